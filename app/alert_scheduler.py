@@ -0,0 +1,314 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Background alert evaluation.
+
+Instead of recomputing alerts for every dashboard viewer, one worker per host
+(elected with a shared-cache lease) evaluates every region after each data
+refresh, runs the results through AlertStateManager and pushes the changes:
+
+- to the event log, which backs the /api/v1/alerts/stream SSE endpoint
+- to any webhook URLs listed in ALERT_WEBHOOK_URLS
+
+A data refresh is detected when the 'regional_summary', 'timeseries' or
+'data_refresh' cache family version changes (POST /api/v1/alerts/evaluate
+bumps the latter); ALERT_SCHEDULER_INTERVAL_SECONDS bounds the time between
+evaluations when no refresh is signalled.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+
+from .config import Config
+from .database import get_regional_summary_latest, get_regional_timeseries
+from .models.predictions import CaseForecastModel, ResourceDemandPredictor
+from .models.alerts import AlertEngine
+from .alert_state import get_alert_state_manager, STATUS_DOWNGRADED, STATUS_REOPENED
+from .events import get_event_log
+from .shared_cache import TABLE_FAMILIES, get_shared_cache, invalidate_tables
+from .hospital_regions import get_region_capacity_map
+
+
+REFRESH_FAMILIES = ('regional_summary', 'timeseries', 'data_refresh')
+# Other jobs that should run on the same data-refresh schedule (e.g. the live feed)
+_refresh_hooks = []
+LEASE_NAME = 'alert-scheduler'
+SNAPSHOT_FAMILY = 'alert_snapshot'
+SNAPSHOT_TTL_SECONDS = 24 * 3600
+
+
+class AlertScheduler:
+    """Evaluate alerts for all regions and push the changes."""
+
+    def __init__(self, engine: Optional[AlertEngine] = None,
+                 region_types: Optional[List[str]] = None,
+                 interval_seconds: Optional[int] = None,
+                 poll_seconds: Optional[int] = None,
+                 webhook_urls: Optional[List[str]] = None,
+                 forecast_days: int = 7):
+        """Initialize the scheduler.
+
+        Args:
+            engine: AlertEngine to evaluate with (default thresholds if None)
+            region_types: Region levels to evaluate
+            interval_seconds: Maximum time between evaluations
+            poll_seconds: How often to check for a data refresh
+            webhook_urls: URLs that receive alert changes as JSON POSTs
+            forecast_days: Horizon for capacity forecasts
+        """
+        self.engine = engine or AlertEngine()
+        self.region_types = region_types or [
+            t.strip() for t in Config.ALERT_SCHEDULER_REGION_TYPES.split(',') if t.strip()
+        ]
+        self.interval_seconds = (Config.ALERT_SCHEDULER_INTERVAL_SECONDS
+                                 if interval_seconds is None else interval_seconds)
+        self.poll_seconds = Config.ALERT_SCHEDULER_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.webhook_urls = webhook_urls if webhook_urls is not None else [
+            url.strip() for url in Config.ALERT_WEBHOOK_URLS.split(',') if url.strip()
+        ]
+        self.forecast_days = forecast_days
+
+        self.last_run = 0.0
+        self.last_versions = None
+        self.last_snapshot: Optional[Dict] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ===================== EVALUATION =====================
+
+    def collect_alerts(self) -> Dict:
+        """Evaluate every rule group for every region.
+
+        Equivalent to AlertEngine.generate_all_alerts per region, but each
+        rule group is evaluated once over all regions.
+
+        Returns:
+            Dict with 'alerts' and the evaluated 'regions' (id -> name)
+        """
+        region_names = {}
+        timeseries_by_region = {}
+        capacity_map = get_region_capacity_map()
+        local_capacity = {}
+
+        for region_type in self.region_types:
+            for region in get_regional_summary_latest(region_type=region_type):
+                region_id = region.get('region_id')
+                region_names[region_id] = region.get('region_name', region_id)
+
+                timeseries = get_regional_timeseries(region_id=region_id, region_type=region_type, days=30)
+                if timeseries:
+                    timeseries_by_region[region_id] = timeseries
+                    # Regions without mapped hospitals only get growth alerts
+                    local = capacity_map.get(region_type, region_id)
+                    if local is not None:
+                        local_capacity[region_id] = local
+
+        case_forecasts = {}
+        for region_id, timeseries in timeseries_by_region.items():
+            if region_id not in local_capacity:
+                continue
+            model = CaseForecastModel()
+            if model.fit(timeseries):
+                forecast = model.forecast(days=self.forecast_days)
+                if forecast.get('success'):
+                    case_forecasts[region_id] = forecast['predictions']
+
+        capacities = {region_id: local['capacity'] for region_id, local in local_capacity.items()}
+        resource_forecasts = ResourceDemandPredictor().predict_resource_needs_many(
+            case_forecasts, capacities,
+            {region_id: local['occupancy'] for region_id, local in local_capacity.items()}
+        )
+
+        alerts = self.engine.generate_growth_alerts_many(timeseries_by_region, region_names)
+        alerts += self.engine.generate_capacity_alerts_many(resource_forecasts, capacities, region_names)
+        alerts += self.engine.generate_resource_depletion_alerts_many(
+            {region_id: local['resource_status'] for region_id, local in local_capacity.items()}, region_names
+        )
+
+        return {'alerts': alerts, 'regions': region_names}
+
+    def run_once(self) -> Dict:
+        """Evaluate, store and push alert changes once.
+
+        Returns:
+            The stored snapshot, including the 'changes' that were pushed
+        """
+        started = time.perf_counter()
+        collected = self.collect_alerts()
+        alerts = collected['alerts']
+
+        manager = get_alert_state_manager()
+        if manager is not None:
+            state = manager.process(alerts, regions=collected['regions'])
+            changes = {
+                'new': state['new'],
+                'escalated': state['escalated'],
+                'resolved': state['resolved'],
+                'updated': [a for a in state['alerts'] if a['status'] in (STATUS_DOWNGRADED, STATUS_REOPENED)],
+            }
+            alerts = state['alerts']
+        else:
+            changes = {'new': alerts, 'escalated': [], 'resolved': [], 'updated': []}
+
+        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+        alerts.sort(key=lambda a: severity_order.get(a['severity'], 99))
+
+        snapshot = {
+            'evaluated_at': datetime.now().isoformat(),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'regions_evaluated': len(collected['regions']),
+            'alerts': alerts,
+            'summary': self.engine.get_alert_summary(alerts),
+            'changes': {kind: len(items) for kind, items in changes.items()},
+        }
+        self.store(snapshot)
+        self.push(changes, snapshot)
+        return snapshot
+
+    def store(self, snapshot: Dict):
+        """Keep the latest evaluation where every worker can serve it."""
+        self.last_snapshot = snapshot
+        cache = get_shared_cache()
+        if cache is not None:
+            # New version first so cached /api/v1/alerts/active responses are invalidated
+            cache.bump_version(SNAPSHOT_FAMILY)
+            cache.set(SNAPSHOT_FAMILY, 'latest', snapshot, ttl=SNAPSHOT_TTL_SECONDS)
+
+    def push(self, changes: Dict, snapshot: Dict):
+        """Publish alert changes to the event log and webhooks."""
+        event_log = get_event_log()
+        for kind, items in changes.items():
+            for alert in items:
+                event_log.publish('alerts', f'alert.{kind}', alert)
+        event_log.publish('alerts', 'alerts.evaluated', {
+            key: snapshot[key] for key in ('evaluated_at', 'regions_evaluated', 'summary', 'changes')
+        })
+        event_log.prune()
+
+        if not any(changes.values()):
+            return
+
+        payload = {'evaluated_at': snapshot['evaluated_at'], **changes}
+        for url in self.webhook_urls:
+            try:
+                requests.post(url, json=payload, timeout=Config.ALERT_WEBHOOK_TIMEOUT_SECONDS)
+            except requests.RequestException as e:
+                print(f"Warning: alert webhook {url} failed: {e}")
+
+    # ===================== SCHEDULING =====================
+
+    def _refresh_versions(self):
+        cache = get_shared_cache()
+        if cache is None:
+            return None
+        return tuple(cache.version(family)[0] for family in REFRESH_FAMILIES)
+
+    def due(self) -> bool:
+        """True after a data refresh or once the interval has elapsed."""
+        if time.time() - self.last_run >= self.interval_seconds:
+            return True
+        return self._refresh_versions() != self.last_versions
+
+    def is_leader(self) -> bool:
+        """Only one worker per host evaluates; others just serve the snapshot."""
+        cache = get_shared_cache()
+        if cache is None:
+            return True
+        return cache.acquire_lease(LEASE_NAME, seconds=max(self.poll_seconds * 3, 60))
+
+    def tick(self) -> Optional[Dict]:
+        """One scheduler iteration: evaluate if this worker leads and a run is due."""
+        # Consume the wake-up on every worker, or a non-leader would keep
+        # returning here immediately from run_forever's wait
+        woken = self._wake.is_set()
+        self._wake.clear()
+        if not self.is_leader() or not (woken or self.due()):
+            return None
+        self.last_versions = self._refresh_versions()
+        self.last_run = time.time()
+
+        for hook in list(_refresh_hooks):
+            try:
+                hook()
+            except Exception as e:
+                print(f"Warning: refresh hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+        return self.run_once()
+
+    def trigger(self):
+        """Ask for an evaluation at the next opportunity (on any worker).
+
+        This is the signal that the data tables were reloaded externally, so
+        the cache families derived from them are invalidated as well.
+        """
+        self._wake.set()
+        cache = get_shared_cache()
+        if cache is not None:
+            invalidate_tables(TABLE_FAMILIES, cache)
+            cache.bump_version('data_refresh')
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Warning: alert evaluation failed: {e}")
+            self._wake.wait(self.poll_seconds)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name='alert-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+def register_refresh_hook(hook):
+    """Run hook() in the scheduler's worker after every data refresh."""
+    if hook not in _refresh_hooks:
+        _refresh_hooks.append(hook)
+
+
+_scheduler: Optional[AlertScheduler] = None
+_scheduler_pid = None
+_scheduler_lock = threading.Lock()
+
+
+def get_alert_scheduler() -> AlertScheduler:
+    """Get this process's AlertScheduler (not started)."""
+    global _scheduler, _scheduler_pid
+    if _scheduler is None or _scheduler_pid != os.getpid():
+        with _scheduler_lock:
+            if _scheduler is None or _scheduler_pid != os.getpid():
+                _scheduler = AlertScheduler()
+                _scheduler_pid = os.getpid()
+    return _scheduler
+
+
+def start_alert_scheduler() -> Optional[AlertScheduler]:
+    """Start the background scheduler thread once per process, if enabled."""
+    if not Config.ALERT_SCHEDULER_ENABLED:
+        return None
+    scheduler = get_alert_scheduler()
+    with _scheduler_lock:
+        if scheduler._thread is None:
+            scheduler.start()
+    return scheduler
+
+
+def latest_alert_snapshot() -> Optional[Dict]:
+    """The most recent evaluation stored by whichever worker ran it."""
+    cache = get_shared_cache()
+    if cache is not None:
+        snapshot = cache.get(SNAPSHOT_FAMILY, 'latest')
+        if snapshot is not None:
+            return snapshot
+    return get_alert_scheduler().last_snapshot
@@ -0,0 +1,353 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Stateful alert tracking on top of AlertEngine.
+
+AlertEngine is stateless: every evaluation produces a fresh set of alerts.
+AlertStateManager keys them by (region_id, alert_type) and keeps one state
+per key, so repeated evaluations report the same alert (same id and
+triggered_at) instead of a new one each time:
+
+- Escalations apply immediately; downgrades and resolution only after the
+  condition has held for several consecutive evaluations (hysteresis), so an
+  alert hovering around a threshold does not flap.
+- An alert that re-fires within the cooldown after resolving is reopened
+  rather than announced again.
+- Only state changes (new, escalated, downgraded, reopened, resolved) are
+  written to the alerts table, batched into one insert and one upsert per
+  evaluation, so write volume follows state changes rather than polling.
+  A failed write is retried at the next evaluation, after re-reading the
+  active alerts so rows stored by other workers are updated, not duplicated.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import Config
+from . import database
+from .shared_cache import get_shared_cache
+
+
+SEVERITY_RANK = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
+STATUS_NEW = 'new'
+STATUS_ONGOING = 'ongoing'
+STATUS_ESCALATED = 'escalated'
+STATUS_DOWNGRADED = 'downgraded'
+STATUS_REOPENED = 'reopened'
+STATUS_CLEARING = 'clearing'
+STATUS_RESOLVED = 'resolved'
+
+AlertKey = Tuple[str, str]
+
+
+def alert_key(alert: Dict) -> AlertKey:
+    return alert['region_id'], alert['alert_type']
+
+
+def dedupe_alerts(alerts: List[Dict]) -> Dict[AlertKey, Dict]:
+    """Collapse alerts to one per (region, type), keeping the most severe."""
+    by_key = {}
+    for alert in alerts:
+        key = alert_key(alert)
+        current = by_key.get(key)
+        if current is None or SEVERITY_RANK.get(alert['severity'], 0) > SEVERITY_RANK.get(current['severity'], 0):
+            by_key[key] = alert
+    return by_key
+
+
+class AlertStateManager:
+    """Deduplicate, debounce and persist alerts produced by AlertEngine."""
+
+    def __init__(self, cooldown_seconds: Optional[int] = None,
+                 resolve_after: Optional[int] = None,
+                 downgrade_after: Optional[int] = None,
+                 sync_seconds: Optional[int] = None,
+                 persist: bool = True,
+                 clock: Callable[[], datetime] = datetime.now):
+        """Initialize the manager.
+
+        Args:
+            cooldown_seconds: Re-fires within this long after resolution reopen
+                the previous alert instead of creating a new one
+            resolve_after: Consecutive evaluations without the alert before it
+                is resolved
+            downgrade_after: Consecutive evaluations at a lower severity before
+                the severity is lowered
+            sync_seconds: How often to reload active alerts from the database
+                (picks up changes made by other workers)
+            persist: Write state changes to the alerts table
+            clock: Returns the current time (overridable in tests)
+        """
+        self.cooldown = timedelta(seconds=Config.ALERT_COOLDOWN_SECONDS
+                                  if cooldown_seconds is None else cooldown_seconds)
+        self.resolve_after = max(1, Config.ALERT_RESOLVE_AFTER if resolve_after is None else resolve_after)
+        self.downgrade_after = max(1, Config.ALERT_DOWNGRADE_AFTER if downgrade_after is None else downgrade_after)
+        self.sync_interval = timedelta(seconds=Config.ALERT_STATE_SYNC_SECONDS
+                                       if sync_seconds is None else sync_seconds)
+        self.persist = persist
+        self.clock = clock
+
+        self._states: Dict[AlertKey, Dict] = {}
+        self._synced_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    # ===================== DATABASE SYNC =====================
+
+    def _sync(self, now: datetime, force: bool = False):
+        """Adopt active alerts from the database (e.g. written by another worker)."""
+        if not self.persist or (not force and self._synced_at and now - self._synced_at < self.sync_interval):
+            return
+        self._synced_at = now
+
+        try:
+            rows = database.get_active_alerts.uncached()
+        except Exception as e:
+            print(f"Warning: could not load active alerts: {e}")
+            return
+
+        active = {}
+        for row in rows:
+            key = (row['region_id'], row['alert_type'])
+            active[key] = row
+            state = self._states.get(key)
+            if state is not None and state['resolved_at'] is None and not state.get('id'):
+                # Raised here but not written yet, while another worker already
+                # stored it: update that row instead of inserting a duplicate
+                state.update(id=row.get('id'), triggered_at=row.get('triggered_at') or state['triggered_at'])
+            elif state is None or state['resolved_at'] is not None:
+                self._states[key] = {
+                    'id': row.get('id'),
+                    'region_id': row['region_id'],
+                    'alert_type': row['alert_type'],
+                    'severity': row['severity'],
+                    'triggered_at': row.get('triggered_at'),
+                    'resolved_at': None,
+                    'alert': {
+                        'region_id': row['region_id'],
+                        'region_name': row['region_id'],
+                        'alert_type': row['alert_type'],
+                        'severity': row['severity'],
+                        'description': row.get('description'),
+                    },
+                    'missed': 0,
+                    'lower_seen': 0,
+                    'dirty': False,
+                }
+
+        # Active locally but resolved elsewhere
+        for key, state in self._states.items():
+            if state['resolved_at'] is None and state.get('id') and key not in active and not state['dirty']:
+                state['resolved_at'] = now.isoformat()
+                state['resolved_dt'] = now
+
+    def _write(self, states: List[Dict]) -> int:
+        """Persist changed states: one insert for new rows, one upsert for the rest.
+
+        Returns:
+            Number of states written; the rest stay dirty for the next evaluation
+        """
+        if not self.persist or not states:
+            for state in states:
+                state['dirty'] = False
+            return 0
+
+        def row(state):
+            data = {
+                'region_id': state['region_id'],
+                'alert_type': state['alert_type'],
+                'severity': state['severity'],
+                'description': state['alert'].get('description'),
+                'triggered_at': state['triggered_at'],
+                'resolved_at': state['resolved_at'],
+            }
+            if state.get('id'):
+                data['id'] = state['id']
+            return data
+
+        new = [s for s in states if not s.get('id')]
+        existing = [s for s in states if s.get('id')]
+        written = []
+
+        try:
+            inserted = database.insert_alerts([row(s) for s in new])
+            for state, saved in zip(new, inserted):
+                state['id'] = saved.get('id')
+            written += new
+        except Exception as e:
+            # Usually one row conflicting with an alert another worker stored;
+            # retry row by row so the others are not lost with it
+            print(f"Warning: could not persist new alerts in one batch: {e}")
+            for state in new:
+                try:
+                    saved = database.insert_alerts([row(state)])
+                    state['id'] = saved[0].get('id') if saved else None
+                    written.append(state)
+                except Exception as e:
+                    print(f"Warning: could not persist alert {state['region_id']}/{state['alert_type']}: {e}")
+
+        try:
+            database.upsert_alerts([row(s) for s in existing])
+            written += existing
+        except Exception as e:
+            print(f"Warning: could not persist alert state: {e}")
+
+        # Failed states stay dirty so the next evaluation retries them, after
+        # a forced sync has adopted any rows other workers wrote meanwhile
+        for state in written:
+            state['dirty'] = False
+        if len(written) < len(states):
+            self._synced_at = None
+        if not written:
+            return 0
+
+        cache = get_shared_cache()
+        if cache is not None:
+            cache.bump_version('alerts')
+
+        return len(written)
+
+    # ===================== EVALUATION =====================
+
+    def _view(self, state: Dict, status: str) -> Dict:
+        alert = dict(state['alert'])
+        alert.update({
+            'alert_id': state.get('id'),
+            'severity': state['severity'],
+            'status': status,
+            'triggered_at': state['triggered_at'],
+            'last_seen_at': state.get('last_seen_at'),
+        })
+        if state['resolved_at']:
+            alert['resolved_at'] = state['resolved_at']
+        return alert
+
+    def _new_state(self, alert: Dict, now: datetime) -> Dict:
+        return {
+            'id': None,
+            'region_id': alert['region_id'],
+            'alert_type': alert['alert_type'],
+            'severity': alert['severity'],
+            'triggered_at': alert.get('triggered_at') or now.isoformat(),
+            'resolved_at': None,
+            'alert': alert,
+            'missed': 0,
+            'lower_seen': 0,
+            'dirty': True,
+        }
+
+    def process(self, alerts: List[Dict], regions: Optional[Iterable[str]] = None,
+                alert_types: Optional[Iterable[str]] = None) -> Dict:
+        """Apply one evaluation's alerts to the tracked state.
+
+        Args:
+            alerts: Alerts from AlertEngine for this evaluation
+            regions: Region ids that were evaluated; active alerts for other
+                regions are left alone (None means all regions)
+            alert_types: Alert types the evaluation can produce; active alerts
+                of other types are left alone (None means all types)
+
+        Returns:
+            Dict with 'alerts' (active alerts with id, status and the original
+            triggered_at), the 'new', 'escalated' and 'resolved' changes, and
+            'writes' (rows written to the database)
+        """
+        now = self.clock()
+        regions = set(regions) if regions is not None else None
+        alert_types = set(alert_types) if alert_types is not None else None
+        current = dedupe_alerts(alerts)
+
+        with self._lock:
+            self._sync(now, force=self._synced_at is None or any(
+                key not in self._states for key in current
+            ))
+
+            changes = {STATUS_NEW: [], STATUS_ESCALATED: [], STATUS_RESOLVED: []}
+            active = []  # (state, status), rendered after the write so new alerts carry ids
+
+            for key, alert in current.items():
+                state = self._states.get(key)
+                status = STATUS_ONGOING
+
+                if state is None or (state['resolved_at'] and now - state['resolved_dt'] > self.cooldown):
+                    state = self._states[key] = self._new_state(alert, now)
+                    status = STATUS_NEW
+                    changes[STATUS_NEW].append(state)
+                elif state['resolved_at']:
+                    # Re-fired within the cooldown: reopen instead of announcing again
+                    state.update(resolved_at=None, resolved_dt=None, missed=0, lower_seen=0,
+                                 severity=alert['severity'], dirty=True)
+                    status = STATUS_REOPENED
+                else:
+                    state['missed'] = 0
+                    rank = SEVERITY_RANK.get(alert['severity'], 0)
+                    current_rank = SEVERITY_RANK.get(state['severity'], 0)
+
+                    if rank > current_rank:
+                        state.update(severity=alert['severity'], lower_seen=0, dirty=True)
+                        status = STATUS_ESCALATED
+                        changes[STATUS_ESCALATED].append(state)
+                    elif rank < current_rank:
+                        state['lower_seen'] += 1
+                        if state['lower_seen'] >= self.downgrade_after:
+                            state.update(severity=alert['severity'], lower_seen=0, dirty=True)
+                            status = STATUS_DOWNGRADED
+                    else:
+                        state['lower_seen'] = 0
+
+                state['alert'] = alert
+                state['last_seen_at'] = now.isoformat()
+                active.append((state, status))
+
+            for key, state in self._states.items():
+                if key in current or state['resolved_at']:
+                    continue
+                if (regions is not None and key[0] not in regions) or \
+                        (alert_types is not None and key[1] not in alert_types):
+                    continue
+
+                state['missed'] += 1
+                if state['missed'] >= self.resolve_after:
+                    state.update(resolved_at=now.isoformat(), resolved_dt=now, dirty=True)
+                    changes[STATUS_RESOLVED].append(state)
+                else:
+                    # Still reported while it clears, so dashboards do not flicker
+                    active.append((state, STATUS_CLEARING))
+
+            # Forget resolved alerts once their cooldown has passed
+            for key in [k for k, s in self._states.items()
+                        if s['resolved_at'] and not s['dirty'] and now - s['resolved_dt'] > self.cooldown]:
+                del self._states[key]
+
+            writes = self._write([s for s in self._states.values() if s['dirty']])
+
+            return {
+                'alerts': [self._view(state, status) for state, status in active],
+                'new': [self._view(s, STATUS_NEW) for s in changes[STATUS_NEW]],
+                'escalated': [self._view(s, STATUS_ESCALATED) for s in changes[STATUS_ESCALATED]],
+                'resolved': [self._view(s, STATUS_RESOLVED) for s in changes[STATUS_RESOLVED]],
+                'writes': writes,
+            }
+
+    def active_alerts(self) -> List[Dict]:
+        """Currently active alerts as last reported."""
+        with self._lock:
+            return [self._view(s, STATUS_ONGOING) for s in self._states.values() if not s['resolved_at']]
+
+
+_manager: Optional[AlertStateManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_alert_state_manager() -> Optional[AlertStateManager]:
+    """Get the process-wide AlertStateManager, or None when disabled."""
+    global _manager
+    if not Config.ALERT_STATE_ENABLED:
+        return None
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = AlertStateManager()
+    return _manager
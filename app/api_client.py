@@ -1,8 +1,16 @@
 # AI Attribution: This file was developed with assistance from Claude (Anthropic).
 # https://claude.ai
 
+import os
+import threading
+import time
+import uuid
+from typing import List, Tuple, Union
+
 import requests
 from .config import Config
+from .metrics import instrumented
+from .model_telemetry import get_model_telemetry
 
 
 class ModelAPIError(Exception):
@@ -10,6 +18,83 @@ class ModelAPIError(Exception):
     pass
 
 
+class BatchNotSupported(ModelAPIError):
+    """Raised when the model API has no batch endpoint or rejects the batch size."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Statuses meaning the batch endpoint does not exist, or cannot take this batch
+BATCH_UNSUPPORTED_STATUSES = {404, 405, 501}
+BATCH_TOO_LARGE_STATUS = 413
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class MultipartBody:
+    """multipart/form-data request body streamed from the parts' files.
+
+    requests would otherwise encode every file into one bytes object. This
+    object reports its length up front (so Content-Length is still sent) and
+    reads each file in chunks only as the body is written to the socket.
+    """
+
+    def __init__(self, parts: List[Tuple[str, object]]):
+        """Build the body.
+
+        Args:
+            parts: (field name, file-like with filename/content_type) pairs
+        """
+        self.boundary = uuid.uuid4().hex
+        self._segments = []
+        for field, image_file in parts:
+            filename = str(image_file.filename or 'upload').replace('"', '%22').replace('\r', '').replace('\n', '')
+            content_type = image_file.content_type or 'application/octet-stream'
+            self._segments.append((
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n'
+            ).encode())
+            self._segments.append((image_file, _file_size(image_file)))
+            self._segments.append(b'\r\n')
+        self._segments.append(f'--{self.boundary}--\r\n'.encode())
+        self.len = sum(len(s) if isinstance(s, bytes) else s[1] for s in self._segments)
+        self._index = 0
+        self._offset = 0
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self) -> int:
+        return self.len
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.len
+        out = []
+        while size > 0 and self._index < len(self._segments):
+            segment = self._segments[self._index]
+            if isinstance(segment, bytes):
+                chunk = segment[self._offset:self._offset + size]
+            else:
+                image_file, length = segment
+                if self._offset == 0:
+                    image_file.seek(0)
+                chunk = image_file.read(min(size, length - self._offset, STREAM_CHUNK_BYTES)) or b''
+                if not chunk and self._offset < length:
+                    raise ModelAPIError("Image changed while it was being sent")
+            self._offset += len(chunk)
+            size -= len(chunk)
+            out.append(chunk)
+            if self._offset >= (len(segment) if isinstance(segment, bytes) else segment[1]):
+                self._index += 1
+                self._offset = 0
+        return b''.join(out)
+
+
+@instrumented('model_api', 'health')
 def check_model_health():
     """
     Ping the model API health endpoint.
@@ -28,6 +113,7 @@ def check_model_health():
         return False
 
 
+@instrumented('model_api', 'predict')
 def get_prediction(image_file):
     """
     Send an image to the model API and get a prediction.
@@ -44,13 +130,20 @@ def get_prediction(image_file):
     """
     if not Config.MODEL_API_URL:
         raise ModelAPIError("Model API URL not configured")
-    
+
+    telemetry = get_model_telemetry() if Config.METRICS_ENABLED else None
+    outcome, model_version, processing_ms, response_bytes = 'error', None, None, 0
+    request_bytes = _file_size(image_file)
+    if telemetry is not None:
+        telemetry.begin()
+    start = time.perf_counter()
+
     try:
         # Reset file pointer in case it was read before
         image_file.seek(0)
 
-        files = {'image': (image_file.filename, image_file, image_file.content_type)}
-        headers = {}
+        body = MultipartBody([('image', image_file)])
+        headers = {'Content-Type': body.content_type}
 
         if Config.MODEL_API_KEY:
             headers['Authorization'] = f'Bearer {Config.MODEL_API_KEY}'
@@ -60,12 +153,14 @@ def get_prediction(image_file):
 
         resp = requests.post(
             Config.MODEL_API_URL,
-            files=files,
+            data=body,
             headers=headers,
             timeout=timeout
         )
-        
+        response_bytes = _content_length(resp)
+
         if resp.status_code != 200:
+            outcome = 'http_error'
             # Try to get error message from response
             try:
                 error_data = resp.json()
@@ -73,18 +168,221 @@ def get_prediction(image_file):
             except ValueError:
                 msg = f'API returned status {resp.status_code}'
             raise ModelAPIError(msg)
-        
+
         data = resp.json()
-        
+
         # Validate response has required fields
         if 'prediction' not in data or 'confidence' not in data:
+            outcome = 'invalid_response'
             raise ModelAPIError("Invalid response format from model API")
-        
+
+        outcome = 'success'
+        model_version = data.get('model_version')
+        processing_ms = data.get('processing_time_ms')
         return data
-        
+
     except requests.Timeout:
+        outcome = 'timeout'
         raise ModelAPIError("Analysis is taking longer than expected. Please try again.")
     except requests.ConnectionError:
+        outcome = 'connection_error'
         raise ModelAPIError("Unable to connect to analysis service. Please check your connection.")
     except requests.RequestException as e:
         raise ModelAPIError(f"Request failed: {str(e)}")
+    finally:
+        if telemetry is not None:
+            telemetry.end(model_version, outcome, time.perf_counter() - start,
+                          processing_ms, request_bytes, response_bytes)
+
+
+# ===================== BATCH PREDICTIONS =====================
+
+_batch_unsupported_until = 0.0
+_batch_lock = threading.Lock()
+
+
+def get_batch_url() -> str:
+    """Batch endpoint: MODEL_API_BATCH_URL, or '<MODEL_API_URL>/batch'."""
+    if Config.MODEL_API_BATCH_URL:
+        return Config.MODEL_API_BATCH_URL
+    if Config.MODEL_API_URL:
+        return Config.MODEL_API_URL.rstrip('/') + '/batch'
+    return ''
+
+
+def batching_available() -> bool:
+    """False when batching is off or the server recently rejected a batch."""
+    return (Config.MODEL_API_BATCH_SIZE > 1 and bool(get_batch_url())
+            and time.time() >= _batch_unsupported_until)
+
+
+def _mark_batch_unsupported():
+    global _batch_unsupported_until
+    with _batch_lock:
+        _batch_unsupported_until = time.time() + Config.MODEL_API_BATCH_RETRY_SECONDS
+    print(f"Warning: model API batch endpoint unavailable; using per-image calls for "
+          f"{Config.MODEL_API_BATCH_RETRY_SECONDS}s")
+
+
+def plan_batches(sizes: List[int], max_files: int, max_bytes: int) -> List[List[int]]:
+    """Split files (in order) into batches of at most max_files and max_bytes.
+
+    A file larger than max_bytes on its own still gets a batch of one.
+
+    Returns:
+        Lists of indexes into sizes
+    """
+    batches, current, current_bytes = [], [], 0
+    for i, size in enumerate(sizes):
+        if current and (len(current) >= max_files or current_bytes + size > max_bytes):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(i)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _predict_one(image_file) -> Union[dict, ModelAPIError]:
+    try:
+        return get_prediction(image_file)
+    except ModelAPIError as e:
+        return e
+
+
+@instrumented('model_api', 'predict_batch')
+def _post_batch(image_files: list, sizes: List[int]) -> List[Union[dict, ModelAPIError]]:
+    """Send one multipart request with several images.
+
+    Raises:
+        BatchNotSupported: If the server has no batch endpoint or rejects the size
+        ModelAPIError: If the whole request fails
+    """
+    telemetry = get_model_telemetry() if Config.METRICS_ENABLED else None
+    if telemetry is not None:
+        for _ in image_files:
+            telemetry.begin()
+    outcome, response_bytes = 'error', 0
+    results = [None] * len(image_files)
+    start = time.perf_counter()
+
+    try:
+        body = MultipartBody([('images', image_file) for image_file in image_files])
+        headers = {'Content-Type': body.content_type}
+        if Config.MODEL_API_KEY:
+            headers['Authorization'] = f'Bearer {Config.MODEL_API_KEY}'
+
+        resp = requests.post(get_batch_url(), data=body, headers=headers,
+                             timeout=max(Config.API_TIMEOUT_SECONDS, 60))
+        response_bytes = _content_length(resp)
+
+        if resp.status_code in BATCH_UNSUPPORTED_STATUSES or resp.status_code == BATCH_TOO_LARGE_STATUS:
+            outcome = 'batch_unsupported'
+            raise BatchNotSupported(f'Batch request rejected with status {resp.status_code}',
+                                    resp.status_code)
+        if resp.status_code != 200:
+            outcome = 'http_error'
+            try:
+                msg = resp.json().get('error', f'API returned status {resp.status_code}')
+            except ValueError:
+                msg = f'API returned status {resp.status_code}'
+            raise ModelAPIError(msg)
+
+        data = resp.json()
+        predictions = data.get('predictions') if isinstance(data, dict) else None
+        if not isinstance(predictions, list) or len(predictions) != len(image_files):
+            outcome = 'invalid_response'
+            raise ModelAPIError("Invalid response format from model API")
+
+        for i, item in enumerate(predictions):
+            if not isinstance(item, dict):
+                results[i] = ModelAPIError("Invalid response format from model API")
+            elif 'prediction' not in item or 'confidence' not in item:
+                results[i] = ModelAPIError(item.get('error') or "Invalid response format from model API")
+            else:
+                if data.get('model_version') and 'model_version' not in item:
+                    item['model_version'] = data['model_version']
+                results[i] = item
+        outcome = 'success'
+        return results
+
+    except requests.Timeout:
+        outcome = 'timeout'
+        raise ModelAPIError("Analysis is taking longer than expected. Please try again.")
+    except requests.ConnectionError:
+        outcome = 'connection_error'
+        raise ModelAPIError("Unable to connect to analysis service. Please check your connection.")
+    except requests.RequestException as e:
+        raise ModelAPIError(f"Request failed: {str(e)}")
+    finally:
+        if telemetry is not None:
+            # One sample per image: each waited for the whole batch
+            elapsed = time.perf_counter() - start
+            for i, size in enumerate(sizes):
+                result = results[i]
+                if isinstance(result, dict):
+                    telemetry.end(result.get('model_version'), 'success', elapsed,
+                                  result.get('processing_time_ms'), size, response_bytes if i == 0 else 0)
+                else:
+                    telemetry.end(None, outcome if outcome != 'success' else 'error',
+                                  elapsed, None, size, response_bytes if i == 0 else 0)
+
+
+def get_predictions_batch(image_files: list) -> List[Union[dict, ModelAPIError]]:
+    """Get predictions for several images, batching them into few requests.
+
+    Images are packed into multipart requests of at most MODEL_API_BATCH_SIZE
+    files and MODEL_API_BATCH_MAX_BYTES. If the server has no batch endpoint
+    (404/405/501) the images are sent one per request instead, and batching is
+    not retried for MODEL_API_BATCH_RETRY_SECONDS; a 413 falls back for that
+    batch only.
+
+    Args:
+        image_files: File-like objects (from request.files)
+
+    Returns:
+        One entry per input file, in order: the prediction dict (as returned by
+        get_prediction) or the ModelAPIError for that file
+    """
+    if not Config.MODEL_API_URL:
+        raise ModelAPIError("Model API URL not configured")
+
+    results: List[Union[dict, ModelAPIError]] = [None] * len(image_files)
+    sizes = [_file_size(f) for f in image_files]
+
+    for batch in plan_batches(sizes, max(1, Config.MODEL_API_BATCH_SIZE), Config.MODEL_API_BATCH_MAX_BYTES):
+        if len(batch) > 1 and batching_available():
+            try:
+                for i, result in zip(batch, _post_batch([image_files[i] for i in batch],
+                                                        [sizes[i] for i in batch])):
+                    results[i] = result
+                continue
+            except BatchNotSupported as e:
+                if e.status_code != BATCH_TOO_LARGE_STATUS:
+                    _mark_batch_unsupported()
+            except ModelAPIError as e:
+                for i in batch:
+                    results[i] = e
+                continue
+
+        for i in batch:
+            results[i] = _predict_one(image_files[i])
+
+    return results
+
+
+def _file_size(image_file) -> int:
+    """Size of an uploaded file in bytes, or 0 if it cannot be determined."""
+    try:
+        image_file.seek(0, os.SEEK_END)
+        return int(image_file.tell())
+    except (AttributeError, OSError, TypeError, ValueError):
+        return 0
+
+
+def _content_length(resp) -> int:
+    try:
+        return int(resp.headers.get('Content-Length') or len(resp.content))
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,131 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Response compression and compact columnar JSON for analytics payloads.
+
+Compression is negotiated per request from Accept-Encoding: Brotli when the
+optional ``brotli`` package is installed and the client accepts it, gzip
+otherwise. Small bodies are sent as-is since compression would not pay off.
+"""
+
+import gzip
+from typing import Dict, List, Optional
+
+from flask import request
+
+from .config import Config
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/css',
+                          'application/javascript', 'text/event-stream'}
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """Pick the best supported encoding from the request's Accept-Encoding."""
+    if BROTLI_AVAILABLE and accept_encodings['br'] > 0:
+        return 'br'
+    if accept_encodings['gzip'] > 0:
+        return 'gzip'
+    return None
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """Compress a response body with the given content-coding."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=Config.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=Config.GZIP_LEVEL)
+
+
+def compress_response(response):
+    """after_request hook that compresses eligible responses."""
+    response.vary.add('Accept-Encoding')
+
+    if (not Config.COMPRESSION_ENABLED
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < Config.COMPRESSION_MIN_BYTES:
+        return response
+
+    response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def register_compression(app):
+    """Install the compression hook on a Flask app."""
+    app.after_request(compress_response)
+
+
+# ===================== COLUMNAR JSON =====================
+
+def wants_columnar() -> bool:
+    """True if the client asked for the columnar shape (?format=columnar)."""
+    return request.args.get('format', '').lower() == 'columnar'
+
+
+def to_columnar(rows: List[Dict], fields: Optional[List[str]] = None) -> Dict:
+    """Convert a list of flat dicts into one array per field.
+
+    Args:
+        rows: Records sharing (mostly) the same keys
+        fields: Field order; defaults to the keys of the first row followed by
+            any keys that only appear later
+
+    Returns:
+        Dict with 'fields', 'length' and 'columns' (field -> list of values)
+    """
+    if fields is None:
+        fields = []
+        seen = set()
+        for row in rows:
+            for field in row:
+                if field not in seen:
+                    seen.add(field)
+                    fields.append(field)
+
+    return {
+        'fields': fields,
+        'length': len(rows),
+        'columns': {field: [row.get(field) for row in rows] for field in fields},
+    }
+
+
+def from_columnar(payload: Dict) -> List[Dict]:
+    """Inverse of to_columnar."""
+    fields = payload['fields']
+    columns = [payload['columns'][field] for field in fields]
+    return [dict(zip(fields, values)) for values in zip(*columns)]
+
+
+def columnar_forecast_report(report: Dict) -> Dict:
+    """Return a copy of a forecast report with its per-day lists in columnar form."""
+    if not report.get('success'):
+        return report
+
+    compact = dict(report)
+    compact['format'] = 'columnar'
+    compact['case_forecast'] = to_columnar(report.get('case_forecast', []))
+
+    resource_forecast = report.get('resource_forecast')
+    if resource_forecast and resource_forecast.get('success'):
+        compact['resource_forecast'] = dict(resource_forecast)
+        compact['resource_forecast']['timeline'] = to_columnar(resource_forecast.get('timeline', []))
+
+    return compact
@@ -16,6 +16,16 @@ class Config:
     MODEL_API_URL = os.getenv('MODEL_API_URL', '')
     MODEL_API_HEALTH_URL = os.getenv('MODEL_API_HEALTH_URL', '')
     MODEL_API_KEY = os.getenv('MODEL_API_KEY', '')
+    # Batch endpoint (defaults to MODEL_API_URL + '/batch'); falls back to per-image calls
+    MODEL_API_BATCH_URL = os.getenv('MODEL_API_BATCH_URL', '')
+    MODEL_API_BATCH_SIZE = int(os.getenv('MODEL_API_BATCH_SIZE', '16'))
+    MODEL_API_BATCH_MAX_BYTES = int(os.getenv('MODEL_API_BATCH_MAX_BYTES', str(32 * 1024 * 1024)))
+    MODEL_API_BATCH_RETRY_SECONDS = int(os.getenv('MODEL_API_BATCH_RETRY_SECONDS', '3600'))
+    # Batch images from concurrent uploads (see app/micro_batcher.py)
+    MICRO_BATCH_ENABLED = os.getenv('MICRO_BATCH_ENABLED', 'True').lower() == 'true'
+    MICRO_BATCH_MAX_WAIT_MS = float(os.getenv('MICRO_BATCH_MAX_WAIT_MS', '10'))
+    MICRO_BATCH_MIN_WAIT_MS = float(os.getenv('MICRO_BATCH_MIN_WAIT_MS', '0.5'))
+    MICRO_BATCH_CONCURRENCY = int(os.getenv('MICRO_BATCH_CONCURRENCY', '4'))
 
     # Supabase Configuration
     SUPABASE_URL = os.getenv('SUPABASE_URL', '')
@@ -25,6 +35,17 @@ class Config:
     API_TIMEOUT_SECONDS = int(os.getenv('API_TIMEOUT_SECONDS', '30'))
     MAX_FILE_SIZE_MB = int(os.getenv('MAX_FILE_SIZE_MB', '10'))
     MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+    MAX_FILES_PER_UPLOAD = int(os.getenv('MAX_FILES_PER_UPLOAD', '50'))
+    # Larger images are rejected from their header (guards against decompression bombs)
+    MAX_IMAGE_PIXELS = int(os.getenv('MAX_IMAGE_PIXELS', '100000000'))
+    # Accepted images are held in memory up to this size each, then spooled to disk
+    UPLOAD_SPOOL_KB = int(os.getenv('UPLOAD_SPOOL_KB', '512'))
+
+    # Content-addressed image store (defaults to the uploads/ directory)
+    IMAGE_STORE_ENABLED = os.getenv('IMAGE_STORE_ENABLED', 'True').lower() == 'true'
+    IMAGE_STORE_PATH = os.getenv('IMAGE_STORE_PATH', '')
+    IMAGE_STORE_TTL_DAYS = float(os.getenv('IMAGE_STORE_TTL_DAYS', '30'))
+    IMAGE_STORE_GC_INTERVAL_SECONDS = int(os.getenv('IMAGE_STORE_GC_INTERVAL_SECONDS', '3600'))
 
     # Flask Configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -34,6 +55,75 @@ class Config:
     # Allowed file types
     ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png'}
 
+    # Shared cache (SQLite file shared by all workers on the host)
+    SHARED_CACHE_ENABLED = os.getenv('SHARED_CACHE_ENABLED', 'True').lower() == 'true'
+    SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH', '')
+    SHARED_CACHE_TTL_SECONDS = int(os.getenv('SHARED_CACHE_TTL_SECONDS', '300'))
+    FORECAST_CACHE_TTL_SECONDS = int(os.getenv('FORECAST_CACHE_TTL_SECONDS', '900'))
+
+    # HTTP caching for read-only API endpoints
+    HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'True').lower() == 'true'
+    HTTP_CACHE_MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', '30'))
+    HTTP_CACHE_TTL_SECONDS = int(os.getenv('HTTP_CACHE_TTL_SECONDS', '60'))
+    # Per-endpoint Cache-Control, e.g. "api_alerts=no-cache;api_global_stats=public, max-age=120"
+    HTTP_CACHE_CONTROL_OVERRIDES = os.getenv('HTTP_CACHE_CONTROL_OVERRIDES', '')
+
+    # Response compression (Brotli is used when the optional brotli package is installed)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+    GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '6'))
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '5'))
+
+    # Alert state (deduplication, hysteresis and persistence to the alerts table)
+    ALERT_STATE_ENABLED = os.getenv('ALERT_STATE_ENABLED', 'True').lower() == 'true'
+    ALERT_COOLDOWN_SECONDS = int(os.getenv('ALERT_COOLDOWN_SECONDS', '3600'))
+    ALERT_RESOLVE_AFTER = int(os.getenv('ALERT_RESOLVE_AFTER', '3'))
+    ALERT_DOWNGRADE_AFTER = int(os.getenv('ALERT_DOWNGRADE_AFTER', '3'))
+    ALERT_STATE_SYNC_SECONDS = int(os.getenv('ALERT_STATE_SYNC_SECONDS', '60'))
+
+    # Background alert evaluation and push delivery
+    ALERT_SCHEDULER_ENABLED = os.getenv('ALERT_SCHEDULER_ENABLED', 'True').lower() == 'true'
+    ALERT_SCHEDULER_INTERVAL_SECONDS = int(os.getenv('ALERT_SCHEDULER_INTERVAL_SECONDS', '900'))
+    ALERT_SCHEDULER_POLL_SECONDS = int(os.getenv('ALERT_SCHEDULER_POLL_SECONDS', '30'))
+    ALERT_SCHEDULER_REGION_TYPES = os.getenv('ALERT_SCHEDULER_REGION_TYPES', 'country')
+    # Required by POST /api/v1/alerts/evaluate; the endpoint is off when unset
+    ALERT_EVALUATE_TOKEN = os.getenv('ALERT_EVALUATE_TOKEN', '')
+    ALERT_WEBHOOK_URLS = os.getenv('ALERT_WEBHOOK_URLS', '')
+    ALERT_WEBHOOK_TIMEOUT_SECONDS = int(os.getenv('ALERT_WEBHOOK_TIMEOUT_SECONDS', '5'))
+
+    # Event log behind the SSE streams
+    EVENT_LOG_PATH = os.getenv('EVENT_LOG_PATH', '')
+    EVENT_RETENTION_SECONDS = int(os.getenv('EVENT_RETENTION_SECONDS', '3600'))
+    SSE_KEEPALIVE_SECONDS = int(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+    SSE_RETRY_MS = int(os.getenv('SSE_RETRY_MS', '3000'))
+
+    # In-memory region hierarchy (re-synced on data refresh or after this long)
+    REGION_INDEX_REFRESH_SECONDS = int(os.getenv('REGION_INDEX_REFRESH_SECONDS', '300'))
+    REGION_CAPACITY_REFRESH_SECONDS = int(os.getenv('REGION_CAPACITY_REFRESH_SECONDS', '300'))
+
+    # Spatial index behind the /api/v1/geo map endpoints
+    GEO_INDEX_REFRESH_SECONDS = int(os.getenv('GEO_INDEX_REFRESH_SECONDS', '300'))
+    GEO_INDEX_CELL_DEGREES = float(os.getenv('GEO_INDEX_CELL_DEGREES', '1.0'))
+
+    # Clustered map tiles
+    MAP_CLUSTER_MAX_ZOOM = int(os.getenv('MAP_CLUSTER_MAX_ZOOM', '12'))
+    MAP_TILE_TTL_SECONDS = int(os.getenv('MAP_TILE_TTL_SECONDS', '3600'))
+
+    # Latency histograms served on /metrics (Prometheus text format)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    # If set, /metrics requires "Authorization: Bearer <token>"
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    # Recent model API calls per model_version used for latency percentiles
+    MODEL_TELEMETRY_WINDOW = int(os.getenv('MODEL_TELEMETRY_WINDOW', '1000'))
+
+    # Request profiling (off unless a token is set; see app/profiling.py)
+    PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+    PROFILE_SLOW_MS = int(os.getenv('PROFILE_SLOW_MS', '0'))
+    PROFILE_SAMPLE_INTERVAL_MS = int(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '10'))
+    PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', '25'))
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '50'))
+    PROFILE_TTL_SECONDS = int(os.getenv('PROFILE_TTL_SECONDS', '86400'))
+
     # Mapbox Configuration (for surveillance dashboard)
     MAPBOX_ACCESS_TOKEN = os.getenv('MAPBOX_ACCESS_TOKEN', '')
 
@@ -2,8 +2,15 @@
 # https://claude.ai
 
 import os
+from datetime import date, timedelta
+from typing import Optional, Tuple, Union
 from supabase import create_client, Client
 from .config import Config
+from .memo import memoized_read, clear_request_memo
+from .metrics import instrumented
+from .shared_cache import shared_cached
+
+DateLike = Union[date, str]
 
 # Initialize Supabase client
 def get_supabase_client() -> Client:
@@ -17,7 +24,43 @@ def get_supabase_client() -> Client:
     return create_client(supabase_url, supabase_key)
 
 
+def _date_bounds(days: int = None, start_date: Optional[DateLike] = None,
+                 end_date: Optional[DateLike] = None) -> Tuple[str, str]:
+    """Resolve a date window into concrete ISO date bounds.
+
+    An explicit start_date/end_date takes precedence; otherwise the window
+    covers the last ``days`` days including today. The bounds are
+    plain 'YYYY-MM-DD' strings so PostgREST sends them as literals that can
+    use the date indexes for a range scan.
+    """
+    end = _as_date(end_date) if end_date else date.today()
+    if start_date:
+        start = _as_date(start_date)
+    else:
+        start = end - timedelta(days=max(days or 0, 1) - 1)
+
+    if start > end:
+        raise ValueError(f"start_date {start} is after end_date {end}")
+
+    return start.isoformat(), end.isoformat()
+
+
+def _as_date(value: DateLike) -> date:
+    """Accept a date/datetime or an ISO-formatted string."""
+    if isinstance(value, date):
+        return value if type(value) is date else value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def _apply_date_window(query, days: int = None, start_date: Optional[DateLike] = None,
+                       end_date: Optional[DateLike] = None):
+    """Add an inclusive [start, end] filter on the 'date' column."""
+    start, end = _date_bounds(days, start_date, end_date)
+    return query.gte('date', start).lte('date', end)
+
+
 # Database helper functions
+@instrumented('db')
 def create_hospital(name: str, city: str, state: str, country: str,
                    latitude: float, longitude: float, registration_number: str,
                    total_beds: int, icu_beds: int) -> dict:
@@ -35,9 +78,12 @@ def create_hospital(name: str, city: str, state: str, country: str,
         'icu_beds': icu_beds,
     }
     response = supabase.table('hospitals').insert(data).execute()
+    clear_request_memo()
     return response.data[0] if response.data else None
 
 
+@memoized_read
+@instrumented('db')
 def get_hospital(hospital_id: str) -> dict:
     """Get hospital by ID."""
     supabase = get_supabase_client()
@@ -45,6 +91,8 @@ def get_hospital(hospital_id: str) -> dict:
     return response.data[0] if response.data else None
 
 
+@memoized_read
+@instrumented('db')
 def get_all_hospitals() -> list:
     """Get all hospitals."""
     supabase = get_supabase_client()
@@ -52,6 +100,7 @@ def get_all_hospitals() -> list:
     return response.data
 
 
+@instrumented('db')
 def create_upload(hospital_id: str, user_id: str, image_count: int) -> dict:
     """Create a new upload record."""
     supabase = get_supabase_client()
@@ -62,9 +111,11 @@ def create_upload(hospital_id: str, user_id: str, image_count: int) -> dict:
         'status': 'processing',
     }
     response = supabase.table('uploads').insert(data).execute()
+    clear_request_memo()
     return response.data[0] if response.data else None
 
 
+@instrumented('db')
 def create_analysis(upload_id: str, image_path: str, prediction: str,
                    confidence: float, severity: str, processing_time_ms: int,
                    model_version: str, heatmap_path: str = None) -> dict:
@@ -81,9 +132,11 @@ def create_analysis(upload_id: str, image_path: str, prediction: str,
         'heatmap_path': heatmap_path,
     }
     response = supabase.table('analyses').insert(data).execute()
+    clear_request_memo()
     return response.data[0] if response.data else None
 
 
+@instrumented('db')
 def create_patient_metadata(analysis_id: str, age_range: str, gender: str,
                            vaccination_status: str, symptoms: list, outcome: str = 'unknown') -> dict:
     """Create patient metadata record."""
@@ -97,19 +150,22 @@ def create_patient_metadata(analysis_id: str, age_range: str, gender: str,
         'outcome': outcome,
     }
     response = supabase.table('patient_metadata').insert(data).execute()
+    clear_request_memo()
     return response.data[0] if response.data else None
 
 
-def get_hospital_stats(hospital_id: str, days: int = 1) -> dict:
-    """Get hospital statistics for the past N days."""
+@memoized_read
+@instrumented('db')
+def get_hospital_stats(hospital_id: str, days: int = 1,
+                       start_date: Optional[DateLike] = None,
+                       end_date: Optional[DateLike] = None) -> dict:
+    """Get hospital statistics for the past N days (or an explicit date range)."""
     supabase = get_supabase_client()
 
-    # Get today's summary
-    response = supabase.table('case_summary') \
+    query = supabase.table('case_summary') \
         .select('*') \
-        .eq('hospital_id', hospital_id) \
-        .gte('date', f'now - interval \'{days} days\'') \
-        .execute()
+        .eq('hospital_id', hospital_id)
+    response = _apply_date_window(query, days, start_date, end_date).execute()
 
     if not response.data:
         return {
@@ -133,15 +189,17 @@ def get_hospital_stats(hospital_id: str, days: int = 1) -> dict:
     return total
 
 
-def get_global_stats(days: int = 1) -> dict:
-    """Get global statistics for the past N days."""
+@memoized_read
+@instrumented('db')
+def get_global_stats(days: int = 1, start_date: Optional[DateLike] = None,
+                     end_date: Optional[DateLike] = None) -> dict:
+    """Get global statistics for the past N days (or an explicit date range)."""
     supabase = get_supabase_client()
 
-    response = supabase.table('regional_summary') \
+    query = supabase.table('regional_summary') \
         .select('*') \
-        .eq('region_type', 'country') \
-        .gte('date', f'now - interval \'{days} days\'') \
-        .execute()
+        .eq('region_type', 'country')
+    response = _apply_date_window(query, days, start_date, end_date).execute()
 
     if not response.data:
         return {
@@ -163,6 +221,9 @@ def get_global_stats(days: int = 1) -> dict:
     return total
 
 
+@memoized_read
+@shared_cached('regional_summary')
+@instrumented('db')
 def get_regional_data(region_type: str = 'country') -> list:
     """Get regional data for map visualization."""
     supabase = get_supabase_client()
@@ -176,6 +237,7 @@ def get_regional_data(region_type: str = 'country') -> list:
     return response.data
 
 
+@instrumented('db')
 def create_alert(region_id: str, alert_type: str, severity: str, description: str, recipients: list) -> dict:
     """Create an alert."""
     supabase = get_supabase_client()
@@ -187,15 +249,40 @@ def create_alert(region_id: str, alert_type: str, severity: str, description: st
         'recipients': recipients,
     }
     response = supabase.table('alerts').insert(data).execute()
+    clear_request_memo()
     return response.data[0] if response.data else None
 
 
+@instrumented('db')
+def insert_alerts(rows: list) -> list:
+    """Insert several alerts in a single request."""
+    if not rows:
+        return []
+    supabase = get_supabase_client()
+    response = supabase.table('alerts').insert(rows).execute()
+    clear_request_memo()
+    return response.data
+
+
+@instrumented('db')
+def upsert_alerts(rows: list) -> list:
+    """Update existing alerts (matched by id) in a single request."""
+    if not rows:
+        return []
+    supabase = get_supabase_client()
+    response = supabase.table('alerts').upsert(rows, on_conflict='id').execute()
+    clear_request_memo()
+    return response.data
+
+
+@memoized_read
+@instrumented('db')
 def get_active_alerts() -> list:
     """Get all active (unresolved) alerts."""
     supabase = get_supabase_client()
     response = supabase.table('alerts') \
         .select('*') \
-        .is_('resolved_at', True) \
+        .is_('resolved_at', 'null') \
         .order('triggered_at', desc=True) \
         .execute()
 
@@ -203,14 +290,19 @@ def get_active_alerts() -> list:
 
 
 # Time-series data functions for predictions
-def get_regional_timeseries(region_id: str = None, region_type: str = 'country', days: int = 30) -> list:
+@memoized_read
+@shared_cached('timeseries')
+@instrumented('db')
+def get_regional_timeseries(region_id: str = None, region_type: str = 'country', days: int = 30,
+                            start_date: Optional[DateLike] = None,
+                            end_date: Optional[DateLike] = None) -> list:
     """Get time-series data for a region (for forecasting)."""
     supabase = get_supabase_client()
 
     query = supabase.table('regional_summary') \
         .select('date, case_count, pneumonia_count, severe_count, deaths, region_name, region_id') \
-        .eq('region_type', region_type) \
-        .gte('date', f'now - interval \'{days} days\'') \
+        .eq('region_type', region_type)
+    query = _apply_date_window(query, days, start_date, end_date) \
         .order('date', desc=False)
 
     if region_id:
@@ -220,13 +312,18 @@ def get_regional_timeseries(region_id: str = None, region_type: str = 'country',
     return response.data
 
 
-def get_hospital_timeseries(hospital_id: str = None, days: int = 30) -> list:
+@memoized_read
+@shared_cached('timeseries')
+@instrumented('db')
+def get_hospital_timeseries(hospital_id: str = None, days: int = 30,
+                            start_date: Optional[DateLike] = None,
+                            end_date: Optional[DateLike] = None) -> list:
     """Get time-series data for a hospital (for forecasting)."""
     supabase = get_supabase_client()
 
     query = supabase.table('case_summary') \
-        .select('date, case_count, pneumonia_count, severe_count, deaths, hospital_id') \
-        .gte('date', f'now - interval \'{days} days\'') \
+        .select('date, case_count, pneumonia_count, severe_count, deaths, hospital_id')
+    query = _apply_date_window(query, days, start_date, end_date) \
         .order('date', desc=False)
 
     if hospital_id:
@@ -236,13 +333,17 @@ def get_hospital_timeseries(hospital_id: str = None, days: int = 30) -> list:
     return response.data
 
 
-def get_resource_timeseries(hospital_id: str = None, days: int = 30) -> list:
+@memoized_read
+@instrumented('db')
+def get_resource_timeseries(hospital_id: str = None, days: int = 30,
+                            start_date: Optional[DateLike] = None,
+                            end_date: Optional[DateLike] = None) -> list:
     """Get resource availability time-series (beds, ventilators, oxygen)."""
     supabase = get_supabase_client()
 
     query = supabase.table('resources') \
-        .select('date, hospital_id, icu_beds_available, ventilators_available, oxygen_supply_days, staff_available') \
-        .gte('date', f'now - interval \'{days} days\'') \
+        .select('date, hospital_id, icu_beds_available, ventilators_available, oxygen_supply_days, staff_available')
+    query = _apply_date_window(query, days, start_date, end_date) \
         .order('date', desc=False)
 
     if hospital_id:
@@ -252,13 +353,15 @@ def get_resource_timeseries(hospital_id: str = None, days: int = 30) -> list:
     return response.data
 
 
+@memoized_read
+@instrumented('db')
 def get_current_hospital_capacity(hospital_id: str = None) -> list:
     """Get current hospital capacity (total beds, ICU beds) and latest resource availability."""
     supabase = get_supabase_client()
 
     # Get hospital capacity
     query = supabase.table('hospitals') \
-        .select('id, name, city, state, country, total_beds, icu_beds')
+        .select('id, name, city, state, country, latitude, longitude, total_beds, icu_beds')
 
     if hospital_id:
         query = query.eq('id', hospital_id)
@@ -282,6 +385,9 @@ def get_current_hospital_capacity(hospital_id: str = None) -> list:
     return hospitals
 
 
+@memoized_read
+@shared_cached('regional_summary')
+@instrumented('db')
 def get_regional_summary_latest(region_type: str = 'country') -> list:
     """Get latest regional summary data."""
     supabase = get_supabase_client()
@@ -0,0 +1,159 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Event log used to push updates to subscribers.
+
+Events are appended to a small SQLite table (WAL mode) next to the shared
+cache, so an event published by the worker running the alert scheduler is
+visible to SSE streams held open by every other worker on the host. Event
+ids are monotonically increasing, which makes them usable as SSE event ids
+for Last-Event-ID replay. Old events are pruned by age and count.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .config import Config
+from .shared_cache import _json_default
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_topic_id ON events(topic, id);
+"""
+
+
+class EventLog:
+    """Append-only, cross-process event log with id-based reads."""
+
+    def __init__(self, path: str, retention_seconds: int = 3600, max_events: int = 10000,
+                 poll_interval: float = 0.5):
+        """Initialize the log.
+
+        Args:
+            path: SQLite file shared by all workers
+            retention_seconds: Events older than this are pruned
+            max_events: At most this many events are kept
+            poll_interval: How often waiting readers check for events written
+                by other processes
+        """
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.max_events = max_events
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        # Wakes readers in this process as soon as something is published
+        self._condition = threading.Condition()
+        self._published = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (reopened after a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def publish(self, topic: str, event_type: str, data) -> int:
+        """Append an event and wake local readers. Returns the event id."""
+        cursor = self._connect().execute(
+            'INSERT INTO events (topic, event_type, payload, created_at) VALUES (?, ?, ?, ?)',
+            (topic, event_type, json.dumps(data, default=_json_default), time.time())
+        )
+        with self._condition:
+            self._published += 1
+            self._condition.notify_all()
+        return cursor.lastrowid
+
+    def read(self, after_id: int = 0, topics: Optional[Iterable[str]] = None,
+             limit: int = 500) -> List[Dict]:
+        """Events with id > after_id, oldest first."""
+        sql = 'SELECT id, topic, event_type, payload, created_at FROM events WHERE id > ?'
+        params = [after_id]
+        if topics:
+            topics = list(topics)
+            sql += f" AND topic IN ({','.join('?' * len(topics))})"
+            params.extend(topics)
+        sql += ' ORDER BY id LIMIT ?'
+        params.append(limit)
+
+        return [{
+            'id': row[0],
+            'topic': row[1],
+            'event_type': row[2],
+            'data': json.loads(row[3]),
+            'created_at': row[4],
+        } for row in self._connect().execute(sql, params)]
+
+    def latest_id(self) -> int:
+        row = self._connect().execute('SELECT MAX(id) FROM events').fetchone()
+        return row[0] or 0
+
+    def oldest_id(self) -> int:
+        row = self._connect().execute('SELECT MIN(id) FROM events').fetchone()
+        return row[0] or 0
+
+    def wait(self, after_id: int, topics: Optional[Iterable[str]] = None,
+             timeout: float = 15.0) -> List[Dict]:
+        """Block until events newer than after_id exist, or the timeout passes."""
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self.read(after_id, topics)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return events
+            with self._condition:
+                self._condition.wait(min(self.poll_interval, remaining))
+
+    def prune(self) -> int:
+        """Drop events past retention or beyond max_events. Returns number removed."""
+        conn = self._connect()
+        removed = conn.execute('DELETE FROM events WHERE created_at < ?',
+                               (time.time() - self.retention_seconds,)).rowcount
+        removed += conn.execute('DELETE FROM events WHERE id <= ?',
+                                (self.latest_id() - self.max_events,)).rowcount
+        return removed
+
+
+def format_sse(event: Dict) -> str:
+    """Render an event as a Server-Sent Events frame."""
+    data = json.dumps(event['data'], default=_json_default, separators=(',', ':'))
+    return f"id: {event['id']}\nevent: {event['event_type']}\ndata: {data}\n\n"
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_event_log() -> EventLog:
+    """Get the process-wide EventLog."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                path = Config.EVENT_LOG_PATH or os.path.join(
+                    tempfile.gettempdir(), 'medialert-events.sqlite3'
+                )
+                _log = EventLog(path, retention_seconds=Config.EVENT_RETENTION_SECONDS)
+    return _log
@@ -0,0 +1,244 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Grid-based spatial index for hospitals and regions.
+
+Points are bucketed into fixed-size latitude/longitude cells, so a
+bounding-box query only visits the cells it overlaps and a k-nearest query
+expands ring by ring from the query point until it has k candidates, then
+checks every cell within the k-th candidate's great-circle distance.
+
+Each worker keeps one index per layer ('hospitals' and one per region
+level), rebuilt when the underlying data changes; the /api/v1/geo endpoints
+use them so map panning only transfers the visible features.
+"""
+
+import heapq
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import Config
+from .database import get_all_hospitals, get_regional_summary_latest
+from .shared_cache import get_shared_cache
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+BBox = Tuple[float, float, float, float]  # (west, south, east, north)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def parse_bbox(value: str) -> BBox:
+    """Parse 'west,south,east,north' (Mapbox getBounds order).
+
+    west > east is allowed and means the box crosses the antimeridian.
+
+    Raises:
+        ValueError: If the value is malformed or out of range
+    """
+    try:
+        west, south, east, north = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError("bbox must be 'west,south,east,north'")
+    if not (-90 <= south <= north <= 90) or not (-180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError('bbox is out of range')
+    return west, south, east, north
+
+
+def point_of(row: Dict) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of a row, or None if it has no usable coordinates."""
+    try:
+        lat, lon = float(row['latitude']), float(row['longitude'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if math.isnan(lat) or math.isnan(lon) or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+class GeoIndex:
+    """Uniform lat/lon grid over rows with coordinates."""
+
+    def __init__(self, rows: Iterable[Dict] = (), cell_degrees: float = 1.0):
+        """Build the index.
+
+        Args:
+            rows: Rows with 'latitude' and 'longitude' (others are skipped)
+            cell_degrees: Grid cell size; roughly the typical query radius
+        """
+        self.cell_degrees = cell_degrees
+        self.columns = int(math.ceil(360 / cell_degrees))
+        self.rows_count = int(math.ceil(180 / cell_degrees))
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, Dict]]] = {}
+        self.size = 0
+        for row in rows:
+            point = point_of(row)
+            if point is not None:
+                self._cells.setdefault(self._cell(*point), []).append((point[0], point[1], row))
+                self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        x = min(int((lon + 180) / self.cell_degrees), self.columns - 1)
+        y = min(int((lat + 90) / self.cell_degrees), self.rows_count - 1)
+        return x, y
+
+    def _cells_in(self, west: float, south: float, east: float, north: float):
+        """Occupied cells overlapping a box that does not cross the antimeridian."""
+        x0, y0 = self._cell(south, west)
+        x1, y1 = self._cell(north, east)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            for (x, y), points in self._cells.items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    yield points
+            return
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                points = self._cells.get((x, y))
+                if points:
+                    yield points
+
+    def within(self, bbox: BBox, limit: Optional[int] = None,
+               sort_by: Optional[str] = None) -> List[Dict]:
+        """Rows inside a (west, south, east, north) box.
+
+        Args:
+            bbox: Bounding box; west > east crosses the antimeridian
+            limit: Maximum rows to return
+            sort_by: Return the rows with the largest values of this column
+                first (applied before the limit)
+        """
+        west, south, east, north = bbox
+        spans = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+        found = []
+        for lo, hi in spans:
+            for points in self._cells_in(lo, south, hi, north):
+                found.extend(row for lat, lon, row in points
+                             if south <= lat <= north and lo <= lon <= hi)
+
+        if sort_by is not None:
+            sort_key = lambda row: row.get(sort_by) or 0
+            if limit is not None:
+                return heapq.nlargest(limit, found, key=sort_key)
+            found.sort(key=sort_key, reverse=True)
+        return found[:limit] if limit is not None else found
+
+    def _ring(self, cx: int, cy: int, radius: int):
+        """Occupied cells at Chebyshev distance radius (longitude wraps)."""
+        for y in range(cy - radius, cy + radius + 1):
+            if not 0 <= y < self.rows_count:
+                continue
+            edge = abs(y - cy) == radius
+            xs = range(cx - radius, cx + radius + 1) if edge else (cx - radius, cx + radius)
+            seen = set()
+            for x in xs:
+                x %= self.columns
+                if x in seen:
+                    continue
+                seen.add(x)
+                points = self._cells.get((x, y))
+                if points:
+                    yield points
+
+    def nearest(self, lat: float, lon: float, k: int = 5,
+                max_km: Optional[float] = None) -> List[Dict]:
+        """The k rows closest to a point, nearest first.
+
+        Each result is {'distance_km': ..., **row}.
+        """
+        if k <= 0 or not self.size:
+            return []
+
+        # Phase 1: grow rings until there are k candidates (or the grid is exhausted)
+        cx, cy = self._cell(lat, lon)
+        candidates = 0
+        radius = 0
+        max_radius = max(self.columns // 2, self.rows_count)
+        while candidates < k and radius <= max_radius:
+            candidates += sum(len(points) for points in self._ring(cx, cy, radius))
+            radius += 1
+
+        # Phase 2: every row within the k-th candidate's distance is in that box
+        best = heapq.nsmallest(k, (
+            (haversine_km(lat, lon, plat, plon), id(row), row)
+            for r in range(radius) for points in self._ring(cx, cy, r) for plat, plon, row in points
+        ))
+        reach = best[-1][0] if len(best) == k else math.inf
+        if max_km is not None:
+            reach = min(reach, max_km)
+
+        results = self._within_km(lat, lon, reach) if math.isfinite(reach) else best
+        return [{'distance_km': round(d, 3), **row} for d, _, row in heapq.nsmallest(k, results)
+                if max_km is None or d <= max_km]
+
+    def _within_km(self, lat: float, lon: float, km: float):
+        dlat = km / KM_PER_DEGREE
+        south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        widest = max(abs(south), abs(north))
+        if widest >= 90 or km >= math.pi * EARTH_RADIUS_KM / 2:
+            bbox = (-180.0, south, 180.0, north)
+        else:
+            dlon = km / (KM_PER_DEGREE * math.cos(math.radians(widest)))
+            if dlon >= 180:
+                bbox = (-180.0, south, 180.0, north)
+            else:
+                west = (lon - dlon + 180) % 360 - 180
+                east = (lon + dlon + 180) % 360 - 180
+                bbox = (west, south, east, north)
+        return [(haversine_km(lat, lon, float(row['latitude']), float(row['longitude'])), id(row), row)
+                for row in self.within(bbox)]
+
+
+class _Layer:
+    def __init__(self, loader: Callable[[], List[Dict]], family: Optional[str]):
+        self.loader = loader
+        self.family = family
+        self.index: Optional[GeoIndex] = None
+        self.version = None
+        self.loaded_at = 0.0
+
+
+_layers: Dict[str, _Layer] = {}
+_layers_lock = threading.Lock()
+
+
+def _layer(name: str) -> _Layer:
+    if name == 'hospitals':
+        return _Layer(get_all_hospitals, None)
+    return _Layer(lambda: get_regional_summary_latest(region_type=name), 'regional_summary')
+
+
+def get_geo_index(layer: str = 'hospitals') -> GeoIndex:
+    """Get this worker's index for 'hospitals' or a region level.
+
+    Region layers are rebuilt when the 'regional_summary' cache family
+    version changes; every layer is rebuilt after GEO_INDEX_REFRESH_SECONDS.
+    """
+    with _layers_lock:
+        state = _layers.get(layer)
+        if state is None:
+            state = _layers[layer] = _layer(layer)
+
+    cache = get_shared_cache()
+    version = cache.version(state.family)[0] if cache is not None and state.family else None
+    if (state.index is not None and version == state.version
+            and time.time() - state.loaded_at < Config.GEO_INDEX_REFRESH_SECONDS):
+        return state.index
+
+    index = GeoIndex(state.loader(), cell_degrees=Config.GEO_INDEX_CELL_DEGREES)
+    state.index, state.version, state.loaded_at = index, version, time.time()
+    return index
@@ -0,0 +1,139 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Which hospitals serve which region, and their combined capacity.
+
+Each hospital is assigned to at most one region per level:
+
+1. by its address fields (country / state / city) matched against the
+   region's id or name, ignoring case and punctuation; then
+2. failing that, to the nearest region of that level whose centroid lies
+   within MATCH_RADIUS_KM (the only option for districts and blocks).
+
+Capacity and occupancy totals are computed once per region when the map is
+built, so forecasts and capacity alerts look them up in O(1) instead of
+summing every hospital for every region.
+"""
+
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .config import Config
+from .database import get_current_hospital_capacity, get_regional_summary_latest
+from .geo_index import GeoIndex, point_of
+from .region_index import LEVELS
+from .shared_cache import get_shared_cache
+from .utils import summarize_capacity
+
+
+ADDRESS_FIELDS = {'country': 'country', 'state': 'state', 'city': 'city'}
+MATCH_RADIUS_KM = {'country': 2500, 'state': 400, 'city': 50, 'district': 15, 'block': 5}
+# Common country spellings that do not match an ISO code or official name
+COUNTRY_ALIASES = {'usa': 'us', 'unitedstatesofamerica': 'us', 'uk': 'gb', 'unitedkingdom': 'gb',
+                   'england': 'gb'}
+
+Key = Tuple[str, str]
+
+
+def normalize_label(value) -> str:
+    return re.sub(r'[^0-9a-z]', '', str(value or '').lower())
+
+
+class RegionCapacityMap:
+    """Region -> hospitals mapping with precomputed capacity totals."""
+
+    def __init__(self, hospitals: List[Dict], regions_by_level: Dict[str, List[Dict]]):
+        """Build the mapping.
+
+        Args:
+            hospitals: Rows from get_current_hospital_capacity()
+            regions_by_level: region_type -> latest regional_summary rows
+        """
+        self.members: Dict[Key, List[Dict]] = {}
+
+        for level, regions in regions_by_level.items():
+            if not regions:
+                continue
+            labels = {}
+            for region in regions:
+                region_id = region.get('region_id')
+                for label in (region_id, region.get('region_name'), str(region_id).rsplit('-', 1)[-1]):
+                    labels.setdefault(normalize_label(label), region_id)
+            geo = GeoIndex(regions, cell_degrees=5 if level in ('country', 'state') else 1)
+
+            for hospital in hospitals:
+                region_id = self._match(hospital, level, labels, geo)
+                if region_id is not None:
+                    self.members.setdefault((level, region_id), []).append(hospital)
+
+        self.totals: Dict[Key, Dict] = {}
+        for key, members in self.members.items():
+            capacity, occupancy = summarize_capacity(members)
+            oxygen = [h['latest_resources']['oxygen_supply_days'] for h in members
+                      if h.get('latest_resources') and h['latest_resources'].get('oxygen_supply_days') is not None]
+            self.totals[key] = {
+                'capacity': capacity,
+                'occupancy': occupancy,
+                'resource_status': {'oxygen_supply_days': min(oxygen) if oxygen else None},
+                'hospital_count': len(members),
+            }
+
+    @staticmethod
+    def _match(hospital: Dict, level: str, labels: Dict[str, str], geo: GeoIndex) -> Optional[str]:
+        field = ADDRESS_FIELDS.get(level)
+        if field:
+            label = normalize_label(hospital.get(field))
+            if level == 'country':
+                label = COUNTRY_ALIASES.get(label, label)
+            if label in labels:
+                return labels[label]
+
+        point = point_of(hospital)
+        if point is None:
+            return None
+        nearest = geo.nearest(point[0], point[1], k=1, max_km=MATCH_RADIUS_KM.get(level))
+        return nearest[0].get('region_id') if nearest else None
+
+    def hospitals(self, region_type: str, region_id: str) -> List[Dict]:
+        return self.members.get((region_type, region_id), [])
+
+    def get(self, region_type: str, region_id: str) -> Optional[Dict]:
+        """Totals for a region, or None if no hospital is mapped to it.
+
+        Returns:
+            Dict with capacity, occupancy (for ResourceDemandPredictor),
+            resource_status (lowest oxygen supply) and hospital_count
+        """
+        return self.totals.get((region_type, region_id))
+
+
+_map: Optional[RegionCapacityMap] = None
+_map_version = None
+_map_loaded_at = 0.0
+_map_lock = threading.Lock()
+
+
+def get_region_capacity_map() -> RegionCapacityMap:
+    """Get this worker's RegionCapacityMap.
+
+    Rebuilt when the 'regional_summary' cache family version changes, and
+    every REGION_CAPACITY_REFRESH_SECONDS to pick up new resource reports.
+    """
+    global _map, _map_version, _map_loaded_at
+    cache = get_shared_cache()
+    version = cache.version('regional_summary')[0] if cache is not None else None
+    if (_map is not None and version == _map_version
+            and time.time() - _map_loaded_at < Config.REGION_CAPACITY_REFRESH_SECONDS):
+        return _map
+
+    with _map_lock:
+        if (_map is None or version != _map_version
+                or time.time() - _map_loaded_at >= Config.REGION_CAPACITY_REFRESH_SECONDS):
+            regions = {level: get_regional_summary_latest(region_type=level) for level in LEVELS}
+            _map = RegionCapacityMap(get_current_hospital_capacity(), regions)
+            _map_version = version
+            _map_loaded_at = time.time()
+    return _map
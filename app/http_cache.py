@@ -0,0 +1,118 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+HTTP conditional-request support for read-only API endpoints.
+
+Rendered JSON bodies are stored in the shared cache together with their
+ETag and generation time. The storage key includes the version of every
+data family the endpoint depends on, so bumping a family (e.g. after a data
+refresh) produces a new ETag. A client that polls with If-None-Match gets a
+304 after a single cache lookup, without the view being run at all.
+"""
+
+import functools
+import hashlib
+import time
+from typing import Iterable, Optional
+
+from flask import Response, make_response, request
+
+from .config import Config
+from .shared_cache import get_shared_cache
+
+
+HTTP_CACHE_FAMILY = 'http_response'
+
+
+def _parse_cache_control_overrides(raw: str) -> dict:
+    """Parse 'endpoint=directives;endpoint=directives' into a dict."""
+    overrides = {}
+    for item in (raw or '').split(';'):
+        if '=' not in item:
+            continue
+        endpoint, directives = item.split('=', 1)
+        overrides[endpoint.strip()] = directives.strip()
+    return overrides
+
+
+def cache_control_for(endpoint: str, max_age: Optional[int] = None) -> str:
+    """Resolve the Cache-Control header value for an endpoint."""
+    overrides = _parse_cache_control_overrides(Config.HTTP_CACHE_CONTROL_OVERRIDES)
+    if endpoint in overrides:
+        return overrides[endpoint]
+    if max_age is None:
+        max_age = Config.HTTP_CACHE_MAX_AGE
+    return f'public, max-age={max_age}, must-revalidate'
+
+
+def _data_version(cache, families: Iterable[str]) -> str:
+    """Combine the versions of the data families an endpoint depends on."""
+    return '.'.join(f"{family}{cache.version(family)[0]}" for family in families)
+
+
+def _make_etag(version: str, body: bytes) -> str:
+    digest = hashlib.sha1(body).hexdigest()[:16]
+    return f"{version}-{digest}" if version else digest
+
+
+def _finalize(response: Response, etag: str, generated_at: float, cache_control: str) -> Response:
+    response.set_etag(etag, weak=True)
+    response.last_modified = generated_at
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
+
+def conditional_get(families: Iterable[str] = (), max_age: Optional[int] = None,
+                    ttl: Optional[int] = None):
+    """Decorator adding ETag/Last-Modified/Cache-Control handling to a view.
+
+    Only for views without side effects: cached and 304 responses skip the
+    view entirely.
+
+    Args:
+        families: Shared cache families whose version the response depends on
+        max_age: Cache-Control max-age (seconds); overridable per endpoint via
+            HTTP_CACHE_CONTROL_OVERRIDES
+        ttl: How long the rendered body is kept server-side (seconds)
+    """
+    families = tuple(families)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            cache_control = cache_control_for(request.endpoint, max_age)
+            cache = get_shared_cache()
+
+            if cache is None or not Config.HTTP_CACHE_ENABLED:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                return _finalize(response, _make_etag('', response.get_data()),
+                                 time.time(), cache_control)
+
+            version = _data_version(cache, families)
+            key = f"{request.endpoint}:{version}:{request.full_path}"
+            entry = cache.get(HTTP_CACHE_FAMILY, key)
+
+            if entry is not None:
+                response = Response(entry['body'], status=200, mimetype=entry['mimetype'])
+                return _finalize(response, entry['etag'], entry['generated_at'], cache_control)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            body = response.get_data()
+            entry = {
+                'body': body.decode('utf-8'),
+                'mimetype': response.mimetype,
+                'etag': _make_etag(version, body),
+                'generated_at': time.time(),
+            }
+            cache.set(HTTP_CACHE_FAMILY, key, entry,
+                      ttl if ttl is not None else Config.HTTP_CACHE_TTL_SECONDS)
+            return _finalize(response, entry['etag'], entry['generated_at'], cache_control)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,308 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Content-addressed on-disk store for uploaded images and model heatmaps.
+
+Objects are named by the SHA-256 of their bytes plus an extension
+(``<sha256>.png``) and live in two levels of shard directories
+(``<root>/ab/cd/abcd....png``), so the same X-ray uploaded by two hospitals,
+or twice by one, is stored once. Keys are returned with upload results (as
+image_url / heatmap_url) and are the values meant for analyses.image_path /
+heatmap_path, but the upload view does not create analyses rows yet: an
+uploads row needs a user_id and hospital sessions carry none.
+
+- Writes go to a temp file under ``<root>/tmp``, are fsynced and then
+  renamed into place, so a reader never sees a partial object and
+  concurrent writers of the same content simply race to the same result.
+- Storing an object that already exists only refreshes its mtime, which is
+  the object's "last referenced" time for retention.
+- Reads are memory-mapped (``mapped``) or served with send_file, which
+  hands the file to the WSGI server's sendfile path.
+- ``collect_garbage`` removes objects not referenced for
+  IMAGE_STORE_TTL_DAYS; each worker runs it every
+  IMAGE_STORE_GC_INTERVAL_SECONDS. An object is renamed aside before it is
+  deleted, so a concurrent ``put`` of the same content either refreshes it
+  first (and it is kept) or finds it gone and writes it again.
+"""
+
+import base64
+import binascii
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from .config import Config
+from .metrics import PREFIX, register_collector
+
+
+CHUNK_BYTES = 64 * 1024
+KEY_RE = re.compile(r'^[0-9a-f]{64}\.(jpg|png)$')
+MIMETYPES = {'jpg': 'image/jpeg', 'png': 'image/png'}
+# Temp files older than this are left over from crashed writers
+TEMP_MAX_AGE_SECONDS = 3600
+
+
+def is_valid_key(key: str) -> bool:
+    return bool(KEY_RE.match(key or ''))
+
+
+class ImageStore:
+    """SHA-256 addressed blob store rooted at one directory."""
+
+    def __init__(self, root: str, ttl_seconds: float = 0, fsync: bool = True):
+        """Initialize the store.
+
+        Args:
+            root: Directory holding the shard directories
+            ttl_seconds: Remove objects not referenced for this long (0 keeps them forever)
+            fsync: Flush each new object to disk before it becomes visible
+        """
+        self.root = os.path.abspath(root)
+        self.ttl_seconds = ttl_seconds
+        self.fsync = fsync
+        self._tmp = os.path.join(self.root, 'tmp')
+        os.makedirs(self._tmp, exist_ok=True)
+
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_written = 0
+        self.gc_removed = 0
+        self._stats_lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        """Absolute path of an object (whether or not it exists)."""
+        if not is_valid_key(key):
+            raise ValueError(f"Invalid image key: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def exists(self, key: str) -> bool:
+        return is_valid_key(key) and os.path.exists(self.path(key))
+
+    # --- writing ---
+    def put(self, file: BinaryIO, ext: str) -> str:
+        """Store a file's contents and return its key.
+
+        The file is read from the start; its position is reset afterwards.
+        """
+        if ext not in MIMETYPES:
+            raise ValueError(f"Unsupported image extension: {ext!r}")
+        digest = hashlib.sha256()
+        file.seek(0)
+        for chunk in iter(lambda: file.read(CHUNK_BYTES), b''):
+            digest.update(chunk)
+        key = f'{digest.hexdigest()}.{ext}'
+        path = self.path(key)
+
+        try:
+            # Already stored: mark it as referenced now
+            os.utime(path)
+            with self._stats_lock:
+                self.deduplicated += 1
+        except FileNotFoundError:
+            size = self._write(file, path)
+            with self._stats_lock:
+                self.stored += 1
+                self.bytes_written += size
+        finally:
+            file.seek(0)
+        return key
+
+    def put_bytes(self, data: bytes, ext: str) -> str:
+        return self.put(BytesIO(data), ext)
+
+    def _write(self, file: BinaryIO, path: str) -> int:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp, suffix='.part')
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                file.seek(0)
+                for chunk in iter(lambda: file.read(CHUNK_BYTES), b''):
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                if self.fsync:
+                    os.fsync(out.fileno())
+            os.chmod(tmp_path, 0o644)
+            try:
+                os.replace(tmp_path, path)
+            except FileNotFoundError:
+                # Garbage collection removed the (empty) shard directory meanwhile
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return size
+
+    # --- reading ---
+    @contextmanager
+    def mapped(self, key: str) -> Iterator[memoryview]:
+        """Read-only, zero-copy view of an object's bytes.
+
+        Usage:
+            with store.mapped(key) as data:
+                encoded = base64.b64encode(data)
+        """
+        with open(self.path(key), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                view = memoryview(mapping)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    # --- retention ---
+    def iter_keys(self) -> Iterator[str]:
+        for shard in os.scandir(self.root):
+            if not shard.is_dir() or len(shard.name) != 2 or shard.name == 'tmp':
+                continue
+            for sub in os.scandir(shard.path):
+                if sub.is_dir():
+                    for entry in os.scandir(sub.path):
+                        if is_valid_key(entry.name):
+                            yield entry.name
+
+    def collect_garbage(self, now: Optional[float] = None) -> Dict:
+        """Delete objects not referenced within the TTL and abandoned temp files.
+
+        Returns:
+            Counts of objects removed and kept, and bytes freed
+        """
+        now = time.time() if now is None else now
+        removed = kept = freed = 0
+        if self.ttl_seconds > 0:
+            cutoff = now - self.ttl_seconds
+            for key in list(self.iter_keys()):
+                path = self.path(key)
+                try:
+                    if os.stat(path).st_mtime >= cutoff:
+                        kept += 1
+                        continue
+                    tomb = os.path.join(self._tmp, f'{key}.{os.getpid()}.gc')
+                    os.rename(path, tomb)
+                    stat = os.stat(tomb)
+                    if stat.st_mtime >= cutoff:
+                        # Referenced again between the check and the rename
+                        os.replace(tomb, path)
+                        kept += 1
+                        continue
+                    os.unlink(tomb)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+                freed += stat.st_size
+                self._remove_empty_shards(os.path.dirname(path))
+
+        for entry in os.scandir(self._tmp):
+            try:
+                if entry.stat().st_mtime < now - TEMP_MAX_AGE_SECONDS:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+        with self._stats_lock:
+            self.gc_removed += removed
+        return {'removed': removed, 'kept': kept, 'bytes_freed': freed}
+
+    def _remove_empty_shards(self, directory: str):
+        for path in (directory, os.path.dirname(directory)):
+            try:
+                os.rmdir(path)
+            except OSError:
+                return
+
+    def prometheus_lines(self) -> List[str]:
+        lines = []
+        metric = f'{PREFIX}_image_store_puts_total'
+        lines += [f'# HELP {metric} Images stored, by whether the content was already present.',
+                  f'# TYPE {metric} counter',
+                  f'{metric}{{result="stored"}} {self.stored}',
+                  f'{metric}{{result="deduplicated"}} {self.deduplicated}']
+        for name, value, help_text in (
+            ('bytes_written_total', self.bytes_written, 'Bytes written for new images.'),
+            ('gc_removed_total', self.gc_removed, 'Images removed after their retention period.'),
+        ):
+            metric = f'{PREFIX}_image_store_{name}'
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter', f'{metric} {value}']
+        return lines
+
+
+_store: Optional[ImageStore] = None
+_store_lock = threading.Lock()
+
+
+def default_store_path() -> str:
+    return Config.IMAGE_STORE_PATH or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads'
+    )
+
+
+def get_image_store() -> Optional[ImageStore]:
+    """Get this worker's ImageStore (with its GC thread), or None when disabled."""
+    global _store
+    if not Config.IMAGE_STORE_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ImageStore(default_store_path(), ttl_seconds=Config.IMAGE_STORE_TTL_DAYS * 86400)
+                register_collector(_store.prometheus_lines)
+                if _store.ttl_seconds > 0 and Config.IMAGE_STORE_GC_INTERVAL_SECONDS > 0:
+                    threading.Thread(target=_run_gc, args=(_store,), name='image-store-gc', daemon=True).start()
+    return _store
+
+
+def _run_gc(store: ImageStore):
+    while True:
+        time.sleep(Config.IMAGE_STORE_GC_INTERVAL_SECONDS)
+        try:
+            store.collect_garbage()
+        except Exception as e:
+            print(f"Warning: image store garbage collection failed: {e}")
+
+
+def store_images(image_files: list) -> List[Optional[str]]:
+    """Store an upload's accepted images.
+
+    Args:
+        image_files: Files with a content_type of image/jpeg or image/png
+
+    Returns:
+        One key per file, or None where the store is off or the write failed
+    """
+    store = get_image_store()
+    if store is None:
+        return [None] * len(image_files)
+    keys = []
+    for image_file in image_files:
+        try:
+            ext = 'png' if image_file.content_type == 'image/png' else 'jpg'
+            keys.append(store.put(image_file, ext))
+        except OSError as e:
+            print(f"Warning: could not store image {image_file.filename}: {e}")
+            keys.append(None)
+    return keys
+
+
+def store_heatmap(heatmap: Optional[str]) -> Optional[str]:
+    """Store a base64-encoded PNG heatmap from the model API and return its key."""
+    store = get_image_store()
+    if store is None or not heatmap:
+        return None
+    try:
+        return store.put_bytes(base64.b64decode(heatmap, validate=True), 'png')
+    except (binascii.Error, OSError) as e:
+        print(f"Warning: could not store heatmap: {e}")
+        return None
@@ -0,0 +1,164 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Live surveillance feed: deltas instead of polling.
+
+After each data refresh the alert scheduler calls LiveFeed.refresh(), which
+compares the latest regional rows and global counters against the previous
+refresh and publishes only what changed to the 'live' topic of the event log:
+
+- regions.changed  {region_type, regions: [changed rows], removed: [region ids]}
+- global.updated   {stats, delta}
+
+Alert changes are already published on the 'alerts' topic by the scheduler.
+The /api/v1/live SSE endpoint sends a full snapshot when a client first
+connects (or has fallen too far behind), then replays and streams deltas
+from both topics by event id.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, List, Optional
+
+from .config import Config
+from .database import get_global_stats, get_regional_summary_latest
+from .events import get_event_log
+from .shared_cache import get_shared_cache, _json_default
+
+
+LIVE_TOPIC = 'live'
+STREAM_TOPICS = ('live', 'alerts')
+STATE_FAMILY = 'live_state'
+STATE_TTL_SECONDS = 24 * 3600
+
+GLOBAL_COUNTERS = ('case_count', 'normal_count', 'pneumonia_count', 'severe_count', 'deaths')
+
+
+def row_fingerprint(row: Dict) -> str:
+    """Stable hash of a row, used to detect changed regions."""
+    encoded = json.dumps(row, sort_keys=True, default=_json_default, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def diff_regions(previous: List[Dict], current: List[Dict]) -> Dict:
+    """Regions whose row changed or appeared, and ids that disappeared."""
+    before = {row.get('region_id'): row_fingerprint(row) for row in previous}
+    changed = [row for row in current if before.get(row.get('region_id')) != row_fingerprint(row)]
+    current_ids = {row.get('region_id') for row in current}
+    removed = [region_id for region_id in before if region_id not in current_ids]
+    return {'regions': changed, 'removed': removed}
+
+
+class LiveFeed:
+    """Compute and publish surveillance deltas."""
+
+    def __init__(self, region_types: Optional[List[str]] = None):
+        """Initialize the feed.
+
+        Args:
+            region_types: Region levels to track (defaults to the levels the
+                alert scheduler evaluates)
+        """
+        self.region_types = region_types or [
+            t.strip() for t in Config.ALERT_SCHEDULER_REGION_TYPES.split(',') if t.strip()
+        ]
+        self._states: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    # --- state storage (shared between workers when the cache is enabled) ---
+    def _load(self, key: str) -> Optional[Dict]:
+        cache = get_shared_cache()
+        if cache is not None:
+            state = cache.get(STATE_FAMILY, key)
+            if state is not None:
+                return state
+        return self._states.get(key)
+
+    def _store(self, key: str, state: Dict):
+        self._states[key] = state
+        cache = get_shared_cache()
+        if cache is not None:
+            cache.set(STATE_FAMILY, key, state, ttl=STATE_TTL_SECONDS)
+
+    # --- publishing ---
+    def refresh(self) -> int:
+        """Publish deltas since the previous refresh. Returns events published."""
+        event_log = get_event_log()
+        published = 0
+
+        with self._lock:
+            stats = {k: get_global_stats(days=1).get(k, 0) for k in GLOBAL_COUNTERS}
+            previous = self._load('global')
+            if previous is None or previous['stats'] != stats:
+                old = previous['stats'] if previous else {k: 0 for k in GLOBAL_COUNTERS}
+                event_log.publish(LIVE_TOPIC, 'global.updated', {
+                    'stats': stats,
+                    'delta': {k: stats[k] - old.get(k, 0) for k in GLOBAL_COUNTERS},
+                })
+                published += 1
+            self._store('global', {'stats': stats})
+
+            for region_type in self.region_types:
+                rows = get_regional_summary_latest(region_type=region_type)
+                previous = self._load(f'regions:{region_type}')
+                delta = diff_regions(previous['regions'] if previous else [], rows)
+                if delta['regions'] or delta['removed']:
+                    event_log.publish(LIVE_TOPIC, 'regions.changed', {'region_type': region_type, **delta})
+                    published += 1
+                self._store(f'regions:{region_type}', {'regions': rows})
+
+        return published
+
+    def snapshot(self, region_type: str = 'country') -> Dict:
+        """Full current state for a newly connected client."""
+        global_state = self._load('global')
+        regions_state = self._load(f'regions:{region_type}')
+
+        if global_state is None:
+            global_state = {'stats': {k: get_global_stats(days=1).get(k, 0) for k in GLOBAL_COUNTERS}}
+        if regions_state is None:
+            regions_state = {'regions': get_regional_summary_latest(region_type=region_type)}
+
+        return {
+            'region_type': region_type,
+            'stats': global_state['stats'],
+            'regions': regions_state['regions'],
+        }
+
+
+def wants_event(event: Dict, region_type: str) -> bool:
+    """Region deltas are only sent to clients watching that region level."""
+    if event['event_type'] == 'regions.changed':
+        return event['data'].get('region_type') == region_type
+    return True
+
+
+def replay_start(last_event_id: Optional[int]) -> Optional[int]:
+    """Where to resume a stream, or None if the client needs a fresh snapshot.
+
+    A snapshot is needed on first connect, and when the client's last event
+    has already been pruned (or belongs to a log that has since been reset).
+    """
+    if last_event_id is None:
+        return None
+    event_log = get_event_log()
+    oldest, latest = event_log.oldest_id(), event_log.latest_id()
+    if last_event_id > latest or (oldest and last_event_id < oldest - 1):
+        return None
+    return last_event_id
+
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+def get_live_feed() -> LiveFeed:
+    """Get the process-wide LiveFeed."""
+    global _feed
+    if _feed is None:
+        with _feed_lock:
+            if _feed is None:
+                _feed = LiveFeed()
+    return _feed
@@ -1,12 +1,14 @@
 # AI Attribution: This file was developed with assistance from Claude (Anthropic).
 # https://claude.ai
 
+import functools
+import hmac
 import os
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
+from flask import Flask, Response, render_template, request, redirect, url_for, session, jsonify, send_file
 from .config import Config
-from .api_client import get_prediction, check_model_health, ModelAPIError
-from .utils import allowed_file, validate_file_size
+from .api_client import check_model_health, ModelAPIError
+from .utils import summarize_capacity
 from .database import (
     get_supabase_client, create_hospital, get_hospital, get_all_hospitals,
     get_hospital_stats, get_global_stats, get_regional_data, create_alert,
@@ -18,6 +20,28 @@ from .models.predictions import (
     generate_forecast_report
 )
 from .models.alerts import AlertEngine
+from .shared_cache import get_shared_cache
+from .http_cache import conditional_get
+from .alert_state import get_alert_state_manager
+from .alert_scheduler import (
+    get_alert_scheduler, start_alert_scheduler, latest_alert_snapshot, register_refresh_hook,
+    SNAPSHOT_FAMILY
+)
+from .events import get_event_log, format_sse
+from .live_feed import get_live_feed, replay_start, wants_event, STREAM_TOPICS
+from .region_index import get_region_index, LEVELS
+from .geo_index import get_geo_index, parse_bbox
+from .map_tiles import get_tile
+from .hospital_regions import get_region_capacity_map
+from .metrics import register_metrics, render_prometheus
+from .model_telemetry import get_model_telemetry
+from .micro_batcher import predict_images
+from .streaming_upload import parse_image_upload, UploadError
+from .image_store import get_image_store, store_images, store_heatmap, is_valid_key, MIMETYPES
+from .profiling import register_profiling, is_authorized, recent_profiles, get_profile
+from .compression import (
+    register_compression, wants_columnar, to_columnar, columnar_forecast_report
+)
 
 
 app = Flask(__name__,
@@ -28,6 +52,21 @@ app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=Config.SESSION_LIFETI
 app.config['SESSION_COOKIE_SECURE'] = False  # Set True only when serving over HTTPS
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+app.json.compact = True
+# Before compression so that request timings and profiles include it
+register_profiling(app)
+register_metrics(app)
+register_compression(app)
+register_refresh_hook(lambda: get_live_feed().refresh())
+
+# Compiled once per worker; an AlertEngine is not modified after construction
+ALERT_ENGINE = AlertEngine()
+
+
+@app.before_request
+def ensure_background_jobs():
+    """Start the alert scheduler in this worker process (no-op once running)."""
+    start_alert_scheduler()
 
 
 # ===================== UTILITY ROUTES =====================
@@ -44,6 +83,60 @@ def health():
     })
 
 
+@app.route('/api/v1/cache/stats')
+def cache_stats():
+    """Shared cache hit/miss/latency metrics per key family (this worker)."""
+    cache = get_shared_cache()
+    if cache is None:
+        return jsonify({'enabled': False, 'families': {}})
+
+    return jsonify({'enabled': True, 'families': cache.stats()})
+
+
+@app.route('/api/v1/model/telemetry')
+def model_telemetry():
+    """Model API latency percentiles and counters per model_version (this worker)."""
+    return jsonify({'enabled': Config.METRICS_ENABLED, **get_model_telemetry().summary()})
+
+
+@app.route('/metrics')
+def metrics():
+    """Latency histograms for this worker in Prometheus text format."""
+    if not Config.METRICS_ENABLED:
+        return jsonify({'success': False, 'error': 'Metrics are disabled'}), 404
+    auth = request.headers.get('Authorization', '')
+    if Config.METRICS_TOKEN and not hmac.compare_digest(auth.encode(), f'Bearer {Config.METRICS_TOKEN}'.encode()):
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    return Response(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _profiling_authorized() -> bool:
+    auth = request.headers.get('Authorization', '')
+    return auth.startswith('Bearer ') and is_authorized(auth[len('Bearer '):])
+
+
+@app.route('/api/v1/profiles')
+def api_profiles():
+    """Recent request profiles captured by this worker (newest first)."""
+    if not _profiling_authorized():
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    return jsonify({'success': True, 'profiles': recent_profiles()})
+
+
+@app.route('/api/v1/profiles/<profile_id>')
+def api_profile(profile_id):
+    """One request profile with its hottest functions."""
+    if not _profiling_authorized():
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    profile = get_profile(profile_id)
+    if profile is None:
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    return jsonify({'success': True, 'profile': profile})
+
+
 # ===================== HOME / LANDING PAGE =====================
 
 @app.route('/')
@@ -167,46 +260,67 @@ def hospital_upload():
         return redirect(url_for('hospital_login'))
 
     if request.method == 'POST':
-        if 'images' not in request.files:
-            return jsonify({'error': 'No files uploaded'}), 400
-
-        files = request.files.getlist('images')
-        if not files or all(f.filename == '' for f in files):
+        try:
+            # Parsed as it arrives: bad or oversize files are rejected without being buffered
+            files = parse_image_upload(request.stream, request.content_type)
+        except UploadError as e:
+            return jsonify({'error': str(e)}), e.status_code
+        if not files:
             return jsonify({'error': 'No files selected'}), 400
 
         import uuid
         upload_id = str(uuid.uuid4())
 
         results = []
-        max_mb = Config.MAX_FILE_SIZE_MB
+        pending = []  # (index into results, file) awaiting a prediction
         for file in files:
-            if not file or not file.filename:
-                continue
-            if not allowed_file(file.filename):
-                results.append({
-                    'filename': file.filename,
-                    'status': 'skipped',
-                    'error': f'File type not allowed. Use JPG or PNG.'
-                })
-                continue
-            if not validate_file_size(file):
+            if file.error:
                 results.append({
                     'filename': file.filename,
                     'status': 'skipped',
-                    'error': f'File too large. Maximum size is {max_mb} MB.'
+                    'error': file.error
                 })
                 continue
+            pending.append((len(results), file))
+            results.append(None)
 
-            api_used = True
+        if pending:
+            accepted = [file for _, file in pending]
             try:
-                # Get prediction from model API
-                prediction = get_prediction(file)
+                # Kept for the results pages; identical images are stored once. Stored
+                # first because a timed-out batch may still be sending the files afterwards.
+                image_keys = store_images(accepted)
+            except Exception:
+                for file in accepted:
+                    file.close()
+                raise
+            try:
+                # Batched with images from concurrent uploads into as few model API
+                # requests as possible; each file is closed once it has been sent
+                predictions = predict_images(accepted, release=lambda file: file.close())
+            except Exception as e:
+                # Raised before anything was queued; closing twice is harmless
+                for file in accepted:
+                    file.close()
+                predictions = [e] * len(pending)
+
+            for (index, file), prediction, image_key in zip(pending, predictions, image_keys):
+                if isinstance(prediction, Exception):
+                    # Fallback: generate a demo analysis when API is unavailable
+                    if Config.METRICS_ENABLED:
+                        get_model_telemetry().fallback(
+                            'model_api_error' if isinstance(prediction, ModelAPIError)
+                            else type(prediction).__name__
+                        )
+                    results[index] = generate_fallback_result(file.filename)
+                    results[index]['image_url'] = image_url(image_key)
+                    continue
 
                 pred_result = prediction.get('prediction', 'UNCERTAIN')
                 conf_result = prediction.get('confidence', 0)
                 severity = get_severity_from_confidence(conf_result)
 
-                results.append({
+                results[index] = {
                     'filename': file.filename,
                     'status': 'success',
                     'prediction': pred_result,
@@ -217,14 +331,10 @@ def hospital_upload():
                     'heatmap': prediction.get('heatmap'),
                     'probabilities': prediction.get('probabilities', {}),
                     'source': 'api',
-                    'analysis': generate_analysis_text(pred_result, conf_result, severity)
-                })
-
-            except (ModelAPIError, Exception):
-                # Fallback: generate a demo analysis when API is unavailable
-                api_used = False
-                fallback = generate_fallback_result(file.filename)
-                results.append(fallback)
+                    'analysis': generate_analysis_text(pred_result, conf_result, severity),
+                    'image_url': image_url(image_key),
+                    'heatmap_url': image_url(store_heatmap(prediction.get('heatmap'))),
+                }
 
         return jsonify({
             'upload_id': upload_id,
@@ -234,6 +344,24 @@ def hospital_upload():
     return render_template('hospital/upload.html')
 
 
+@app.route('/hospital/images/<key>')
+def hospital_image(key):
+    """Serve a stored X-ray or heatmap by its content hash."""
+    if 'hospital_id' not in session:
+        return jsonify({'error': 'Session expired. Please log in again.'}), 401
+    store = get_image_store()
+    if store is None or not is_valid_key(key) or not store.exists(key):
+        return jsonify({'error': 'Image not found'}), 404
+    # Served with the WSGI server's file wrapper (sendfile), without reading it into memory
+    response = send_file(store.path(key), mimetype=MIMETYPES[key.rsplit('.', 1)[1]],
+                         etag=key.split('.', 1)[0], max_age=365 * 24 * 3600, conditional=True)
+    # Content-addressed, so it never changes; private because it is patient data
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+
 @app.route('/hospital/results/<upload_id>')
 def hospital_results(upload_id):
     """View results for a specific upload.
@@ -314,18 +442,8 @@ def surveillance_region(region_type, region_id):
 
     regional_data = response.data
 
-    # Get sub-regions
-    if region_type in ['country', 'state']:
-        sub_type = 'state' if region_type == 'country' else 'city'
-        sub_response = supabase.table('regional_summary') \
-            .select('*') \
-            .eq('region_type', sub_type) \
-            .order('case_count', desc=True) \
-            .limit(10) \
-            .execute()
-        sub_regions = sub_response.data
-    else:
-        sub_regions = []
+    # Sub-regions are the region's own children in the hierarchy index
+    sub_regions = get_region_index().children(region_type, region_id, limit=10)
 
     return render_template('surveillance/region.html',
         region_type=region_type,
@@ -397,9 +515,10 @@ def surveillance_predictions():
     regions = get_regional_summary_latest(region_type='country')
 
     growth_metrics = []
-    rapid_growth_alerts = []
+    metrics_by_region = {}
+    region_names = {}
 
-    alert_engine = AlertEngine()
+    alert_engine = ALERT_ENGINE
 
     for region in regions[:10]:  # Top 10 regions
         region_id = region.get('region_id')
@@ -420,14 +539,11 @@ def surveillance_predictions():
                 metrics['region_id'] = region_id
                 metrics['region_name'] = region_name
                 growth_metrics.append(metrics)
+                metrics_by_region[region_id] = metrics
+                region_names[region_id] = region_name
 
-                # Generate growth alerts
-                alerts = alert_engine.generate_growth_alerts(
-                    region_name=region_name,
-                    region_id=region_id,
-                    timeseries_data=timeseries
-                )
-                rapid_growth_alerts.extend(alerts)
+    # Evaluate growth alert rules for all regions at once
+    rapid_growth_alerts = alert_engine.alerts_from_growth_metrics(metrics_by_region, region_names)
 
     # Sort metrics by growth rate
     growth_metrics.sort(key=lambda x: x.get('growth_rate_3day', 0), reverse=True)
@@ -510,6 +626,7 @@ def surveillance_hospitals():
 # ===================== API ENDPOINTS =====================
 
 @app.route('/api/v1/global-stats')
+@conditional_get(families=('regional_summary',))
 def api_global_stats():
     """API endpoint for global statistics."""
     days = request.args.get('days', default=1, type=int)
@@ -525,6 +642,7 @@ def api_global_stats():
 
 
 @app.route('/api/v1/regional-data')
+@conditional_get(families=('regional_summary',))
 def api_regional_data():
     """API endpoint for regional data (for map)."""
     region_type = request.args.get('type', default='country')
@@ -540,6 +658,7 @@ def api_regional_data():
 
 
 @app.route('/api/v1/alerts')
+@conditional_get(families=('alerts',), max_age=15)
 def api_alerts():
     """API endpoint for alerts."""
     # Demo mode - provide mock alerts
@@ -564,6 +683,7 @@ def api_alerts():
 
 
 @app.route('/api/v1/hospital/<hospital_id>/stats')
+@conditional_get(families=('timeseries',))
 def api_hospital_stats(hospital_id):
     """API endpoint for hospital-specific statistics."""
     days = request.args.get('days', default=1, type=int)
@@ -579,9 +699,127 @@ def api_hospital_stats(hospital_id):
     return jsonify(stats)
 
 
+@app.route('/api/v1/regions/<region_type>/<region_id>')
+@conditional_get(families=('regional_summary',))
+def api_region_hierarchy(region_type, region_id):
+    """Drill-down for one region: ancestors, direct children and subtree totals.
+
+    Query params:
+        - limit: Maximum number of children, largest first (default: all)
+    """
+    limit = request.args.get('limit', type=int)
+    described = get_region_index().describe(region_type, region_id, limit=limit)
+    if described is None:
+        return jsonify({'success': False, 'error': f'Unknown region {region_type}/{region_id}'}), 404
+
+    return jsonify({'success': True, **described})
+
+
+def _geo_layer(kind):
+    """Spatial index layer for a /api/v1/geo request, or raise ValueError."""
+    if kind == 'hospitals':
+        return get_geo_index('hospitals')
+    region_type = request.args.get('region_type', default='country')
+    if region_type not in LEVELS:
+        raise ValueError(f'Unknown region_type {region_type!r}')
+    return get_geo_index(region_type)
+
+
+@app.route('/api/v1/geo/<any(hospitals, regions):kind>')
+@conditional_get(families=('regional_summary',))
+def api_geo_within(kind):
+    """Hospitals or regions inside the map viewport.
+
+    Query params:
+        - bbox: 'west,south,east,north' (required)
+        - region_type: Region level for /regions (default: 'country')
+        - limit: Maximum features; regions with the most cases are kept first
+    """
+    try:
+        bbox = parse_bbox(request.args.get('bbox'))
+        index = _geo_layer(kind)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    limit = request.args.get('limit', type=int)
+    features = index.within(bbox, limit=limit, sort_by='case_count' if kind == 'regions' else None)
+    return jsonify({'success': True, 'count': len(features), kind: features})
+
+
+@app.route('/api/v1/geo/<any(hospitals, regions):kind>/nearest')
+@conditional_get(families=('regional_summary',))
+def api_geo_nearest(kind):
+    """The k hospitals or regions closest to a point, with distance_km.
+
+    Query params:
+        - lat, lon: Query point (required)
+        - k: Number of results (default: 5, max 100)
+        - max_km: Ignore anything further away
+        - region_type: Region level for /regions (default: 'country')
+    """
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return jsonify({'success': False, 'error': 'lat and lon are required'}), 400
+    try:
+        index = _geo_layer(kind)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    k = min(max(request.args.get('k', default=5, type=int), 1), 100)
+    features = index.nearest(lat, lon, k=k, max_km=request.args.get('max_km', type=float))
+    return jsonify({'success': True, 'count': len(features), kind: features})
+
+
+@app.route('/api/v1/map/tiles/<region_type>/<int:z>/<int:x>/<int:y>')
+@conditional_get(families=('regional_summary',), max_age=300)
+def api_map_tile(region_type, z, x, y):
+    """Clustered GeoJSON for one Web Mercator map tile of a region level."""
+    if region_type not in LEVELS:
+        return jsonify({'success': False, 'error': f'Unknown region_type {region_type!r}'}), 400
+    try:
+        tile = get_tile(region_type, z, x, y)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    return jsonify(tile)
+
+
+@app.route('/api/v1/timeseries/region/<region_id>')
+@conditional_get(families=('timeseries',))
+def api_regional_timeseries(region_id):
+    """Daily case time-series for a region.
+
+    Query params:
+        - region_type: 'country', 'state', or 'city' (default: 'country')
+        - days: Window length in days (default: 30)
+        - start_date / end_date: Explicit ISO date range (overrides days)
+        - format: 'columnar' for one array per field instead of a list of rows
+    """
+    region_type = request.args.get('region_type', default='country')
+    days = request.args.get('days', default=30, type=int)
+
+    try:
+        rows = get_regional_timeseries(
+            region_id=region_id,
+            region_type=region_type,
+            days=days,
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date')
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    if wants_columnar():
+        return jsonify({'success': True, 'format': 'columnar', 'timeseries': to_columnar(rows)})
+
+    return jsonify({'success': True, 'timeseries': rows})
+
+
 # ===================== PREDICTION & ALERT API ENDPOINTS =====================
 
 @app.route('/api/v1/predictions/region/<region_id>')
+@conditional_get(families=('timeseries', 'forecast_report'), max_age=300)
 def api_regional_predictions(region_id):
     """Generate 7-day forecast for a specific region.
 
@@ -608,28 +846,28 @@ def api_regional_predictions(region_id):
 
         region_name = timeseries_data[0].get('region_name', region_id)
 
-        # Get current hospital capacity for this region
-        hospitals = get_current_hospital_capacity()
-
-        # Aggregate capacity across region
-        total_capacity = {
-            'total_beds': sum(h.get('total_beds', 0) for h in hospitals),
-            'icu_beds': sum(h.get('icu_beds', 0) for h in hospitals),
-            'ventilators_available': sum(
-                h.get('latest_resources', {}).get('ventilators_available', 0)
-                if h.get('latest_resources') else 0
-                for h in hospitals
-            )
-        }
+        # Capacity and occupancy of the hospitals serving this region
+        local = get_region_capacity_map().get(region_type, region_id)
+        if local is not None:
+            total_capacity, current_occupancy = local['capacity'], local['occupancy']
+        else:
+            total_capacity, current_occupancy = summarize_capacity([])
 
         # Generate comprehensive forecast report
-        report = generate_forecast_report(
+        report = cached_forecast_report(
+            f"region:{region_type}:{region_id}:{forecast_days}",
             region_name=region_name,
             timeseries_data=timeseries_data,
             current_capacity=total_capacity,
-            forecast_days=forecast_days
+            forecast_days=forecast_days,
+            current_occupancy=current_occupancy
         )
 
+        report = {**report, 'hospitals_in_region': local['hospital_count'] if local else 0}
+
+        if wants_columnar():
+            report = columnar_forecast_report(report)
+
         return jsonify(report)
 
     except Exception as e:
@@ -640,6 +878,7 @@ def api_regional_predictions(region_id):
 
 
 @app.route('/api/v1/predictions/hospital/<hospital_id>')
+@conditional_get(families=('timeseries', 'forecast_report'), max_age=300)
 def api_hospital_predictions(hospital_id):
     """Generate 7-day forecast for a specific hospital.
 
@@ -668,23 +907,21 @@ def api_hospital_predictions(hospital_id):
 
         # Get hospital capacity
         capacity_info = get_current_hospital_capacity(hospital_id=hospital_id)
-        current_capacity = capacity_info[0] if capacity_info else {}
+        current_capacity, current_occupancy = summarize_capacity(capacity_info[:1])
 
         # Generate forecast report
-        report = generate_forecast_report(
+        report = cached_forecast_report(
+            f"hospital:{hospital_id}:{forecast_days}",
             region_name=hospital.get('name', hospital_id),
             timeseries_data=timeseries_data,
-            current_capacity={
-                'total_beds': current_capacity.get('total_beds', 0),
-                'icu_beds': current_capacity.get('icu_beds', 0),
-                'ventilators_available': (
-                    current_capacity.get('latest_resources', {}).get('ventilators_available', 0)
-                    if current_capacity.get('latest_resources') else 0
-                )
-            },
-            forecast_days=forecast_days
+            current_capacity=current_capacity,
+            forecast_days=forecast_days,
+            current_occupancy=current_occupancy
         )
 
+        if wants_columnar():
+            report = columnar_forecast_report(report)
+
         return jsonify(report)
 
     except Exception as e:
@@ -698,6 +935,8 @@ def api_hospital_predictions(hospital_id):
 def api_growth_alerts():
     """Get rapid growth alerts for all regions.
 
+    Not wrapped in conditional_get: every evaluation feeds alert state tracking.
+
     Query params:
         - region_type: 'country', 'state', or 'city' (default: 'country')
         - threshold: Growth rate % to trigger alert (default: 50)
@@ -709,12 +948,13 @@ def api_growth_alerts():
         # Get latest regional data
         regions = get_regional_summary_latest(region_type=region_type)
 
-        alert_engine = AlertEngine(thresholds={'surge_growth_rate': threshold})
-        all_alerts = []
+        alert_engine = growth_alert_engine(threshold)
+        timeseries_by_region = {}
+        region_names = {}
 
         for region in regions:
             region_id = region.get('region_id')
-            region_name = region.get('region_name', region_id)
+            region_names[region_id] = region.get('region_name', region_id)
 
             # Get time-series for this region
             timeseries = get_regional_timeseries(
@@ -724,13 +964,14 @@ def api_growth_alerts():
             )
 
             if timeseries:
-                # Generate growth alerts
-                alerts = alert_engine.generate_growth_alerts(
-                    region_name=region_name,
-                    region_id=region_id,
-                    timeseries_data=timeseries
-                )
-                all_alerts.extend(alerts)
+                timeseries_by_region[region_id] = timeseries
+
+        # Evaluate growth alert rules for all regions at once
+        all_alerts = alert_engine.generate_growth_alerts_many(timeseries_by_region, region_names)
+
+        # Track state for the standard thresholds only; custom thresholds are ad hoc
+        if 'threshold' not in request.args:
+            all_alerts = track_alert_state(all_alerts, region_names, alert_engine.rules.owned_alert_types('growth'))
 
         # Get summary
         summary = alert_engine.get_alert_summary(all_alerts)
@@ -752,6 +993,8 @@ def api_growth_alerts():
 def api_capacity_alerts():
     """Get capacity warnings for all regions.
 
+    Not wrapped in conditional_get: every evaluation feeds alert state tracking.
+
     Query params:
         - region_type: 'country', 'state', or 'city' (default: 'country')
         - forecast_days: Days to forecast (default: 7)
@@ -762,12 +1005,16 @@ def api_capacity_alerts():
 
         regions = get_regional_summary_latest(region_type=region_type)
 
-        alert_engine = AlertEngine()
-        all_alerts = []
+        alert_engine = ALERT_ENGINE
+        capacity_map = get_region_capacity_map()
+        case_forecasts = {}
+        capacities = {}
+        occupancies = {}
+        region_names = {}
 
         for region in regions[:10]:  # Limit to top 10 regions for performance
             region_id = region.get('region_id')
-            region_name = region.get('region_name', region_id)
+            region_names[region_id] = region.get('region_name', region_id)
 
             # Get time-series
             timeseries = get_regional_timeseries(
@@ -776,19 +1023,11 @@ def api_capacity_alerts():
                 days=30
             )
 
-            if not timeseries:
+            # Regions without mapped hospitals have no capacity to warn about
+            local = capacity_map.get(region_type, region_id)
+            if not timeseries or local is None:
                 continue
-
-            # Get capacity
-            hospitals = get_current_hospital_capacity()
-            total_capacity = {
-                'icu_beds': sum(h.get('icu_beds', 0) for h in hospitals),
-                'ventilators_available': sum(
-                    h.get('latest_resources', {}).get('ventilators_available', 0)
-                    if h.get('latest_resources') else 0
-                    for h in hospitals
-                )
-            }
+            capacities[region_id], occupancies[region_id] = local['capacity'], local['occupancy']
 
             # Generate forecast
             forecast_model = CaseForecastModel()
@@ -796,21 +1035,18 @@ def api_capacity_alerts():
                 case_forecast = forecast_model.forecast(days=forecast_days)
 
                 if case_forecast.get('success'):
-                    # Predict resource needs
-                    resource_predictor = ResourceDemandPredictor()
-                    resource_forecast = resource_predictor.predict_resource_needs(
-                        case_forecast['predictions'],
-                        total_capacity
-                    )
-
-                    # Generate capacity alerts
-                    alerts = alert_engine.generate_capacity_alerts(
-                        region_name=region_name,
-                        region_id=region_id,
-                        resource_forecast=resource_forecast,
-                        current_capacity=total_capacity
-                    )
-                    all_alerts.extend(alerts)
+                    case_forecasts[region_id] = case_forecast['predictions']
+
+        # Predict resource needs for every region in one vectorized pass
+        resource_forecasts = ResourceDemandPredictor().predict_resource_needs_many(
+            case_forecasts, capacities, occupancies
+        )
+
+        all_alerts = alert_engine.generate_capacity_alerts_many(
+            resource_forecasts, capacities, region_names
+        )
+        all_alerts = track_alert_state(all_alerts, resource_forecasts,
+                                       alert_engine.rules.owned_alert_types('capacity'))
 
         summary = alert_engine.get_alert_summary(all_alerts)
 
@@ -827,7 +1063,119 @@ def api_capacity_alerts():
         }), 500
 
 
+@app.route('/api/v1/alerts/active')
+@conditional_get(families=(SNAPSHOT_FAMILY,), max_age=15)
+def api_active_alerts():
+    """Alerts from the latest background evaluation of all regions.
+
+    Served from the stored snapshot, so no alert computation happens per
+    request. Use /api/v1/alerts/stream to be notified of changes.
+    """
+    snapshot = latest_alert_snapshot()
+    if snapshot is None:
+        return jsonify({
+            'success': False,
+            'error': 'Alerts have not been evaluated yet'
+        }), 503
+
+    return jsonify({'success': True, **snapshot})
+
+
+@app.route('/api/v1/alerts/evaluate', methods=['POST'])
+def api_trigger_alert_evaluation():
+    """Signal a data refresh so the scheduler re-evaluates alerts now.
+
+    Requires ``Authorization: Bearer <ALERT_EVALUATE_TOKEN>``; disabled when
+    no token is configured.
+    """
+    if not Config.ALERT_EVALUATE_TOKEN:
+        return jsonify({'success': False, 'error': 'Alert evaluation trigger is disabled'}), 404
+    auth = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(auth.encode(), f'Bearer {Config.ALERT_EVALUATE_TOKEN}'.encode()):
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    get_alert_scheduler().trigger()
+    return jsonify({'success': True, 'queued': True}), 202
+
+
+@app.route('/api/v1/alerts/stream')
+def api_alert_stream():
+    """Server-Sent Events stream of alert changes.
+
+    Events: alert.new, alert.escalated, alert.updated, alert.resolved and
+    alerts.evaluated. Reconnecting clients send Last-Event-ID (or
+    ?last_event_id=) and receive the events they missed.
+    """
+    event_log = get_event_log()
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_id = int(last_id) if last_id and last_id.isdigit() else event_log.latest_id()
+
+    def generate(last_id):
+        yield f"retry: {Config.SSE_RETRY_MS}\n\n"
+        while True:
+            events = event_log.wait(last_id, topics=['alerts'], timeout=Config.SSE_KEEPALIVE_SECONDS)
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                last_id = event['id']
+                yield format_sse(event)
+
+    return Response(generate(last_id), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+@app.route('/api/v1/live')
+def api_live_feed():
+    """Server-Sent Events feed of surveillance deltas.
+
+    Query params:
+        - region_type: Region level for region deltas (default: 'country')
+        - last_event_id: Resume point (same as the Last-Event-ID header)
+
+    The first event is a full 'snapshot' (global counters, latest regional
+    rows and active alerts). After that only deltas are sent:
+    regions.changed, global.updated and the alert.* events. A client that
+    reconnects with Last-Event-ID gets the events it missed, or a new
+    snapshot if they are no longer retained.
+    """
+    region_type = request.args.get('region_type', default='country')
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_id = replay_start(int(last_id) if last_id and last_id.isdigit() else None)
+    event_log = get_event_log()
+
+    def generate(last_id):
+        yield f"retry: {Config.SSE_RETRY_MS}\n\n"
+
+        if last_id is None:
+            # Take the id first: deltas published while the snapshot is built
+            # are replayed afterwards, and applying them twice is harmless
+            last_id = event_log.latest_id()
+            snapshot = get_live_feed().snapshot(region_type)
+            alerts = latest_alert_snapshot()
+            snapshot['alerts'] = alerts['alerts'] if alerts else []
+            yield format_sse({'id': last_id, 'event_type': 'snapshot', 'data': snapshot})
+
+        while True:
+            events = event_log.wait(last_id, topics=STREAM_TOPICS, timeout=Config.SSE_KEEPALIVE_SECONDS)
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                last_id = event['id']
+                if wants_event(event, region_type):
+                    yield format_sse(event)
+
+    return Response(generate(last_id), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
 @app.route('/api/v1/analytics/growth-metrics')
+@conditional_get(families=('timeseries', 'regional_summary'))
 def api_growth_metrics():
     """Get growth metrics for all regions (doubling time, velocity, etc).
 
@@ -893,6 +1241,44 @@ def server_error(error):
 
 # ===================== HELPER FUNCTIONS =====================
 
+@functools.lru_cache(maxsize=32)
+def growth_alert_engine(surge_growth_rate: float) -> AlertEngine:
+    """AlertEngine for a surge threshold, compiled once per threshold."""
+    return AlertEngine(thresholds={'surge_growth_rate': surge_growth_rate})
+
+
+def track_alert_state(alerts: list, regions, alert_types) -> list:
+    """Run freshly generated alerts through the alert state manager.
+
+    Args:
+        alerts: Alerts from AlertEngine
+        regions: Region ids that were evaluated
+        alert_types: Alert types the evaluation can produce
+
+    Returns:
+        Active alerts with stable ids/triggered_at, or the input unchanged
+        when alert state tracking is disabled
+    """
+    manager = get_alert_state_manager()
+    if manager is None:
+        return alerts
+    return manager.process(alerts, regions=regions, alert_types=alert_types)['alerts']
+
+
+def cached_forecast_report(cache_key: str, **report_kwargs) -> dict:
+    """Generate a forecast report through the shared cross-worker cache."""
+    cache = get_shared_cache()
+    if cache is None:
+        return generate_forecast_report(**report_kwargs)
+
+    return cache.get_or_compute(
+        'forecast_report',
+        cache_key,
+        lambda: generate_forecast_report(**report_kwargs),
+        ttl=Config.FORECAST_CACHE_TTL_SECONDS
+    )
+
+
 def get_severity_from_confidence(confidence: float) -> str:
     """Determine severity level based on confidence."""
     if confidence < 0.3:
@@ -961,6 +1347,11 @@ def generate_analysis_text(prediction: str, confidence: float, severity: str) ->
     return " ".join(lines)
 
 
+def image_url(key):
+    """URL of a stored image, or None if it was not stored."""
+    return url_for('hospital_image', key=key) if key else None
+
+
 def generate_fallback_result(filename: str) -> dict:
     """Generate a fallback analysis result when the API is unavailable.
 
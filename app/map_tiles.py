@@ -0,0 +1,133 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Server-side clustering of regional_summary points into map tiles.
+
+Tiles use the standard Web Mercator z/x/y scheme that Mapbox requests. Each
+tile is split into a CLUSTER_GRID x CLUSTER_GRID grid; the points falling in
+one grid cell become a single cluster feature carrying their summed counts.
+A tile therefore never holds more than CLUSTER_GRID**2 features below
+MAP_CLUSTER_MAX_ZOOM, however many regions exist, and because the grid
+cells of zoom z+1 nest inside those of zoom z, clusters split predictably
+as the user zooms in.
+
+Tiles are built from the spatial index and cached in the shared cache,
+keyed by the 'regional_summary' data version, so every worker reuses them
+until the next data refresh.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+from .config import Config
+from .geo_index import get_geo_index
+from .shared_cache import get_shared_cache
+
+
+TILE_FAMILY = 'map_tiles'
+MAX_LATITUDE = 85.05112878
+# 8 x 8 cells is one cluster per 32px of a 256px tile
+CLUSTER_GRID = 8
+SUMMED_FIELDS = ('case_count', 'severe_count', 'deaths')
+POINT_FIELDS = ('region_type', 'region_id', 'region_name', 'case_count', 'severe_count',
+                'deaths', 'population', 'case_density', 'date')
+
+
+def tile_fraction(lat: float, lon: float, z: int) -> Tuple[float, float]:
+    """Fractional tile coordinates of a point at zoom z."""
+    n = 2 ** z
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(west, south, east, north) of a tile in degrees."""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def validate_tile(z: int, x: int, y: int):
+    """Raise ValueError for coordinates outside the tile pyramid."""
+    if not 0 <= z <= 22:
+        raise ValueError('zoom must be between 0 and 22')
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise ValueError(f'tile {x}/{y} does not exist at zoom {z}')
+
+
+def _point_feature(lat: float, lon: float, row: Dict) -> Dict:
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [round(lon, 5), round(lat, 5)]},
+        'properties': {'cluster': False, 'point_count': 1,
+                       **{field: row.get(field) for field in POINT_FIELDS if field in row}},
+    }
+
+
+def cluster_tile(rows: List[Dict], z: int, x: int, y: int,
+                 grid: int = CLUSTER_GRID, max_zoom: int = None) -> Dict:
+    """Build one tile's GeoJSON FeatureCollection from the rows inside it."""
+    max_zoom = Config.MAP_CLUSTER_MAX_ZOOM if max_zoom is None else max_zoom
+    cells: Dict[Tuple[int, int], List[Tuple[float, float, Dict]]] = {}
+    for row in rows:
+        lat, lon = float(row['latitude']), float(row['longitude'])
+        fx, fy = tile_fraction(lat, lon, z)
+        # Points on the tile's right/bottom edge belong to the neighbouring tile
+        if not (x <= fx < x + 1 and y <= fy < y + 1):
+            continue
+        cell = (0, 0) if z >= max_zoom else (int((fx - x) * grid), int((fy - y) * grid))
+        cells.setdefault(cell, []).append((lat, lon, row))
+
+    features = []
+    for points in cells.values():
+        if len(points) == 1 or z >= max_zoom:
+            features.extend(_point_feature(lat, lon, row) for lat, lon, row in points)
+            continue
+        top = max(points, key=lambda p: p[2].get('case_count') or 0)[2]
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [
+                round(sum(p[1] for p in points) / len(points), 5),
+                round(sum(p[0] for p in points) / len(points), 5),
+            ]},
+            'properties': {
+                'cluster': True,
+                'point_count': len(points),
+                'expansion_zoom': z + 1,
+                'top_region_id': top.get('region_id'),
+                **{field: sum(p[2].get(field) or 0 for p in points) for field in SUMMED_FIELDS},
+            },
+        })
+
+    return {
+        'type': 'FeatureCollection',
+        'tile': {'z': z, 'x': x, 'y': y},
+        'point_count': sum(f['properties']['point_count'] for f in features),
+        'features': features,
+    }
+
+
+def build_tile(region_type: str, z: int, x: int, y: int) -> Dict:
+    """Cluster the indexed regions of one level that fall inside a tile."""
+    rows = get_geo_index(region_type).within(tile_bounds(z, x, y))
+    return cluster_tile(rows, z, x, y)
+
+
+def get_tile(region_type: str, z: int, x: int, y: int) -> Dict:
+    """A tile from the shared cache, built on a miss."""
+    validate_tile(z, x, y)
+    cache = get_shared_cache()
+    if cache is None:
+        return build_tile(region_type, z, x, y)
+    version = cache.version('regional_summary')[0]
+    return cache.get_or_compute(
+        TILE_FAMILY, f'v{version}:{region_type}/{z}/{x}/{y}',
+        lambda: build_tile(region_type, z, x, y),
+        ttl=Config.MAP_TILE_TTL_SECONDS
+    )
@@ -0,0 +1,126 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Request-scoped memoization and single-flight de-duplication for read helpers.
+
+Within a single Flask request, identical calls to a decorated function return
+the first result without touching the database again. Across concurrent
+requests in the same worker, identical calls that overlap in time share one
+in-flight execution instead of each issuing their own query.
+
+Results are shared between callers, so treat them as read-only.
+"""
+
+import functools
+import inspect
+import threading
+
+from flask import g, has_request_context
+
+
+_MEMO_ATTR = '_read_memo'
+
+
+class _InFlightCall:
+    """A call currently being executed by a leader thread."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _make_key(func, signature, args, kwargs):
+    """Build a hashable cache key from the call signature.
+
+    Arguments are bound against the signature (with defaults applied) so that
+    positional and keyword spellings of the same call share one key.
+    """
+    try:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = tuple(bound.arguments.items())
+    except TypeError:
+        params = (args, tuple(sorted(kwargs.items())))
+
+    key = (func.__module__, func.__qualname__, params)
+    try:
+        hash(key)
+    except TypeError:
+        key = (func.__module__, func.__qualname__, repr(params))
+    return key
+
+
+def _request_memo():
+    """Get the memo dict for the current request, or None outside a request."""
+    if not has_request_context():
+        return None
+    memo = getattr(g, _MEMO_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(g, _MEMO_ATTR, memo)
+    return memo
+
+
+def _single_flight(key, func, args, kwargs):
+    """Run func once for all concurrent callers with the same key."""
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _InFlightCall()
+            _inflight[key] = call
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = func(*args, **kwargs)
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.done.set()
+
+
+def memoized_read(func):
+    """Decorator for idempotent read helpers.
+
+    Identical calls are collapsed within the current request, and concurrent
+    identical calls in this worker share a single execution.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = _make_key(func, signature, args, kwargs)
+        memo = _request_memo()
+
+        if memo is not None and key in memo:
+            return memo[key]
+
+        result = _single_flight(key, func, args, kwargs)
+
+        if memo is not None:
+            memo[key] = result
+        return result
+
+    wrapper.uncached = func
+    return wrapper
+
+
+def clear_request_memo():
+    """Drop memoized results for the current request (e.g. after a write)."""
+    if has_request_context() and hasattr(g, _MEMO_ATTR):
+        delattr(g, _MEMO_ATTR)
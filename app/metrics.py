@@ -0,0 +1,241 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Latency histograms for the request hot path, exported in Prometheus format.
+
+Operations are grouped by kind:
+
+- ``db``         Supabase helpers in app/database.py (real round trips only;
+                 memoized and shared-cache hits return before the span starts)
+- ``model_api``  calls to the external model API
+- ``model``      forecasting, resource and growth models
+- ``template``   Jinja template rendering
+
+Whole requests are timed separately, labelled by Flask endpoint, method and
+status code.
+
+Metrics are kept per worker process. When METRICS_ENABLED is off, spans and
+decorated functions cost one attribute lookup and nothing is recorded.
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional, Tuple
+
+from flask import g, request, template_rendered, before_render_template
+
+from .config import Config
+
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PREFIX = 'medialert'
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with an error count."""
+
+    __slots__ = ('counts', 'sum', 'count', 'errors', 'lock')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False):
+        index = bisect_left(BUCKETS, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+            if error:
+                self.errors += 1
+
+    def cumulative(self):
+        """(le, cumulative count) pairs ending with +Inf."""
+        total = 0
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+# (kind, operation) -> Histogram for spans; (endpoint, method, status) -> Histogram for requests
+_operations: Dict[Tuple[str, str], Histogram] = {}
+_requests: Dict[Tuple[str, str, str], Histogram] = {}
+_registry_lock = threading.Lock()
+# Callables returning extra exposition lines (e.g. model API telemetry)
+_collectors = []
+
+
+def _histogram(table: Dict, key: Tuple) -> Histogram:
+    histogram = table.get(key)
+    if histogram is None:
+        with _registry_lock:
+            histogram = table.setdefault(key, Histogram())
+    return histogram
+
+
+def observe(kind: str, operation: str, seconds: float, error: bool = False):
+    """Record one timed operation."""
+    if Config.METRICS_ENABLED:
+        _histogram(_operations, (kind, operation)).observe(seconds, error)
+
+
+class span:
+    """Context manager timing the enclosed block as one operation.
+
+    Usage:
+        with span('model', 'prophet_fit'):
+            model.fit(df)
+    """
+
+    __slots__ = ('kind', 'operation', 'start')
+
+    def __init__(self, kind: str, operation: str):
+        self.kind = kind
+        self.operation = operation
+        self.start = None
+
+    def __enter__(self):
+        if Config.METRICS_ENABLED:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.start is not None:
+            observe(self.kind, self.operation, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+def instrumented(kind: str, operation: Optional[str] = None):
+    """Decorator timing every call of a function as one operation.
+
+    Args:
+        kind: Operation kind ('db', 'model_api', 'model', ...)
+        operation: Name to report; defaults to the function's qualified name
+    """
+    def decorator(func):
+        name = operation or func.__qualname__
+        histogram_key = (kind, name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Config.METRICS_ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            error = True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                _histogram(_operations, histogram_key).observe(time.perf_counter() - start, error)
+
+        return wrapper
+    return decorator
+
+
+# ===================== FLASK HOOKS =====================
+
+def _start_request():
+    if Config.METRICS_ENABLED:
+        g._metrics_start = time.perf_counter()
+
+
+def _finish_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is not None:
+        key = (request.endpoint or 'unmatched', request.method, str(response.status_code))
+        _histogram(_requests, key).observe(time.perf_counter() - start, response.status_code >= 500)
+    return response
+
+
+def _start_template(sender, template, context, **extra):
+    if Config.METRICS_ENABLED:
+        g.setdefault('_metrics_templates', []).append(time.perf_counter())
+
+
+def _finish_template(sender, template, context, **extra):
+    starts = g.get('_metrics_templates')
+    if starts:
+        observe('template', template.name or 'string', time.perf_counter() - starts.pop())
+
+
+def register_metrics(app):
+    """Install request and template timing hooks on a Flask app.
+
+    Register before other after_request hooks (e.g. compression) so that
+    request durations include them.
+    """
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_start_template, app)
+    template_rendered.connect(_finish_template, app)
+
+
+# ===================== EXPORT =====================
+
+def register_collector(collect):
+    """Add a callable returning extra Prometheus lines to /metrics."""
+    _collectors.append(collect)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram):
+    with histogram.lock:
+        buckets = list(histogram.cumulative())
+        total, count = histogram.sum, histogram.count
+    for bound, cumulative in buckets:
+        yield f'{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}'
+    yield f'{name}_sum{{{labels}}} {total:.6f}'
+    yield f'{name}_count{{{labels}}} {count}'
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _registry_lock:
+        operations, requests = sorted(_operations.items()), sorted(_requests.items())
+    lines = []
+
+    name = f'{PREFIX}_operation_duration_seconds'
+    lines += [f'# HELP {name} Duration of instrumented operations.', f'# TYPE {name} histogram']
+    for (kind, operation), histogram in operations:
+        labels = f'kind="{_escape(kind)}",operation="{_escape(operation)}"'
+        lines.extend(_histogram_lines(name, labels, histogram))
+
+    name = f'{PREFIX}_operation_errors_total'
+    lines += [f'# HELP {name} Instrumented operations that raised.', f'# TYPE {name} counter']
+    for (kind, operation), histogram in operations:
+        lines.append(f'{name}{{kind="{_escape(kind)}",operation="{_escape(operation)}"}} {histogram.errors}')
+
+    name = f'{PREFIX}_http_request_duration_seconds'
+    lines += [f'# HELP {name} Duration of HTTP requests by endpoint.', f'# TYPE {name} histogram']
+    for (endpoint, method, status), histogram in requests:
+        labels = f'endpoint="{_escape(endpoint)}",method="{method}",status="{status}"'
+        lines.extend(_histogram_lines(name, labels, histogram))
+
+    for collect in _collectors:
+        try:
+            lines.extend(collect())
+        except Exception as e:
+            print(f"Warning: metrics collector failed: {e}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Drop all recorded metrics (mainly for tests)."""
+    with _registry_lock:
+        _operations.clear()
+        _requests.clear()
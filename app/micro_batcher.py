@@ -0,0 +1,269 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+In-process micro-batching of model API calls across concurrent requests.
+
+Images submitted by any request thread in this worker go into one queue. A
+collector thread seals a batch when it holds MODEL_API_BATCH_SIZE images or
+when the oldest image has waited for the current batching window, and hands
+it to get_predictions_batch on a small pool (MICRO_BATCH_CONCURRENCY batches
+in flight). While every slot is busy the queue keeps filling, so under load
+batches grow on their own.
+
+The window adapts to the arrival rate (an EWMA of the gap between uploads):
+
+- uploads arriving further apart than MICRO_BATCH_MAX_WAIT_MS will not join
+  a batch in time, so the window drops to MICRO_BATCH_MIN_WAIT_MS and a lone
+  upload is sent almost immediately;
+- otherwise the window is the time expected to fill a batch, capped at
+  MICRO_BATCH_MAX_WAIT_MS.
+
+A caller that gives up waiting withdraws its items that are still queued.
+Items already in a batch cannot be recalled; the ``release`` callback of
+run_many tells the caller when the batcher is done reading each item, so
+uploads are not closed while a batch is still sending them.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, List, Optional
+
+from .api_client import ModelAPIError, batching_available, get_predictions_batch
+from .config import Config
+from .metrics import PREFIX, register_collector
+
+
+# Weight of the newest inter-arrival gap in the EWMA
+GAP_ALPHA = 0.2
+
+
+class _Pending:
+    __slots__ = ('item', 'future', 'enqueued')
+
+    def __init__(self, item, future: Future, enqueued: float):
+        self.item = item
+        self.future = future
+        self.enqueued = enqueued
+
+
+class MicroBatcher:
+    """Collects items from many threads into batches for one batch function."""
+
+    def __init__(self, send_batch: Callable[[list], list], max_batch: int = 16,
+                 max_wait_ms: float = 10.0, min_wait_ms: float = 0.5, concurrency: int = 4):
+        """Start the collector thread.
+
+        Args:
+            send_batch: Called with a list of items; returns one result per item
+            max_batch: Most items per batch
+            max_wait_ms: Longest time the first item of a batch waits for others
+            min_wait_ms: Window used when arrivals are too sparse to batch
+            concurrency: Batches allowed in flight at once
+        """
+        self.send_batch = send_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self.min_wait = min(min_wait_ms, max_wait_ms) / 1000
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='micro-batch')
+        self._gap: Optional[float] = None
+        self._last_arrival: Optional[float] = None
+
+        self.batches = 0
+        self.items = 0
+        self.full_batches = 0
+        self.queue_wait_seconds = 0.0
+
+        threading.Thread(target=self._run, name='micro-batch-collector', daemon=True).start()
+
+    # --- submitting ---
+    def submit(self, item) -> Future:
+        """Queue one item; the future resolves to its result."""
+        return self.submit_many([item])[0]
+
+    def submit_many(self, items: list) -> List[Future]:
+        """Queue items that arrived together (counted as one arrival)."""
+        return [p.future for p in self._enqueue(items)]
+
+    def _enqueue(self, items: list) -> List[_Pending]:
+        now = time.perf_counter()
+        pending = [_Pending(item, Future(), now) for item in items]
+        with self._cond:
+            if self._last_arrival is not None:
+                gap = now - self._last_arrival
+                self._gap = gap if self._gap is None else self._gap + GAP_ALPHA * (gap - self._gap)
+            self._last_arrival = now
+            self._queue.extend(pending)
+            self._cond.notify()
+        return pending
+
+    def run_many(self, items: list, timeout: Optional[float] = None,
+                 release: Optional[Callable] = None) -> list:
+        """Submit items and wait for all of them.
+
+        Args:
+            items: Items to send
+            timeout: Seconds to wait for all results
+            release: Called with each item once the batcher no longer needs
+                it: on return for finished or withdrawn items, or when its
+                batch completes for items still being sent after a timeout
+
+        Returns:
+            One entry per item: its result, or the exception raised for it
+        """
+        pending = self._enqueue(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = []
+        for p in pending:
+            try:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                results.append(p.future.result(timeout=remaining))
+            except FutureTimeout:
+                results.append(ModelAPIError("Analysis is taking longer than expected. Please try again."))
+            except Exception as e:
+                results.append(e)
+
+        self._withdraw(pending)
+        if release is not None:
+            for p in pending:
+                p.future.add_done_callback(lambda _, item=p.item: release(item))
+        return results
+
+    def _withdraw(self, pending: List[_Pending]):
+        """Drop items that are still queued, so they are never sent."""
+        with self._cond:
+            for p in pending:
+                if p.future.done():
+                    continue
+                try:
+                    self._queue.remove(p)
+                except ValueError:
+                    continue  # already in a batch
+                p.future.cancel()
+
+    # --- batching ---
+    def window(self) -> float:
+        """Current batching window in seconds."""
+        gap = self._gap
+        if gap is None or gap >= self.max_wait:
+            return self.min_wait
+        return min(self.max_wait, max(self.min_wait, gap * (self.max_batch - 1)))
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _run(self):
+        while True:
+            try:
+                self._collect_and_send()
+            except Exception as e:
+                print(f"Warning: micro-batch collector failed: {e}")
+
+    def _collect_and_send(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = self._queue[0].enqueued + self.window()
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+        # Wait for a free slot before sealing, so the batch keeps growing meanwhile
+        self._slots.acquire()
+        now = time.perf_counter()
+        with self._cond:
+            batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+            if not batch:
+                # Everything waiting was withdrawn by callers that timed out
+                self._slots.release()
+                return
+            self.batches += 1
+            self.items += len(batch)
+            self.full_batches += len(batch) == self.max_batch
+            self.queue_wait_seconds += sum(now - p.enqueued for p in batch)
+        self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[_Pending]):
+        try:
+            results = self.send_batch([p.item for p in batch])
+            for pending, result in zip(batch, results):
+                pending.future.set_result(result)
+            for pending in batch[len(results):]:
+                pending.future.set_exception(ModelAPIError("Invalid response format from model API"))
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def prometheus_lines(self) -> List[str]:
+        lines = []
+        for name, kind, value, help_text in (
+            ('batches_total', 'counter', self.batches, 'Batches sent by the micro-batcher.'),
+            ('images_total', 'counter', self.items, 'Images sent through the micro-batcher.'),
+            ('full_batches_total', 'counter', self.full_batches, 'Batches sealed because they were full.'),
+            ('queue_wait_seconds_total', 'counter', round(self.queue_wait_seconds, 6),
+             'Time images spent queued before their batch was sent.'),
+            ('window_seconds', 'gauge', round(self.window(), 6), 'Current batching window.'),
+            ('queue_depth', 'gauge', self.queue_depth(), 'Images waiting to be batched.'),
+        ):
+            metric = f'{PREFIX}_micro_batch_{name}'
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}', f'{metric} {value}']
+        return lines
+
+
+_batcher: Optional[MicroBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_micro_batcher() -> MicroBatcher:
+    """Get this worker's MicroBatcher in front of get_predictions_batch."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    get_predictions_batch,
+                    max_batch=Config.MODEL_API_BATCH_SIZE,
+                    max_wait_ms=Config.MICRO_BATCH_MAX_WAIT_MS,
+                    min_wait_ms=Config.MICRO_BATCH_MIN_WAIT_MS,
+                    concurrency=Config.MICRO_BATCH_CONCURRENCY,
+                )
+                register_collector(_batcher.prometheus_lines)
+    return _batcher
+
+
+def predict_images(image_files: list, release: Optional[Callable] = None) -> list:
+    """Predictions for an upload's images, batched with concurrent uploads.
+
+    Falls back to calling get_predictions_batch directly when micro-batching
+    is off or the model API does not support batches.
+
+    Args:
+        image_files: Files to send
+        release: Called with each file once the model API client has
+            finished reading it (see MicroBatcher.run_many); close the files
+            there rather than when this returns
+
+    Returns:
+        One entry per file: the prediction dict or the exception for that file
+    """
+    if not image_files:
+        return []
+    if not Config.MICRO_BATCH_ENABLED or not Config.MODEL_API_URL or not batching_available():
+        try:
+            return get_predictions_batch(image_files)
+        finally:
+            if release is not None:
+                for image_file in image_files:
+                    release(image_file)
+    timeout = 2 * max(Config.API_TIMEOUT_SECONDS, 60) + Config.MICRO_BATCH_MAX_WAIT_MS / 1000
+    return get_micro_batcher().run_many(image_files, timeout=timeout, release=release)
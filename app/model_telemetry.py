@@ -0,0 +1,196 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Client-side telemetry for the model API, broken down by model_version.
+
+For every prediction call the client records:
+
+- end-to-end latency as seen by this app, and the model's own reported
+  processing_time_ms; the difference (network, queueing, cold starts) is
+  tracked as overhead
+- the outcome (success, timeout, connection_error, http_error,
+  invalid_response, error) and upload fallbacks
+- request and response payload sizes
+- how many images are awaiting a response, and the peak, for sizing
+  concurrency (a batch request counts each of its images)
+
+Latency percentiles are computed over the last MODEL_TELEMETRY_WINDOW calls
+per model version, so a cold-start regression in a new version shows up
+without being diluted by older traffic. Failed calls have no model_version
+and are reported under "unknown".
+"""
+
+import threading
+from collections import Counter, deque
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from .config import Config
+from .metrics import PREFIX, _escape, register_collector
+
+
+UNKNOWN_VERSION = 'unknown'
+QUANTILES = (0.5, 0.9, 0.99)
+TIMINGS = {
+    'latency': 'End-to-end model API latency.',
+    'processing': 'Processing time reported by the model API.',
+    'overhead': 'Model API latency not spent in the model: network, queueing, cold starts.',
+}
+
+
+class _VersionStats:
+    """Rolling latency windows and counters for one model version."""
+
+    def __init__(self, window: int):
+        self.windows = {name: deque(maxlen=window) for name in TIMINGS}
+        self.sums = dict.fromkeys(TIMINGS, 0.0)
+        self.counts = dict.fromkeys(TIMINGS, 0)
+        self.outcomes = Counter()
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def add(self, timing: str, seconds: float):
+        self.windows[timing].append(seconds)
+        self.sums[timing] += seconds
+        self.counts[timing] += 1
+
+
+class ModelAPITelemetry:
+    """Thread-safe per-version model API statistics for this worker."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._versions: Dict[str, _VersionStats] = {}
+        self._fallbacks = Counter()
+        self.in_flight = 0
+        self.in_flight_max = 0
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """Mark an image as sent (for the in-flight gauge)."""
+        with self._lock:
+            self.in_flight += 1
+            self.in_flight_max = max(self.in_flight_max, self.in_flight)
+
+    def end(self, model_version: Optional[str], outcome: str, seconds: float,
+            processing_ms: Optional[float] = None, request_bytes: int = 0, response_bytes: int = 0):
+        """Record a finished call.
+
+        Args:
+            model_version: Version reported by the API, or None if the call failed
+            outcome: 'success' or the failure kind
+            seconds: End-to-end latency measured by the client
+            processing_ms: Model-side processing time reported by the API
+            request_bytes: Size of the uploaded image
+            response_bytes: Size of the API response body
+        """
+        version = str(model_version) if model_version else UNKNOWN_VERSION
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            stats = self._versions.get(version)
+            if stats is None:
+                stats = self._versions[version] = _VersionStats(self.window)
+            stats.outcomes[outcome] += 1
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.add('latency', seconds)
+            if isinstance(processing_ms, (int, float)) and processing_ms >= 0:
+                processing = processing_ms / 1000
+                stats.add('processing', processing)
+                stats.add('overhead', max(0.0, seconds - processing))
+
+    def fallback(self, reason: str):
+        """Record an upload that fell back to a demo result."""
+        with self._lock:
+            self._fallbacks[reason] += 1
+
+    def summary(self) -> Dict:
+        """Per-version percentiles (ms) and counters."""
+        with self._lock:
+            versions = {}
+            for version, stats in self._versions.items():
+                entry = {
+                    'requests': sum(stats.outcomes.values()),
+                    'outcomes': dict(stats.outcomes),
+                    'request_bytes': stats.request_bytes,
+                    'response_bytes': stats.response_bytes,
+                }
+                for name in TIMINGS:
+                    for q, value in zip(QUANTILES, _quantiles(stats.windows[name])):
+                        entry[f'{name}_p{int(q * 100)}_ms'] = None if value is None else round(value * 1000, 3)
+                versions[version] = entry
+            return {
+                'versions': versions,
+                'fallbacks': dict(self._fallbacks),
+                'in_flight': self.in_flight,
+                'in_flight_max': self.in_flight_max,
+            }
+
+    def prometheus_lines(self) -> Iterable[str]:
+        """Exposition lines for the /metrics endpoint."""
+        with self._lock:
+            versions = sorted(self._versions.items())
+            lines = []
+
+            for timing, help_text in TIMINGS.items():
+                metric = f'{PREFIX}_model_api_{timing}_seconds'
+                lines += [f'# HELP {metric} {help_text} Quantiles cover the last '
+                          f'{self.window} calls.', f'# TYPE {metric} summary']
+                for version, stats in versions:
+                    label = f'model_version="{_escape(version)}"'
+                    for q, value in zip(QUANTILES, _quantiles(stats.windows[timing])):
+                        if value is not None:
+                            lines.append(f'{metric}{{{label},quantile="{q}"}} {value:.6f}')
+                    lines.append(f'{metric}_sum{{{label}}} {stats.sums[timing]:.6f}')
+                    lines.append(f'{metric}_count{{{label}}} {stats.counts[timing]}')
+
+            metric = f'{PREFIX}_model_api_requests_total'
+            lines += [f'# HELP {metric} Model API calls by outcome.', f'# TYPE {metric} counter']
+            for version, stats in versions:
+                for outcome, count in sorted(stats.outcomes.items()):
+                    lines.append(f'{metric}{{model_version="{_escape(version)}",outcome="{outcome}"}} {count}')
+
+            for direction in ('request', 'response'):
+                metric = f'{PREFIX}_model_api_{direction}_bytes_total'
+                lines += [f'# HELP {metric} Model API {direction} payload bytes.', f'# TYPE {metric} counter']
+                for version, stats in versions:
+                    value = getattr(stats, f'{direction}_bytes')
+                    lines.append(f'{metric}{{model_version="{_escape(version)}"}} {value}')
+
+            metric = f'{PREFIX}_model_api_fallbacks_total'
+            lines += [f'# HELP {metric} Uploads answered with a fallback result.', f'# TYPE {metric} counter']
+            for reason, count in sorted(self._fallbacks.items()):
+                lines.append(f'{metric}{{reason="{_escape(reason)}"}} {count}')
+
+            for name, value, help_text in (
+                ('in_flight', self.in_flight, 'Images currently awaiting a model API response.'),
+                ('in_flight_max', self.in_flight_max, 'Most images awaiting a model API response at once.'),
+            ):
+                metric = f'{PREFIX}_model_api_{name}'
+                lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge', f'{metric} {value}']
+        return lines
+
+
+def _quantiles(window) -> list:
+    if not window:
+        return [None] * len(QUANTILES)
+    return [float(v) for v in np.quantile(np.fromiter(window, dtype=float), QUANTILES)]
+
+
+_telemetry: Optional[ModelAPITelemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_model_telemetry() -> ModelAPITelemetry:
+    """Get this worker's ModelAPITelemetry."""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = ModelAPITelemetry(window=Config.MODEL_TELEMETRY_WINDOW)
+    return _telemetry
+
+
+register_collector(lambda: get_model_telemetry().prometheus_lines())
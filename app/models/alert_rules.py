@@ -0,0 +1,286 @@
+"""
+Alert Rule Engine Module
+Compiles declarative alert rules and evaluates them over a metrics table.
+
+A rule is a plain dict:
+
+    {
+        'name': 'surge',
+        'group': 'growth',
+        'alert_type': 'surge_detected',
+        'when': [('growth_rate', '>=', 'surge_growth_rate')],
+        'severity': 'high',
+        'escalate': [('critical', [('growth_rate', '>', 100)])],
+        'unless': None,
+        'title': "Case Surge Detected: {region_name}",
+        'description': "Cases increased by {growth_rate:.1f}% ...",
+        'metrics': ['growth_rate', 'current_cases'],
+        'recommendations': ["..."],
+    }
+
+Conditions in 'when' are ANDed; a threshold is either a number or the name
+of a threshold supplied at compile time. 'unless' names an earlier rule in
+the same group and suppresses this rule wherever that one fired (if/elif).
+'metrics' is a list of column names or a dict of output name -> column.
+
+Rules are compiled once (thresholds resolved, operators bound, templates
+checked) and then evaluated as vectorized predicates over every region in a
+MetricsTable at once; only alerts that actually fire are rendered.
+
+AI Attribution: This file was developed with assistance from Claude (Anthropic).
+https://claude.ai
+"""
+
+import numpy as np
+from datetime import datetime
+from string import Formatter
+from typing import Dict, List, Optional, Union
+
+
+OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+
+class MetricsTable:
+    """Column-oriented metrics for many regions (one row per region)."""
+
+    def __init__(self, columns: Dict[str, Union[List, np.ndarray]]):
+        """Initialize from a dict of equal-length columns.
+
+        Args:
+            columns: Column name -> list or 1-D array of per-region values.
+                Missing values are None (or NaN in numeric arrays).
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+
+        self.columns = columns
+        self._length = lengths.pop() if lengths else 0
+        self._numeric = {}
+        self._values = {}
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> 'MetricsTable':
+        """Build a table from per-region dicts sharing the same keys."""
+        names = list(records[0]) if records else []
+        return cls({name: [record.get(name) for record in records] for name in names})
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def numeric(self, name: str) -> np.ndarray:
+        """Column as a float array with None mapped to NaN (cached)."""
+        if name not in self._numeric:
+            values = self.columns[name]
+            if not isinstance(values, np.ndarray):
+                values = [np.nan if v is None else v for v in values]
+            self._numeric[name] = np.asarray(values, dtype=float)
+        return self._numeric[name]
+
+    def value(self, name: str, i: int):
+        """Plain-Python value of one cell, for rendering."""
+        if name not in self._values:
+            values = self.columns[name]
+            self._values[name] = values.tolist() if isinstance(values, np.ndarray) else values
+        return self._values[name][i]
+
+    def row(self, i: int, names) -> Dict:
+        """Plain-Python values of the given columns for row i."""
+        return {name: self.value(name, i) for name in names}
+
+
+def _template_fields(template: str) -> List[str]:
+    """Column names referenced by a str.format template."""
+    return [field.split('.')[0].split('[')[0]
+            for _, field, _, _ in Formatter().parse(template) if field]
+
+
+class CompiledRule:
+    """A single rule with thresholds resolved and operators bound."""
+
+    def __init__(self, spec: Dict, thresholds: Dict):
+        self.name = spec['name']
+        self.group = spec.get('group')
+        self.alert_type = spec['alert_type']
+        self.severity = spec['severity']
+        self.unless = spec.get('unless')
+        self.title = spec['title']
+        self.description = spec['description']
+        self.recommendations = list(spec.get('recommendations', []))
+
+        metrics = spec.get('metrics', [])
+        self.metrics = dict(metrics) if isinstance(metrics, dict) else {m: m for m in metrics}
+
+        self.conditions = self._compile_conditions(spec['when'], thresholds)
+        self.escalations = [
+            (severity, self._compile_conditions(conditions, thresholds))
+            for severity, conditions in spec.get('escalate', [])
+        ]
+
+        # Every column the rule reads, so a table can be checked up front
+        fields = {'region_id', 'region_name'}
+        fields.update(column for column, _, _ in self.conditions)
+        for _, conditions in self.escalations:
+            fields.update(column for column, _, _ in conditions)
+        fields.update(self.metrics.values())
+        for template in [self.title, self.description] + self.recommendations:
+            fields.update(_template_fields(template))
+        self.fields = fields
+
+    def _compile_conditions(self, conditions, thresholds: Dict) -> List:
+        compiled = []
+        for column, op, threshold in conditions:
+            if op not in OPERATORS:
+                raise ValueError(f"Rule '{self.name}': unknown operator '{op}'")
+            if isinstance(threshold, str):
+                if threshold not in thresholds:
+                    raise ValueError(f"Rule '{self.name}': unknown threshold '{threshold}'")
+                threshold = thresholds[threshold]
+            compiled.append((column, OPERATORS[op], float(threshold)))
+        return compiled
+
+    @staticmethod
+    def _match(conditions, table: MetricsTable) -> np.ndarray:
+        mask = np.ones(len(table), dtype=bool)
+        for column, ufunc, threshold in conditions:
+            # NaN (missing) never satisfies a comparison
+            mask &= ufunc(table.numeric(column), threshold)
+        return mask
+
+    def mask(self, table: MetricsTable) -> np.ndarray:
+        """Boolean array: does the rule fire for each row."""
+        return self._match(self.conditions, table)
+
+    def severities(self, table: MetricsTable) -> np.ndarray:
+        """Per-row severity after escalations (first matching escalation wins)."""
+        severities = np.full(len(table), self.severity, dtype=object)
+        for severity, conditions in reversed(self.escalations):
+            severities[self._match(conditions, table)] = severity
+        return severities
+
+    def render(self, table: MetricsTable, i: int, severity: str, triggered_at: str) -> Dict:
+        """Build the alert dict for row i."""
+        context = table.row(i, self.fields)
+        return {
+            'region_id': context['region_id'],
+            'region_name': context['region_name'],
+            'alert_type': self.alert_type,
+            'severity': severity,
+            'title': self.title.format(**context),
+            'description': self.description.format(**context),
+            'metrics': {name: context[column] for name, column in self.metrics.items()},
+            'triggered_at': triggered_at,
+            'recommendations': [r.format(**context) for r in self.recommendations],
+        }
+
+
+class RuleSet:
+    """A compiled, ordered collection of alert rules."""
+
+    def __init__(self, rules: List[CompiledRule]):
+        self.rules = rules
+
+    def group(self, group: Optional[str]) -> List[CompiledRule]:
+        return [rule for rule in self.rules if group is None or rule.group == group]
+
+    def alert_types(self, group: Optional[str] = None) -> set:
+        """Alert types the rules in a group can produce."""
+        return {rule.alert_type for rule in self.group(group)}
+
+    def owned_alert_types(self, group: str) -> set:
+        """Alert types only the rules in a group can produce.
+
+        An evaluation of one group can clear these, but not types that
+        another group also raises (its absence says nothing about those).
+        """
+        others = {rule.alert_type for rule in self.rules if rule.group != group}
+        return self.alert_types(group) - others
+
+    def masks(self, table: MetricsTable, group: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Evaluate every rule in a group over the table.
+
+        Returns:
+            Dict of rule name -> boolean array over rows, in rule order
+        """
+        rules = self.group(group)
+        missing = set().union(*(rule.fields for rule in rules)) - set(table.columns) if rules else set()
+        if missing and len(table):
+            raise ValueError(f"Metrics table is missing columns: {sorted(missing)}")
+
+        masks = {}
+        for rule in rules:
+            mask = rule.mask(table)
+            if rule.unless:
+                mask &= ~masks[rule.unless]
+            masks[rule.name] = mask
+        return masks
+
+    def evaluate(self, table: MetricsTable, group: Optional[str] = None) -> List[Dict]:
+        """Evaluate rules over all rows and render the alerts that fire.
+
+        Args:
+            table: One row per region, with region_id/region_name columns
+            group: Only evaluate rules in this group (None for all)
+
+        Returns:
+            List of alert dicts, ordered by row and then by rule order
+        """
+        rules = self.group(group)
+        if not rules or not len(table):
+            return []
+
+        masks = self.masks(table, group)
+        fired = np.stack([masks[rule.name] for rule in rules], axis=1)
+        rows, rule_indexes = np.nonzero(fired)  # row-major: by region, then rule
+
+        severities = {}
+        triggered_at = datetime.now().isoformat()
+        alerts = []
+        for i, r in zip(rows.tolist(), rule_indexes.tolist()):
+            rule = rules[r]
+            if r not in severities:
+                severities[r] = rule.severities(table)
+            alerts.append(rule.render(table, i, severities[r][i], triggered_at))
+        return alerts
+
+
+def compile_rules(specs: List[Dict], thresholds: Optional[Dict] = None) -> RuleSet:
+    """Compile declarative rule specs against a set of thresholds.
+
+    Args:
+        specs: Rule dicts (see module docstring), in evaluation order
+        thresholds: Named threshold values referenced by the rules
+
+    Returns:
+        RuleSet ready for evaluation
+
+    Raises:
+        ValueError: On unknown operators/thresholds, duplicate names, or an
+            'unless' that does not name an earlier rule in the same group
+    """
+    thresholds = thresholds or {}
+    rules = []
+    seen = {}
+
+    for spec in specs:
+        rule = CompiledRule(spec, thresholds)
+        if rule.name in seen:
+            raise ValueError(f"Duplicate rule name '{rule.name}'")
+        if rule.unless and (rule.unless not in seen or seen[rule.unless] != rule.group):
+            raise ValueError(
+                f"Rule '{rule.name}': 'unless' must name an earlier rule in group '{rule.group}'"
+            )
+        seen[rule.name] = rule.group
+        rules.append(rule)
+
+    return RuleSet(rules)
@@ -6,9 +6,155 @@ AI Attribution: This file was developed with assistance from Claude (Anthropic).
 https://claude.ai
 """
 
-from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from .predictions import GrowthAnalyzer
+from .alert_rules import MetricsTable, compile_rules
+
+
+# Declarative alert rules, evaluated in order within each group. Thresholds
+# given as strings are looked up in AlertEngine.thresholds at compile time.
+ALERT_RULES = [
+    # ----- Growth -----
+    {
+        'name': 'surge',
+        'group': 'growth',
+        'alert_type': 'surge_detected',
+        'when': [('growth_rate', '>=', 'surge_growth_rate')],
+        'severity': 'high',
+        'escalate': [('critical', [('growth_rate', '>', 100)])],
+        'title': "🚨 Case Surge Detected: {region_name}",
+        'description': "Cases increased by {growth_rate:.1f}% in the last 3 days. Immediate attention required.",
+        'metrics': ['growth_rate', 'current_cases', 'trend'],
+        'recommendations': [
+            "Implement enhanced public health measures",
+            "Increase testing and contact tracing capacity",
+            "Prepare hospitals for surge in admissions"
+        ]
+    },
+    {
+        # Less severe than surge, so only when surge did not fire
+        'name': 'rapid_growth',
+        'group': 'growth',
+        'alert_type': 'rapid_growth',
+        'when': [('growth_rate', '>=', 'rapid_growth_rate')],
+        'unless': 'surge',
+        'severity': 'medium',
+        'title': "⚠️ Rapid Growth: {region_name}",
+        'description': "Cases increasing at {growth_rate:.1f}% over 3 days. Monitor closely.",
+        'metrics': ['growth_rate', 'current_cases'],
+        'recommendations': [
+            "Increase surveillance in affected areas",
+            "Review hospital preparedness plans"
+        ]
+    },
+    {
+        'name': 'critical_doubling_time',
+        'group': 'growth',
+        'alert_type': 'rapid_growth',
+        'when': [('doubling_time', '>', 0), ('doubling_time', '<=', 'doubling_time_critical')],
+        'severity': 'critical',
+        'title': "🔴 Critical Doubling Time: {region_name}",
+        'description': "Cases doubling every {doubling_time:.1f} days. Exponential growth detected.",
+        'metrics': ['doubling_time', 'daily_velocity'],
+        'recommendations': [
+            "Consider lockdown or movement restrictions",
+            "Activate emergency response protocols",
+            "Coordinate with neighboring regions"
+        ]
+    },
+
+    # ----- Capacity -----
+    {
+        'name': 'icu_capacity_crisis',
+        'group': 'capacity',
+        'alert_type': 'capacity_warning',
+        'when': [('max_utilization', '>=', 'icu_utilization_critical')],
+        'severity': 'critical',
+        'title': "🏥 ICU Capacity Crisis: {region_name}",
+        'description': "ICU utilization will reach {max_utilization:.1f}% by {peak_date}. Shortage of {icu_gap} beds predicted.",
+        'metrics': {
+            'max_utilization': 'max_utilization',
+            'current_icu_beds': 'current_icu_beds',
+            'peak_icu_needed': 'peak_icu_needed',
+            'gap': 'icu_gap',
+            'peak_date': 'peak_date'
+        },
+        'recommendations': [
+            "URGENT: Procure {icu_gap} additional ICU beds before {peak_date}",
+            "Convert general wards to ICU capacity",
+            "Coordinate patient transfers to neighboring facilities",
+            "Activate field hospital protocols if available"
+        ]
+    },
+    {
+        'name': 'icu_capacity_warning',
+        'group': 'capacity',
+        'alert_type': 'capacity_warning',
+        'when': [('max_utilization', '>=', 'icu_utilization_warning')],
+        'unless': 'icu_capacity_crisis',
+        'severity': 'high',
+        'title': "⚠️ ICU Capacity Warning: {region_name}",
+        'description': "ICU utilization approaching {max_utilization:.1f}% by {peak_date}. Prepare surge capacity.",
+        'metrics': ['max_utilization', 'peak_date'],
+        'recommendations': [
+            "Activate surge capacity plans",
+            "Defer non-urgent procedures to free capacity",
+            "Review staffing levels and prepare for overtime"
+        ]
+    },
+    {
+        'name': 'ventilator_shortage',
+        'group': 'capacity',
+        'alert_type': 'resource_depletion',
+        'when': [('ventilator_gap', '>', 0)],
+        'severity': 'high',
+        'title': "💨 Ventilator Shortage Predicted: {region_name}",
+        'description': "Need {peak_ventilators_needed} ventilators by {peak_date}, but only {ventilators_available} available. Gap: {ventilator_gap}",
+        'metrics': {
+            'peak_ventilators_needed': 'peak_ventilators_needed',
+            'available': 'ventilators_available',
+            'gap': 'ventilator_gap',
+            'peak_date': 'peak_date'
+        },
+        'recommendations': [
+            "Procure {ventilator_gap} additional ventilators immediately",
+            "Coordinate ventilator sharing with nearby hospitals",
+            "Train staff on ventilator operation and maintenance"
+        ]
+    },
+
+    # ----- Resource depletion -----
+    {
+        'name': 'oxygen_crisis',
+        'group': 'resources',
+        'alert_type': 'resource_depletion',
+        'when': [('oxygen_days_remaining', '<=', 'oxygen_days_critical')],
+        'severity': 'critical',
+        'title': "🔴 Oxygen Crisis: {region_name}",
+        'description': "Oxygen supply will deplete in {oxygen_days_remaining} days at current consumption rate.",
+        'metrics': ['oxygen_days_remaining'],
+        'recommendations': [
+            "Emergency oxygen procurement required",
+            "Activate oxygen rationing protocols",
+            "Coordinate emergency oxygen transfers from other regions"
+        ]
+    },
+    {
+        'name': 'oxygen_warning',
+        'group': 'resources',
+        'alert_type': 'resource_depletion',
+        'when': [('oxygen_days_remaining', '<=', 'oxygen_days_warning')],
+        'unless': 'oxygen_crisis',
+        'severity': 'medium',
+        'title': "⚠️ Oxygen Supply Warning: {region_name}",
+        'description': "Oxygen supply at {oxygen_days_remaining} days remaining. Replenishment needed.",
+        'metrics': ['oxygen_days_remaining'],
+        'recommendations': [
+            "Schedule oxygen delivery within 48 hours",
+            "Monitor oxygen consumption closely"
+        ]
+    },
+]
 
 
 class AlertEngine:
@@ -27,11 +173,12 @@ class AlertEngine:
     TYPE_RAPID_GROWTH = 'rapid_growth'
     TYPE_DEMOGRAPHIC_RISK = 'demographic_risk'
 
-    def __init__(self, thresholds: Optional[Dict] = None):
+    def __init__(self, thresholds: Optional[Dict] = None, rules: Optional[List[Dict]] = None):
         """Initialize alert engine.
 
         Args:
             thresholds: Optional dict to customize alert thresholds
+            rules: Optional rule specs replacing ALERT_RULES
         """
         # Default thresholds
         self.thresholds = {
@@ -48,197 +195,191 @@ class AlertEngine:
         if thresholds:
             self.thresholds.update(thresholds)
 
-    def generate_growth_alerts(self, region_name: str, region_id: str,
-                               timeseries_data: List[Dict]) -> List[Dict]:
-        """Generate alerts for rapid case growth.
+        self.rules = compile_rules(rules if rules is not None else ALERT_RULES, self.thresholds)
+
+    # ===================== METRICS TABLES =====================
+
+    @staticmethod
+    def growth_metrics_table(growth_metrics: Dict[str, Dict],
+                             region_names: Optional[Dict[str, str]] = None) -> MetricsTable:
+        """Build the growth metrics table from GrowthAnalyzer output.
 
         Args:
-            region_name: Name of region
-            region_id: Region identifier
-            timeseries_data: Historical case data
+            growth_metrics: region_id -> calculate_growth_metrics() result
+            region_names: Optional region_id -> display name
 
         Returns:
-            List of alert dicts
+            MetricsTable with one row per region whose metrics succeeded
         """
-        alerts = []
+        region_names = region_names or {}
+        records = [{
+            'region_id': region_id,
+            'region_name': region_names.get(region_id, region_id),
+            'growth_rate': metrics['growth_rate_3day'],
+            'doubling_time': metrics.get('doubling_time_days'),
+            'daily_velocity': metrics['daily_velocity'],
+            'trend': metrics['trend'],
+            'current_cases': metrics['current_cases'],
+        } for region_id, metrics in growth_metrics.items() if metrics.get('success')]
+
+        return MetricsTable.from_records(records)
+
+    @staticmethod
+    def capacity_metrics_table(resource_forecasts: Dict[str, Dict],
+                               capacities: Dict[str, Dict],
+                               region_names: Optional[Dict[str, str]] = None) -> MetricsTable:
+        """Build the capacity metrics table from ResourceDemandPredictor output.
 
-        # Calculate growth metrics
-        growth_metrics = GrowthAnalyzer.calculate_growth_metrics(timeseries_data)
+        Args:
+            resource_forecasts: region_id -> predict_resource_needs() result
+            capacities: region_id -> current hospital capacity
+            region_names: Optional region_id -> display name
 
-        if not growth_metrics.get('success'):
-            return alerts
+        Returns:
+            MetricsTable with one row per successful forecast
+        """
+        region_names = region_names or {}
+        records = []
 
-        growth_rate = growth_metrics['growth_rate_3day']
-        doubling_time = growth_metrics.get('doubling_time_days')
-        trend = growth_metrics['trend']
+        for region_id, forecast in resource_forecasts.items():
+            if not forecast.get('success'):
+                continue
 
-        # Surge alert
-        if growth_rate >= self.thresholds['surge_growth_rate']:
-            alerts.append({
-                'region_id': region_id,
-                'region_name': region_name,
-                'alert_type': self.TYPE_SURGE,
-                'severity': self.SEVERITY_CRITICAL if growth_rate > 100 else self.SEVERITY_HIGH,
-                'title': f"🚨 Case Surge Detected: {region_name}",
-                'description': f"Cases increased by {growth_rate:.1f}% in the last 3 days. Immediate attention required.",
-                'metrics': {
-                    'growth_rate': growth_rate,
-                    'current_cases': growth_metrics['current_cases'],
-                    'trend': trend
-                },
-                'triggered_at': datetime.now().isoformat(),
-                'recommendations': [
-                    "Implement enhanced public health measures",
-                    "Increase testing and contact tracing capacity",
-                    "Prepare hospitals for surge in admissions"
-                ]
-            })
+            summary = forecast.get('summary', {})
+            capacity = capacities.get(region_id, {})
+            peak_icu_needed = summary.get('peak_icu_beds_needed', 0)
+            peak_ventilators = summary.get('peak_ventilators_needed', 0)
 
-        # Rapid growth alert (less severe than surge)
-        elif growth_rate >= self.thresholds['rapid_growth_rate']:
-            alerts.append({
+            records.append({
                 'region_id': region_id,
-                'region_name': region_name,
-                'alert_type': self.TYPE_RAPID_GROWTH,
-                'severity': self.SEVERITY_MEDIUM,
-                'title': f"⚠️ Rapid Growth: {region_name}",
-                'description': f"Cases increasing at {growth_rate:.1f}% over 3 days. Monitor closely.",
-                'metrics': {
-                    'growth_rate': growth_rate,
-                    'current_cases': growth_metrics['current_cases']
-                },
-                'triggered_at': datetime.now().isoformat(),
-                'recommendations': [
-                    "Increase surveillance in affected areas",
-                    "Review hospital preparedness plans"
-                ]
+                'region_name': region_names.get(region_id, region_id),
+                'max_utilization': summary.get('max_icu_utilization', 0),
+                # With length-of-stay modelling, occupancy peaks after the case peak
+                'peak_date': summary.get('peak_demand_date', summary.get('peak_date')),
+                'peak_icu_needed': peak_icu_needed,
+                'current_icu_beds': capacity.get('icu_beds', 0),
+                'icu_gap': peak_icu_needed - capacity.get('icu_beds', 0),
+                'peak_ventilators_needed': peak_ventilators,
+                'ventilators_available': capacity.get('ventilators_available', 0),
+                'ventilator_gap': peak_ventilators - capacity.get('ventilators_available', 0),
             })
 
-        # Doubling time alert
-        if doubling_time and doubling_time <= self.thresholds['doubling_time_critical']:
-            alerts.append({
-                'region_id': region_id,
-                'region_name': region_name,
-                'alert_type': self.TYPE_RAPID_GROWTH,
-                'severity': self.SEVERITY_CRITICAL,
-                'title': f"🔴 Critical Doubling Time: {region_name}",
-                'description': f"Cases doubling every {doubling_time:.1f} days. Exponential growth detected.",
-                'metrics': {
-                    'doubling_time': doubling_time,
-                    'daily_velocity': growth_metrics['daily_velocity']
-                },
-                'triggered_at': datetime.now().isoformat(),
-                'recommendations': [
-                    "Consider lockdown or movement restrictions",
-                    "Activate emergency response protocols",
-                    "Coordinate with neighboring regions"
-                ]
-            })
+        return MetricsTable.from_records(records)
 
-        return alerts
+    @staticmethod
+    def resource_metrics_table(resource_statuses: Dict[str, Dict],
+                               region_names: Optional[Dict[str, str]] = None) -> MetricsTable:
+        """Build the resource-level metrics table.
 
-    def generate_capacity_alerts(self, region_name: str, region_id: str,
-                                 resource_forecast: Dict, current_capacity: Dict) -> List[Dict]:
-        """Generate alerts for hospital capacity issues.
+        Args:
+            resource_statuses: region_id -> current resource levels
+            region_names: Optional region_id -> display name
+
+        Returns:
+            MetricsTable with one row per region
+        """
+        region_names = region_names or {}
+        records = [{
+            'region_id': region_id,
+            'region_name': region_names.get(region_id, region_id),
+            'oxygen_days_remaining': status.get('oxygen_supply_days'),
+        } for region_id, status in resource_statuses.items()]
+
+        return MetricsTable.from_records(records)
+
+    # ===================== ALERT GENERATION =====================
+
+    def alerts_from_growth_metrics(self, growth_metrics: Dict[str, Dict],
+                                   region_names: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """Generate growth alerts from already computed growth metrics.
+
+        Args:
+            growth_metrics: region_id -> calculate_growth_metrics() result
+            region_names: Optional region_id -> display name
+
+        Returns:
+            List of alert dicts, grouped by region
+        """
+        table = self.growth_metrics_table(growth_metrics, region_names)
+        return self.rules.evaluate(table, group='growth')
+
+    def generate_growth_alerts_many(self, timeseries_by_region: Dict[str, List[Dict]],
+                                    region_names: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """Generate alerts for rapid case growth across many regions.
+
+        Args:
+            timeseries_by_region: region_id -> historical case data
+            region_names: Optional region_id -> display name
+
+        Returns:
+            List of alert dicts, grouped by region
+        """
+        growth_metrics = {
+            region_id: GrowthAnalyzer.calculate_growth_metrics(timeseries)
+            for region_id, timeseries in timeseries_by_region.items()
+        }
+        return self.alerts_from_growth_metrics(growth_metrics, region_names)
+
+    def generate_growth_alerts(self, region_name: str, region_id: str,
+                               timeseries_data: List[Dict]) -> List[Dict]:
+        """Generate alerts for rapid case growth.
 
         Args:
             region_name: Name of region
             region_id: Region identifier
-            resource_forecast: Output from ResourceDemandPredictor
-            current_capacity: Current hospital capacity
+            timeseries_data: Historical case data
 
         Returns:
             List of alert dicts
         """
-        alerts = []
-
-        if not resource_forecast.get('success'):
-            return alerts
+        return self.generate_growth_alerts_many({region_id: timeseries_data}, {region_id: region_name})
 
-        summary = resource_forecast.get('summary', {})
-        max_utilization = summary.get('max_icu_utilization', 0)
-        peak_date = summary.get('peak_date')
-        peak_icu_needed = summary.get('peak_icu_beds_needed', 0)
+    def generate_capacity_alerts_many(self, resource_forecasts: Dict[str, Dict],
+                                      capacities: Dict[str, Dict],
+                                      region_names: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """Generate hospital capacity alerts across many regions.
 
-        current_icu = current_capacity.get('icu_beds', 0)
+        Args:
+            resource_forecasts: region_id -> output from ResourceDemandPredictor
+            capacities: region_id -> current hospital capacity
+            region_names: Optional region_id -> display name
 
-        # Critical capacity alert
-        if max_utilization >= self.thresholds['icu_utilization_critical']:
-            gap = peak_icu_needed - current_icu
+        Returns:
+            List of alert dicts, grouped by region
+        """
+        table = self.capacity_metrics_table(resource_forecasts, capacities, region_names)
+        return self.rules.evaluate(table, group='capacity')
 
-            alerts.append({
-                'region_id': region_id,
-                'region_name': region_name,
-                'alert_type': self.TYPE_CAPACITY,
-                'severity': self.SEVERITY_CRITICAL,
-                'title': f"🏥 ICU Capacity Crisis: {region_name}",
-                'description': f"ICU utilization will reach {max_utilization:.1f}% by {peak_date}. Shortage of {gap} beds predicted.",
-                'metrics': {
-                    'max_utilization': max_utilization,
-                    'current_icu_beds': current_icu,
-                    'peak_icu_needed': peak_icu_needed,
-                    'gap': gap,
-                    'peak_date': peak_date
-                },
-                'triggered_at': datetime.now().isoformat(),
-                'recommendations': [
-                    f"URGENT: Procure {gap} additional ICU beds before {peak_date}",
-                    "Convert general wards to ICU capacity",
-                    "Coordinate patient transfers to neighboring facilities",
-                    "Activate field hospital protocols if available"
-                ]
-            })
+    def generate_capacity_alerts(self, region_name: str, region_id: str,
+                                 resource_forecast: Dict, current_capacity: Dict) -> List[Dict]:
+        """Generate alerts for hospital capacity issues.
 
-        # Warning capacity alert
-        elif max_utilization >= self.thresholds['icu_utilization_warning']:
-            alerts.append({
-                'region_id': region_id,
-                'region_name': region_name,
-                'alert_type': self.TYPE_CAPACITY,
-                'severity': self.SEVERITY_HIGH,
-                'title': f"⚠️ ICU Capacity Warning: {region_name}",
-                'description': f"ICU utilization approaching {max_utilization:.1f}% by {peak_date}. Prepare surge capacity.",
-                'metrics': {
-                    'max_utilization': max_utilization,
-                    'peak_date': peak_date
-                },
-                'triggered_at': datetime.now().isoformat(),
-                'recommendations': [
-                    "Activate surge capacity plans",
-                    "Defer non-urgent procedures to free capacity",
-                    "Review staffing levels and prepare for overtime"
-                ]
-            })
+        Args:
+            region_name: Name of region
+            region_id: Region identifier
+            resource_forecast: Output from ResourceDemandPredictor
+            current_capacity: Current hospital capacity
 
-        # Ventilator shortage alert
-        peak_ventilators = summary.get('peak_ventilators_needed', 0)
-        current_ventilators = current_capacity.get('ventilators_available', 0)
+        Returns:
+            List of alert dicts
+        """
+        return self.generate_capacity_alerts_many(
+            {region_id: resource_forecast}, {region_id: current_capacity}, {region_id: region_name}
+        )
 
-        if peak_ventilators > current_ventilators:
-            ventilator_gap = peak_ventilators - current_ventilators
+    def generate_resource_depletion_alerts_many(self, resource_statuses: Dict[str, Dict],
+                                                region_names: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """Generate alerts for depleting resources across many regions.
 
-            alerts.append({
-                'region_id': region_id,
-                'region_name': region_name,
-                'alert_type': self.TYPE_RESOURCE_DEPLETION,
-                'severity': self.SEVERITY_HIGH,
-                'title': f"💨 Ventilator Shortage Predicted: {region_name}",
-                'description': f"Need {peak_ventilators} ventilators by {peak_date}, but only {current_ventilators} available. Gap: {ventilator_gap}",
-                'metrics': {
-                    'peak_ventilators_needed': peak_ventilators,
-                    'available': current_ventilators,
-                    'gap': ventilator_gap,
-                    'peak_date': peak_date
-                },
-                'triggered_at': datetime.now().isoformat(),
-                'recommendations': [
-                    f"Procure {ventilator_gap} additional ventilators immediately",
-                    "Coordinate ventilator sharing with nearby hospitals",
-                    "Train staff on ventilator operation and maintenance"
-                ]
-            })
+        Args:
+            resource_statuses: region_id -> current resource levels
+            region_names: Optional region_id -> display name
 
-        return alerts
+        Returns:
+            List of alert dicts, grouped by region
+        """
+        table = self.resource_metrics_table(resource_statuses, region_names)
+        return self.rules.evaluate(table, group='resources')
 
     def generate_resource_depletion_alerts(self, region_name: str, region_id: str,
                                           resource_status: Dict) -> List[Dict]:
@@ -252,50 +393,8 @@ class AlertEngine:
         Returns:
             List of alert dicts
         """
-        alerts = []
-
-        # Oxygen depletion alert
-        oxygen_days = resource_status.get('oxygen_supply_days')
-
-        if oxygen_days is not None:
-            if oxygen_days <= self.thresholds['oxygen_days_critical']:
-                alerts.append({
-                    'region_id': region_id,
-                    'region_name': region_name,
-                    'alert_type': self.TYPE_RESOURCE_DEPLETION,
-                    'severity': self.SEVERITY_CRITICAL,
-                    'title': f"🔴 Oxygen Crisis: {region_name}",
-                    'description': f"Oxygen supply will deplete in {oxygen_days} days at current consumption rate.",
-                    'metrics': {
-                        'oxygen_days_remaining': oxygen_days
-                    },
-                    'triggered_at': datetime.now().isoformat(),
-                    'recommendations': [
-                        "Emergency oxygen procurement required",
-                        "Activate oxygen rationing protocols",
-                        "Coordinate emergency oxygen transfers from other regions"
-                    ]
-                })
-
-            elif oxygen_days <= self.thresholds['oxygen_days_warning']:
-                alerts.append({
-                    'region_id': region_id,
-                    'region_name': region_name,
-                    'alert_type': self.TYPE_RESOURCE_DEPLETION,
-                    'severity': self.SEVERITY_MEDIUM,
-                    'title': f"⚠️ Oxygen Supply Warning: {region_name}",
-                    'description': f"Oxygen supply at {oxygen_days} days remaining. Replenishment needed.",
-                    'metrics': {
-                        'oxygen_days_remaining': oxygen_days
-                    },
-                    'triggered_at': datetime.now().isoformat(),
-                    'recommendations': [
-                        "Schedule oxygen delivery within 48 hours",
-                        "Monitor oxygen consumption closely"
-                    ]
-                })
-
-        return alerts
+        return self.generate_resource_depletion_alerts_many({region_id: resource_status},
+                                                            {region_id: region_name})
 
     def generate_all_alerts(self, region_name: str, region_id: str,
                            timeseries_data: List[Dict],
@@ -22,6 +22,8 @@ except ImportError:
 
 from sklearn.linear_model import LinearRegression
 
+from ..metrics import instrumented, span
+
 
 class CaseForecastModel:
     """Time-series forecasting for case predictions."""
@@ -81,7 +83,8 @@ class CaseForecastModel:
                     changepoint_prior_scale=0.05,  # Detect trend changes
                     interval_width=0.95  # 95% confidence intervals
                 )
-                self.model.fit(df)
+                with span('model', 'prophet_fit'):
+                    self.model.fit(df)
             else:
                 # Fallback: Linear regression
                 df['day_num'] = (df['ds'] - df['ds'].min()).dt.days
@@ -89,7 +92,8 @@ class CaseForecastModel:
                 y = df['y'].values
 
                 self.model = LinearRegression()
-                self.model.fit(X, y)
+                with span('model', 'linear_fit'):
+                    self.model.fit(X, y)
                 self.base_date = df['ds'].min()
 
             return True
@@ -97,6 +101,7 @@ class CaseForecastModel:
             print(f"Error training model: {e}")
             return False
 
+    @instrumented('model')
     def forecast(self, days: int = 7) -> Dict:
         """Generate forecast for next N days.
 
@@ -178,19 +183,244 @@ class ResourceDemandPredictor:
     ICU_BED_RATIO = 0.30  # 30% of pneumonia cases need ICU
     VENTILATOR_RATIO = 0.10  # 10% of pneumonia cases need ventilators
     OXYGEN_PER_CASE = 2  # Units of oxygen per pneumonia case per day
+    HOSPITALIZATION_RATIO = 0.50  # 50% of pneumonia cases are admitted
     AVG_STAY_DAYS = 7  # Average hospital stay for pneumonia patients
+    ICU_STAY_DAYS = 10  # Average ICU stay
+    VENTILATOR_DAYS = 8  # Average time on a ventilator
 
-    def __init__(self, custom_ratios: Optional[Dict] = None):
+    def __init__(self, custom_ratios: Optional[Dict] = None, use_length_of_stay: bool = True):
         """Initialize resource predictor.
 
         Args:
-            custom_ratios: Optional dict to override default ratios
+            custom_ratios: Optional dict to override default ratios and stay lengths
+            use_length_of_stay: Project bed/ICU/ventilator census by carrying
+                admitted patients over their length of stay. When False, each
+                day's needs are derived from that day's new cases only.
         """
+        self.use_length_of_stay = use_length_of_stay
+        self.stay_distributions = {}
+
         if custom_ratios:
             self.SEVERE_RATIO = custom_ratios.get('severe_ratio', self.SEVERE_RATIO)
             self.ICU_BED_RATIO = custom_ratios.get('icu_bed_ratio', self.ICU_BED_RATIO)
             self.VENTILATOR_RATIO = custom_ratios.get('ventilator_ratio', self.VENTILATOR_RATIO)
             self.OXYGEN_PER_CASE = custom_ratios.get('oxygen_per_case', self.OXYGEN_PER_CASE)
+            self.HOSPITALIZATION_RATIO = custom_ratios.get('hospitalization_ratio', self.HOSPITALIZATION_RATIO)
+            self.AVG_STAY_DAYS = custom_ratios.get('avg_stay_days', self.AVG_STAY_DAYS)
+            self.ICU_STAY_DAYS = custom_ratios.get('icu_stay_days', self.ICU_STAY_DAYS)
+            self.VENTILATOR_DAYS = custom_ratios.get('ventilator_days', self.VENTILATOR_DAYS)
+            # Optional empirical distributions: {'beds'|'icu'|'ventilators': pmf}
+            # where pmf[d] is the probability of a stay lasting d + 1 days
+            self.stay_distributions = custom_ratios.get('stay_distributions', {})
+
+    @staticmethod
+    def length_of_stay_survival(mean_days: float = None, pmf=None) -> np.ndarray:
+        """Probability that a patient is still admitted k days after admission.
+
+        Args:
+            mean_days: Mean stay; a geometric stay distribution is assumed
+            pmf: Empirical distribution, pmf[d] = P(stay == d + 1 days).
+                Takes precedence over mean_days.
+
+        Returns:
+            Array S with S[0] == 1 and S[k] = P(stay > k). Its sum is the mean stay.
+        """
+        if pmf is not None:
+            pmf = np.asarray(pmf, dtype=np.float64)
+            pmf = pmf / pmf.sum()
+            return np.concatenate(([1.0], 1.0 - np.cumsum(pmf)[:-1])).clip(min=0.0)
+
+        mean_days = max(float(mean_days or 1), 1.0)
+        stay_on = 1.0 - 1.0 / mean_days
+        max_days = int(np.ceil(mean_days * 10))
+        return stay_on ** np.arange(max_days)
+
+    @staticmethod
+    def project_census(admissions, survival: np.ndarray, initial_census=None) -> np.ndarray:
+        """Convolve daily admissions with a length-of-stay survival curve.
+
+        Args:
+            admissions: (regions x horizon) daily admissions
+            survival: Output of length_of_stay_survival
+            initial_census: Optional (regions,) patients already admitted today.
+                They are discharged following the residual stay of a steady-state
+                population.
+
+        Returns:
+            (regions x horizon) array of patients in care on each day
+        """
+        admissions = np.atleast_2d(np.asarray(admissions, dtype=np.float64))
+        horizon = admissions.shape[1]
+        census = np.zeros_like(admissions)
+
+        for k in range(min(len(survival), horizon)):
+            if survival[k] > 0:
+                census[:, k:] += admissions[:, :horizon - k] * survival[k]
+
+        if initial_census is not None:
+            # P(remaining stay > t) for a patient picked from a steady-state census
+            tail = np.cumsum(survival[::-1])[::-1]
+            residual = np.zeros(horizon)
+            remaining = tail[1:horizon + 1] / tail[0]
+            residual[:len(remaining)] = remaining
+            initial = np.asarray(initial_census, dtype=np.float64).reshape(-1, 1)
+            census += initial * residual
+
+        return census
+
+    def _survival(self, resource: str, mean_days: float) -> np.ndarray:
+        return self.length_of_stay_survival(mean_days, self.stay_distributions.get(resource))
+
+    @instrumented('model')
+    def predict_resource_matrix(self, predicted_cases, icu_capacity, bed_capacity=None,
+                                current_occupancy: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+        """Calculate resource requirements for many regions in one vectorized pass.
+
+        Args:
+            predicted_cases: (regions x horizon) array of daily predicted cases
+                (a 1-D array is treated as a single region)
+            icu_capacity: Per-region ICU bed capacity, shape (regions,) or scalar
+            bed_capacity: Per-region total beds (used with length of stay)
+            current_occupancy: Optional per-region arrays (or scalars) for
+                beds_occupied, icu_beds_occupied, ventilators_in_use
+
+        Returns:
+            Dict of arrays. Per-day arrays have shape (regions, horizon):
+            predicted_cases, severe_cases, icu_beds_needed, ventilators_needed,
+            oxygen_units_needed, icu_bed_gap, icu_capacity_utilization (plus
+            beds_needed, bed_gap, bed_capacity_utilization with length of stay).
+            Per-region arrays have shape (regions,): peak_index, peak_demand_index,
+            peak_cases, peak_icu_beds_needed, peak_ventilators_needed,
+            total_icu_gap_days, max_icu_utilization (plus peak_beds_needed,
+            max_bed_utilization with length of stay).
+        """
+        cases = np.atleast_2d(np.asarray(predicted_cases, dtype=np.float64))
+        n_regions = cases.shape[0]
+
+        def per_region(values):
+            return np.broadcast_to(np.asarray(values, dtype=np.float64).reshape(-1), (n_regions,))
+
+        capacity = per_region(icu_capacity)
+        occupancy = current_occupancy or {}
+
+        severe = np.trunc(cases * self.SEVERE_RATIO).astype(np.int64)
+        oxygen = np.trunc(cases * self.OXYGEN_PER_CASE).astype(np.int64)
+
+        if self.use_length_of_stay:
+            icu_census = self.project_census(
+                cases * self.ICU_BED_RATIO, self._survival('icu', self.ICU_STAY_DAYS),
+                per_region(occupancy.get('icu_beds_occupied', 0))
+            )
+            ventilator_census = self.project_census(
+                cases * self.VENTILATOR_RATIO, self._survival('ventilators', self.VENTILATOR_DAYS),
+                per_region(occupancy.get('ventilators_in_use', 0))
+            )
+            bed_census = self.project_census(
+                cases * self.HOSPITALIZATION_RATIO, self._survival('beds', self.AVG_STAY_DAYS),
+                per_region(occupancy.get('beds_occupied', 0))
+            )
+            # A partially occupied bed is still a bed
+            icu_needed = np.ceil(icu_census - 1e-9).astype(np.int64)
+            ventilators = np.ceil(ventilator_census - 1e-9).astype(np.int64)
+            beds_needed = np.ceil(bed_census - 1e-9).astype(np.int64)
+        else:
+            icu_needed = np.trunc(cases * self.ICU_BED_RATIO).astype(np.int64)
+            ventilators = np.trunc(cases * self.VENTILATOR_RATIO).astype(np.int64)
+
+        icu_gap = np.maximum(0, icu_needed - capacity[:, None]).astype(np.int64)
+        # Zero capacity is treated like a single bed so utilization stays finite
+        denominator = np.where(capacity > 0, capacity, 1.0)
+        utilization = (icu_needed / denominator[:, None]) * 100
+
+        rows = np.arange(n_regions)
+        peak_index = np.argmax(cases, axis=1)
+
+        matrix = {
+            'predicted_cases': cases.astype(np.int64),
+            'severe_cases': severe,
+            'icu_beds_needed': icu_needed,
+            'ventilators_needed': ventilators,
+            'oxygen_units_needed': oxygen,
+            'icu_bed_gap': icu_gap,
+            'icu_capacity_utilization': utilization,
+            'peak_index': peak_index,
+            'peak_demand_index': np.argmax(icu_needed, axis=1),
+            'peak_cases': cases[rows, peak_index].astype(np.int64),
+            'peak_icu_beds_needed': icu_needed.max(axis=1),
+            'peak_ventilators_needed': ventilators.max(axis=1),
+            'total_icu_gap_days': icu_gap.sum(axis=1),
+            'max_icu_utilization': utilization.max(axis=1),
+        }
+
+        if self.use_length_of_stay:
+            beds = per_region(bed_capacity if bed_capacity is not None else 0)
+            bed_denominator = np.where(beds > 0, beds, 1.0)
+            bed_utilization = (beds_needed / bed_denominator[:, None]) * 100
+            matrix.update({
+                'beds_needed': beds_needed,
+                'bed_gap': np.maximum(0, beds_needed - beds[:, None]).astype(np.int64),
+                'bed_capacity_utilization': bed_utilization,
+                'peak_beds_needed': beds_needed.max(axis=1),
+                'max_bed_utilization': bed_utilization.max(axis=1),
+            })
+
+        return matrix
+
+    @staticmethod
+    def resource_forecast_view(matrix: Dict[str, np.ndarray], dates: List[str],
+                               region_index: int = 0) -> Dict:
+        """Build the dict output of predict_resource_needs for one matrix row.
+
+        Args:
+            matrix: Output of predict_resource_matrix
+            dates: Date label for each forecast day
+            region_index: Row of the matrix to view
+
+        Returns:
+            Dict with 'success', 'timeline' and 'summary'
+        """
+        i = region_index
+        has_beds = 'beds_needed' in matrix
+        count_fields = ['predicted_cases', 'severe_cases', 'icu_beds_needed',
+                        'ventilators_needed', 'oxygen_units_needed', 'icu_bed_gap']
+        if has_beds:
+            count_fields += ['beds_needed', 'bed_gap']
+
+        columns = {name: matrix[name][i].tolist() for name in count_fields}
+        utilization = matrix['icu_capacity_utilization'][i].tolist()
+        bed_utilization = matrix['bed_capacity_utilization'][i].tolist() if has_beds else None
+
+        resource_timeline = []
+        for d in range(len(dates)):
+            day = {'date': dates[d]}
+            for name in count_fields:
+                day[name] = columns[name][d]
+            day['icu_capacity_utilization'] = round(utilization[d], 1)
+            if has_beds:
+                day['bed_capacity_utilization'] = round(bed_utilization[d], 1)
+            resource_timeline.append(day)
+
+        peak = int(matrix['peak_index'][i])
+        summary = {
+            'peak_date': dates[peak],
+            'peak_cases': columns['predicted_cases'][peak],
+            'peak_icu_beds_needed': int(matrix['peak_icu_beds_needed'][i]),
+            'peak_ventilators_needed': int(matrix['peak_ventilators_needed'][i]),
+            'total_icu_gap_days': int(matrix['total_icu_gap_days'][i]),
+            'max_icu_utilization': round(float(matrix['max_icu_utilization'][i]), 1)
+        }
+        if has_beds:
+            summary.update({
+                'peak_demand_date': dates[int(matrix['peak_demand_index'][i])],
+                'peak_beds_needed': int(matrix['peak_beds_needed'][i]),
+                'max_bed_utilization': round(float(matrix['max_bed_utilization'][i]), 1),
+            })
+
+        return {
+            'success': True,
+            'timeline': resource_timeline,
+            'summary': summary
+        }
 
     def predict_resource_needs(self, case_forecast: List[Dict],
                                current_capacity: Dict,
@@ -208,49 +438,49 @@ class ResourceDemandPredictor:
         if not case_forecast:
             return {'success': False, 'error': 'No forecast data provided'}
 
-        resource_timeline = []
+        matrix = self.predict_resource_matrix(
+            [[day['predicted_cases'] for day in case_forecast]],
+            current_capacity.get('icu_beds', 0),
+            current_capacity.get('total_beds', 0),
+            current_occupancy
+        )
+        return self.resource_forecast_view(matrix, [day['date'] for day in case_forecast])
 
-        for day_pred in case_forecast:
-            predicted_cases = day_pred['predicted_cases']
-
-            # Calculate resource needs
-            severe_cases = int(predicted_cases * self.SEVERE_RATIO)
-            icu_beds_needed = int(predicted_cases * self.ICU_BED_RATIO)
-            ventilators_needed = int(predicted_cases * self.VENTILATOR_RATIO)
-            oxygen_needed = int(predicted_cases * self.OXYGEN_PER_CASE)
-
-            # Calculate gaps
-            icu_gap = max(0, icu_beds_needed - current_capacity.get('icu_beds', 0))
-
-            resource_timeline.append({
-                'date': day_pred['date'],
-                'predicted_cases': predicted_cases,
-                'severe_cases': severe_cases,
-                'icu_beds_needed': icu_beds_needed,
-                'ventilators_needed': ventilators_needed,
-                'oxygen_units_needed': oxygen_needed,
-                'icu_bed_gap': icu_gap,
-                'icu_capacity_utilization': round(
-                    (icu_beds_needed / current_capacity.get('icu_beds', 1)) * 100, 1
-                )
-            })
+    def predict_resource_needs_many(self, forecasts: Dict[str, List[Dict]],
+                                    capacities: Dict[str, Dict],
+                                    occupancies: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+        """Run predict_resource_needs for many regions sharing one forecast horizon.
 
-        # Generate summary
-        peak_day = max(resource_timeline, key=lambda x: x['predicted_cases'])
-        total_icu_gap = sum(day['icu_bed_gap'] for day in resource_timeline)
+        Args:
+            forecasts: region_id -> list of daily predictions (same length for all)
+            capacities: region_id -> capacity dict with icu_beds, total_beds
+            occupancies: Optional region_id -> current occupancy dict
 
-        return {
-            'success': True,
-            'timeline': resource_timeline,
-            'summary': {
-                'peak_date': peak_day['date'],
-                'peak_cases': peak_day['predicted_cases'],
-                'peak_icu_beds_needed': peak_day['icu_beds_needed'],
-                'peak_ventilators_needed': peak_day['ventilators_needed'],
-                'total_icu_gap_days': total_icu_gap,
-                'max_icu_utilization': max(day['icu_capacity_utilization']
-                                          for day in resource_timeline)
+        Returns:
+            region_id -> predict_resource_needs-style dict
+        """
+        region_ids = [rid for rid, days in forecasts.items() if days]
+        if not region_ids:
+            return {}
+
+        horizons = {len(forecasts[rid]) for rid in region_ids}
+        if len(horizons) > 1:
+            raise ValueError("All forecasts must cover the same number of days")
+
+        occupancies = occupancies or {}
+        occupancy_fields = ('beds_occupied', 'icu_beds_occupied', 'ventilators_in_use')
+        matrix = self.predict_resource_matrix(
+            [[day['predicted_cases'] for day in forecasts[rid]] for rid in region_ids],
+            [capacities.get(rid, {}).get('icu_beds', 0) for rid in region_ids],
+            [capacities.get(rid, {}).get('total_beds', 0) for rid in region_ids],
+            {
+                field: [occupancies.get(rid, {}).get(field, 0) for rid in region_ids]
+                for field in occupancy_fields
             }
+        )
+        return {
+            rid: self.resource_forecast_view(matrix, [day['date'] for day in forecasts[rid]], i)
+            for i, rid in enumerate(region_ids)
         }
 
 
@@ -258,6 +488,7 @@ class GrowthAnalyzer:
     """Analyze epidemic growth patterns and detect rapid acceleration."""
 
     @staticmethod
+    @instrumented('model')
     def calculate_growth_metrics(timeseries_data: List[Dict]) -> Dict:
         """Calculate growth rate, doubling time, and velocity.
 
@@ -345,7 +576,7 @@ class GrowthAnalyzer:
         if not metrics['success']:
             return metrics
 
-        is_surge = metrics['growth_rate_3day'] > threshold
+        is_surge = bool(metrics['growth_rate_3day'] > threshold)
 
         # Determine severity
         if metrics['growth_rate_3day'] > 100:
@@ -366,8 +597,10 @@ class GrowthAnalyzer:
         }
 
 
+@instrumented('model')
 def generate_forecast_report(region_name: str, timeseries_data: List[Dict],
-                             current_capacity: Dict, forecast_days: int = 7) -> Dict:
+                             current_capacity: Dict, forecast_days: int = 7,
+                             current_occupancy: Optional[Dict] = None) -> Dict:
     """Generate complete forecast report for a region.
 
     Args:
@@ -375,6 +608,7 @@ def generate_forecast_report(region_name: str, timeseries_data: List[Dict],
         timeseries_data: Historical case data
         current_capacity: Hospital capacity info
         forecast_days: Days to forecast
+        current_occupancy: Optional beds/ICU/ventilators currently in use
 
     Returns:
         Complete forecast report with cases, resources, and alerts
@@ -396,7 +630,8 @@ def generate_forecast_report(region_name: str, timeseries_data: List[Dict],
     resource_predictor = ResourceDemandPredictor()
     resource_forecast = resource_predictor.predict_resource_needs(
         case_forecast['predictions'],
-        current_capacity
+        current_capacity,
+        current_occupancy
     )
 
     # Growth analysis
@@ -414,19 +649,22 @@ def generate_forecast_report(region_name: str, timeseries_data: List[Dict],
         'recommendations': generate_recommendations(
             surge_detection,
             resource_forecast,
-            growth_analysis
+            growth_analysis,
+            current_capacity
         )
     }
 
 
 def generate_recommendations(surge_info: Dict, resource_forecast: Dict,
-                            growth_metrics: Dict) -> List[str]:
+                            growth_metrics: Dict,
+                            current_capacity: Optional[Dict] = None) -> List[str]:
     """Generate actionable recommendations for policymakers.
 
     Args:
         surge_info: Surge detection results
         resource_forecast: Resource demand predictions
         growth_metrics: Growth analysis metrics
+        current_capacity: Hospital capacity info (for the ICU bed gap)
 
     Returns:
         List of recommendation strings
@@ -450,9 +688,10 @@ def generate_recommendations(surge_info: Dict, resource_forecast: Dict,
         max_util = summary.get('max_icu_utilization', 0)
 
         if max_util > 100:
-            gap = summary.get('peak_icu_beds_needed', 0) - current_capacity.get('icu_beds', 0)
+            gap = summary.get('peak_icu_beds_needed', 0) - (current_capacity or {}).get('icu_beds', 0)
+            peak_date = summary.get('peak_demand_date', summary.get('peak_date'))
             recommendations.append(
-                f"🏥 URGENT: Procure {gap} additional ICU beds before {summary.get('peak_date')}"
+                f"🏥 URGENT: Procure {gap} additional ICU beds before {peak_date}"
             )
         elif max_util > 80:
             recommendations.append(
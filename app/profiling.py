@@ -0,0 +1,307 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Opt-in profiling of individual requests.
+
+Two triggers, both off unless PROFILING_TOKEN is set:
+
+- On demand: a request carrying ``X-Profile: <PROFILING_TOKEN>`` (or
+  ``?_profile=<PROFILING_TOKEN>``) runs under cProfile.
+- Slow requests: when PROFILE_SLOW_MS > 0, a background sampler starts
+  taking stack samples of any request still running after that many
+  milliseconds, so the slow part of the request is captured without paying
+  for cProfile on every request.
+
+Either way the top PROFILE_TOP_N functions by self time are kept in a
+per-worker ring buffer (and in the shared cache, so any worker can serve
+them) and the response carries an ``X-Profile-Id`` header.
+"""
+
+import cProfile
+import hmac
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+from flask import g, request
+
+from .config import Config
+from .shared_cache import get_shared_cache
+
+
+PROFILE_FAMILY = 'profiles'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_ARG = '_profile'
+
+_PATH_PREFIXES = sorted({os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep,
+                         *(p + os.sep for p in sys.path if p and os.path.isabs(p))},
+                        key=len, reverse=True)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+def function_label(filename: str, line: int, name: str) -> str:
+    """pstats-style 'file:line(function)' label with the install prefix stripped."""
+    if filename == '~':
+        return name
+    return f'{_short_path(filename)}:{line}({name})'
+
+
+def top_functions_from_stats(profile: cProfile.Profile, limit: int) -> List[Dict]:
+    """Top functions of a cProfile run by self (internal) time."""
+    stats = pstats.Stats(profile).stats
+    rows = [{
+        'function': function_label(*func),
+        'calls': calls,
+        'self_ms': round(tottime * 1000, 3),
+        'cumulative_ms': round(cumtime * 1000, 3),
+    } for func, (_, calls, tottime, cumtime, _) in stats.items()]
+    rows.sort(key=lambda r: (r['self_ms'], r['cumulative_ms']), reverse=True)
+    return rows[:limit]
+
+
+# ===================== SAMPLING =====================
+
+class _SampledRequest:
+    """Stack samples collected for one in-flight request."""
+
+    __slots__ = ('thread_id', 'start', 'samples', 'self_counts', 'cumulative_counts')
+
+    def __init__(self, thread_id: int, start: float):
+        self.thread_id = thread_id
+        self.start = start
+        self.samples = 0
+        self.self_counts = Counter()
+        self.cumulative_counts = Counter()
+
+    def add_stack(self, frame):
+        seen = set()
+        top = True
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_filename, code.co_firstlineno, code.co_name)
+            if top:
+                self.self_counts[key] += 1
+                top = False
+            if key not in seen:
+                seen.add(key)
+                self.cumulative_counts[key] += 1
+            frame = frame.f_back
+        self.samples += 1
+
+    def top_functions(self, interval_ms: float, limit: int) -> List[Dict]:
+        rows = [{
+            'function': function_label(*key),
+            'samples': count,
+            'self_ms': round(count * interval_ms, 3),
+            'cumulative_ms': round(self.cumulative_counts[key] * interval_ms, 3),
+        } for key, count in self.self_counts.items()]
+        rows.sort(key=lambda r: (r['self_ms'], r['cumulative_ms']), reverse=True)
+        return rows[:limit]
+
+
+class SlowRequestSampler:
+    """Background thread sampling the stacks of requests that run too long."""
+
+    def __init__(self, threshold_ms: float, interval_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self._active: Dict[int, _SampledRequest] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='slow-request-sampler', daemon=True)
+        self._thread.start()
+
+    def begin(self) -> _SampledRequest:
+        sampled = _SampledRequest(threading.get_ident(), time.perf_counter())
+        with self._lock:
+            self._active[sampled.thread_id] = sampled
+        return sampled
+
+    def end(self, sampled: _SampledRequest):
+        with self._lock:
+            self._active.pop(sampled.thread_id, None)
+
+    def sample_once(self):
+        """Take one stack sample of every request past the threshold."""
+        now = time.perf_counter()
+        with self._lock:
+            due = [s for s in self._active.values() if now - s.start >= self.threshold]
+            if not due:
+                return
+            frames = sys._current_frames()
+            for sampled in due:
+                frame = frames.get(sampled.thread_id)
+                if frame is not None:
+                    sampled.add_stack(frame)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sample_once()
+            except Exception as e:
+                print(f"Warning: profile sampling failed: {e}")
+
+
+_sampler: Optional[SlowRequestSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_slow_request_sampler() -> Optional[SlowRequestSampler]:
+    """Get this worker's sampler, or None when slow-request profiling is off."""
+    global _sampler
+    if not Config.PROFILING_TOKEN or Config.PROFILE_SLOW_MS <= 0:
+        return None
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = SlowRequestSampler(Config.PROFILE_SLOW_MS, Config.PROFILE_SAMPLE_INTERVAL_MS)
+    return _sampler
+
+
+# ===================== STORAGE =====================
+
+_recent = deque(maxlen=Config.PROFILE_KEEP)
+_recent_lock = threading.Lock()
+
+
+def save_profile(profile: Dict):
+    """Keep a profile in this worker's ring buffer and the shared cache."""
+    with _recent_lock:
+        _recent.append(profile)
+    cache = get_shared_cache()
+    if cache is not None:
+        try:
+            cache.set(PROFILE_FAMILY, profile['id'], profile, ttl=Config.PROFILE_TTL_SECONDS)
+        except Exception as e:
+            print(f"Warning: could not store profile {profile['id']}: {e}")
+
+
+def get_profile(profile_id: str) -> Optional[Dict]:
+    with _recent_lock:
+        for profile in _recent:
+            if profile['id'] == profile_id:
+                return profile
+    cache = get_shared_cache()
+    return cache.get(PROFILE_FAMILY, profile_id) if cache is not None else None
+
+
+def recent_profiles() -> List[Dict]:
+    """Summaries of this worker's profiles, newest first."""
+    with _recent_lock:
+        profiles = list(_recent)
+    return [{k: v for k, v in p.items() if k != 'functions'} for p in reversed(profiles)]
+
+
+# ===================== FLASK HOOKS =====================
+
+def is_authorized(token: Optional[str]) -> bool:
+    return bool(Config.PROFILING_TOKEN) and token is not None and hmac.compare_digest(
+        token.encode(), Config.PROFILING_TOKEN.encode())
+
+
+def _start_profiling():
+    if not Config.PROFILING_TOKEN:
+        return
+    token = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_ARG)
+    if token is not None and is_authorized(token):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this process (Python 3.12+ allows only one)
+            g._profile_busy = True
+        else:
+            g._profiler = profiler
+    else:
+        sampler = get_slow_request_sampler()
+        if sampler is not None:
+            g._profile_sample = sampler.begin()
+    g._profile_start = time.perf_counter()
+
+
+def _recorded_path() -> str:
+    """The request path and query string, without the profiling token."""
+    args = [(key, value) for key, value in request.args.items(multi=True) if key != PROFILE_QUERY_ARG]
+    return f"{request.path}?{urlencode(args)}" if args else request.path
+
+
+def _profile_record(mode: str, duration_ms: float, status_code: int) -> Dict:
+    return {
+        'id': uuid.uuid4().hex[:16],
+        'mode': mode,
+        'method': request.method,
+        'path': _recorded_path(),
+        'endpoint': request.endpoint,
+        'status': status_code,
+        'duration_ms': round(duration_ms, 3),
+        'pid': os.getpid(),
+        'created_at': datetime.now().isoformat(),
+    }
+
+
+def _finish_profiling(response):
+    start = g.pop('_profile_start', None)
+    if start is None:
+        return response
+    duration_ms = (time.perf_counter() - start) * 1000
+    profiler = g.pop('_profiler', None)
+    sampled = g.pop('_profile_sample', None)
+
+    if g.pop('_profile_busy', False):
+        response.headers['X-Profile-Status'] = 'busy'
+    elif profiler is not None:
+        profiler.disable()
+        profile = _profile_record('cprofile', duration_ms, response.status_code)
+        profile['functions'] = top_functions_from_stats(profiler, Config.PROFILE_TOP_N)
+        save_profile(profile)
+        response.headers['X-Profile-Id'] = profile['id']
+    elif sampled is not None:
+        if _sampler is not None:
+            _sampler.end(sampled)
+        if sampled.samples:
+            profile = _profile_record('sampling', duration_ms, response.status_code)
+            profile.update({
+                'samples': sampled.samples,
+                'sampled_after_ms': Config.PROFILE_SLOW_MS,
+                'interval_ms': Config.PROFILE_SAMPLE_INTERVAL_MS,
+                'functions': sampled.top_functions(Config.PROFILE_SAMPLE_INTERVAL_MS, Config.PROFILE_TOP_N),
+            })
+            save_profile(profile)
+            response.headers['X-Profile-Id'] = profile['id']
+            print(f"Warning: slow request {profile['method']} {profile['path']} took "
+                  f"{profile['duration_ms']:.0f} ms; profile {profile['id']}")
+    return response
+
+
+def _cleanup_profiling(exc):
+    """Stop profiling a request that ended without reaching after_request."""
+    profiler = g.pop('_profiler', None)
+    if profiler is not None:
+        profiler.disable()
+    sampled = g.pop('_profile_sample', None)
+    if sampled is not None and _sampler is not None:
+        _sampler.end(sampled)
+
+
+def register_profiling(app):
+    """Install the profiling hooks on a Flask app.
+
+    Register before other hooks so that the profile covers them too.
+    """
+    app.before_request(_start_profiling)
+    app.after_request(_finish_profiling)
+    app.teardown_request(_cleanup_profiling)
@@ -0,0 +1,339 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+In-memory region hierarchy: block -> district -> city -> state -> country.
+
+regional_summary stores every level as independent rows. RegionIndex links
+the latest row of each region to its parent and keeps subtree roll-ups of the
+count columns, so drill-downs are O(children) lookups and totals for any
+subtree are read from the index instead of issued as new queries.
+
+A region's parent is its parent_region_id column when set; otherwise it is
+inferred from the id prefix ('IN-MH-MUM' -> 'IN-MH' -> 'IN'), matched
+against the nearest coarser level that has that id.
+
+Roll-ups are maintained incrementally: when a region's counts change, the
+difference is added to each ancestor (O(depth)) rather than recomputing the
+tree. A region with children rolls up to the sum of its children; a leaf
+rolls up to its own reported counts.
+"""
+
+import heapq
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import Config
+from .database import get_regional_summary_latest
+from .live_feed import row_fingerprint
+from .shared_cache import get_shared_cache
+
+
+LEVELS = ('country', 'state', 'city', 'district', 'block')
+COUNTERS = ('case_count', 'normal_count', 'pneumonia_count', 'severe_count',
+            'deaths', 'hospitals_reporting', 'population')
+
+Key = Tuple[str, str]
+
+
+def infer_parent_id(region_id: str) -> Optional[str]:
+    """Parent id from the hierarchical id convention, e.g. 'IN-MH' -> 'IN'."""
+    if not region_id or '-' not in region_id:
+        return None
+    return region_id.rsplit('-', 1)[0]
+
+
+def _counts(row: Dict) -> np.ndarray:
+    return np.array([row.get(name) or 0 for name in COUNTERS], dtype=np.int64)
+
+
+class RegionNode:
+    """One region with its links and aggregates."""
+
+    __slots__ = ('key', 'row', 'fingerprint', 'parent', 'children', 'values', 'child_sum')
+
+    def __init__(self, key: Key, row: Dict):
+        self.key = key
+        self.row = row
+        self.fingerprint = row_fingerprint(row)
+        self.parent: Optional['RegionNode'] = None
+        self.children: Dict[Key, 'RegionNode'] = {}
+        self.values = _counts(row)
+        self.child_sum = np.zeros(len(COUNTERS), dtype=np.int64)
+
+    @property
+    def level(self) -> str:
+        return self.key[0]
+
+    @property
+    def region_id(self) -> str:
+        return self.key[1]
+
+    def rollup_values(self) -> np.ndarray:
+        return self.child_sum if self.children else self.values
+
+
+def rollup_dict(values: np.ndarray) -> Dict:
+    """Counter array as a JSON-ready dict, with case_density recomputed."""
+    totals = {name: int(v) for name, v in zip(COUNTERS, values)}
+    population = totals['population']
+    totals['case_density'] = (totals['case_count'] * 100.0 / population) if population else None
+    return totals
+
+
+class RegionIndex:
+    """Parent/child index over the latest regional_summary rows."""
+
+    def __init__(self, rows: Optional[Iterable[Dict]] = None):
+        self._nodes: Dict[Key, RegionNode] = {}
+        self._by_id: Dict[str, Dict[str, RegionNode]] = {}
+        # Regions whose parent id is not indexed yet, keyed by that parent id
+        self._orphans: Dict[str, Dict[Key, RegionNode]] = {}
+        self._lock = threading.RLock()
+        if rows:
+            self.update_many(rows)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, key: Key):
+        return key in self._nodes
+
+    # --- linking ---
+    def _find_parent(self, node: RegionNode) -> Optional[RegionNode]:
+        parent_id = node.row.get('parent_region_id') or infer_parent_id(node.region_id)
+        if not parent_id:
+            return None
+        level = LEVELS.index(node.level) if node.level in LEVELS else len(LEVELS)
+        candidates = self._by_id.get(parent_id, {})
+        for parent_level in reversed(LEVELS[:level]):
+            if parent_level in candidates:
+                return candidates[parent_level]
+        self._orphans.setdefault(parent_id, {})[node.key] = node
+        return None
+
+    def _propagate(self, node: Optional[RegionNode], delta: np.ndarray):
+        """Add delta to the child sums of node and its ancestors."""
+        while node is not None and delta.any():
+            before = node.rollup_values().copy()
+            node.child_sum += delta
+            delta = node.rollup_values() - before
+            node = node.parent
+
+    def _attach(self, node: RegionNode, parent: RegionNode):
+        before = parent.rollup_values().copy()
+        node.parent = parent
+        parent.children[node.key] = node
+        parent.child_sum += node.rollup_values()
+        self._propagate(parent.parent, parent.rollup_values() - before)
+
+    def _detach(self, node: RegionNode):
+        parent = node.parent
+        if parent is None:
+            return
+        before = parent.rollup_values().copy()
+        parent.child_sum -= node.rollup_values()
+        del parent.children[node.key]
+        node.parent = None
+        self._propagate(parent.parent, parent.rollup_values() - before)
+
+    # --- updates ---
+    def update(self, row: Dict, region_type: Optional[str] = None) -> bool:
+        """Insert or update one region from its latest row.
+
+        Returns:
+            True if the index changed
+        """
+        key = (region_type or row.get('region_type'), row.get('region_id'))
+        with self._lock:
+            node = self._nodes.get(key)
+            if node is not None and node.fingerprint == row_fingerprint(row):
+                return False
+
+            if node is None:
+                node = RegionNode(key, row)
+                self._nodes[key] = node
+                self._by_id.setdefault(key[1], {})[key[0]] = node
+                parent = self._find_parent(node)
+                if parent is not None:
+                    self._attach(node, parent)
+                for orphan in self._orphans.pop(key[1], {}).values():
+                    if orphan.key in self._nodes:
+                        parent = self._find_parent(orphan)
+                        if parent is not None:
+                            self._attach(orphan, parent)
+                return True
+
+            parent_id = row.get('parent_region_id')
+            if parent_id != node.row.get('parent_region_id'):
+                # Moved to another parent: re-link rather than adjust in place
+                self.remove(*key)
+                return self.update(row, key[0])
+
+            before = node.rollup_values().copy()
+            node.row = row
+            node.fingerprint = row_fingerprint(row)
+            node.values = _counts(row)
+            self._propagate(node.parent, node.rollup_values() - before)
+            return True
+
+    def update_many(self, rows: Iterable[Dict]) -> int:
+        """Update several rows, coarsest level first. Returns rows changed."""
+        rank = {level: i for i, level in enumerate(LEVELS)}
+        ordered = sorted(rows, key=lambda r: rank.get(r.get('region_type'), len(LEVELS)))
+        with self._lock:
+            return sum(self.update(row) for row in ordered)
+
+    def remove(self, region_type: str, region_id: str) -> bool:
+        """Drop a region; its children stay indexed and wait for a new parent."""
+        key = (region_type, region_id)
+        with self._lock:
+            node = self._nodes.pop(key, None)
+            if node is None:
+                return False
+            self._detach(node)
+            self._by_id[region_id].pop(region_type, None)
+            if not self._by_id[region_id]:
+                del self._by_id[region_id]
+            for orphans in self._orphans.values():
+                orphans.pop(key, None)
+            for child in list(node.children.values()):
+                child.parent = None
+                self._orphans.setdefault(region_id, {})[child.key] = child
+            node.children.clear()
+            return True
+
+    def sync_level(self, region_type: str, rows: List[Dict]) -> int:
+        """Make one level match rows: update changed regions, remove missing ones."""
+        with self._lock:
+            current = {row.get('region_id') for row in rows}
+            stale = [key for key in self._nodes if key[0] == region_type and key[1] not in current]
+            changed = sum(self.remove(*key) for key in stale)
+            return changed + sum(self.update(row, region_type) for row in rows)
+
+    # --- lookups ---
+    def get(self, region_type: str, region_id: str) -> Optional[Dict]:
+        """The latest row for a region."""
+        node = self._nodes.get((region_type, region_id))
+        return node.row if node else None
+
+    def parent(self, region_type: str, region_id: str) -> Optional[Dict]:
+        node = self._nodes.get((region_type, region_id))
+        return node.parent.row if node and node.parent else None
+
+    def ancestors(self, region_type: str, region_id: str) -> List[Dict]:
+        """Rows from the immediate parent up to the root."""
+        with self._lock:
+            node = self._nodes.get((region_type, region_id))
+            path = []
+            while node is not None and node.parent is not None:
+                node = node.parent
+                path.append(node.row)
+            return path
+
+    def children(self, region_type: str, region_id: str,
+                 sort_by: Optional[str] = 'case_count', limit: Optional[int] = None) -> List[Dict]:
+        """Direct sub-regions of a region, largest first.
+
+        Rows are shared with the index; treat them as read-only.
+        """
+        with self._lock:
+            node = self._nodes.get((region_type, region_id))
+            if node is None:
+                return []
+            rows = [child.row for child in node.children.values()]
+        if sort_by is None:
+            return rows[:limit] if limit is not None else rows
+        sort_key = lambda row: row.get(sort_by) or 0
+        if limit is not None:
+            return heapq.nlargest(limit, rows, key=sort_key)
+        return sorted(rows, key=sort_key, reverse=True)
+
+    def roots(self, region_type: Optional[str] = None) -> List[Dict]:
+        """Regions without a parent (optionally of one level)."""
+        with self._lock:
+            return [node.row for node in self._nodes.values()
+                    if node.parent is None and (region_type is None or node.level == region_type)]
+
+    def rollup(self, region_type: str, region_id: str) -> Optional[Dict]:
+        """Totals for a region's subtree."""
+        node = self._nodes.get((region_type, region_id))
+        if node is None:
+            return None
+        with self._lock:
+            return rollup_dict(node.rollup_values())
+
+    def rollup_many(self, keys: Iterable[Key]) -> Dict:
+        """Combined totals for several subtrees.
+
+        Regions nested inside another listed region are only counted once.
+        """
+        with self._lock:
+            nodes = [self._nodes[key] for key in set(keys) if key in self._nodes]
+            selected = {node.key for node in nodes}
+            total = np.zeros(len(COUNTERS), dtype=np.int64)
+            for node in nodes:
+                ancestor = node.parent
+                while ancestor is not None and ancestor.key not in selected:
+                    ancestor = ancestor.parent
+                if ancestor is None:
+                    total += node.rollup_values()
+            return rollup_dict(total)
+
+    def describe(self, region_type: str, region_id: str, limit: Optional[int] = None) -> Optional[Dict]:
+        """A region with its ancestors, children and subtree roll-up."""
+        with self._lock:
+            node = self._nodes.get((region_type, region_id))
+            if node is None:
+                return None
+            return {
+                'region': node.row,
+                'ancestors': [{'region_type': r.get('region_type'), 'region_id': r.get('region_id'),
+                               'region_name': r.get('region_name')}
+                              for r in self.ancestors(region_type, region_id)],
+                'children': [
+                    {**row, 'rollup': self.rollup(row.get('region_type'), row.get('region_id'))}
+                    for row in self.children(region_type, region_id, limit=limit)
+                ],
+                'child_count': len(node.children),
+                'rollup': rollup_dict(node.rollup_values()),
+            }
+
+
+_index: Optional[RegionIndex] = None
+_index_version = None
+_index_loaded_at = 0.0
+_index_lock = threading.Lock()
+
+
+def _data_version():
+    cache = get_shared_cache()
+    return cache.version('regional_summary')[0] if cache is not None else None
+
+
+def get_region_index() -> RegionIndex:
+    """Get the process-wide RegionIndex, synced with the latest regional data.
+
+    The index is re-synced when the 'regional_summary' cache family version
+    changes, or every REGION_INDEX_REFRESH_SECONDS; a sync only touches the
+    regions whose rows changed.
+    """
+    global _index, _index_version, _index_loaded_at
+    version = _data_version()
+    fresh = time.time() - _index_loaded_at < Config.REGION_INDEX_REFRESH_SECONDS
+    if _index is not None and version == _index_version and fresh:
+        return _index
+
+    with _index_lock:
+        if _index is None:
+            _index = RegionIndex()
+        elif version == _index_version and time.time() - _index_loaded_at < Config.REGION_INDEX_REFRESH_SECONDS:
+            return _index
+        for level in LEVELS:
+            _index.sync_level(level, get_regional_summary_latest(region_type=level))
+        _index_version = version
+        _index_loaded_at = time.time()
+    return _index
@@ -0,0 +1,359 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Cache tier shared by every Gunicorn worker on a host.
+
+Entries live in a single SQLite file (WAL mode), so all workers see the same
+regional summaries, time-series and forecast reports instead of each keeping
+a private copy. Keys are namespaced by family and a per-family version;
+bumping the version invalidates the whole family at once. A lease row per key
+stops concurrent workers from recomputing the same expired entry (stampede
+protection): one worker recomputes while the others serve the stale value or
+wait briefly for the fresh one.
+"""
+
+import functools
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import Config
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    cache_key TEXT PRIMARY KEY,
+    family TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache_versions (
+    family TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache_leases (
+    cache_key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+_MISSING = object()
+
+# Cache families derived from each data table. Whatever writes a table bumps
+# these (invalidate_tables), so cached reads and the ETags built from family
+# versions change with the data.
+TABLE_FAMILIES = {
+    'regional_summary': ('regional_summary', 'timeseries', 'forecast_report'),
+    'case_summary': ('timeseries', 'forecast_report'),
+    'resources': ('forecast_report',),
+}
+
+
+def _json_default(value):
+    """Serialize numpy scalars and dates that show up in analytics payloads."""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class CacheStats:
+    """Hit/miss/latency counters for one key family (per worker process)."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.computes = 0
+        self.lookup_seconds = 0.0
+        self.compute_seconds = 0.0
+        self.lookups = 0
+
+    def to_dict(self) -> Dict:
+        lookups = self.lookups or 1
+        computes = self.computes or 1
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'computes': self.computes,
+            'hit_ratio': round(self.hits / lookups, 4) if self.lookups else 0.0,
+            'avg_lookup_ms': round(self.lookup_seconds / lookups * 1000, 3),
+            'avg_compute_ms': round(self.compute_seconds / computes * 1000, 3),
+        }
+
+
+class SharedCache:
+    """SQLite-backed key/value cache with TTLs, versions and leases."""
+
+    def __init__(self, path: str, default_ttl: int = 300, stale_ttl: int = 60,
+                 lease_seconds: int = 30, wait_seconds: float = 5.0):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite file shared by all workers
+            default_ttl: Seconds an entry stays fresh
+            stale_ttl: Extra seconds an expired entry may be served while
+                another worker recomputes it
+            lease_seconds: How long a recompute lease is held before it is
+                considered abandoned
+            wait_seconds: How long a worker without the lease waits for the
+                fresh value before computing it itself
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+        self._instance = uuid.uuid4().hex
+        self._local = threading.local()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    # --- connection handling ---
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (reopened after a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @property
+    def owner(self) -> str:
+        """Lease owner id, unique per worker process and thread."""
+        return f"{self._instance}:{os.getpid()}:{threading.get_ident()}"
+
+    def _family_stats(self, family: str) -> CacheStats:
+        stats = self._stats.get(family)
+        if stats is None:
+            with self._stats_lock:
+                stats = self._stats.setdefault(family, CacheStats())
+        return stats
+
+    # --- versions ---
+    def version(self, family: str) -> Tuple[int, float]:
+        """Get (version, updated_at) for a family. Unknown families are version 0."""
+        row = self._connect().execute(
+            'SELECT version, updated_at FROM cache_versions WHERE family = ?', (family,)
+        ).fetchone()
+        return (row[0], row[1]) if row else (0, 0.0)
+
+    def bump_version(self, family: str) -> int:
+        """Invalidate every entry in a family by moving it to a new version."""
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            'INSERT INTO cache_versions (family, version, updated_at) VALUES (?, 1, ?) '
+            'ON CONFLICT(family) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at',
+            (family, now)
+        )
+        conn.execute('DELETE FROM cache_entries WHERE family = ?', (family,))
+        return self.version(family)[0]
+
+    def make_key(self, family: str, key: str) -> str:
+        """Build the versioned storage key."""
+        version, _ = self.version(family)
+        return f"{family}:v{version}:{key}"
+
+    # --- basic operations ---
+    def _read(self, cache_key: str) -> Tuple[Any, float, float]:
+        row = self._connect().execute(
+            'SELECT value, expires_at, stale_until FROM cache_entries WHERE cache_key = ?',
+            (cache_key,)
+        ).fetchone()
+        if row is None:
+            return _MISSING, 0.0, 0.0
+        return json.loads(row[0]), row[1], row[2]
+
+    def get(self, family: str, key: str, default: Any = None) -> Any:
+        """Get a fresh value, or default on miss/expiry."""
+        start = time.perf_counter()
+        value, expires_at, _ = self._read(self.make_key(family, key))
+        stats = self._family_stats(family)
+        stats.lookups += 1
+        stats.lookup_seconds += time.perf_counter() - start
+
+        if value is _MISSING or expires_at < time.time():
+            stats.misses += 1
+            return default
+        stats.hits += 1
+        return value
+
+    def set(self, family: str, key: str, value: Any, ttl: Optional[int] = None):
+        """Store a value under the family's current version."""
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        self._connect().execute(
+            'INSERT OR REPLACE INTO cache_entries (cache_key, family, value, expires_at, stale_until) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (self.make_key(family, key), family,
+             json.dumps(value, default=_json_default),
+             now + ttl, now + ttl + self.stale_ttl)
+        )
+
+    def delete(self, family: str, key: str):
+        self._connect().execute(
+            'DELETE FROM cache_entries WHERE cache_key = ?', (self.make_key(family, key),)
+        )
+
+    def purge_expired(self) -> int:
+        """Remove entries past their stale window. Returns number removed."""
+        now = time.time()
+        conn = self._connect()
+        removed = conn.execute('DELETE FROM cache_entries WHERE stale_until < ?', (now,)).rowcount
+        conn.execute('DELETE FROM cache_leases WHERE expires_at < ?', (now,))
+        return removed
+
+    # --- stampede protection ---
+    def _acquire_lease(self, cache_key: str, seconds: Optional[float] = None) -> bool:
+        now = time.time()
+        cursor = self._connect().execute(
+            'INSERT INTO cache_leases (cache_key, owner, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(cache_key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+            'WHERE cache_leases.expires_at < ? OR cache_leases.owner = excluded.owner',
+            (cache_key, self.owner, now + (seconds or self.lease_seconds), now)
+        )
+        return cursor.rowcount == 1
+
+    def _release_lease(self, cache_key: str):
+        self._connect().execute(
+            'DELETE FROM cache_leases WHERE cache_key = ? AND owner = ?', (cache_key, self.owner)
+        )
+
+    def acquire_lease(self, name: str, seconds: Optional[float] = None) -> bool:
+        """Take (or renew) a named lease, e.g. to elect one worker for a background job.
+
+        Leases are owned per process and thread, so the same thread must renew
+        and release it.
+        """
+        return self._acquire_lease(f"lease:{name}", seconds)
+
+    def release_lease(self, name: str):
+        self._release_lease(f"lease:{name}")
+
+    def get_or_compute(self, family: str, key: str, compute: Callable[[], Any],
+                       ttl: Optional[int] = None) -> Any:
+        """Return the cached value, computing and storing it on a miss.
+
+        Only the worker holding the lease recomputes an expired entry; others
+        serve the stale value if one is available, or poll for the fresh value
+        for up to wait_seconds before computing it themselves.
+        """
+        stats = self._family_stats(family)
+        cache_key = self.make_key(family, key)
+
+        start = time.perf_counter()
+        value, expires_at, stale_until = self._read(cache_key)
+        stats.lookups += 1
+        stats.lookup_seconds += time.perf_counter() - start
+
+        now = time.time()
+        if value is not _MISSING and expires_at >= now:
+            stats.hits += 1
+            return value
+        stats.misses += 1
+
+        if not self._acquire_lease(cache_key):
+            if value is not _MISSING and stale_until >= now:
+                stats.stale_hits += 1
+                return value
+
+            deadline = time.monotonic() + self.wait_seconds
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                fresh, fresh_expires, _ = self._read(cache_key)
+                if fresh is not _MISSING and fresh_expires >= time.time():
+                    stats.hits += 1
+                    return fresh
+
+        try:
+            start = time.perf_counter()
+            value = compute()
+            stats.computes += 1
+            stats.compute_seconds += time.perf_counter() - start
+            self.set(family, key, value, ttl)
+            return value
+        finally:
+            self._release_lease(cache_key)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-family hit/miss/latency metrics for this worker."""
+        return {family: s.to_dict() for family, s in sorted(self._stats.items())}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """Get the process-wide SharedCache, or None when caching is disabled."""
+    global _cache
+    if not Config.SHARED_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = Config.SHARED_CACHE_PATH or os.path.join(
+                    tempfile.gettempdir(), 'medialert-cache.sqlite3'
+                )
+                _cache = SharedCache(path, default_ttl=Config.SHARED_CACHE_TTL_SECONDS)
+    return _cache
+
+
+def invalidate_tables(tables: Iterable[str], cache: Optional[SharedCache] = None) -> List[str]:
+    """Bump the cache families derived from tables that were just written.
+
+    Args:
+        tables: Names of the written tables
+        cache: Cache to invalidate (default: this process's shared cache)
+
+    Returns:
+        The families that were bumped (empty when caching is disabled)
+    """
+    cache = cache or get_shared_cache()
+    if cache is None:
+        return []
+    families = sorted({family for table in tables for family in TABLE_FAMILIES.get(table, ())})
+    for family in families:
+        cache.bump_version(family)
+    return families
+
+
+def _key_from_call(args, kwargs) -> str:
+    return json.dumps([args, sorted(kwargs.items())], default=_json_default, separators=(',', ':'))
+
+
+def shared_cached(family: str, ttl: Optional[int] = None):
+    """Decorator that caches a function's JSON-serializable result across workers."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_shared_cache()
+            if cache is None:
+                return func(*args, **kwargs)
+            key = f"{func.__name__}:{_key_from_call(args, kwargs)}"
+            return cache.get_or_compute(family, key, lambda: func(*args, **kwargs), ttl)
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -0,0 +1,252 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Streaming parser for multipart image uploads.
+
+request.files reads the whole request body before the view runs, and it only
+checks sizes and types once every file has been received. This parser reads
+request.stream in CHUNK_BYTES pieces and checks each image part as it
+arrives:
+
+- the extension is checked from the part headers, before any data is read
+- the magic bytes are checked from the first bytes of the part, and the
+  dimensions from the image header once the part is complete
+- the size limit is enforced on every chunk, so an oversize file is rejected
+  as soon as it crosses MAX_FILE_SIZE_MB
+- parts beyond MAX_FILES_PER_UPLOAD are rejected without being stored
+
+The body is read in full CHUNK_BYTES pieces (a read from the socket may
+return less), and the decoder is only given complete lines, up to the last
+line break of what has been read: MultipartDecoder passes the line break in
+front of a boundary on as part data when its buffer ends between the
+boundary and the line break after it.
+
+Rejected parts are read off the socket and dropped. Accepted images are
+spooled in memory up to UPLOAD_SPOOL_KB each and on disk beyond that, so
+peak memory for an upload is bounded by the number of images times the
+spool size rather than by the upload size.
+"""
+
+import tempfile
+from typing import BinaryIO, List, Optional
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, File, MultipartDecoder, NeedData
+
+from .config import Config
+from .utils import SIGNATURE_BYTES, ImageHeader, allowed_file, sniff_image_type, validate_image
+
+
+CHUNK_BYTES = 64 * 1024
+# Most bytes the decoder may hold for part headers and boundary lookahead
+DECODER_BUFFER_BYTES = 4 * CHUNK_BYTES
+# Allowance on top of the boundary for the rest of a boundary line ("--",
+# optional whitespace and the line breaks)
+BOUNDARY_LINE_EXTRA = 64
+UPLOAD_FIELD = 'images'
+
+
+class UploadError(Exception):
+    """The request body is not a usable multipart upload."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UploadedImage:
+    """One file part of an upload.
+
+    Accepted images are readable like the file objects the model API client
+    expects (filename, content_type, read/seek/tell). Rejected parts carry
+    only the filename and the reason in ``error``.
+    """
+
+    def __init__(self, filename: str, error: Optional[str] = None):
+        self.filename = filename
+        self.error = error
+        self.content_type = None
+        self.size = 0
+        self.header: Optional[ImageHeader] = None
+        self._file: Optional[BinaryIO] = None
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _PartReader:
+    """Validates and spools the data of one file part as it arrives."""
+
+    def __init__(self, image: UploadedImage):
+        self.image = image
+        self.accept = image.error is None
+        self.head = b''
+
+    def write(self, data: bytes):
+        if not self.accept:
+            return
+        image = self.image
+        image.size += len(data)
+        if image.size > Config.MAX_FILE_SIZE_BYTES:
+            self.reject(f'File too large. Maximum size is {Config.MAX_FILE_SIZE_MB} MB.')
+            return
+
+        if image._file is None:
+            self.head += data
+            if len(self.head) < SIGNATURE_BYTES:
+                return
+            self._start(self.head)
+            self.head = b''
+        else:
+            image._file.write(data)
+
+    def finish(self):
+        if self.accept and self.image._file is None:
+            # Shorter than any signature
+            self._start(self.head)
+        if self.accept:
+            header, error = validate_image(self.image._file)
+            if error:
+                self.reject(error)
+            else:
+                self.image.header = header
+
+    def _start(self, head: bytes):
+        image_type = sniff_image_type(head)
+        if image_type is None:
+            self.reject('File content is not a JPG or PNG image.')
+            return
+        self.image.content_type = f'image/{image_type}'
+        self.image._file = tempfile.SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_KB * 1024)
+        self.image._file.write(head)
+
+    def reject(self, error: str):
+        self.accept = False
+        self.image.error = error
+        self.image.close()
+
+
+def parse_image_upload(stream: BinaryIO, content_type: str) -> List[UploadedImage]:
+    """Read an upload's image parts from a request body stream.
+
+    Args:
+        stream: The request body (request.stream)
+        content_type: The request Content-Type header
+
+    Returns:
+        One UploadedImage per non-empty file part of the images field, in
+        upload order (empty if no file was selected). Parts with ``error``
+        set were rejected; close the rest when done.
+
+    Raises:
+        UploadError: The body is not a multipart upload with an images field,
+            or is malformed
+    """
+    mimetype, options = parse_options_header(content_type or '')
+    boundary = options.get('boundary', '')
+    if mimetype != 'multipart/form-data' or not boundary:
+        raise UploadError('No files uploaded')
+
+    decoder = MultipartDecoder(boundary.encode('latin-1'), max_form_memory_size=DECODER_BUFFER_BYTES)
+    max_boundary_line = len(boundary) + BOUNDARY_LINE_EXTRA
+    held = b''
+    images: List[UploadedImage] = []
+    accepted = 0
+    part: Optional[_PartReader] = None
+    finished = False
+    seen_field = False
+
+    try:
+        while not finished:
+            chunk = _read_chunk(stream)
+            if chunk:
+                data = held + chunk
+                split = _feed_limit(data, max_boundary_line)
+                decoder.receive_data(data[:split])
+                held = data[split:]
+            else:
+                decoder.receive_data(held)
+                decoder.receive_data(None)
+            event = decoder.next_event()
+            while not isinstance(event, NeedData):
+                if isinstance(event, Epilogue):
+                    finished = True
+                    break
+                if isinstance(event, Data):
+                    if part is not None:
+                        part.write(event.data)
+                        if not event.more_data:
+                            part.finish()
+                            part = None
+                elif isinstance(event, File) and event.name == UPLOAD_FIELD and event.filename:
+                    seen_field = True
+                    image = UploadedImage(event.filename)
+                    if not allowed_file(event.filename):
+                        image.error = 'File type not allowed. Use JPG or PNG.'
+                    elif accepted >= Config.MAX_FILES_PER_UPLOAD:
+                        image.error = f'Too many files. Upload at most {Config.MAX_FILES_PER_UPLOAD} at a time.'
+                    else:
+                        accepted += 1
+                    images.append(image)
+                    part = _PartReader(image)
+                else:
+                    # Form fields, other file fields and empty file inputs are skipped
+                    seen_field = seen_field or (isinstance(event, File) and event.name == UPLOAD_FIELD)
+                    part = None
+                event = decoder.next_event()
+            if not chunk and not finished:
+                raise UploadError('Upload was interrupted before it completed')
+        if not seen_field:
+            raise UploadError('No files uploaded')
+    except RequestEntityTooLarge:
+        _close_all(images)
+        raise UploadError('Upload part headers are too large', 413)
+    except UploadError:
+        _close_all(images)
+        raise
+    except ValueError:
+        _close_all(images)
+        raise UploadError('Malformed multipart upload')
+
+    return images
+
+
+def _read_chunk(stream: BinaryIO) -> bytes:
+    """Read CHUNK_BYTES from the body; less only at its end."""
+    parts = []
+    size = 0
+    while size < CHUNK_BYTES:
+        data = stream.read(CHUNK_BYTES - size)
+        if not data:
+            break
+        parts.append(data)
+        size += len(data)
+    return b''.join(parts)
+
+
+def _feed_limit(data: bytes, max_boundary_line: int) -> int:
+    """How much of data can be given to the decoder now.
+
+    Up to the last line break, so a boundary line is never split. An
+    unfinished line longer than any boundary line cannot end in one, so all
+    but its last max_boundary_line bytes can go as well.
+    """
+    return max(data.rfind(b'\n') + 1, len(data) - max_boundary_line)
+
+
+def _close_all(images: List[UploadedImage]):
+    for image in images:
+        image.close()
@@ -0,0 +1,417 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""
+Synthetic outbreak data for load tests, benchmarks and local backends.
+
+SyntheticOutbreak builds a region hierarchy (country -> state -> city ->
+district -> block, as deep as requested) and simulates daily cases with
+several outbreak waves, weekly reporting seasonality and over-dispersed
+noise. Waves are drawn per country and inherited down the tree with jittered
+timing and size, so neighbouring regions rise and fall together.
+
+Counts are generated at the finest level and summed upwards, so every
+table is consistent: a city's regional_summary row equals the sum of its
+districts and of its hospitals' case_summary rows.
+
+Rows are streamed as (table, chunk) pairs. Only the daily series along the
+current path of the tree are held in memory, so millions of rows can be
+generated with bounded memory:
+
+    outbreak = SyntheticOutbreak(countries=5, states=20, cities=10, days=365)
+    for table, rows in outbreak.stream(chunk_size=5000):
+        supabase.table(table).insert(rows).execute()
+
+Command line (writes one JSON Lines file per table):
+
+    python -m app.synthetic_data --countries 5 --states 20 --cities 10 --days 365 --out data/raw/synthetic
+    python -m app.synthetic_data --countries 1 --days 30 --supabase
+"""
+
+import argparse
+import json
+import os
+import uuid
+import zlib
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+LEVELS = ('country', 'state', 'city', 'district', 'block')
+# Insert order that satisfies the schema's foreign keys
+TABLES = ('hospitals', 'users', 'regional_summary', 'case_summary', 'resources', 'uploads', 'analyses')
+# Relative reporting volume Monday..Sunday
+WEEKDAY_FACTORS = np.array([1.10, 1.12, 1.08, 1.04, 1.00, 0.88, 0.78])
+NAMESPACE = uuid.UUID('6f0d9a4e-3c1b-4d5e-9f7a-2b8c1d0e4a53')
+
+
+def stable_uuid(*parts) -> str:
+    """Deterministic UUID, so re-running with the same seed upserts the same rows."""
+    return str(uuid.uuid5(NAMESPACE, ':'.join(str(p) for p in parts)))
+
+
+class SyntheticOutbreak:
+    """Configurable synthetic data set."""
+
+    def __init__(self, countries: int = 3, states: int = 5, cities: int = 4,
+                 districts: int = 0, blocks: int = 0, days: int = 90,
+                 end_date: Optional[date] = None, waves: int = 3,
+                 hospitals_per_city: int = 2, analyses: bool = False, seed: int = 0):
+        """Configure the data set.
+
+        Args:
+            countries: Number of countries
+            states, cities, districts, blocks: Children per parent at each
+                level; 0 stops the hierarchy at the level above
+            days: Days of history per region
+            end_date: Last day of history (default: today)
+            waves: Maximum outbreak waves per country
+            hospitals_per_city: Hospitals at the finest level down to 'city'
+            analyses: Also emit uploads/analyses (one analysis per case)
+            seed: Random seed; the same seed reproduces the same rows
+        """
+        fan_out = [countries, states, cities, districts, blocks]
+        depth = next((i for i, n in enumerate(fan_out) if n <= 0), len(fan_out))
+        if depth == 0:
+            raise ValueError('countries must be at least 1')
+        self.fan_out = fan_out[:depth]
+        self.levels = LEVELS[:depth]
+        self.hospital_level = self.levels[min(depth, 3) - 1]
+        self.days = days
+        self.end_date = end_date or date.today()
+        self.dates = [(self.end_date - timedelta(days=days - 1 - i)).isoformat() for i in range(days)]
+        self.weekday = WEEKDAY_FACTORS[[(self.end_date - timedelta(days=days - 1 - i)).weekday()
+                                        for i in range(days)]]
+        self.max_waves = waves
+        self.hospitals_per_city = hospitals_per_city
+        self.analyses = analyses
+        self.seed = seed
+
+    # ===================== SIZE =====================
+
+    def region_count(self) -> int:
+        total, width = 0, 1
+        for n in self.fan_out:
+            width *= n
+            total += width
+        return total
+
+    def estimate_rows(self) -> Dict[str, int]:
+        """Approximate rows per table (analyses depend on simulated cases)."""
+        hospital_regions = int(np.prod(self.fan_out[:self.levels.index(self.hospital_level) + 1]))
+        hospitals = hospital_regions * self.hospitals_per_city
+        return {
+            'regional_summary': self.region_count() * self.days,
+            'hospitals': hospitals,
+            'users': hospitals,
+            'case_summary': hospitals * self.days,
+            'resources': hospitals * self.days,
+        }
+
+    # ===================== SIMULATION =====================
+
+    def _rng(self, region_id: str) -> np.random.Generator:
+        return np.random.default_rng([self.seed, zlib.crc32(region_id.encode())])
+
+    def _country_waves(self, rng) -> np.ndarray:
+        """(n, 3) array of wave peak day, width (days) and relative height."""
+        n = int(rng.integers(1, self.max_waves + 1))
+        return np.column_stack([
+            rng.uniform(-0.2, 1.1, n) * self.days,
+            rng.uniform(7, 35, n),
+            rng.lognormal(0, 0.6, n),
+        ])
+
+    def _inherit_waves(self, waves: np.ndarray, rng) -> np.ndarray:
+        child = waves.copy()
+        child[:, 0] += rng.normal(0, 5, len(child))
+        child[:, 1] *= rng.uniform(0.8, 1.25, len(child))
+        child[:, 2] *= rng.lognormal(0, 0.4, len(child))
+        return child
+
+    def _simulate(self, waves: np.ndarray, population: int, rng) -> Dict[str, np.ndarray]:
+        """Daily counts for one leaf region."""
+        t = np.arange(self.days)[:, None]
+        shape = (waves[:, 2] * np.exp(-0.5 * ((t - waves[:, 0]) / waves[:, 1]) ** 2)).sum(axis=1)
+        attack = population * rng.uniform(2e-5, 2e-4)
+        expected = (0.05 + shape) * attack * self.weekday
+        # Gamma-Poisson mixture: over-dispersed like real reporting
+        cases = rng.poisson(rng.gamma(8.0, np.maximum(expected, 1e-9) / 8.0))
+
+        pneumonia = rng.binomial(cases, rng.uniform(0.12, 0.25))
+        severe = rng.binomial(pneumonia, 0.35)
+        return {
+            'case_count': cases,
+            'normal_count': cases - pneumonia,
+            'pneumonia_count': pneumonia - severe,
+            'severe_count': severe,
+            'deaths': rng.binomial(severe, 0.08),
+        }
+
+    # ===================== ROWS =====================
+
+    def _region_rows(self, level, region_id, name, parent_id, lat, lon, population, counts, hospitals):
+        columns = {field: values.tolist() for field, values in counts.items()}
+        density = (counts['case_count'] * 100.0 / population).round(6).tolist()
+        lat, lon = round(lat, 5), round(lon, 5)
+        for i, day in enumerate(self.dates):
+            yield {
+                'region_type': level,
+                'region_id': region_id,
+                'region_name': name,
+                'parent_region_id': parent_id,
+                'latitude': lat,
+                'longitude': lon,
+                'date': day,
+                'case_count': columns['case_count'][i],
+                'normal_count': columns['normal_count'][i],
+                'pneumonia_count': columns['pneumonia_count'][i],
+                'severe_count': columns['severe_count'][i],
+                'deaths': columns['deaths'][i],
+                'hospitals_reporting': hospitals,
+                'population': population,
+                'case_density': density[i],
+            }
+
+    def _hospital_tables(self, region: Dict, counts: Dict[str, np.ndarray], rng):
+        """Hospitals of one region with their daily case_summary, resources and analyses."""
+        n = self.hospitals_per_city
+        beds = rng.integers(80, 900, n)
+        share = beds / beds.sum()
+        split = {field: np.stack([rng.multinomial(int(v), share) for v in counts[field]])
+                 for field in ('normal_count', 'pneumonia_count', 'severe_count', 'deaths')}
+        split['case_count'] = split['normal_count'] + split['pneumonia_count'] + split['severe_count']
+
+        for h in range(n):
+            hospital_id = stable_uuid(self.seed, 'hospital', region['region_id'], h)
+            icu_beds = int(beds[h] * rng.uniform(0.08, 0.2))
+            yield 'hospitals', {
+                'id': hospital_id,
+                'name': f"{region['region_name']} Hospital {h + 1}",
+                'city': region['city'],
+                'state': region['state'],
+                'country': region['country'],
+                'latitude': round(region['latitude'] + rng.normal(0, 0.05), 5),
+                'longitude': round(region['longitude'] + rng.normal(0, 0.05), 5),
+                'registration_number': f"SYN-{region['region_id']}-{h + 1:03d}",
+                'total_beds': int(beds[h]),
+                'icu_beds': icu_beds,
+            }
+            user_id = stable_uuid(self.seed, 'user', hospital_id)
+            yield 'users', {
+                'id': user_id,
+                'hospital_id': hospital_id,
+                'email': f"radiology-{hospital_id[:8]}@synthetic.example",
+                'password_hash': 'synthetic',
+                'full_name': f"Synthetic Radiologist {h + 1}",
+                'role': 'radiologist',
+            }
+
+            columns = {field: values[:, h].tolist() for field, values in split.items()}
+            # ICU census: severe admissions staying ~8 days
+            icu_census = np.convolve(split['severe_count'][:, h], np.ones(8), mode='full')[:self.days]
+            load = np.minimum(icu_census / max(icu_beds, 1), 1.2)
+            confidence = np.where(split['case_count'][:, h] > 0,
+                                  rng.uniform(0.78, 0.93, self.days).round(3), 0).tolist()
+            icu_available = np.maximum(0, icu_beds - icu_census.astype(int)).tolist()
+            ventilators = np.maximum(0, max(2, icu_beds // 2) - (icu_census * 0.4).astype(int)).tolist()
+            oxygen = np.maximum(0.5, 14 - 10 * load + rng.normal(0, 0.5, self.days)).round(1).tolist()
+            staff = (beds[h] * rng.uniform(0.9, 1.3, self.days)).astype(int).tolist()
+
+            for i, day in enumerate(self.dates):
+                yield 'case_summary', {
+                    'hospital_id': hospital_id,
+                    'date': day,
+                    'case_count': columns['case_count'][i],
+                    'normal_count': columns['normal_count'][i],
+                    'pneumonia_count': columns['pneumonia_count'][i],
+                    'severe_count': columns['severe_count'][i],
+                    'deaths': columns['deaths'][i],
+                    'avg_confidence': confidence[i],
+                }
+                yield 'resources', {
+                    'hospital_id': hospital_id,
+                    'date': day,
+                    'icu_beds_available': icu_available[i],
+                    'ventilators_available': ventilators[i],
+                    'oxygen_supply_days': oxygen[i],
+                    'staff_available': staff[i],
+                }
+                if self.analyses and columns['case_count'][i]:
+                    yield from self._analyses(hospital_id, user_id, day, columns, i, rng)
+
+    def _analyses(self, hospital_id, user_id, day, columns, i, rng):
+        upload_id = stable_uuid(self.seed, 'upload', hospital_id, day)
+        normal = columns['normal_count'][i]
+        pneumonia = columns['pneumonia_count'][i]
+        severe = columns['severe_count'][i]
+        total = normal + pneumonia + severe
+        yield 'uploads', {
+            'id': upload_id, 'hospital_id': hospital_id, 'user_id': user_id,
+            'image_count': total, 'status': 'completed', 'created_at': f'{day}T08:00:00',
+        }
+
+        predictions = ['NORMAL'] * normal + ['PNEUMONIA'] * (pneumonia + severe)
+        severities = ['mild'] * normal + ['moderate'] * pneumonia + ['severe'] * severe
+        confidence = rng.beta(9, 2, total).round(4).tolist()
+        processing_ms = rng.integers(120, 600, total).tolist()
+        seconds = np.sort(rng.integers(8 * 3600, 20 * 3600, total)).tolist()
+        for k in range(total):
+            yield 'analyses', {
+                'id': stable_uuid(self.seed, 'analysis', upload_id, k),
+                'upload_id': upload_id,
+                'image_path': f'synthetic/{upload_id}/{k}.png',
+                'ai_prediction': predictions[k],
+                'confidence': confidence[k],
+                'severity': severities[k],
+                'processing_time_ms': processing_ms[k],
+                'model_version': 'synthetic',
+                'created_at': f'{day}T{seconds[k] // 3600:02d}:{seconds[k] // 60 % 60:02d}:{seconds[k] % 60:02d}',
+            }
+
+    def _region(self, depth: int, region_id: str, name: str, parent: Optional[Dict],
+                waves: np.ndarray, lat: float, lon: float, names: Dict):
+        """Yield (table, row) for a region's subtree; return its counts and totals."""
+        level = self.levels[depth]
+        rng = self._rng(region_id)
+        waves = self._country_waves(rng) if waves is None else self._inherit_waves(waves, rng)
+        names = {**names, level: name}
+
+        if depth + 1 < len(self.levels):
+            counts, population, hospitals = None, 0, 0
+            spread = 8.0 / (3 ** depth)
+            for c in range(self.fan_out[depth + 1]):
+                child_id = f'{region_id}-{c + 1:02d}'
+                child_level = self.levels[depth + 1]
+                child_lat = float(np.clip(lat + rng.normal(0, spread), -80, 80))
+                child_lon = (lon + rng.normal(0, spread) + 180) % 360 - 180
+                child = yield from self._region(
+                    depth + 1, child_id, f'{name} {child_level.title()} {c + 1}', {'region_id': region_id},
+                    waves, child_lat, child_lon, names
+                )
+                counts = child[0] if counts is None else {k: counts[k] + child[0][k] for k in counts}
+                population += child[1]
+                hospitals += child[2]
+        else:
+            population = int(rng.lognormal(11 - 0.8 * depth, 0.7)) + 1000
+            counts = self._simulate(waves, population, rng)
+            hospitals = 0
+
+        if level == self.hospital_level:
+            hospitals = self.hospitals_per_city
+            region = {'region_id': region_id, 'region_name': name, 'latitude': lat, 'longitude': lon,
+                      'country': names.get('country', ''), 'state': names.get('state', ''),
+                      'city': names.get('city', name)}
+            yield from self._hospital_tables(region, counts, rng)
+
+        for row in self._region_rows(level, region_id, name, parent and parent['region_id'],
+                                     lat, lon, population, counts, hospitals):
+            yield 'regional_summary', row
+        return counts, population, hospitals
+
+    def rows(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (table, row) pairs, children before parents."""
+        rng = np.random.default_rng(self.seed)
+        for c in range(self.fan_out[0]):
+            yield from self._region(0, f'C{c + 1:03d}', f'Country {c + 1}', None, None,
+                                    float(rng.uniform(-45, 60)), float(rng.uniform(-170, 170)), {})
+
+    def stream(self, chunk_size: int = 5000) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yield (table, rows) chunks of at most chunk_size rows.
+
+        A table's rows are only emitted after the rows they reference (e.g.
+        hospitals before case_summary), so chunks can be inserted in order.
+        """
+        buffers: Dict[str, List[Dict]] = {table: [] for table in TABLES}
+        for table, row in self.rows():
+            buffer = buffers[table]
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                # Flush referenced tables first to keep foreign keys satisfied
+                for name in TABLES[:TABLES.index(table) + 1]:
+                    if buffers[name]:
+                        yield name, buffers[name]
+                        buffers[name] = []
+        for name in TABLES:
+            if buffers[name]:
+                yield name, buffers[name]
+
+    def tables(self) -> Dict[str, List[Dict]]:
+        """Everything in memory, e.g. to seed FakeSupabase (small data sets only)."""
+        tables: Dict[str, List[Dict]] = {table: [] for table in TABLES}
+        for table, row in self.rows():
+            tables[table].append(row)
+        return {table: rows for table, rows in tables.items() if rows}
+
+
+# ===================== COMMAND LINE =====================
+
+def write_jsonl(outbreak: SyntheticOutbreak, out_dir: str, chunk_size: int) -> Dict[str, int]:
+    os.makedirs(out_dir, exist_ok=True)
+    files, written = {}, {}
+    try:
+        for table, rows in outbreak.stream(chunk_size):
+            if table not in files:
+                files[table] = open(os.path.join(out_dir, f'{table}.jsonl'), 'w')
+            files[table].write(''.join(json.dumps(row, separators=(',', ':')) + '\n' for row in rows))
+            written[table] = written.get(table, 0) + len(rows)
+    finally:
+        for f in files.values():
+            f.close()
+    return written
+
+
+def insert_supabase(outbreak: SyntheticOutbreak, chunk_size: int) -> Dict[str, int]:
+    from .database import get_supabase_client
+    from .shared_cache import invalidate_tables
+
+    supabase = get_supabase_client()
+    conflicts = {'hospitals': 'id', 'users': 'id', 'uploads': 'id', 'analyses': 'id',
+                 'regional_summary': 'region_type,region_id,date',
+                 'case_summary': 'hospital_id,date', 'resources': 'hospital_id,date'}
+    written = {}
+    for table, rows in outbreak.stream(chunk_size):
+        supabase.table(table).upsert(rows, on_conflict=conflicts[table]).execute()
+        written[table] = written.get(table, 0) + len(rows)
+    invalidate_tables(written)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic outbreak data')
+    parser.add_argument('--countries', type=int, default=3)
+    parser.add_argument('--states', type=int, default=5, help='States per country')
+    parser.add_argument('--cities', type=int, default=4, help='Cities per state')
+    parser.add_argument('--districts', type=int, default=0, help='Districts per city')
+    parser.add_argument('--blocks', type=int, default=0, help='Blocks per district')
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--waves', type=int, default=3, help='Maximum outbreak waves')
+    parser.add_argument('--hospitals-per-city', type=int, default=2)
+    parser.add_argument('--analyses', action='store_true', help='Also generate uploads and analyses')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--out', default='data/raw/synthetic', help='Directory for JSON Lines files')
+    parser.add_argument('--supabase', action='store_true', help='Upsert into the configured Supabase instead')
+    args = parser.parse_args()
+
+    outbreak = SyntheticOutbreak(
+        countries=args.countries, states=args.states, cities=args.cities,
+        districts=args.districts, blocks=args.blocks, days=args.days, waves=args.waves,
+        hospitals_per_city=args.hospitals_per_city, analyses=args.analyses, seed=args.seed
+    )
+    print(f"Generating {outbreak.region_count()} regions x {args.days} days "
+          f"(~{sum(outbreak.estimate_rows().values())} rows before analyses)")
+
+    if args.supabase:
+        written = insert_supabase(outbreak, args.chunk_size)
+    else:
+        written = write_jsonl(outbreak, args.out, args.chunk_size)
+    for table in TABLES:
+        if table in written:
+            print(f"{table:<18}{written[table]:>12}")
+
+
+if __name__ == '__main__':
+    main()
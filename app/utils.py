@@ -2,11 +2,34 @@
 # https://claude.ai
 
 import os
+import struct
 import uuid
+import zlib
+from typing import NamedTuple, Optional, Tuple
 from werkzeug.utils import secure_filename
 from .config import Config
 
 
+# Leading bytes of each accepted image format
+IMAGE_SIGNATURES = {
+    b'\xff\xd8\xff': 'jpeg',
+    b'\x89PNG\r\n\x1a\n': 'png',
+}
+SIGNATURE_BYTES = max(len(signature) for signature in IMAGE_SIGNATURES)
+
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT, JPG and DAC), which carry the dimensions
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field
+JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD8)) | {0x01, 0xD8}
+
+
+class ImageHeader(NamedTuple):
+    """Format and dimensions read from an image header."""
+    format: str
+    width: int
+    height: int
+
+
 def allowed_file(filename):
     """Check if file has an allowed extension."""
     if '.' not in filename:
@@ -15,6 +38,109 @@ def allowed_file(filename):
     return ext in Config.ALLOWED_EXTENSIONS
 
 
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Image format ('jpeg' or 'png') from a file's first bytes, or None.
+
+    Args:
+        head: At least the first SIGNATURE_BYTES bytes of the file
+    """
+    for signature, image_type in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return image_type
+    return None
+
+
+def read_image_header(file) -> Optional[ImageHeader]:
+    """Read a JPEG or PNG file's format and dimensions without decoding it.
+
+    PNG dimensions come from the IHDR chunk (CRC checked). For JPEG the
+    marker segments are skipped with seeks up to the start-of-frame segment,
+    so only a few dozen bytes are read even past large EXIF blocks.
+
+    Args:
+        file: Seekable binary file; its position is reset to 0 afterwards
+
+    Returns:
+        ImageHeader, or None if the header is not a valid JPEG or PNG header
+    """
+    try:
+        file.seek(0)
+        image_type = sniff_image_type(file.read(SIGNATURE_BYTES))
+        if image_type == 'png':
+            size = _png_dimensions(file)
+        elif image_type == 'jpeg':
+            size = _jpeg_dimensions(file)
+        else:
+            size = None
+    finally:
+        file.seek(0)
+    if size is None:
+        return None
+    return ImageHeader(image_type, *size)
+
+
+def _png_dimensions(file) -> Optional[Tuple[int, int]]:
+    file.seek(8)
+    chunk = file.read(25)  # length, type, 13 bytes of IHDR data, CRC
+    if len(chunk) < 25:
+        return None
+    length, kind, data, crc = struct.unpack('>I4s13sI', chunk)
+    if length != 13 or kind != b'IHDR' or zlib.crc32(kind + data) != crc:
+        return None
+    return struct.unpack('>II', data[:8])
+
+
+def _jpeg_dimensions(file) -> Optional[Tuple[int, int]]:
+    file.seek(2)
+    read = file.read
+    while True:
+        byte = read(1)
+        if byte != b'\xff':
+            return None
+        while byte == b'\xff':  # fill bytes before the marker code
+            byte = read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image, or scan data, before any frame header
+            return None
+        length = read(2)
+        if len(length) < 2:
+            return None
+        segment_length = struct.unpack('>H', length)[0]
+        if segment_length < 2:
+            return None
+        if marker in JPEG_SOF_MARKERS:
+            frame = read(5)  # precision, height, width
+            if len(frame) < 5:
+                return None
+            _, height, width = struct.unpack('>BHH', frame)
+            return width, height
+        file.seek(segment_length - 2, os.SEEK_CUR)
+
+
+def validate_image(file) -> Tuple[Optional[ImageHeader], Optional[str]]:
+    """Check that a file is a JPEG or PNG with sensible dimensions.
+
+    Only the header is read, so this costs microseconds per file and bad
+    files are rejected before a model API round trip is spent on them.
+
+    Returns:
+        (header, None) if valid, (None or header, error message) otherwise
+    """
+    header = read_image_header(file)
+    if header is None:
+        return None, 'File content is not a valid JPG or PNG image.'
+    if header.width == 0 or header.height == 0:
+        return header, 'Image has no pixels.'
+    if header.width * header.height > Config.MAX_IMAGE_PIXELS:
+        return header, f'Image is too large ({header.width}x{header.height} pixels).'
+    return header, None
+
+
 def validate_file_size(file):
     """
     Check if file is under the max size limit.
@@ -49,3 +175,34 @@ def get_file_extension(filename):
     if '.' in filename:
         return filename.rsplit('.', 1)[1].lower()
     return ''
+
+
+def summarize_capacity(hospitals: list) -> tuple:
+    """Aggregate capacity and current occupancy over a set of hospitals.
+
+    Args:
+        hospitals: Rows from get_current_hospital_capacity()
+
+    Returns:
+        (capacity, occupancy) dicts for ResourceDemandPredictor. Only
+        icu_beds_occupied can be derived (icu_beds minus the reported
+        icu_beds_available); resources reports no general-ward availability
+        or ventilator totals, so beds_occupied and ventilators_in_use are
+        always 0 and those projections start from an empty census.
+    """
+    capacity = {'total_beds': 0, 'icu_beds': 0, 'ventilators_available': 0}
+    occupancy = {'beds_occupied': 0, 'icu_beds_occupied': 0, 'ventilators_in_use': 0}
+
+    for h in hospitals:
+        capacity['total_beds'] += h.get('total_beds') or 0
+        capacity['icu_beds'] += h.get('icu_beds') or 0
+
+        resources = h.get('latest_resources')
+        if resources:
+            capacity['ventilators_available'] += resources.get('ventilators_available') or 0
+            if resources.get('icu_beds_available') is not None:
+                occupancy['icu_beds_occupied'] += max(
+                    0, (h.get('icu_beds') or 0) - resources['icu_beds_available']
+                )
+
+    return capacity, occupancy
@@ -0,0 +1,356 @@
+"""
+End-to-end latency and throughput benchmarks.
+
+Runs the Flask app in-process against a seeded in-memory datastore (the same
+FakeSupabase the tests use) and a local fake model API served over real HTTP,
+then measures:
+
+- upload:      POST /hospital/upload with 1-50 images
+- concurrency: simultaneous single-image uploads, with and without
+               micro-batching (the fake model API defaults to 20 ms here)
+- forecast:    CaseForecastModel fit + forecast (linear, and Prophet if installed)
+- growth:      GrowthAnalyzer over 10-100k regions
+- endpoints:   the all-region alert and analytics endpoints, over
+               app.synthetic_data outbreaks
+
+AI Attribution: This file was developed with assistance from Claude (Anthropic).
+https://claude.ai
+
+Usage:
+    python benchmarks/e2e.py
+    python benchmarks/e2e.py --only upload,forecast --repeat 10
+    python benchmarks/e2e.py --growth-regions 10,100,1000,10000,100000 --output data/outputs/e2e.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import database
+from app.config import Config
+from app.models import predictions
+from app.models.predictions import CaseForecastModel, GrowthAnalyzer
+from app.synthetic_data import SyntheticOutbreak
+from tests.fake_supabase import FakeSupabase
+
+
+SUITES = ('upload', 'concurrency', 'forecast', 'growth', 'endpoints')
+# Captured before configure_app() switches Prophet off for the other suites
+PROPHET_INSTALLED = predictions.PROPHET_AVAILABLE
+
+
+# ===================== HELPERS =====================
+
+def timed(fn, repeat, warmup=1):
+    """Run fn warmup + repeat times and summarize the timed runs in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'runs': repeat,
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'p50_ms': round(samples[len(samples) // 2], 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'min_ms': round(samples[0], 3),
+        'max_ms': round(samples[-1], 3),
+    }
+
+
+def make_png(width=256, height=256, seed=0):
+    """A valid greyscale PNG filled with noise (so it does not compress away)."""
+    rng = random.Random(seed)
+    raw = b''.join(b'\x00' + bytes(rng.getrandbits(8) for _ in range(width)) for _ in range(height))
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(raw, 6)) + chunk(b'IEND', b''))
+
+
+def make_timeseries(region_id, days=30, base=1000, weekly_growth=1.25):
+    today = date.today()
+    return [{
+        'region_type': 'country',
+        'region_id': region_id,
+        'region_name': f'Region {region_id}',
+        'latitude': 0.0,
+        'longitude': 0.0,
+        'date': (today - timedelta(days=days - 1 - i)).isoformat(),
+        'case_count': int(base * weekly_growth ** (i / 7)),
+    } for i in range(days)]
+
+
+class FakeModelAPI:
+    """Local HTTP server that answers /predict and /predict/batch like the real model API."""
+
+    def __init__(self, latency_ms=0.0):
+        latency = latency_ms / 1000
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if latency:
+                    time.sleep(latency)
+                prediction = {
+                    'prediction': 'PNEUMONIA', 'confidence': 0.87,
+                    'probabilities': {'NORMAL': 0.13, 'PNEUMONIA': 0.87},
+                    'processing_time_ms': latency_ms, 'model_version': 'bench',
+                }
+                if self.path.endswith('/batch'):
+                    # One fixed latency per batch, like batched inference on a GPU
+                    prediction = {'predictions': [prediction] * payload.count(b'name="images"')}
+                body = json.dumps(prediction).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/predict'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def configure_app(fake):
+    """Point the app at the in-memory datastore (and a temp image store) with background work disabled."""
+    database.get_supabase_client = lambda: fake
+    Config.SHARED_CACHE_ENABLED = False
+    Config.ALERT_SCHEDULER_ENABLED = False
+    Config.ALERT_STATE_ENABLED = False
+    predictions.PROPHET_AVAILABLE = False
+    Config.IMAGE_STORE_PATH = tempfile.mkdtemp(prefix='medialert-bench-images-')
+
+
+# ===================== SUITES =====================
+
+def bench_upload(args):
+    from app.main import app
+
+    image = make_png()
+    results = []
+    with FakeModelAPI(args.model_latency_ms) as model_api:
+        Config.MODEL_API_URL = model_api.url
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['hospital_id'] = 'bench-hospital'
+
+        for count in args.upload_images:
+            def post():
+                files = [(io.BytesIO(image), f'xray_{i}.png') for i in range(count)]
+                response = client.post('/hospital/upload', data={'images': files},
+                                       content_type='multipart/form-data')
+                assert response.status_code == 200, response.status_code
+                assert all(r.get('source') == 'api' for r in response.get_json()['results'])
+
+            stats = timed(post, args.repeat)
+            stats.update({
+                'suite': 'upload', 'case': f'{count}_images', 'images': count,
+                'image_bytes': len(image),
+                'images_per_second': round(count / (stats['mean_ms'] / 1000), 1),
+            })
+            results.append(stats)
+    return results
+
+
+def bench_concurrency(args):
+    """Many single-image uploads at once, with and without micro-batching."""
+    from concurrent.futures import ThreadPoolExecutor
+    from app.main import app
+
+    image = make_png()
+    results = []
+    with FakeModelAPI(args.model_latency_ms or 20.0) as model_api:
+        Config.MODEL_API_URL = model_api.url
+        clients = []
+        for _ in range(args.concurrent_uploads):
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session['hospital_id'] = 'bench-hospital'
+            clients.append(client)
+
+        def post(client):
+            response = client.post('/hospital/upload', data={'images': [(io.BytesIO(image), 'xray.png')]},
+                                   content_type='multipart/form-data')
+            assert response.status_code == 200, response.status_code
+
+        for enabled in (False, True):
+            Config.MICRO_BATCH_ENABLED = enabled
+            with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+                def burst():
+                    list(pool.map(post, clients))
+
+                stats = timed(burst, args.repeat)
+            stats.update({
+                'suite': 'concurrency',
+                'case': f"{len(clients)}_uploads_{'micro_batched' if enabled else 'unbatched'}",
+                'uploads': len(clients),
+                'images_per_second': round(len(clients) / (stats['mean_ms'] / 1000), 1),
+            })
+            results.append(stats)
+    return results
+
+
+def bench_forecast(args):
+    results = []
+    variants = [('linear', False)]
+    if PROPHET_INSTALLED:
+        variants.append(('prophet', True))
+
+    for days in args.history_days:
+        history = make_timeseries('F', days=days)
+        for name, use_prophet in variants:
+            predictions.PROPHET_AVAILABLE = use_prophet
+
+            def fit_forecast():
+                model = CaseForecastModel(use_prophet=use_prophet)
+                if not model.fit(history) or not model.forecast(days=args.forecast_days)['success']:
+                    raise RuntimeError(f'{name} forecast failed')
+
+            case = {'suite': 'forecast', 'case': f'{name}_{days}d', 'model': name,
+                    'history_days': days, 'forecast_days': args.forecast_days}
+            try:
+                stats = timed(fit_forecast, args.repeat if name == 'linear' else max(1, args.repeat // 5))
+            except RuntimeError as e:
+                # e.g. Prophet installed without a working Stan backend
+                print(f"Warning: skipping {case['case']}: {e}")
+                continue
+            results.append({**stats, **case})
+    predictions.PROPHET_AVAILABLE = False
+    return results
+
+
+def bench_growth(args):
+    results = []
+    for count in args.growth_regions:
+        rng = random.Random(count)
+        series = [make_timeseries(f'R{i}', days=14, base=rng.randint(10, 10000),
+                                  weekly_growth=rng.uniform(0.8, 2.5)) for i in range(count)]
+
+        def analyze():
+            for timeseries in series:
+                GrowthAnalyzer.calculate_growth_metrics(timeseries)
+
+        stats = timed(analyze, repeat=1 if count >= 10000 else args.repeat, warmup=0 if count >= 10000 else 1)
+        stats.update({'suite': 'growth', 'case': f'{count}_regions', 'regions': count,
+                      'regions_per_second': round(count / (stats['mean_ms'] / 1000), 1)})
+        results.append(stats)
+    return results
+
+
+def bench_endpoints(args):
+    from app.main import app
+
+    tables = SyntheticOutbreak(countries=args.endpoint_regions, states=0, days=30,
+                               hospitals_per_city=1, seed=args.seed).tables()
+    fake = FakeSupabase({**tables, 'alerts': []})
+    configure_app(fake)
+    client = app.test_client()
+
+    results = []
+    for path in ('/api/v1/alerts/growth', '/api/v1/alerts/capacity', '/api/v1/analytics/growth-metrics'):
+        def get():
+            fake.queries.clear()
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+
+        stats = timed(get, args.repeat)
+        fake.queries.clear()
+        client.get(path)
+        stats.update({'suite': 'endpoints', 'case': path, 'regions': args.endpoint_regions,
+                      'queries_per_request': len(fake.queries)})
+        results.append(stats)
+    return results
+
+
+# ===================== MAIN =====================
+
+def int_list(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end latency benchmarks')
+    parser.add_argument('--only', default=','.join(SUITES), help=f'Comma-separated suites ({", ".join(SUITES)})')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+    parser.add_argument('--upload-images', type=int_list, default=[1, 5, 10, 25, 50])
+    parser.add_argument('--model-latency-ms', type=float, default=0.0, help='Delay added by the fake model API')
+    parser.add_argument('--concurrent-uploads', type=int, default=16, help='Simultaneous uploads in the concurrency suite')
+    parser.add_argument('--history-days', type=int_list, default=[30, 90])
+    parser.add_argument('--forecast-days', type=int, default=7)
+    parser.add_argument('--growth-regions', type=int_list, default=[10, 100, 1000])
+    parser.add_argument('--endpoint-regions', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--baseline', help='Earlier --output file to compare mean latencies against')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    configure_app(FakeSupabase({'regional_summary': [], 'hospitals': [], 'alerts': []}))
+    suites = {'upload': bench_upload, 'concurrency': bench_concurrency, 'forecast': bench_forecast,
+              'growth': bench_growth, 'endpoints': bench_endpoints}
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {(r['suite'], r['case']): r for r in json.load(f)['results']}
+
+    results = []
+    for name in [s.strip() for s in args.only.split(',') if s.strip()]:
+        for result in suites[name](args):
+            results.append(result)
+            line = (f"{result['suite']:<12}{result['case']:<36}{result['mean_ms']:>12.2f} ms"
+                    f"{result['p95_ms']:>12.2f} p95")
+            before = baseline.get((result['suite'], result['case']))
+            if before:
+                result['baseline_mean_ms'] = before['mean_ms']
+                line += f"{result['mean_ms'] / before['mean_ms']:>9.2f}x"
+            print(line)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({
+                'benchmark': 'e2e',
+                'generated_at': datetime.now().isoformat(),
+                'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                                'prophet': PROPHET_INSTALLED},
+                'params': vars(args),
+                'results': results,
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
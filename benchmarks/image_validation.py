@@ -0,0 +1,120 @@
+"""
+Microbenchmark for header-based image validation.
+
+Times app.utils.validate_image (magic bytes plus dimensions read from the
+header, no decode) on in-memory and spooled-to-disk images of several kinds,
+and compares it with opening and fully decoding the same image with Pillow,
+which is what rejecting a bad file would otherwise take (on the model API).
+
+AI Attribution: This file was developed with assistance from Claude (Anthropic).
+https://claude.ai
+
+Usage:
+    python benchmarks/image_validation.py
+    python benchmarks/image_validation.py --repeat 20000 --output data/outputs/image_validation.json
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils import validate_image
+from tests.fake_images import jpeg_bytes, png_bytes
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+def make_cases(size):
+    """(name, bytes, decodable) cases.
+
+    Pillow-encoded images when Pillow is installed, a synthetic JPEG with a
+    64 KB EXIF block (header only) and two bad files.
+    """
+    cases = []
+    if PIL_AVAILABLE:
+        image = Image.effect_noise((size, size), 64).convert('L')
+        for name, fmt, kwargs in (('png', 'PNG', {}), ('jpeg', 'JPEG', {'quality': 90}),
+                                  ('jpeg_progressive', 'JPEG', {'progressive': True})):
+            buffer = io.BytesIO()
+            image.save(buffer, fmt, **kwargs)
+            cases.append((name, buffer.getvalue(), True))
+    else:
+        cases += [('png', png_bytes(size, size), False), ('jpeg', jpeg_bytes(size, size), False)]
+    cases += [
+        ('jpeg_64kb_exif', jpeg_bytes(size, size, exif_bytes=64000), False),
+        ('not_an_image', b'%PDF-1.7\n' + b'\x00' * 4096, False),
+        ('truncated_png', png_bytes(size, size)[:20], False),
+    ]
+    return cases
+
+
+def per_call_us(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def decode(data):
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure header-based image validation')
+    parser.add_argument('--size', type=int, default=1024, help='Image width and height in pixels')
+    parser.add_argument('--repeat', type=int, default=5000, help='Calls timed per case')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    results = []
+    for name, data, decodable in make_cases(args.size):
+        header, error = validate_image(io.BytesIO(data))
+        memory = io.BytesIO(data)
+        with tempfile.TemporaryFile() as disk:
+            disk.write(data)
+            result = {
+                'case': name,
+                'bytes': len(data),
+                'valid': error is None,
+                'dimensions': f'{header.width}x{header.height}' if header else None,
+                'validate_memory_us': round(per_call_us(lambda: validate_image(memory), args.repeat), 2),
+                'validate_disk_us': round(per_call_us(lambda: validate_image(disk), args.repeat), 2),
+            }
+        if decodable:
+            result['pillow_decode_us'] = round(per_call_us(lambda: decode(data), max(1, args.repeat // 100)), 2)
+        results.append(result)
+
+    print(f"{'case':<20}{'bytes':>10}{'valid':>7}{'memory us':>12}{'disk us':>10}{'decode us':>12}")
+    for r in results:
+        decoded = r.get('pillow_decode_us')
+        print(f"{r['case']:<20}{r['bytes']:>10}{str(r['valid']):>7}{r['validate_memory_us']:>12.2f}"
+              f"{r['validate_disk_us']:>10.2f}{decoded if decoded is not None else '-':>12}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({
+                'benchmark': 'image_validation',
+                'generated_at': datetime.now().isoformat(),
+                'params': vars(args),
+                'pillow_available': PIL_AVAILABLE,
+                'results': results,
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
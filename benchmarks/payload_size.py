@@ -0,0 +1,126 @@
+"""
+Payload-size benchmark for analytics responses.
+
+Compares the encoded size of forecast reports and all-region alert lists as
+row-oriented JSON vs. the columnar shape, each uncompressed, gzip'd and (when
+the optional brotli package is installed) Brotli-compressed.
+
+AI Attribution: This file was developed with assistance from Claude (Anthropic).
+https://claude.ai
+
+Usage:
+    python benchmarks/payload_size.py
+    python benchmarks/payload_size.py --regions 500 --forecast-days 90 --output data/outputs/payload_size.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import predictions
+from app.models.alerts import AlertEngine
+from app.compression import BROTLI_AVAILABLE, columnar_forecast_report, to_columnar
+
+if BROTLI_AVAILABLE:
+    import brotli
+
+
+def make_timeseries(days=30, start_value=1000, growth_rate=1.25, region_id='R0'):
+    start = datetime.now() - timedelta(days=days)
+    return [{
+        'date': (start + timedelta(days=i)).strftime('%Y-%m-%d'),
+        'case_count': int(start_value * (growth_rate ** (i / 7))),
+        'region_name': f'Region {region_id}',
+        'region_id': region_id,
+    } for i in range(days)]
+
+
+def encode(payload):
+    return json.dumps(payload, separators=(',', ':'), default=lambda o: o.item()).encode('utf-8')
+
+
+def measure(name, payload):
+    """Return size measurements for one payload."""
+    raw = encode(payload)
+    result = {'payload': name, 'identity_bytes': len(raw)}
+
+    start = time.perf_counter()
+    result['gzip_bytes'] = len(gzip.compress(raw, compresslevel=6))
+    result['gzip_ms'] = round((time.perf_counter() - start) * 1000, 3)
+
+    if BROTLI_AVAILABLE:
+        start = time.perf_counter()
+        result['br_bytes'] = len(brotli.compress(raw, quality=5))
+        result['br_ms'] = round((time.perf_counter() - start) * 1000, 3)
+
+    return result
+
+
+def build_forecast_report(forecast_days):
+    predictions.PROPHET_AVAILABLE = False  # keep the benchmark fast and deterministic
+    return predictions.generate_forecast_report(
+        region_name='Benchmark Region',
+        timeseries_data=make_timeseries(days=60),
+        current_capacity={'total_beds': 100000, 'icu_beds': 100000, 'ventilators_available': 100000},
+        forecast_days=forecast_days
+    )
+
+
+def build_alert_list(regions):
+    engine = AlertEngine()
+    alerts = []
+    for i in range(regions):
+        alerts.extend(engine.generate_growth_alerts(
+            region_name=f'Region {i}',
+            region_id=f'R{i}',
+            timeseries_data=make_timeseries(days=14, growth_rate=1.5 + (i % 5) * 0.5, region_id=f'R{i}')
+        ))
+    return alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure analytics payload sizes')
+    parser.add_argument('--regions', type=int, default=200, help='Regions in the alert list')
+    parser.add_argument('--forecast-days', type=int, default=90, help='Forecast horizon')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    report = build_forecast_report(args.forecast_days)
+    alerts = build_alert_list(args.regions)
+    flat_alerts = [{k: v for k, v in a.items() if not isinstance(v, (dict, list))} for a in alerts]
+
+    results = [
+        measure('forecast_report_rows', report),
+        measure('forecast_report_columnar', columnar_forecast_report(report)),
+        measure('alerts_rows', alerts),
+        measure('alerts_flat_rows', flat_alerts),
+        measure('alerts_flat_columnar', to_columnar(flat_alerts)),
+    ]
+
+    print(f"{'payload':<28}{'identity':>12}{'gzip':>10}" + (f"{'br':>10}" if BROTLI_AVAILABLE else ''))
+    for r in results:
+        line = f"{r['payload']:<28}{r['identity_bytes']:>12}{r['gzip_bytes']:>10}"
+        if BROTLI_AVAILABLE:
+            line += f"{r['br_bytes']:>10}"
+        print(line)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({
+                'benchmark': 'payload_size',
+                'generated_at': datetime.now().isoformat(),
+                'params': vars(args),
+                'results': results,
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -88,6 +88,7 @@ CREATE TABLE regional_summary (
   region_type TEXT NOT NULL CHECK (region_type IN ('country', 'state', 'city', 'district', 'block')),
   region_id TEXT NOT NULL,
   region_name TEXT,
+  parent_region_id TEXT,
   latitude FLOAT,
   longitude FLOAT,
   date DATE NOT NULL,
@@ -107,7 +108,9 @@ CREATE TABLE regional_summary (
 CREATE TABLE alerts (
   id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
   region_id TEXT NOT NULL,
-  alert_type TEXT NOT NULL CHECK (alert_type IN ('threshold_exceeded', 'surge_detected', 'variant_detected')),
+  alert_type TEXT NOT NULL CHECK (alert_type IN ('threshold_exceeded', 'surge_detected', 'variant_detected',
+                                                 'rapid_growth', 'capacity_warning', 'resource_depletion',
+                                                 'demographic_risk')),
   severity TEXT NOT NULL CHECK (severity IN ('low', 'medium', 'high', 'critical')),
   description TEXT,
   triggered_at TIMESTAMP DEFAULT NOW(),
@@ -140,9 +143,12 @@ CREATE INDEX idx_case_summary_hospital_id ON case_summary(hospital_id);
 CREATE INDEX idx_case_summary_date ON case_summary(date);
 CREATE INDEX idx_regional_summary_region_type ON regional_summary(region_type);
 CREATE INDEX idx_regional_summary_date ON regional_summary(date);
+CREATE INDEX idx_regional_summary_type_date ON regional_summary(region_type, date);
 CREATE INDEX idx_regional_summary_case_count ON regional_summary(case_count DESC);
 CREATE INDEX idx_alerts_region_id ON alerts(region_id);
 CREATE INDEX idx_alerts_resolved_at ON alerts(resolved_at);
+-- At most one active alert per (region, type); the alert manager updates it in place
+CREATE UNIQUE INDEX idx_alerts_active_region_type ON alerts(region_id, alert_type) WHERE resolved_at IS NULL;
 CREATE INDEX idx_resources_hospital_id ON resources(hospital_id);
 CREATE INDEX idx_resources_date ON resources(date);
 
@@ -0,0 +1,35 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""Minimal JPEG and PNG byte strings for upload and header-sniffing tests.
+
+The headers are well formed (so format and dimensions can be read from
+them); the image data after the header is filler and is never decoded.
+"""
+
+import struct
+import zlib
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    body = kind + data
+    return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body))
+
+
+def png_bytes(width=2, height=2, body=b'p' * 100) -> bytes:
+    header = struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header) + png_chunk(b'IDAT', body)
+
+
+def jpeg_segment(marker: int, data: bytes) -> bytes:
+    return struct.pack('>BBH', 0xFF, marker, len(data) + 2) + data
+
+
+def jpeg_bytes(width=2, height=2, exif_bytes=16, body=b'j' * 100, sof_marker=0xC0) -> bytes:
+    """JPEG with an APP0 and an APP1 (EXIF-sized filler) segment before the frame header."""
+    return (b'\xff\xd8'
+            + jpeg_segment(0xE0, b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00')
+            + jpeg_segment(0xE1, b'Exif\x00\x00' + b'\x00' * exif_bytes)
+            + jpeg_segment(sof_marker, struct.pack('>BHHB', 8, height, width, 1) + b'\x01\x11\x00')
+            + jpeg_segment(0xDA, b'\x01\x01\x00\x00\x3f\x00')
+            + body + b'\xff\xd9')
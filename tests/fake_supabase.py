@@ -0,0 +1,165 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+"""In-memory stand-in for the Supabase client used by the database tests.
+
+Only the subset of the PostgREST query builder that app/database.py uses is
+implemented. Filters are applied "server side", so ``rows_returned`` reflects
+what would actually be transferred over the wire.
+"""
+
+import copy
+import uuid
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table_name = table
+        self.filters = []
+        self.orders = []
+        self.limit_count = None
+        self.columns = None
+        self.operation = 'select'
+        self.payload = None
+        self.on_conflict = None
+
+    # --- query builder ---
+    def select(self, columns='*'):
+        if columns.strip() != '*':
+            self.columns = [c.strip() for c in columns.split(',')]
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(('eq', column, value))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(('neq', column, value))
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(('gte', column, value))
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(('lte', column, value))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(('in', column, list(values)))
+        return self
+
+    def is_(self, column, value):
+        self.filters.append(('is', column, value))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
+    def insert(self, data):
+        self.operation = 'insert'
+        self.payload = data
+        return self
+
+    def upsert(self, data, on_conflict=None):
+        self.operation = 'upsert'
+        self.payload = data
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, data):
+        self.operation = 'update'
+        self.payload = data
+        return self
+
+    # --- execution ---
+    def _matches(self, row):
+        for op, column, value in self.filters:
+            current = row.get(column)
+            if op == 'eq' and current != value:
+                return False
+            if op == 'neq' and current == value:
+                return False
+            if op == 'gte' and (current is None or str(current) < str(value)):
+                return False
+            if op == 'lte' and (current is None or str(current) > str(value)):
+                return False
+            if op == 'in' and current not in value:
+                return False
+            if op == 'is':
+                expected_null = value in (None, 'null')
+                if expected_null != (current is None):
+                    return False
+        return True
+
+    def execute(self):
+        self.client.queries.append(self)
+        rows = self.client.tables.setdefault(self.table_name, [])
+
+        if self.operation == 'insert':
+            new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            inserted = []
+            for row in new_rows:
+                row = dict(row)
+                row.setdefault('id', str(uuid.uuid4()))
+                rows.append(row)
+                inserted.append(copy.deepcopy(row))
+            return FakeResponse(inserted)
+
+        if self.operation == 'upsert':
+            new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            keys = (self.on_conflict or 'id').split(',')
+            written = []
+            for row in new_rows:
+                existing = next((r for r in rows
+                                 if all(r.get(k) == row.get(k) for k in keys)), None)
+                if existing is None:
+                    existing = {'id': str(uuid.uuid4())}
+                    rows.append(existing)
+                existing.update(row)
+                written.append(copy.deepcopy(existing))
+            return FakeResponse(written)
+
+        if self.operation == 'update':
+            updated = []
+            for row in rows:
+                if self._matches(row):
+                    row.update(self.payload)
+                    updated.append(copy.deepcopy(row))
+            return FakeResponse(updated)
+
+        result = [row for row in rows if self._matches(row)]
+        for column, desc in reversed(self.orders):
+            result.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        if self.limit_count is not None:
+            result = result[:self.limit_count]
+        if self.columns:
+            result = [{c: row.get(c) for c in self.columns} for row in result]
+        else:
+            result = [copy.deepcopy(row) for row in result]
+
+        self.client.rows_returned += len(result)
+        return FakeResponse(result)
+
+
+class FakeSupabase:
+    """Minimal Supabase client backed by plain lists of dicts."""
+
+    def __init__(self, tables=None):
+        self.tables = {name: list(rows) for name, rows in (tables or {}).items()}
+        self.queries = []
+        self.rows_returned = 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
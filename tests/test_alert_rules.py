@@ -0,0 +1,211 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import time
+import pytest
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models.alert_rules import MetricsTable, compile_rules
+from app.models.alerts import AlertEngine
+
+
+def make_rule(**overrides):
+    rule = {
+        'name': 'hot',
+        'group': 'test',
+        'alert_type': 'rapid_growth',
+        'when': [('growth_rate', '>=', 'limit')],
+        'severity': 'high',
+        'title': "Hot: {region_name}",
+        'description': "Growth {growth_rate:.1f}%",
+        'metrics': ['growth_rate'],
+        'recommendations': ["Watch {region_id}"],
+    }
+    rule.update(overrides)
+    return rule
+
+
+def make_table(rates):
+    return MetricsTable({
+        'region_id': [f'R{i}' for i in range(len(rates))],
+        'region_name': [f'Region {i}' for i in range(len(rates))],
+        'growth_rate': rates,
+    })
+
+
+class TestCompileRules:
+    """Tests for rule compilation."""
+
+    def test_unknown_threshold(self):
+        with pytest.raises(ValueError, match='unknown threshold'):
+            compile_rules([make_rule()], {})
+
+    def test_unknown_operator(self):
+        with pytest.raises(ValueError, match='unknown operator'):
+            compile_rules([make_rule(when=[('growth_rate', '=>', 1)])])
+
+    def test_unless_must_reference_earlier_rule(self):
+        with pytest.raises(ValueError, match="'unless'"):
+            compile_rules([make_rule(unless='later'), make_rule(name='later')], {'limit': 1})
+
+    def test_duplicate_names(self):
+        with pytest.raises(ValueError, match='Duplicate'):
+            compile_rules([make_rule(), make_rule()], {'limit': 1})
+
+
+class TestRuleSetEvaluate:
+    """Tests for vectorized evaluation."""
+
+    def test_fires_and_renders(self):
+        rules = compile_rules([make_rule()], {'limit': 20})
+
+        alerts = rules.evaluate(make_table([10.0, 25.0, None]))
+
+        assert len(alerts) == 1
+        assert alerts[0]['region_id'] == 'R1'
+        assert alerts[0]['title'] == 'Hot: Region 1'
+        assert alerts[0]['description'] == 'Growth 25.0%'
+        assert alerts[0]['metrics'] == {'growth_rate': 25.0}
+        assert alerts[0]['recommendations'] == ['Watch R1']
+
+    def test_escalation_and_unless(self):
+        rules = compile_rules([
+            make_rule(name='surge', when=[('growth_rate', '>=', 50)],
+                      escalate=[('critical', [('growth_rate', '>', 100)])]),
+            make_rule(name='rapid', severity='medium', unless='surge'),
+        ], {'limit': 20})
+
+        alerts = rules.evaluate(make_table([30.0, 60.0, 150.0]))
+
+        assert [(a['region_id'], a['severity']) for a in alerts] == \
+            [('R0', 'medium'), ('R1', 'high'), ('R2', 'critical')]
+
+    def test_alerts_grouped_by_region_in_rule_order(self):
+        rules = compile_rules([
+            make_rule(name='a', when=[('growth_rate', '>', 0)]),
+            make_rule(name='b', when=[('growth_rate', '>', 5)]),
+        ])
+
+        alerts = rules.evaluate(make_table([10.0, 1.0, 10.0]))
+
+        assert [(a['region_id'], a['title']) for a in alerts] == [
+            ('R0', 'Hot: Region 0'), ('R0', 'Hot: Region 0'),
+            ('R1', 'Hot: Region 1'),
+            ('R2', 'Hot: Region 2'), ('R2', 'Hot: Region 2'),
+        ]
+
+    def test_missing_column(self):
+        rules = compile_rules([make_rule(when=[('doubling_time', '<', 3)])])
+
+        with pytest.raises(ValueError, match='doubling_time'):
+            rules.evaluate(make_table([1.0]))
+
+    def test_numpy_columns_render_as_python(self):
+        rules = compile_rules([make_rule()], {'limit': 0})
+        table = make_table(np.array([1.5]))
+
+        alert = rules.evaluate(table)[0]
+
+        assert type(alert['metrics']['growth_rate']) is float
+
+    def test_thousands_of_regions(self):
+        engine = AlertEngine()
+        n = 5000
+        rng = np.random.default_rng(0)
+        table = MetricsTable({
+            'region_id': [f'R{i}' for i in range(n)],
+            'region_name': [f'Region {i}' for i in range(n)],
+            'growth_rate': rng.uniform(-50, 200, n),
+            'doubling_time': rng.uniform(0.5, 30, n),
+            'daily_velocity': rng.uniform(0, 100, n),
+            'trend': ['growing'] * n,
+            'current_cases': rng.integers(0, 10000, n),
+        })
+
+        start = time.perf_counter()
+        masks = engine.rules.masks(table, group='growth')
+        elapsed = time.perf_counter() - start
+
+        assert masks['surge'].shape == (n,)
+        assert not (masks['surge'] & masks['rapid_growth']).any()
+        assert elapsed < 0.5
+
+
+class TestAlertEngineRules:
+    """AlertEngine behaviour on top of the compiled rules."""
+
+    def test_surge_and_doubling_time(self):
+        engine = AlertEngine()
+        timeseries = [{'date': f'2026-01-0{i + 1}', 'case_count': c}
+                      for i, c in enumerate([10, 10, 10, 40, 40, 40])]
+
+        alerts = engine.generate_growth_alerts('Region A', 'A', timeseries)
+
+        assert [a['alert_type'] for a in alerts] == ['surge_detected', 'rapid_growth']
+        assert alerts[0]['severity'] == 'critical'
+        assert alerts[0]['description'] == \
+            'Cases increased by 300.0% in the last 3 days. Immediate attention required.'
+        assert alerts[0]['metrics'] == {'growth_rate': 300.0, 'current_cases': 40, 'trend': 'rapid_growth'}
+        assert alerts[1]['title'].endswith('Critical Doubling Time: Region A')
+
+    def test_custom_threshold(self):
+        timeseries = [{'date': f'2026-01-0{i + 1}', 'case_count': c}
+                      for i, c in enumerate([10, 10, 10, 13, 13, 13])]
+
+        default = AlertEngine().generate_growth_alerts('A', 'A', timeseries)
+        lowered = AlertEngine(thresholds={'surge_growth_rate': 25}).generate_growth_alerts('A', 'A', timeseries)
+
+        assert [a['alert_type'] for a in default] == ['rapid_growth']
+        assert [a['alert_type'] for a in lowered] == ['surge_detected']
+
+    def test_owned_alert_types_exclude_shared_types(self):
+        rules = AlertEngine().rules
+
+        assert rules.alert_types('capacity') == {'capacity_warning', 'resource_depletion'}
+        assert rules.owned_alert_types('capacity') == {'capacity_warning'}
+        assert rules.owned_alert_types('growth') == {'surge_detected', 'rapid_growth'}
+
+    def test_route_engines_are_compiled_once(self):
+        from app.main import growth_alert_engine
+
+        assert growth_alert_engine(25.0) is growth_alert_engine(25.0)
+        assert growth_alert_engine(25.0).thresholds['surge_growth_rate'] == 25.0
+        assert growth_alert_engine(30.0) is not growth_alert_engine(25.0)
+
+    def test_capacity_alerts_many(self):
+        forecasts = {
+            'A': {'success': True, 'summary': {'max_icu_utilization': 120.0, 'peak_demand_date': '2026-02-01',
+                                               'peak_icu_beds_needed': 60, 'peak_ventilators_needed': 5}},
+            'B': {'success': True, 'summary': {'max_icu_utilization': 85.0, 'peak_date': '2026-02-02',
+                                               'peak_icu_beds_needed': 17, 'peak_ventilators_needed': 1}},
+            'C': {'success': False},
+        }
+        capacities = {'A': {'icu_beds': 50, 'ventilators_available': 10},
+                      'B': {'icu_beds': 20, 'ventilators_available': 0}}
+
+        alerts = AlertEngine().generate_capacity_alerts_many(forecasts, capacities, {'A': 'Alpha'})
+
+        assert [(a['region_id'], a['severity']) for a in alerts] == \
+            [('A', 'critical'), ('B', 'high'), ('B', 'high')]
+        assert alerts[0]['metrics']['gap'] == 10
+        assert alerts[0]['recommendations'][0] == 'URGENT: Procure 10 additional ICU beds before 2026-02-01'
+        assert alerts[0]['region_name'] == 'Alpha'
+        assert alerts[2]['metrics'] == {'peak_ventilators_needed': 1, 'available': 0,
+                                        'gap': 1, 'peak_date': '2026-02-02'}
+
+    def test_oxygen_alerts(self):
+        engine = AlertEngine()
+
+        alerts = engine.generate_resource_depletion_alerts_many({
+            'A': {'oxygen_supply_days': 2},
+            'B': {'oxygen_supply_days': 6},
+            'C': {'oxygen_supply_days': None},
+            'D': {},
+        })
+
+        assert [(a['region_id'], a['severity']) for a in alerts] == [('A', 'critical'), ('B', 'medium')]
+        assert alerts[0]['description'] == 'Oxygen supply will deplete in 2 days at current consumption rate.'
@@ -0,0 +1,150 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import database, alert_scheduler, hospital_regions
+from app.alert_scheduler import AlertScheduler
+from app.alert_state import AlertStateManager
+from app.config import Config
+from app.events import EventLog
+from app.models import predictions
+from app.shared_cache import SharedCache
+from tests.fake_supabase import FakeSupabase
+
+
+def make_rows(region_id, base, growth):
+    today = date.today()
+    return [{
+        'region_type': 'country',
+        'region_id': region_id,
+        'region_name': region_id,
+        'date': (today - timedelta(days=29 - i)).isoformat(),
+        'case_count': int(base * growth ** i),
+    } for i in range(30)]
+
+
+@pytest.fixture
+def env(tmp_path):
+    fake = FakeSupabase({
+        'regional_summary': make_rows('US', 1000, 1.0) + make_rows('IN', 100, 1.3),
+        'hospitals': [{'id': 'h1', 'name': 'H1', 'country': 'US', 'total_beds': 10**6, 'icu_beds': 10**5}],
+        'resources': [{'hospital_id': 'h1', 'date': date.today().isoformat(),
+                       'icu_beds_available': 10**5, 'ventilators_available': 10**6,
+                       'oxygen_supply_days': 30}],
+        'alerts': [],
+    })
+    cache = SharedCache(str(tmp_path / 'cache.sqlite3'))
+    log = EventLog(str(tmp_path / 'events.sqlite3'))
+    manager = AlertStateManager(resolve_after=1)
+
+    with patch.object(database, 'get_supabase_client', return_value=fake), \
+            patch.object(Config, 'SHARED_CACHE_ENABLED', False), \
+            patch.object(predictions, 'PROPHET_AVAILABLE', False), \
+            patch.object(hospital_regions, '_map', None), \
+            patch.object(alert_scheduler, 'get_shared_cache', return_value=cache), \
+            patch.object(alert_scheduler, 'get_event_log', return_value=log), \
+            patch.object(alert_scheduler, 'get_alert_state_manager', return_value=manager), \
+            patch('app.alert_state.get_shared_cache', return_value=cache):
+        yield {'fake': fake, 'cache': cache, 'log': log}
+
+
+class TestAlertScheduler:
+    """Tests for background evaluation and push delivery."""
+
+    def test_run_once_stores_and_publishes(self, env):
+        scheduler = AlertScheduler(webhook_urls=[])
+
+        snapshot = scheduler.run_once()
+
+        assert snapshot['regions_evaluated'] == 2
+        assert {a['region_id'] for a in snapshot['alerts']} == {'IN'}
+        assert snapshot['changes']['new'] == len(snapshot['alerts'])
+        assert env['cache'].get('alert_snapshot', 'latest')['evaluated_at'] == snapshot['evaluated_at']
+
+        events = env['log'].read(0)
+        assert [e['event_type'] for e in events][-1] == 'alerts.evaluated'
+        assert {e['data']['region_id'] for e in events if e['event_type'] == 'alert.new'} == {'IN'}
+        assert len(env['fake'].tables['alerts']) == len(snapshot['alerts'])
+
+    def test_unchanged_data_pushes_nothing_new(self, env):
+        scheduler = AlertScheduler(webhook_urls=['http://localhost/hook'])
+
+        with patch.object(alert_scheduler.requests, 'post') as post:
+            scheduler.run_once()
+            after_first = env['log'].latest_id()
+            second = scheduler.run_once()
+
+        assert second['changes'] == {'new': 0, 'escalated': 0, 'resolved': 0, 'updated': 0}
+        assert [e['event_type'] for e in env['log'].read(after_first)] == ['alerts.evaluated']
+        assert post.call_count == 1
+        assert post.call_args.args[0] == 'http://localhost/hook'
+        assert {a['region_id'] for a in post.call_args.kwargs['json']['new']} == {'IN'}
+
+    def test_webhook_failure_does_not_break_evaluation(self, env):
+        scheduler = AlertScheduler(webhook_urls=['http://localhost/hook'])
+
+        with patch.object(alert_scheduler.requests, 'post',
+                          side_effect=alert_scheduler.requests.ConnectionError('refused')):
+            snapshot = scheduler.run_once()
+
+        assert snapshot['changes']['new'] > 0
+
+    def test_runs_after_data_refresh_only(self, env):
+        scheduler = AlertScheduler(webhook_urls=[], interval_seconds=3600)
+
+        assert scheduler.tick() is not None
+        assert scheduler.tick() is None
+
+        env['cache'].bump_version('regional_summary')
+
+        assert scheduler.tick() is not None
+
+    def test_trigger_forces_run(self, env):
+        scheduler = AlertScheduler(webhook_urls=[], interval_seconds=3600)
+        scheduler.tick()
+
+        scheduler.trigger()
+
+        assert scheduler.tick() is not None
+        assert env['cache'].version('forecast_report')[0] == 1
+
+    def test_only_lease_holder_runs(self, env):
+        scheduler = AlertScheduler(webhook_urls=[])
+        other_owner = SharedCache(env['cache'].path)
+        assert other_owner.acquire_lease(alert_scheduler.LEASE_NAME, seconds=60)
+
+        assert scheduler.tick() is None
+
+    def test_non_leader_consumes_wakeup(self, env):
+        scheduler = AlertScheduler(webhook_urls=[])
+        other_owner = SharedCache(env['cache'].path)
+        assert other_owner.acquire_lease(alert_scheduler.LEASE_NAME, seconds=60)
+
+        scheduler.trigger()
+
+        assert scheduler.tick() is None
+        assert not scheduler._wake.is_set()
+
+    def test_evaluate_endpoint_requires_token(self, env):
+        from app import main
+        client = main.app.test_client()
+
+        with patch.object(Config, 'ALERT_SCHEDULER_ENABLED', False), \
+                patch.object(main, 'get_alert_scheduler', return_value=AlertScheduler(webhook_urls=[])):
+            with patch.object(Config, 'ALERT_EVALUATE_TOKEN', ''):
+                assert client.post('/api/v1/alerts/evaluate').status_code == 404
+            with patch.object(Config, 'ALERT_EVALUATE_TOKEN', 'secret'):
+                assert client.post('/api/v1/alerts/evaluate').status_code == 401
+                assert client.post('/api/v1/alerts/evaluate',
+                                   headers={'Authorization': 'Bearer wrong'}).status_code == 401
+                accepted = client.post('/api/v1/alerts/evaluate', headers={'Authorization': 'Bearer secret'})
+
+        assert accepted.status_code == 202
+        assert env['cache'].version('data_refresh')[0] == 1
@@ -0,0 +1,241 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import database
+from app.alert_state import AlertStateManager, dedupe_alerts
+from tests.fake_supabase import FakeSupabase
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2026, 3, 1, 12, 0, 0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        self.now += timedelta(**kwargs)
+
+
+def alert(region_id='US', alert_type='surge_detected', severity='high', description='Surge'):
+    return {
+        'region_id': region_id,
+        'region_name': region_id,
+        'alert_type': alert_type,
+        'severity': severity,
+        'description': description,
+        'triggered_at': datetime.now().isoformat(),
+    }
+
+
+@pytest.fixture
+def fake():
+    client = FakeSupabase({'alerts': []})
+    with patch.object(database, 'get_supabase_client', return_value=client), \
+            patch('app.alert_state.get_shared_cache', return_value=None):
+        yield client
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def manager(fake, clock):
+    return AlertStateManager(cooldown_seconds=600, resolve_after=2, downgrade_after=2,
+                             sync_seconds=3600, clock=clock)
+
+
+def writes(fake):
+    return [q for q in fake.queries if q.operation in ('insert', 'upsert')]
+
+
+class TestDedupe:
+    def test_keeps_most_severe_per_key(self):
+        alerts = [alert(severity='medium'), alert(severity='critical'), alert(alert_type='rapid_growth')]
+
+        by_key = dedupe_alerts(alerts)
+
+        assert by_key[('US', 'surge_detected')]['severity'] == 'critical'
+        assert len(by_key) == 2
+
+
+class TestAlertStateManager:
+    """Tests for deduplication, hysteresis and persistence."""
+
+    def test_new_alert_is_persisted_once(self, manager, fake, clock):
+        first = manager.process([alert()])
+        clock.advance(minutes=5)
+        second = manager.process([alert(description='Surge (updated)')])
+
+        assert [a['status'] for a in first['alerts']] == ['new']
+        assert len(first['new']) == 1
+        assert second['alerts'][0]['status'] == 'ongoing'
+        assert second['alerts'][0]['alert_id'] == first['alerts'][0]['alert_id'] is not None
+        assert second['alerts'][0]['triggered_at'] == first['alerts'][0]['triggered_at']
+        assert second['writes'] == 0
+        assert len(fake.tables['alerts']) == 1
+        assert len(writes(fake)) == 1
+
+    def test_escalation_is_immediate(self, manager, fake):
+        manager.process([alert(severity='high')])
+        result = manager.process([alert(severity='critical')])
+
+        assert result['alerts'][0]['status'] == 'escalated'
+        assert len(result['escalated']) == 1
+        assert fake.tables['alerts'][0]['severity'] == 'critical'
+
+    def test_downgrade_needs_consecutive_evaluations(self, manager, fake):
+        manager.process([alert(severity='critical')])
+
+        once = manager.process([alert(severity='medium')])
+        twice = manager.process([alert(severity='medium')])
+
+        assert once['alerts'][0]['severity'] == 'critical'
+        assert once['writes'] == 0
+        assert twice['alerts'][0]['severity'] == 'medium'
+        assert twice['alerts'][0]['status'] == 'downgraded'
+        assert fake.tables['alerts'][0]['severity'] == 'medium'
+
+    def test_resolution_needs_consecutive_misses(self, manager, fake):
+        manager.process([alert()])
+
+        once = manager.process([])
+        twice = manager.process([])
+
+        assert [a['status'] for a in once['alerts']] == ['clearing']
+        assert once['resolved'] == []
+        assert twice['alerts'] == []
+        assert len(twice['resolved']) == 1
+        assert fake.tables['alerts'][0]['resolved_at'] is not None
+
+    def test_flapping_alert_is_not_resolved(self, manager, fake):
+        manager.process([alert()])
+        for _ in range(5):
+            manager.process([])
+            manager.process([alert()])
+
+        assert fake.tables['alerts'][0]['resolved_at'] is None
+        assert len(writes(fake)) == 1
+
+    def test_refire_within_cooldown_reopens(self, manager, fake, clock):
+        first = manager.process([alert()])
+        manager.process([])
+        manager.process([])
+        clock.advance(minutes=5)
+
+        result = manager.process([alert()])
+
+        assert result['alerts'][0]['status'] == 'reopened'
+        assert result['new'] == []
+        assert result['alerts'][0]['alert_id'] == first['alerts'][0]['alert_id']
+        assert len(fake.tables['alerts']) == 1
+        assert fake.tables['alerts'][0]['resolved_at'] is None
+
+    def test_refire_after_cooldown_is_new(self, manager, fake, clock):
+        manager.process([alert()])
+        manager.process([])
+        manager.process([])
+        clock.advance(minutes=30)
+
+        result = manager.process([alert()])
+
+        assert len(result['new']) == 1
+        assert len(fake.tables['alerts']) == 2
+
+    def test_out_of_scope_alerts_are_not_cleared(self, manager):
+        manager.process([alert(region_id='US'), alert(region_id='IN', alert_type='capacity_warning')],
+                        regions=['US', 'IN'])
+
+        for _ in range(3):
+            result = manager.process([alert(region_id='US')], alert_types=['surge_detected'])
+
+        assert result['resolved'] == []
+        assert {a['region_id'] for a in manager.active_alerts()} == {'US', 'IN'}
+
+    def test_adopts_active_alerts_from_database(self, fake, clock):
+        fake.tables['alerts'].append({
+            'id': 'existing', 'region_id': 'US', 'alert_type': 'surge_detected',
+            'severity': 'high', 'description': 'Surge', 'triggered_at': '2026-02-28T00:00:00',
+            'resolved_at': None,
+        })
+        manager = AlertStateManager(resolve_after=2, clock=clock)
+
+        result = manager.process([alert()])
+
+        assert result['alerts'][0]['alert_id'] == 'existing'
+        assert result['alerts'][0]['triggered_at'] == '2026-02-28T00:00:00'
+        assert result['new'] == []
+        assert writes(fake) == []
+
+    def test_write_failure_is_retried(self, manager, fake):
+        with patch.object(database, 'insert_alerts', side_effect=RuntimeError('down')):
+            failed = manager.process([alert()])
+
+        retried = manager.process([alert()])
+
+        assert failed['writes'] == 0
+        assert retried['writes'] == 1
+        assert len(fake.tables['alerts']) == 1
+
+    def test_failed_insert_adopts_row_written_elsewhere(self, manager, fake):
+        with patch.object(database, 'insert_alerts', side_effect=RuntimeError('conflict')):
+            manager.process([alert()])
+        # Another worker stored the same active alert meanwhile
+        fake.tables['alerts'].append({
+            'id': 'other', 'region_id': 'US', 'alert_type': 'surge_detected',
+            'severity': 'medium', 'description': 'Surge', 'triggered_at': '2026-02-28T00:00:00',
+            'resolved_at': None,
+        })
+
+        result = manager.process([alert()])
+
+        assert result['writes'] == 1
+        assert [row['id'] for row in fake.tables['alerts']] == ['other']
+        assert fake.tables['alerts'][0]['severity'] == 'high'
+        assert result['alerts'][0]['alert_id'] == 'other'
+
+    def test_one_failed_insert_does_not_drop_the_others(self, manager, fake):
+        real_insert = database.insert_alerts
+
+        def insert(rows):
+            if any(row['region_id'] == 'IN' for row in rows):
+                raise RuntimeError('duplicate key')
+            return real_insert(rows)
+
+        with patch.object(database, 'insert_alerts', side_effect=insert):
+            result = manager.process([alert('US'), alert('IN'), alert('BR')])
+
+        assert result['writes'] == 2
+        assert sorted(row['region_id'] for row in fake.tables['alerts']) == ['BR', 'US']
+
+
+class TestAlertRoutes:
+    def test_repeated_requests_still_track_state(self, tmp_path):
+        from app import main
+        from app.config import Config
+        from app.shared_cache import SharedCache
+        cache = SharedCache(str(tmp_path / 'cache.sqlite3'))
+        fake = FakeSupabase({'regional_summary': [], 'hospitals': [], 'resources': [], 'alerts': []})
+
+        with patch.object(database, 'get_supabase_client', return_value=fake), \
+                patch.object(Config, 'ALERT_SCHEDULER_ENABLED', False), \
+                patch('app.http_cache.get_shared_cache', return_value=cache), \
+                patch('app.shared_cache.get_shared_cache', return_value=cache), \
+                patch.object(main, 'track_alert_state', side_effect=lambda alerts, *a: alerts) as track:
+            client = main.app.test_client()
+            for path in ('/api/v1/alerts/growth', '/api/v1/alerts/capacity'):
+                first = client.get(path)
+                second = client.get(path, headers={'If-None-Match': first.headers.get('ETag', '')})
+                assert second.status_code == 200
+
+        assert track.call_count == 4
@@ -9,7 +9,11 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from app.api_client import get_prediction, check_model_health, ModelAPIError
+from app import api_client
+from app.api_client import (
+    get_prediction, get_predictions_batch, check_model_health, plan_batches, ModelAPIError
+)
+from app.config import Config
 
 
 class TestCheckModelHealth:
@@ -129,3 +133,105 @@ class TestGetPrediction:
             get_prediction(self.create_mock_file())
         
         assert 'Model failed to process image' in str(exc_info.value)
+
+
+def image(name, size=1000):
+    f = BytesIO(b'x' * size)
+    f.filename = name
+    f.content_type = 'image/png'
+    return f
+
+
+def json_response(status_code, payload):
+    resp = Mock(status_code=status_code, headers={})
+    resp.json.return_value = payload
+    return resp
+
+
+def sent_files(call):
+    """(field, filename, bytes) of each part of a mocked multipart requests.post call."""
+    from werkzeug.formparser import parse_form_data
+    body = call.kwargs['data']
+    payload = body.read()
+    assert len(payload) == len(body)
+    _, _, files = parse_form_data({
+        'wsgi.input': BytesIO(payload), 'REQUEST_METHOD': 'POST',
+        'CONTENT_TYPE': call.kwargs['headers']['Content-Type'], 'CONTENT_LENGTH': str(len(payload)),
+    })
+    return [(field, f.filename, f.read()) for field, f in files.items(multi=True)]
+
+
+def prediction(label='NORMAL', **extra):
+    return {'prediction': label, 'confidence': 0.9, **extra}
+
+
+@pytest.fixture
+def batch_config():
+    with patch.object(Config, 'MODEL_API_URL', 'http://api.test/predict'), \
+            patch.object(Config, 'MODEL_API_BATCH_URL', ''), \
+            patch.object(Config, 'MODEL_API_KEY', ''), \
+            patch.object(Config, 'MODEL_API_BATCH_SIZE', 3), \
+            patch.object(Config, 'MODEL_API_BATCH_MAX_BYTES', 10000), \
+            patch.object(Config, 'METRICS_ENABLED', False), \
+            patch.object(api_client, '_batch_unsupported_until', 0.0):
+        yield
+
+
+class TestGetPredictionsBatch:
+    """Tests for the batch prediction client."""
+
+    def test_plan_respects_count_and_bytes(self):
+        assert plan_batches([1] * 7, max_files=3, max_bytes=100) == [[0, 1, 2], [3, 4, 5], [6]]
+        assert plan_batches([60, 30, 20, 500, 10], max_files=10, max_bytes=100) == [[0, 1], [2], [3], [4]]
+
+    @patch('app.api_client.requests.post')
+    def test_results_map_back_in_order(self, mock_post, batch_config):
+        mock_post.side_effect = [
+            json_response(200, {'model_version': 'v2', 'predictions': [
+                prediction('NORMAL'), {'error': 'unreadable image'}, prediction('PNEUMONIA', model_version='v3'),
+            ]}),
+            json_response(200, prediction('PNEUMONIA')),
+        ]
+
+        results = get_predictions_batch([image(f'{i}.png') for i in range(4)])
+
+        assert mock_post.call_count == 2
+        assert mock_post.call_args_list[0].args[0] == 'http://api.test/predict/batch'
+        assert [name for field, name, _ in sent_files(mock_post.call_args_list[0])
+                if field == 'images'] == ['0.png', '1.png', '2.png']
+        assert results[0]['model_version'] == 'v2'
+        assert isinstance(results[1], ModelAPIError) and 'unreadable' in str(results[1])
+        assert results[2]['model_version'] == 'v3'
+        assert results[3]['prediction'] == 'PNEUMONIA'
+        assert mock_post.call_args_list[1].args[0] == 'http://api.test/predict'
+
+    @patch('app.api_client.requests.post')
+    def test_falls_back_when_batching_unsupported(self, mock_post, batch_config):
+        mock_post.side_effect = [json_response(404, {'error': 'Not found'})] + \
+            [json_response(200, prediction()) for _ in range(5)]
+
+        first = get_predictions_batch([image('a.png'), image('b.png')])
+        second = get_predictions_batch([image('c.png'), image('d.png'), image('e.png')])
+
+        assert all(r['prediction'] == 'NORMAL' for r in first + second)
+        urls = [c.args[0] for c in mock_post.call_args_list]
+        assert urls == ['http://api.test/predict/batch'] + ['http://api.test/predict'] * 5
+
+    @patch('app.api_client.requests.post')
+    def test_payload_too_large_falls_back_for_that_batch_only(self, mock_post, batch_config):
+        mock_post.side_effect = [json_response(413, {}), json_response(200, prediction()),
+                                 json_response(200, prediction())]
+
+        get_predictions_batch([image('a.png'), image('b.png')])
+
+        assert api_client.batching_available()
+
+    @patch('app.api_client.requests.post')
+    def test_batch_failure_marks_each_file(self, mock_post, batch_config):
+        import requests
+        mock_post.side_effect = requests.Timeout()
+
+        results = get_predictions_batch([image('a.png'), image('b.png')])
+
+        assert mock_post.call_count == 1
+        assert all(isinstance(r, ModelAPIError) and 'longer than expected' in str(r) for r in results)
@@ -0,0 +1,107 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import gzip
+import pytest
+from flask import Flask, jsonify
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import compression
+from app.compression import (
+    register_compression, to_columnar, from_columnar, columnar_forecast_report
+)
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    register_compression(app)
+
+    @app.route('/big')
+    def big():
+        return jsonify([{'date': f'2026-01-{i % 28 + 1:02d}', 'predicted_cases': i} for i in range(500)])
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    return app.test_client()
+
+
+class TestCompression:
+    """Tests for Accept-Encoding negotiation."""
+
+    def test_gzip_when_accepted(self, client):
+        with patch.object(compression, 'BROTLI_AVAILABLE', False):
+            resp = client.get('/big', headers={'Accept-Encoding': 'gzip, br'})
+
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in resp.headers['Vary']
+        body = gzip.decompress(resp.data)
+        assert body.startswith(b'[{')
+        assert int(resp.headers['Content-Length']) == len(resp.data)
+
+    def test_identity_when_not_accepted(self, client):
+        resp = client.get('/big', headers={'Accept-Encoding': 'identity'})
+
+        assert 'Content-Encoding' not in resp.headers
+        assert resp.get_json()[0]['predicted_cases'] == 0
+
+    def test_small_bodies_not_compressed(self, client):
+        resp = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in resp.headers
+
+    @pytest.mark.skipif(not compression.BROTLI_AVAILABLE, reason='brotli not installed')
+    def test_brotli_preferred_when_available(self, client):
+        resp = client.get('/big', headers={'Accept-Encoding': 'gzip, br'})
+
+        assert resp.headers['Content-Encoding'] == 'br'
+
+
+class TestColumnar:
+    """Tests for the columnar JSON shape."""
+
+    def test_round_trip(self):
+        rows = [{'date': '2026-01-01', 'cases': 1}, {'date': '2026-01-02', 'cases': 2}]
+
+        payload = to_columnar(rows)
+
+        assert payload['fields'] == ['date', 'cases']
+        assert payload['columns']['cases'] == [1, 2]
+        assert payload['length'] == 2
+        assert from_columnar(payload) == rows
+
+    def test_missing_fields_become_none(self):
+        payload = to_columnar([{'a': 1}, {'a': 2, 'b': 3}])
+
+        assert payload['columns']['b'] == [None, 3]
+
+    def test_forecast_report(self):
+        report = {
+            'success': True,
+            'case_forecast': [{'date': '2026-01-01', 'predicted_cases': 5}],
+            'resource_forecast': {
+                'success': True,
+                'timeline': [{'date': '2026-01-01', 'icu_beds_needed': 1}],
+                'summary': {'peak_cases': 5},
+            },
+        }
+
+        compact = columnar_forecast_report(report)
+
+        assert compact['format'] == 'columnar'
+        assert compact['case_forecast']['columns']['predicted_cases'] == [5]
+        assert compact['resource_forecast']['timeline']['columns']['icu_beds_needed'] == [1]
+        assert compact['resource_forecast']['summary'] == {'peak_cases': 5}
+        # The original report is left untouched
+        assert isinstance(report['case_forecast'], list)
+
+    def test_failed_report_passes_through(self):
+        report = {'success': False, 'error': 'x'}
+
+        assert columnar_forecast_report(report) is report
@@ -0,0 +1,129 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import database
+from app.database import (
+    get_global_stats, get_hospital_stats, get_regional_timeseries,
+    get_hospital_timeseries, get_resource_timeseries
+)
+from tests.fake_supabase import FakeSupabase
+
+
+def make_regional_rows(days=60, region_id='US', region_type='country'):
+    today = date.today()
+    return [{
+        'region_type': region_type,
+        'region_id': region_id,
+        'region_name': region_id,
+        'date': (today - timedelta(days=i)).isoformat(),
+        'case_count': 100 + i,
+        'normal_count': 80,
+        'pneumonia_count': 15,
+        'severe_count': 5,
+        'deaths': 1,
+    } for i in range(days)]
+
+
+def make_case_rows(days=60, hospital_id='h1'):
+    today = date.today()
+    return [{
+        'hospital_id': hospital_id,
+        'date': (today - timedelta(days=i)).isoformat(),
+        'case_count': 10,
+        'normal_count': 8,
+        'pneumonia_count': 2,
+        'severe_count': 1,
+        'deaths': 0,
+        'avg_confidence': 0.9,
+    } for i in range(days)]
+
+
+@pytest.fixture
+def fake_db():
+    fake = FakeSupabase({
+        'regional_summary': make_regional_rows(),
+        'case_summary': make_case_rows(),
+        'resources': [{
+            'hospital_id': 'h1',
+            'date': (date.today() - timedelta(days=i)).isoformat(),
+            'icu_beds_available': 5,
+        } for i in range(60)],
+    })
+    with patch.object(database, 'get_supabase_client', return_value=fake), \
+            patch.object(database.Config, 'SHARED_CACHE_ENABLED', False):
+        yield fake
+
+
+class TestDateBounds:
+    """Tests for the date window helper."""
+
+    def test_days_window_ends_today(self):
+        start, end = database._date_bounds(days=7)
+        assert end == date.today().isoformat()
+        assert start == (date.today() - timedelta(days=6)).isoformat()
+
+    def test_explicit_range_overrides_days(self):
+        start, end = database._date_bounds(days=30, start_date='2026-01-01', end_date='2026-01-10')
+        assert (start, end) == ('2026-01-01', '2026-01-10')
+
+    def test_accepts_date_objects(self):
+        start, end = database._date_bounds(start_date=date(2026, 1, 1), end_date=date(2026, 1, 2))
+        assert (start, end) == ('2026-01-01', '2026-01-02')
+
+    def test_rejects_inverted_range(self):
+        with pytest.raises(ValueError):
+            database._date_bounds(start_date='2026-02-01', end_date='2026-01-01')
+
+
+class TestDateWindowQueries:
+    """Only rows inside the requested window should leave the database."""
+
+    def test_regional_timeseries_transfers_only_window(self, fake_db):
+        rows = get_regional_timeseries(region_id='US', days=30)
+
+        assert len(rows) == 30  # today plus the 29 previous days
+        assert fake_db.rows_returned == 30
+        assert rows[0]['date'] == (date.today() - timedelta(days=29)).isoformat()
+
+    def test_regional_timeseries_explicit_range(self, fake_db):
+        start = date.today() - timedelta(days=20)
+        end = date.today() - timedelta(days=11)
+
+        rows = get_regional_timeseries(region_id='US', start_date=start, end_date=end)
+
+        assert len(rows) == 10
+        assert fake_db.rows_returned == 10
+        assert rows[0]['date'] == start.isoformat()
+        assert rows[-1]['date'] == end.isoformat()
+
+    def test_filters_are_sent_as_iso_dates(self, fake_db):
+        get_hospital_timeseries(hospital_id='h1', days=7)
+
+        date_filters = [f for f in fake_db.queries[-1].filters if f[1] == 'date']
+        assert ('gte', 'date', (date.today() - timedelta(days=6)).isoformat()) in date_filters
+        assert ('lte', 'date', date.today().isoformat()) in date_filters
+
+    def test_global_stats_aggregates_window(self, fake_db):
+        stats = get_global_stats(days=1)
+
+        assert fake_db.rows_returned == 1
+        assert stats['case_count'] == 100  # today's row only
+
+    def test_hospital_stats_aggregates_window(self, fake_db):
+        stats = get_hospital_stats('h1', days=6)
+
+        assert stats['case_count'] == 60
+        assert fake_db.rows_returned == 6
+
+    def test_resource_timeseries_window(self, fake_db):
+        rows = get_resource_timeseries(hospital_id='h1', days=3)
+
+        assert len(rows) == 3
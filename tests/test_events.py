@@ -0,0 +1,69 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import threading
+import time
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.events import EventLog, format_sse
+
+
+@pytest.fixture
+def log(tmp_path):
+    return EventLog(str(tmp_path / 'events.sqlite3'), poll_interval=0.05)
+
+
+class TestEventLog:
+    """Tests for the cross-process event log."""
+
+    def test_publish_and_read_after_id(self, log):
+        first = log.publish('alerts', 'alert.new', {'region_id': 'US'})
+        second = log.publish('alerts', 'alert.resolved', {'region_id': 'IN'})
+
+        assert second > first
+        assert [e['event_type'] for e in log.read(0)] == ['alert.new', 'alert.resolved']
+        assert [e['data'] for e in log.read(first)] == [{'region_id': 'IN'}]
+        assert log.latest_id() == second
+
+    def test_topic_filter(self, log):
+        log.publish('alerts', 'alert.new', {})
+        log.publish('live', 'region.changed', {})
+
+        assert [e['topic'] for e in log.read(0, topics=['live'])] == ['live']
+
+    def test_visible_to_other_instances(self, log):
+        other = EventLog(log.path)
+
+        log.publish('alerts', 'alert.new', {'n': 1})
+
+        assert other.read(0)[0]['data'] == {'n': 1}
+
+    def test_wait_wakes_on_publish(self, log):
+        threading.Timer(0.05, log.publish, args=('alerts', 'alert.new', {})).start()
+
+        start = time.monotonic()
+        events = log.wait(0, timeout=5)
+
+        assert len(events) == 1
+        assert time.monotonic() - start < 2
+
+    def test_wait_times_out(self, log):
+        assert log.wait(log.latest_id(), timeout=0.1) == []
+
+    def test_prune_keeps_max_events(self, tmp_path):
+        log = EventLog(str(tmp_path / 'small.sqlite3'), max_events=3)
+        for i in range(5):
+            log.publish('alerts', 'alert.new', {'i': i})
+
+        log.prune()
+
+        assert [e['data']['i'] for e in log.read(0)] == [2, 3, 4]
+
+    def test_format_sse(self):
+        frame = format_sse({'id': 7, 'event_type': 'alert.new', 'data': {'a': 1}})
+
+        assert frame == 'id: 7\nevent: alert.new\ndata: {"a":1}\n\n'
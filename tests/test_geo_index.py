@@ -0,0 +1,130 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import random
+import pytest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import database, geo_index
+from app.config import Config
+from app.geo_index import GeoIndex, haversine_km, parse_bbox
+from tests.fake_supabase import FakeSupabase
+
+
+def place(name, lat, lon, **extra):
+    return {'id': name, 'name': name, 'latitude': lat, 'longitude': lon, **extra}
+
+
+@pytest.fixture
+def random_points():
+    rng = random.Random(7)
+    return [place(f'p{i}', rng.uniform(-80, 80), rng.uniform(-180, 180)) for i in range(500)]
+
+
+class TestGeoIndex:
+    """Tests for bounding-box and nearest-neighbour queries."""
+
+    def test_bbox_matches_brute_force(self, random_points):
+        index = GeoIndex(random_points, cell_degrees=5)
+        bbox = (-20.5, 10.0, 45.2, 60.0)
+
+        found = {r['id'] for r in index.within(bbox)}
+
+        expected = {r['id'] for r in random_points
+                    if 10 <= r['latitude'] <= 60 and -20.5 <= r['longitude'] <= 45.2}
+        assert found == expected
+
+    def test_bbox_across_antimeridian(self):
+        index = GeoIndex([place('fiji', -17.7, 178.0), place('samoa', -13.8, -172.1),
+                          place('sydney', -33.9, 151.2)])
+
+        found = {r['id'] for r in index.within((170, -20, -170, -10))}
+
+        assert found == {'fiji', 'samoa'}
+
+    def test_bbox_limit_keeps_largest(self):
+        index = GeoIndex([place('a', 1, 1, case_count=5), place('b', 1, 2, case_count=50),
+                          place('c', 2, 1, case_count=20)])
+
+        assert [r['id'] for r in index.within((0, 0, 3, 3), limit=2, sort_by='case_count')] == ['b', 'c']
+
+    def test_nearest_matches_brute_force(self, random_points):
+        index = GeoIndex(random_points, cell_degrees=2)
+        rng = random.Random(3)
+
+        for _ in range(20):
+            lat, lon = rng.uniform(-85, 85), rng.uniform(-180, 180)
+            found = [r['id'] for r in index.nearest(lat, lon, k=5)]
+            expected = sorted(random_points,
+                              key=lambda r: haversine_km(lat, lon, r['latitude'], r['longitude']))[:5]
+            assert found == [r['id'] for r in expected]
+
+    def test_nearest_wraps_longitude(self):
+        index = GeoIndex([place('east', 0, 179.5), place('far', 0, 150)], cell_degrees=1)
+
+        result = index.nearest(0, -179.5, k=1)
+
+        assert result[0]['id'] == 'east'
+        assert result[0]['distance_km'] == pytest.approx(111.2, abs=0.5)
+
+    def test_nearest_max_km_and_small_index(self):
+        index = GeoIndex([place('mumbai', 19.07, 72.87), place('delhi', 28.61, 77.21)])
+
+        assert [r['id'] for r in index.nearest(19.0, 72.8, k=5)] == ['mumbai', 'delhi']
+        assert [r['id'] for r in index.nearest(19.0, 72.8, k=5, max_km=100)] == ['mumbai']
+
+    def test_rows_without_coordinates_are_skipped(self):
+        index = GeoIndex([place('a', None, 1), place('b', '12.5', '77.5'), {'id': 'c'}])
+
+        assert len(index) == 1
+
+    def test_parse_bbox(self):
+        assert parse_bbox('-10,20,30,40') == (-10, 20, 30, 40)
+        with pytest.raises(ValueError):
+            parse_bbox('1,2,3')
+        with pytest.raises(ValueError):
+            parse_bbox('0,50,10,40')
+
+
+class TestGeoEndpoints:
+    @pytest.fixture
+    def client(self):
+        from app.main import app
+        fake = FakeSupabase({
+            'hospitals': [place('h1', 19.07, 72.87), place('h2', 28.61, 77.21), place('h3', 40.71, -74.0)],
+            'regional_summary': [
+                place('IN-MH-MUM', 19.07, 72.87, region_type='city', region_id='IN-MH-MUM',
+                      date='2026-03-01', case_count=400),
+                place('NYC', 40.71, -74.0, region_type='city', region_id='NYC',
+                      date='2026-03-01', case_count=90),
+            ],
+        })
+        with patch.object(database, 'get_supabase_client', return_value=fake), \
+                patch.object(Config, 'SHARED_CACHE_ENABLED', False), \
+                patch.object(Config, 'ALERT_SCHEDULER_ENABLED', False), \
+                patch.object(geo_index, '_layers', {}):
+            yield app.test_client()
+
+    def test_viewport_returns_visible_features(self, client):
+        response = client.get('/api/v1/geo/hospitals?bbox=60,5,100,35')
+
+        assert {h['id'] for h in response.get_json()['hospitals']} == {'h1', 'h2'}
+
+    def test_regions_by_level(self, client):
+        response = client.get('/api/v1/geo/regions?region_type=city&bbox=-80,30,-60,50')
+
+        assert [r['region_id'] for r in response.get_json()['regions']] == ['NYC']
+
+    def test_nearest(self, client):
+        response = client.get('/api/v1/geo/hospitals/nearest?lat=19&lon=73&k=2')
+
+        assert [h['id'] for h in response.get_json()['hospitals']] == ['h1', 'h2']
+
+    def test_bad_requests(self, client):
+        assert client.get('/api/v1/geo/hospitals').status_code == 400
+        assert client.get('/api/v1/geo/regions?region_type=planet&bbox=0,0,1,1').status_code == 400
+        assert client.get('/api/v1/geo/hospitals/nearest?lat=100&lon=0').status_code == 400
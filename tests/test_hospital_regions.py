@@ -0,0 +1,120 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import database, hospital_regions
+from app.config import Config
+from app.hospital_regions import RegionCapacityMap
+from app.models import predictions
+from tests.fake_supabase import FakeSupabase
+
+
+def hospital(hospital_id, city, state, country, lat, lon, beds, icu, icu_available=None, oxygen=None):
+    """A hospitals row and its latest resources row (or None), as stored."""
+    row = {'id': hospital_id, 'name': hospital_id, 'city': city, 'state': state, 'country': country,
+           'latitude': lat, 'longitude': lon, 'registration_number': f'REG-{hospital_id}',
+           'total_beds': beds, 'icu_beds': icu}
+    resources = None
+    if icu_available is not None:
+        resources = {'hospital_id': hospital_id, 'date': date.today().isoformat(),
+                     'icu_beds_available': icu_available, 'ventilators_available': 5,
+                     'oxygen_supply_days': oxygen, 'staff_available': 50}
+    return row, resources
+
+
+def capacity_rows(*hospitals):
+    """Hospitals as get_current_hospital_capacity() returns them, with only its selected columns."""
+    fake = FakeSupabase({'hospitals': [row for row, _ in hospitals],
+                         'resources': [res for _, res in hospitals if res]})
+    with patch.object(database, 'get_supabase_client', return_value=fake):
+        return database.get_current_hospital_capacity.uncached()
+
+
+def region(region_type, region_id, name, lat, lon):
+    return {'region_type': region_type, 'region_id': region_id, 'region_name': name,
+            'latitude': lat, 'longitude': lon}
+
+
+STORED_HOSPITALS = [
+    hospital('sinai', 'New York', 'NY', 'USA', 40.79, -73.98, 150, 30, icu_available=10, oxygen=4),
+    hospital('ucla', 'Los Angeles', 'CA', 'USA', 34.07, -118.24, 200, 40, icu_available=40, oxygen=9),
+    hospital('apollo', 'Mumbai', 'MH', 'India', 19.11, 72.87, 400, 80),
+]
+HOSPITALS = capacity_rows(*STORED_HOSPITALS)
+
+REGIONS = {
+    'country': [region('country', 'US', 'United States', 37.09, -95.71),
+                region('country', 'IN', 'India', 20.59, 78.96)],
+    'state': [region('state', 'IN-MH', 'Maharashtra', 19.75, 75.71)],
+    'city': [region('city', 'NYC', 'New York City', 40.71, -74.0),
+             region('city', 'LA', 'Los Angeles', 34.05, -118.24)],
+}
+
+
+class TestRegionCapacityMap:
+    """Tests for mapping hospitals to regions."""
+
+    def test_country_totals_only_include_local_hospitals(self):
+        mapping = RegionCapacityMap(HOSPITALS, REGIONS)
+
+        us = mapping.get('country', 'US')
+        assert us['hospital_count'] == 2
+        assert us['capacity']['icu_beds'] == 70
+        assert us['occupancy']['icu_beds_occupied'] == 20
+        assert us['resource_status']['oxygen_supply_days'] == 4
+        assert mapping.get('country', 'IN')['capacity']['total_beds'] == 400
+
+    def test_capacity_query_returns_coordinates(self):
+        assert [(h['latitude'], h['longitude']) for h in HOSPITALS][0] == (40.79, -73.98)
+
+    def test_state_matches_id_suffix(self):
+        mapping = RegionCapacityMap(HOSPITALS, REGIONS)
+
+        assert [h['id'] for h in mapping.hospitals('state', 'IN-MH')] == ['apollo']
+
+    def test_city_by_name_or_distance(self):
+        mapping = RegionCapacityMap(HOSPITALS, REGIONS)
+
+        assert [h['id'] for h in mapping.hospitals('city', 'LA')] == ['ucla']
+        assert [h['id'] for h in mapping.hospitals('city', 'NYC')] == ['sinai']
+
+    def test_far_hospitals_are_not_mapped(self):
+        mapping = RegionCapacityMap(
+            capacity_rows(hospital('remote', 'Nowhere', '', '', 10.0, 10.0, 10, 1)),
+            {'city': REGIONS['city']}
+        )
+
+        assert mapping.get('city', 'NYC') is None
+        assert mapping.get('city', 'LA') is None
+
+
+class TestRegionalPredictions:
+    def test_forecast_uses_local_capacity(self):
+        today = date.today()
+        rows = [{'region_type': 'country', 'region_id': 'IN', 'region_name': 'India',
+                 'latitude': 20.59, 'longitude': 78.96,
+                 'date': (today - timedelta(days=29 - i)).isoformat(), 'case_count': 1000 + 10 * i}
+                for i in range(30)]
+        fake = FakeSupabase({
+            'regional_summary': rows,
+            'hospitals': [row for row, _ in STORED_HOSPITALS],
+            'resources': [],
+        })
+
+        from app import main
+        with patch.object(main, 'generate_forecast_report', wraps=main.generate_forecast_report) as report_fn, \
+                patch.object(database, 'get_supabase_client', return_value=fake), \
+                patch.object(Config, 'SHARED_CACHE_ENABLED', False), \
+                patch.object(Config, 'ALERT_SCHEDULER_ENABLED', False), \
+                patch.object(predictions, 'PROPHET_AVAILABLE', False), \
+                patch.object(hospital_regions, '_map', None):
+            report = main.app.test_client().get('/api/v1/predictions/region/IN').get_json()
+
+        assert report['hospitals_in_region'] == 1
+        assert report_fn.call_args.kwargs['current_capacity']['icu_beds'] == 80
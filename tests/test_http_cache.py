@@ -0,0 +1,110 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+from flask import Flask, jsonify
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.http_cache import conditional_get, cache_control_for
+from app.shared_cache import SharedCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedCache(str(tmp_path / 'cache.sqlite3'))
+
+
+@pytest.fixture
+def client(cache):
+    app = Flask(__name__)
+    app.view_calls = 0
+
+    @app.route('/stats')
+    @conditional_get(families=('regional_summary',), max_age=45)
+    def stats():
+        app.view_calls += 1
+        return jsonify({'case_count': 10})
+
+    @app.route('/missing')
+    @conditional_get(families=('regional_summary',))
+    def missing():
+        app.view_calls += 1
+        return jsonify({'error': 'not found'}), 404
+
+    with patch('app.http_cache.get_shared_cache', return_value=cache):
+        yield app.test_client()
+
+
+class TestConditionalGet:
+    """Tests for ETag / 304 handling."""
+
+    def test_sets_validators(self, client):
+        resp = client.get('/stats')
+
+        assert resp.status_code == 200
+        assert resp.headers['ETag'].startswith('W/"regional_summary0-')
+        assert 'Last-Modified' in resp.headers
+        assert resp.headers['Cache-Control'] == 'public, max-age=45, must-revalidate'
+
+    def test_if_none_match_returns_304_without_running_view(self, client):
+        first = client.get('/stats')
+        calls = client.application.view_calls
+
+        second = client.get('/stats', headers={'If-None-Match': first.headers['ETag']})
+
+        assert second.status_code == 304
+        assert second.data == b''
+        assert client.application.view_calls == calls
+
+    def test_stale_etag_gets_full_body(self, client):
+        resp = client.get('/stats', headers={'If-None-Match': 'W/"something-else"'})
+
+        assert resp.status_code == 200
+        assert resp.get_json() == {'case_count': 10}
+
+    def test_repeat_requests_served_from_cache(self, client):
+        client.get('/stats')
+        client.get('/stats')
+
+        assert client.application.view_calls == 1
+
+    def test_version_bump_changes_etag(self, client, cache):
+        first = client.get('/stats')
+        cache.bump_version('regional_summary')
+
+        second = client.get('/stats', headers={'If-None-Match': first.headers['ETag']})
+
+        assert second.status_code == 200
+        assert second.headers['ETag'] != first.headers['ETag']
+        assert client.application.view_calls == 2
+
+    def test_query_string_is_part_of_key(self, client):
+        client.get('/stats?days=1')
+        client.get('/stats?days=7')
+
+        assert client.application.view_calls == 2
+
+    def test_errors_are_not_cached(self, client):
+        client.get('/missing')
+        resp = client.get('/missing')
+
+        assert resp.status_code == 404
+        assert 'ETag' not in resp.headers
+        assert client.application.view_calls == 2
+
+
+class TestCacheControl:
+    """Tests for per-endpoint Cache-Control configuration."""
+
+    @patch('app.http_cache.Config')
+    def test_override_by_endpoint(self, mock_config):
+        mock_config.HTTP_CACHE_CONTROL_OVERRIDES = 'api_alerts=no-cache;api_global_stats=public, max-age=120'
+        mock_config.HTTP_CACHE_MAX_AGE = 30
+
+        assert cache_control_for('api_alerts') == 'no-cache'
+        assert cache_control_for('api_global_stats') == 'public, max-age=120'
+        assert cache_control_for('api_regional_data') == 'public, max-age=30, must-revalidate'
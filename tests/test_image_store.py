@@ -0,0 +1,169 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import base64
+import os
+import time
+import pytest
+from io import BytesIO
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import image_store
+from app.config import Config
+from app.image_store import ImageStore
+from tests.fake_images import jpeg_bytes, png_bytes
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ImageStore(str(tmp_path / 'images'), ttl_seconds=3600, fsync=False)
+
+
+def age(store, key, seconds):
+    then = time.time() - seconds
+    os.utime(store.path(key), (then, then))
+
+
+class TestImageStore:
+    """Tests for content-addressed storage, reads and retention."""
+
+    def test_identical_content_is_stored_once(self, store):
+        image = BytesIO(png_bytes(64, 64))
+        image.read(5)
+
+        first = store.put(image, 'png')
+        second = store.put_bytes(png_bytes(64, 64), 'png')
+
+        assert first == second
+        assert image.tell() == 0
+        assert store.path(first).endswith(os.path.join(first[:2], first[2:4], first))
+        assert list(store.iter_keys()) == [first]
+        assert (store.stored, store.deduplicated) == (1, 1)
+
+    def test_mapped_read(self, store):
+        key = store.put_bytes(jpeg_bytes(), 'jpg')
+
+        with store.mapped(key) as data:
+            assert bytes(data[:2]) == b'\xff\xd8'
+            assert data.nbytes == len(jpeg_bytes())
+
+    def test_failed_write_leaves_nothing_behind(self, store):
+        class Broken(BytesIO):
+            reads = 0
+
+            def read(self, size=-1):
+                self.reads += 1
+                if self.reads > 2:  # fail while copying, after hashing succeeded
+                    raise OSError('disk full')
+                return super().read(size)
+
+        with pytest.raises(OSError):
+            store.put(Broken(png_bytes()), 'png')
+
+        assert list(store.iter_keys()) == []
+        assert os.listdir(os.path.join(store.root, 'tmp')) == []
+
+    def test_rejects_bad_keys(self, store):
+        with pytest.raises(ValueError):
+            store.path('../../etc/passwd')
+        assert not store.exists('a' * 64 + '.gif')
+
+    def test_gc_removes_unreferenced_objects(self, store):
+        old = store.put_bytes(png_bytes(1, 1), 'png')
+        fresh = store.put_bytes(png_bytes(2, 2), 'png')
+        age(store, old, 7200)
+        stale_temp = os.path.join(store.root, 'tmp', 'crashed.part')
+        open(stale_temp, 'wb').close()
+        os.utime(stale_temp, (0, 0))
+
+        result = store.collect_garbage()
+
+        assert result == {'removed': 1, 'kept': 1, 'bytes_freed': len(png_bytes(1, 1))}
+        assert not store.exists(old) and store.exists(fresh)
+        assert not os.path.exists(os.path.dirname(store.path(old)))
+        assert not os.path.exists(stale_temp)
+
+    def test_put_refreshes_retention(self, store):
+        key = store.put_bytes(png_bytes(), 'png')
+        age(store, key, 7200)
+
+        store.put_bytes(png_bytes(), 'png')
+
+        assert store.collect_garbage()['removed'] == 0
+
+    def test_gc_keeps_object_referenced_during_collection(self, store):
+        key = store.put_bytes(png_bytes(), 'png')
+        age(store, key, 7200)
+        real_rename = os.rename
+
+        def rename_then_touch(src, dst):
+            # A concurrent put() refreshed the object just before it was moved aside
+            os.utime(src)
+            real_rename(src, dst)
+
+        with patch.object(image_store.os, 'rename', rename_then_touch):
+            result = store.collect_garbage()
+
+        assert result['removed'] == 0 and store.exists(key)
+
+    def test_zero_ttl_keeps_everything(self, tmp_path):
+        store = ImageStore(str(tmp_path), ttl_seconds=0, fsync=False)
+        key = store.put_bytes(png_bytes(), 'png')
+        age(store, key, 10 ** 8)
+
+        assert store.collect_garbage()['removed'] == 0
+
+
+class TestImageRoutes:
+    @pytest.fixture
+    def client(self, store):
+        from app.main import app
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['hospital_id'] = 'h1'
+        with patch.object(image_store, '_store', store), \
+                patch.object(Config, 'IMAGE_STORE_ENABLED', True), \
+                patch.object(Config, 'ALERT_SCHEDULER_ENABLED', False):
+            yield client
+
+    def upload(self, client, data):
+        return client.post('/hospital/upload', content_type='multipart/form-data',
+                           data={'images': [(BytesIO(data), 'scan.png')]})
+
+    def test_upload_stores_image_and_heatmap(self, client, store):
+        heatmap = png_bytes(8, 8, body=b'heat')
+        prediction = {'prediction': 'NORMAL', 'confidence': 0.9, 'heatmap': base64.b64encode(heatmap).decode()}
+
+        with patch('app.main.predict_images', return_value=[prediction]):
+            result = self.upload(client, png_bytes()).get_json()['results'][0]
+        image = client.get(result['image_url'])
+
+        assert image.status_code == 200
+        assert image.data == png_bytes() and image.mimetype == 'image/png'
+        assert 'private' in image.headers['Cache-Control'] and 'immutable' in image.headers['Cache-Control']
+        assert client.get(result['heatmap_url']).data == heatmap
+
+        revalidated = client.get(result['image_url'], headers={'If-None-Match': image.headers['ETag']})
+        assert revalidated.status_code == 304
+
+    def test_uploads_from_two_hospitals_share_one_object(self, client, store):
+        with patch.object(Config, 'MODEL_API_URL', ''):
+            first = self.upload(client, png_bytes()).get_json()['results'][0]
+            with client.session_transaction() as session:
+                session['hospital_id'] = 'h2'
+            second = self.upload(client, png_bytes()).get_json()['results'][0]
+
+        assert first['image_url'] == second['image_url']
+        assert len(list(store.iter_keys())) == 1
+
+    def test_requires_session_and_valid_key(self, client, store):
+        key = store.put_bytes(png_bytes(), 'png')
+
+        assert client.get('/hospital/images/not-a-key').status_code == 404
+        assert client.get(f'/hospital/images/{"0" * 64}.png').status_code == 404
+        with client.session_transaction() as session:
+            session.clear()
+        assert client.get(f'/hospital/images/{key}').status_code == 401
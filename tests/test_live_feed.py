@@ -0,0 +1,118 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import live_feed
+from app.live_feed import LiveFeed, diff_regions, replay_start, wants_event
+from app.events import EventLog
+
+
+def region(region_id, cases):
+    return {'region_id': region_id, 'region_name': region_id, 'date': '2026-03-01', 'case_count': cases}
+
+
+@pytest.fixture
+def env(tmp_path):
+    data = {
+        'stats': {'case_count': 100, 'normal_count': 80, 'pneumonia_count': 15, 'severe_count': 5, 'deaths': 1},
+        'regions': [region('US', 10), region('IN', 20)],
+    }
+    log = EventLog(str(tmp_path / 'events.sqlite3'))
+
+    with patch.object(live_feed, 'get_event_log', return_value=log), \
+            patch.object(live_feed, 'get_shared_cache', return_value=None), \
+            patch.object(live_feed, 'get_global_stats', side_effect=lambda days: dict(data['stats'])), \
+            patch.object(live_feed, 'get_regional_summary_latest',
+                         side_effect=lambda region_type: [dict(r) for r in data['regions']]):
+        yield {'data': data, 'log': log}
+
+
+class TestDiffRegions:
+    def test_changed_new_and_removed(self):
+        delta = diff_regions([region('US', 10), region('IN', 20), region('BR', 5)],
+                             [region('US', 10), region('IN', 25), region('GB', 1)])
+
+        assert [r['region_id'] for r in delta['regions']] == ['IN', 'GB']
+        assert delta['removed'] == ['BR']
+
+    def test_no_changes(self):
+        rows = [region('US', 10)]
+
+        assert diff_regions(rows, [dict(r) for r in rows]) == {'regions': [], 'removed': []}
+
+
+class TestLiveFeed:
+    """Tests for delta publishing."""
+
+    def test_first_refresh_publishes_everything(self, env):
+        published = LiveFeed(['country']).refresh()
+
+        events = env['log'].read(0)
+        assert published == 2
+        assert [e['event_type'] for e in events] == ['global.updated', 'regions.changed']
+        assert len(events[1]['data']['regions']) == 2
+
+    def test_unchanged_data_publishes_nothing(self, env):
+        feed = LiveFeed(['country'])
+        feed.refresh()
+
+        assert feed.refresh() == 0
+
+    def test_only_changed_regions_are_sent(self, env):
+        feed = LiveFeed(['country'])
+        feed.refresh()
+        after = env['log'].latest_id()
+        env['data']['regions'] = [region('US', 10), region('IN', 30)]
+        env['data']['stats'] = dict(env['data']['stats'], case_count=110)
+
+        feed.refresh()
+
+        events = env['log'].read(after)
+        assert events[0]['data']['delta']['case_count'] == 10
+        assert events[0]['data']['delta']['deaths'] == 0
+        assert [r['region_id'] for r in events[1]['data']['regions']] == ['IN']
+
+    def test_snapshot_uses_last_refresh(self, env):
+        feed = LiveFeed(['country'])
+        feed.refresh()
+        env['data']['regions'] = []
+
+        snapshot = feed.snapshot('country')
+
+        assert len(snapshot['regions']) == 2
+        assert snapshot['stats']['case_count'] == 100
+
+
+class TestReplay:
+    def test_first_connect_needs_snapshot(self, env):
+        assert replay_start(None) is None
+
+    def test_resume_from_retained_event(self, env):
+        for _ in range(3):
+            env['log'].publish('live', 'global.updated', {})
+
+        assert replay_start(1) == 1
+
+    def test_pruned_events_need_snapshot(self, tmp_path, env):
+        log = EventLog(str(tmp_path / 'small.sqlite3'), max_events=2)
+        for _ in range(5):
+            log.publish('live', 'global.updated', {})
+        log.prune()
+
+        with patch.object(live_feed, 'get_event_log', return_value=log):
+            assert replay_start(1) is None
+            assert replay_start(3) == 3
+            assert replay_start(99) is None
+
+    def test_region_type_filter(self):
+        event = {'event_type': 'regions.changed', 'data': {'region_type': 'state'}}
+
+        assert wants_event(event, 'state')
+        assert not wants_event(event, 'country')
+        assert wants_event({'event_type': 'alert.new', 'data': {}}, 'country')
@@ -0,0 +1,92 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import random
+import pytest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import map_tiles
+from app.geo_index import GeoIndex
+from app.map_tiles import cluster_tile, get_tile, tile_bounds, tile_fraction, validate_tile
+from app.shared_cache import SharedCache
+
+
+def city(region_id, lat, lon, cases):
+    return {'region_type': 'city', 'region_id': region_id, 'region_name': region_id,
+            'latitude': lat, 'longitude': lon, 'case_count': cases, 'severe_count': cases // 10,
+            'deaths': 1}
+
+
+@pytest.fixture
+def cities():
+    rng = random.Random(11)
+    return [city(f'c{i}', rng.uniform(-60, 70), rng.uniform(-180, 180), rng.randint(1, 1000))
+            for i in range(3000)]
+
+
+class TestTileMath:
+    def test_bounds_round_trip(self):
+        west, south, east, north = tile_bounds(3, 5, 2)
+
+        x, y = tile_fraction((south + north) / 2, (west + east) / 2, 3)
+
+        assert (int(x), int(y)) == (5, 2)
+
+    def test_validate(self):
+        validate_tile(0, 0, 0)
+        with pytest.raises(ValueError):
+            validate_tile(2, 4, 0)
+
+
+class TestClustering:
+    """Tests for per-tile clusters."""
+
+    def test_world_tile_is_bounded_and_keeps_totals(self, cities):
+        tile = cluster_tile(cities, 0, 0, 0)
+
+        assert len(tile['features']) <= map_tiles.CLUSTER_GRID ** 2
+        assert tile['point_count'] == len(cities)
+        assert sum(f['properties']['case_count'] for f in tile['features']) == \
+            sum(c['case_count'] for c in cities)
+
+    def test_children_partition_parent(self, cities):
+        index = GeoIndex(cities, cell_degrees=5)
+        parent = cluster_tile(index.within(tile_bounds(2, 1, 1)), 2, 1, 1)
+
+        children = [cluster_tile(index.within(tile_bounds(3, x, y)), 3, x, y)
+                    for x in (2, 3) for y in (2, 3)]
+
+        assert sum(t['point_count'] for t in children) == parent['point_count']
+
+    def test_single_points_keep_their_fields(self):
+        tile = cluster_tile([city('NYC', 40.71, -74.0, 90)], 4, 4, 6)
+
+        properties = tile['features'][0]['properties']
+        assert properties['cluster'] is False
+        assert properties['region_id'] == 'NYC'
+
+    def test_no_clustering_at_max_zoom(self):
+        rows = [city('a', 40.7100, -74.0000, 1), city('b', 40.7101, -74.0001, 2)]
+        x, y = (int(v) for v in tile_fraction(40.71, -74.0, 12))
+
+        tile = cluster_tile(rows, 12, x, y, max_zoom=12)
+
+        assert len(tile['features']) == 2
+
+    def test_cached_per_data_version(self, tmp_path, cities):
+        cache = SharedCache(str(tmp_path / 'cache.sqlite3'))
+        index = GeoIndex(cities)
+
+        with patch.object(map_tiles, 'get_shared_cache', return_value=cache), \
+                patch.object(map_tiles, 'get_geo_index', return_value=index) as geo:
+            first = get_tile('city', 1, 0, 0)
+            assert get_tile('city', 1, 0, 0) == first
+            assert geo.call_count == 1
+
+            cache.bump_version('regional_summary')
+            get_tile('city', 1, 0, 0)
+            assert geo.call_count == 2
@@ -0,0 +1,138 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+import threading
+import time
+from flask import Flask
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.memo import memoized_read, clear_request_memo
+
+
+@pytest.fixture
+def flask_app():
+    return Flask(__name__)
+
+
+def make_counting_reader(delay=0.0):
+    calls = []
+
+    @memoized_read
+    def read(region_id, days=30):
+        calls.append((region_id, days))
+        if delay:
+            time.sleep(delay)
+        return {'region_id': region_id, 'days': days}
+
+    return read, calls
+
+
+class TestRequestMemo:
+    """Identical calls within one request hit the backend once."""
+
+    def test_collapses_identical_calls(self, flask_app):
+        read, calls = make_counting_reader()
+
+        with flask_app.test_request_context('/'):
+            first = read('US')
+            second = read('US')
+
+        assert first is second
+        assert len(calls) == 1
+
+    def test_positional_and_keyword_calls_share_key(self, flask_app):
+        read, calls = make_counting_reader()
+
+        with flask_app.test_request_context('/'):
+            read('US', 30)
+            read(region_id='US')
+            read('US', days=30)
+
+        assert len(calls) == 1
+
+    def test_different_arguments_are_not_collapsed(self, flask_app):
+        read, calls = make_counting_reader()
+
+        with flask_app.test_request_context('/'):
+            read('US')
+            read('IN')
+
+        assert len(calls) == 2
+
+    def test_memo_does_not_outlive_request(self, flask_app):
+        read, calls = make_counting_reader()
+
+        with flask_app.test_request_context('/'):
+            read('US')
+        with flask_app.test_request_context('/'):
+            read('US')
+
+        assert len(calls) == 2
+
+    def test_clear_request_memo(self, flask_app):
+        read, calls = make_counting_reader()
+
+        with flask_app.test_request_context('/'):
+            read('US')
+            clear_request_memo()
+            read('US')
+
+        assert len(calls) == 2
+
+    def test_no_memo_outside_request(self):
+        read, calls = make_counting_reader()
+
+        read('US')
+        read('US')
+
+        assert len(calls) == 2
+
+
+class TestSingleFlight:
+    """Concurrent identical calls share one execution."""
+
+    def test_concurrent_calls_share_execution(self):
+        read, calls = make_counting_reader(delay=0.1)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(read('US')))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert len(results) == 5
+        assert all(r is results[0] for r in results)
+
+    def test_errors_propagate_to_waiters(self):
+        started = threading.Event()
+
+        @memoized_read
+        def failing(region_id):
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError('boom')
+
+        errors = []
+
+        def call():
+            try:
+                failing('US')
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        leader.join()
+        follower.join()
+
+        assert len(errors) == 2
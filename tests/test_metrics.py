@@ -0,0 +1,132 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+from flask import Flask, render_template_string
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import metrics
+from app.config import Config
+from app.metrics import instrumented, span, render_prometheus, register_metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    with patch.object(Config, 'METRICS_ENABLED', True):
+        yield
+    metrics.reset()
+
+
+def sample(text, line_prefix):
+    """Value of the first exposition line starting with line_prefix."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f'{line_prefix} not found')
+
+
+class TestInstrumentation:
+    """Tests for spans, decorators and the Prometheus output."""
+
+    def test_decorator_records_calls_and_errors(self):
+        @instrumented('db', 'get_thing')
+        def get_thing(fail=False):
+            if fail:
+                raise ValueError('boom')
+            return 42
+
+        assert get_thing() == 42
+        with pytest.raises(ValueError):
+            get_thing(fail=True)
+
+        text = render_prometheus()
+        labels = 'kind="db",operation="get_thing"'
+        assert sample(text, f'medialert_operation_duration_seconds_count{{{labels}}}') == 2
+        assert sample(text, f'medialert_operation_duration_seconds_bucket{{{labels},le="+Inf"}}') == 2
+        assert sample(text, f'medialert_operation_errors_total{{{labels}}}') == 1
+
+    def test_span_buckets_are_cumulative(self):
+        metrics.observe('model', 'fit', 0.003)
+        metrics.observe('model', 'fit', 0.2)
+        with span('model', 'fit'):
+            pass
+
+        text = render_prometheus()
+        labels = 'kind="model",operation="fit"'
+        assert sample(text, f'medialert_operation_duration_seconds_bucket{{{labels},le="0.001"}}') == 1
+        assert sample(text, f'medialert_operation_duration_seconds_bucket{{{labels},le="0.005"}}') == 2
+        assert sample(text, f'medialert_operation_duration_seconds_bucket{{{labels},le="0.25"}}') == 3
+        assert sample(text, f'medialert_operation_duration_seconds_sum{{{labels}}}') == pytest.approx(0.203, abs=1e-3)
+
+    def test_disabled_records_nothing(self):
+        calls = []
+
+        @instrumented('db')
+        def query():
+            calls.append(1)
+            return 'rows'
+
+        with patch.object(Config, 'METRICS_ENABLED', False):
+            assert query() == 'rows'
+            with span('model', 'fit'):
+                pass
+
+        assert calls == [1]
+        assert 'operation=' not in render_prometheus()
+
+    def test_request_and_template_timings(self):
+        app = Flask(__name__)
+        register_metrics(app)
+
+        @app.route('/page/<name>')
+        def page(name):
+            return render_template_string('<p>{{ name }}</p>', name=name)
+
+        client = app.test_client()
+        client.get('/page/a')
+        client.get('/page/b')
+        client.get('/missing')
+
+        text = render_prometheus()
+        assert sample(text, 'medialert_http_request_duration_seconds_count'
+                            '{endpoint="page",method="GET",status="200"}') == 2
+        assert sample(text, 'medialert_http_request_duration_seconds_count'
+                            '{endpoint="unmatched",method="GET",status="404"}') == 1
+        assert sample(text, 'medialert_operation_duration_seconds_count'
+                            '{kind="template",operation="string"}') == 2
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+    with patch.object(Config, 'ALERT_SCHEDULER_ENABLED', False), \
+            patch.object(Config, 'METRICS_TOKEN', ''):
+        yield app.test_client()
+
+
+class TestMetricsEndpoint:
+    def test_serves_prometheus_text(self, client):
+        metrics.observe('db', 'get_hospital', 0.01)
+
+        resp = client.get('/metrics')
+
+        assert resp.status_code == 200
+        assert resp.content_type.startswith('text/plain; version=0.0.4')
+        assert b'# TYPE medialert_operation_duration_seconds histogram' in resp.data
+        assert b'operation="get_hospital"' in resp.data
+
+    def test_token_required_when_configured(self, client):
+        with patch.object(Config, 'METRICS_TOKEN', 'secret'):
+            assert client.get('/metrics').status_code == 401
+            ok = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+
+        assert ok.status_code == 200
+
+    def test_disabled_returns_404(self, client):
+        with patch.object(Config, 'METRICS_ENABLED', False):
+            assert client.get('/metrics').status_code == 404
@@ -0,0 +1,151 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+import threading
+import time
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import micro_batcher
+from app.api_client import ModelAPIError
+from app.config import Config
+from app.micro_batcher import MicroBatcher, predict_images
+
+
+class RecordingModel:
+    """Batch function that records batch sizes and echoes its inputs."""
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, items):
+        with self.lock:
+            self.batches.append(len(items))
+        time.sleep(self.latency)
+        return [{'item': item} for item in items]
+
+
+class TestMicroBatcher:
+    """Tests for the adaptive micro-batcher."""
+
+    def test_concurrent_callers_share_batches(self):
+        model = RecordingModel()
+        batcher = MicroBatcher(model, max_batch=8, max_wait_ms=20, concurrency=1)
+        results = {}
+
+        def upload(i):
+            results[i] = batcher.run_many([f'img-{i}'], timeout=5)
+
+        threads = [threading.Thread(target=upload, args=(i,)) for i in range(24)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert all(results[i] == [{'item': f'img-{i}'}] for i in range(24))
+        assert sum(model.batches) == 24
+        assert len(model.batches) < 24
+        assert max(model.batches) <= 8
+
+    def test_window_adapts_to_arrival_rate(self):
+        batcher = MicroBatcher(RecordingModel(latency=0), max_batch=16, max_wait_ms=10, min_wait_ms=0.5)
+        assert batcher.window() == pytest.approx(0.0005)
+
+        batcher._gap = 0.0002   # busy: ~0.2 ms between uploads
+        assert batcher.window() == pytest.approx(0.003)
+
+        batcher._gap = 0.002
+        assert batcher.window() == pytest.approx(0.010)
+
+        batcher._gap = 0.5      # quiet: nobody will join in time
+        assert batcher.window() == pytest.approx(0.0005)
+
+    def test_lone_upload_is_not_delayed(self):
+        batcher = MicroBatcher(RecordingModel(latency=0), max_batch=16, max_wait_ms=200, min_wait_ms=0.5)
+
+        start = time.perf_counter()
+        batcher.run_many(['a', 'b'], timeout=5)
+
+        assert time.perf_counter() - start < 0.1
+
+    def test_batch_errors_reach_every_caller(self):
+        def failing(items):
+            raise ModelAPIError('model down')
+
+        batcher = MicroBatcher(failing, max_batch=4, max_wait_ms=5)
+        results = batcher.run_many(['a', 'b'], timeout=5)
+
+        assert all(isinstance(r, ModelAPIError) for r in results)
+
+    def test_metrics_lines(self):
+        batcher = MicroBatcher(RecordingModel(latency=0), max_batch=2, max_wait_ms=5)
+        batcher.run_many(['a', 'b', 'c'], timeout=5)
+
+        lines = batcher.prometheus_lines()
+        assert 'medialert_micro_batch_images_total 3' in lines
+        assert 'medialert_micro_batch_full_batches_total 1' in lines
+
+    def test_timeout_withdraws_queued_items_and_releases_sent_ones(self):
+        sending = threading.Event()
+        finish = threading.Event()
+
+        def slow(items):
+            sending.set()
+            finish.wait(5)
+            return [{'item': item} for item in items]
+
+        batcher = MicroBatcher(slow, max_batch=1, max_wait_ms=1, concurrency=1)
+        released = []
+        results = batcher.run_many(['sent', 'queued'], timeout=0.2, release=released.append)
+
+        assert sending.is_set()
+        assert all(isinstance(r, ModelAPIError) for r in results)
+        assert released == ['queued']  # never sent; 'sent' is still being read
+        assert batcher.queue_depth() == 0
+
+        finish.set()
+        deadline = time.monotonic() + 2
+        while len(released) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert released == ['queued', 'sent']
+        assert batcher.items == 1
+
+    def test_release_after_results(self):
+        batcher = MicroBatcher(RecordingModel(latency=0), max_batch=4, max_wait_ms=5)
+        released = []
+
+        batcher.run_many(['a', 'b'], timeout=5, release=released.append)
+
+        assert released == ['a', 'b']
+
+
+class TestPredictImages:
+    def test_uses_batch_client_directly_when_disabled(self):
+        with patch.object(Config, 'MICRO_BATCH_ENABLED', False), \
+                patch.object(micro_batcher, 'get_predictions_batch', return_value=['r']) as batch_fn:
+            assert predict_images(['f']) == ['r']
+
+        batch_fn.assert_called_once_with(['f'])
+
+    def test_direct_path_releases_files(self):
+        released = []
+        with patch.object(Config, 'MICRO_BATCH_ENABLED', False), \
+                patch.object(micro_batcher, 'get_predictions_batch', side_effect=ModelAPIError('down')):
+            with pytest.raises(ModelAPIError):
+                predict_images(['f', 'g'], release=released.append)
+
+        assert released == ['f', 'g']
+
+    def test_routes_through_batcher(self):
+        batcher = MicroBatcher(RecordingModel(latency=0), max_batch=4, max_wait_ms=5)
+        with patch.object(Config, 'MICRO_BATCH_ENABLED', True), \
+                patch.object(Config, 'MODEL_API_URL', 'http://api.test/predict'), \
+                patch.object(micro_batcher, 'batching_available', return_value=True), \
+                patch.object(micro_batcher, '_batcher', batcher):
+            assert predict_images(['x', 'y']) == [{'item': 'x'}, {'item': 'y'}]
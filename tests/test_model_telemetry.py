@@ -0,0 +1,137 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+import requests
+from io import BytesIO
+from unittest.mock import Mock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import model_telemetry
+from app.api_client import get_prediction, ModelAPIError
+from app.config import Config
+from app.metrics import render_prometheus
+from app.model_telemetry import ModelAPITelemetry, get_model_telemetry
+from tests.fake_images import png_bytes
+
+
+@pytest.fixture(autouse=True)
+def telemetry():
+    with patch.object(model_telemetry, '_telemetry', ModelAPITelemetry(window=100)), \
+            patch.object(Config, 'METRICS_ENABLED', True), \
+            patch.object(Config, 'MODEL_API_URL', 'http://api.test/predict'), \
+            patch.object(Config, 'MODEL_API_KEY', ''):
+        yield get_model_telemetry()
+
+
+def image_file(content=b'\x89PNG\r\n\x1a\n' + b'x' * 2040):
+    f = BytesIO(content)
+    f.filename = 'scan.png'
+    f.content_type = 'image/png'
+    return f
+
+
+def api_response(model_version='v2', processing_time_ms=40):
+    resp = Mock(status_code=200, headers={'Content-Length': '150'})
+    resp.json.return_value = {'prediction': 'NORMAL', 'confidence': 0.9,
+                              'model_version': model_version, 'processing_time_ms': processing_time_ms}
+    return resp
+
+
+class TestModelAPITelemetry:
+    """Tests for the per-version statistics."""
+
+    def test_percentiles_and_overhead_per_version(self, telemetry):
+        for i in range(100):
+            telemetry.begin()
+            telemetry.end('v1', 'success', 0.1 + i / 1000, processing_ms=50)
+        telemetry.begin()
+        telemetry.end('v2', 'success', 2.0, processing_ms=100)
+
+        summary = telemetry.summary()
+        v1 = summary['versions']['v1']
+        assert v1['requests'] == 100
+        assert v1['latency_p50_ms'] == pytest.approx(149.5)
+        assert v1['overhead_p50_ms'] == pytest.approx(99.5)
+        assert summary['versions']['v2']['latency_p99_ms'] == 2000.0
+        assert summary['in_flight'] == 0
+        assert summary['in_flight_max'] == 1
+
+    def test_window_keeps_recent_calls(self):
+        telemetry = ModelAPITelemetry(window=10)
+        for _ in range(50):
+            telemetry.end('v1', 'success', 0.1)
+        for _ in range(10):
+            telemetry.end('v1', 'success', 5.0)
+
+        v1 = telemetry.summary()['versions']['v1']
+        assert v1['latency_p50_ms'] == 5000.0
+        assert v1['requests'] == 60
+
+
+class TestGetPredictionTelemetry:
+    @patch('app.api_client.requests.post')
+    def test_success_recorded_under_model_version(self, mock_post, telemetry):
+        mock_post.return_value = api_response()
+
+        get_prediction(image_file())
+
+        v2 = telemetry.summary()['versions']['v2']
+        assert v2['outcomes'] == {'success': 1}
+        assert v2['request_bytes'] == 2048
+        assert v2['response_bytes'] == 150
+        assert v2['processing_p50_ms'] == 40.0
+
+    @patch('app.api_client.requests.post')
+    def test_failures_classified(self, mock_post, telemetry):
+        mock_post.side_effect = requests.Timeout()
+        with pytest.raises(ModelAPIError):
+            get_prediction(image_file())
+
+        mock_post.side_effect = None
+        mock_post.return_value = Mock(status_code=503, headers={})
+        mock_post.return_value.json.return_value = {'error': 'cold start'}
+        with pytest.raises(ModelAPIError):
+            get_prediction(image_file())
+
+        assert telemetry.summary()['versions']['unknown']['outcomes'] == {'timeout': 1, 'http_error': 1}
+
+    @patch('app.api_client.requests.post')
+    def test_exported_on_metrics(self, mock_post):
+        mock_post.return_value = api_response(model_version='v3')
+
+        get_prediction(image_file())
+
+        text = render_prometheus()
+        assert 'medialert_model_api_requests_total{model_version="v3",outcome="success"} 1' in text
+        assert 'medialert_model_api_latency_seconds_count{model_version="v3"} 1' in text
+        assert '# TYPE medialert_model_api_in_flight gauge' in text
+
+    @patch('app.api_client.requests.post')
+    def test_disabled_records_nothing(self, mock_post, telemetry):
+        mock_post.return_value = api_response()
+
+        with patch.object(Config, 'METRICS_ENABLED', False):
+            get_prediction(image_file())
+
+        assert telemetry.summary()['versions'] == {}
+
+
+class TestUploadFallback:
+    def test_fallback_counted(self, telemetry):
+        from app.main import app
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['hospital_id'] = 'h1'
+
+        with patch.object(Config, 'MODEL_API_URL', ''), \
+                patch.object(Config, 'IMAGE_STORE_ENABLED', False), \
+                patch.object(Config, 'ALERT_SCHEDULER_ENABLED', False):
+            resp = client.post('/hospital/upload', data={'images': [(image_file(png_bytes()), 'scan.png')]},
+                               content_type='multipart/form-data')
+
+        assert resp.status_code == 200
+        assert telemetry.summary()['fallbacks'] == {'model_api_error': 1}
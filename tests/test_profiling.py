@@ -0,0 +1,121 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+import time
+from flask import Flask, jsonify
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import profiling
+from app.config import Config
+from app.profiling import register_profiling, get_profile, recent_profiles
+from app.shared_cache import SharedCache
+
+
+def busy_work(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def slow_work(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        time.sleep(0.002)
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    register_profiling(app)
+
+    @app.route('/fast')
+    def fast():
+        return jsonify({'total': busy_work(200000)})
+
+    @app.route('/slow')
+    def slow():
+        slow_work(0.15)
+        return jsonify({'done': True})
+
+    with patch.object(Config, 'PROFILING_TOKEN', 'secret'), \
+            patch.object(Config, 'PROFILE_SLOW_MS', 0), \
+            patch.object(Config, 'SHARED_CACHE_ENABLED', False), \
+            patch.object(profiling, '_sampler', None), \
+            patch.object(profiling, '_recent', profiling.deque(maxlen=10)):
+        yield app.test_client()
+
+
+class TestOnDemandProfiling:
+    """Tests for header/query triggered cProfile runs."""
+
+    def test_header_with_token_captures_profile(self, client):
+        resp = client.get('/fast', headers={'X-Profile': 'secret'})
+
+        profile = get_profile(resp.headers['X-Profile-Id'])
+        assert profile['mode'] == 'cprofile'
+        assert profile['path'] == '/fast'
+        assert profile['status'] == 200
+        assert any('busy_work' in f['function'] for f in profile['functions'])
+        assert len(profile['functions']) <= Config.PROFILE_TOP_N
+
+    def test_query_flag_works_too(self, client):
+        resp = client.get('/fast?_profile=secret')
+        with_args = client.get('/fast?region=IN&_profile=secret&days=7')
+
+        assert 'X-Profile-Id' in resp.headers
+        # The token is not stored with the profile
+        assert get_profile(resp.headers['X-Profile-Id'])['path'] == '/fast'
+        assert get_profile(with_args.headers['X-Profile-Id'])['path'] == '/fast?region=IN&days=7'
+
+    def test_wrong_token_or_no_token_configured_is_ignored(self, client):
+        assert 'X-Profile-Id' not in client.get('/fast', headers={'X-Profile': 'guess'}).headers
+
+        with patch.object(Config, 'PROFILING_TOKEN', ''):
+            assert 'X-Profile-Id' not in client.get('/fast', headers={'X-Profile': ''}).headers
+
+        assert recent_profiles() == []
+
+    def test_profiles_shared_through_cache(self, client, tmp_path):
+        cache = SharedCache(str(tmp_path / 'cache.sqlite3'))
+        with patch.object(profiling, 'get_shared_cache', return_value=cache):
+            profile_id = client.get('/fast', headers={'X-Profile': 'secret'}).headers['X-Profile-Id']
+            profiling._recent.clear()
+
+            assert get_profile(profile_id)['id'] == profile_id
+
+
+class TestSlowRequestSampling:
+    def test_slow_request_is_sampled(self, client):
+        with patch.object(Config, 'PROFILE_SLOW_MS', 30), \
+                patch.object(Config, 'PROFILE_SAMPLE_INTERVAL_MS', 5):
+            fast = client.get('/fast')
+            slow = client.get('/slow')
+
+        assert 'X-Profile-Id' not in fast.headers
+        profile = get_profile(slow.headers['X-Profile-Id'])
+        assert profile['mode'] == 'sampling'
+        assert profile['samples'] > 0
+        assert 'slow_work' in profile['functions'][0]['function']
+        assert [p['id'] for p in recent_profiles()] == [profile['id']]
+
+
+class TestProfileEndpoints:
+    def test_requires_token(self):
+        from app.main import app
+        client = app.test_client()
+
+        with patch.object(Config, 'PROFILING_TOKEN', 'secret'), \
+                patch.object(Config, 'ALERT_SCHEDULER_ENABLED', False), \
+                patch.object(profiling, '_recent', profiling.deque([{'id': 'abc', 'functions': []}])):
+            assert client.get('/api/v1/profiles').status_code == 401
+            listed = client.get('/api/v1/profiles', headers={'Authorization': 'Bearer secret'}).get_json()
+            one = client.get('/api/v1/profiles/abc', headers={'Authorization': 'Bearer secret'})
+
+        assert listed['profiles'] == [{'id': 'abc'}]
+        assert one.get_json()['profile']['id'] == 'abc'
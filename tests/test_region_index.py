@@ -0,0 +1,163 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+import threading
+from datetime import date
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import database, region_index
+from app.config import Config
+from app.region_index import RegionIndex, infer_parent_id
+from tests.fake_supabase import FakeSupabase
+
+
+def row(region_type, region_id, cases, parent=None, population=None):
+    return {
+        'region_type': region_type, 'region_id': region_id, 'region_name': region_id,
+        'parent_region_id': parent, 'date': date.today().isoformat(),
+        'case_count': cases, 'deaths': cases // 100, 'population': population,
+    }
+
+
+@pytest.fixture
+def rows():
+    return [
+        row('country', 'IN', 1000, population=1000000),
+        row('state', 'IN-MH', 600),
+        row('state', 'IN-DL', 300),
+        row('city', 'IN-MH-MUM', 400, population=20000),
+        row('city', 'IN-MH-PUN', 150, population=10000),
+        row('city', 'NYC', 90, parent='US-NY'),
+    ]
+
+
+class TestHierarchy:
+    """Tests for parent/child links."""
+
+    def test_infer_parent_id(self):
+        assert infer_parent_id('IN-MH-MUM') == 'IN-MH'
+        assert infer_parent_id('IN') is None
+
+    def test_children_are_filtered_by_parent(self, rows):
+        index = RegionIndex(rows)
+
+        assert [r['region_id'] for r in index.children('country', 'IN')] == ['IN-MH', 'IN-DL']
+        assert [r['region_id'] for r in index.children('state', 'IN-MH', limit=1)] == ['IN-MH-MUM']
+        assert index.children('state', 'IN-DL') == []
+
+    def test_reads_wait_for_writers(self, rows):
+        index = RegionIndex(rows)
+        results = {}
+
+        def read():
+            results['children'] = index.children('country', 'IN')
+            results['roots'] = index.roots('country')
+
+        with index._lock:
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(0.1)
+            assert results == {}  # blocked while the index is being written
+        reader.join(1)
+
+        assert len(results['children']) == 2 and len(results['roots']) == 1
+
+    def test_ancestors(self, rows):
+        index = RegionIndex(rows)
+
+        assert [r['region_id'] for r in index.ancestors('city', 'IN-MH-MUM')] == ['IN-MH', 'IN']
+
+    def test_explicit_parent_arriving_later(self, rows):
+        index = RegionIndex(rows)
+        assert index.parent('city', 'NYC') is None
+
+        index.update(row('state', 'US-NY', 100))
+
+        assert index.parent('city', 'NYC')['region_id'] == 'US-NY'
+        assert index.rollup('state', 'US-NY')['case_count'] == 90
+
+    def test_skips_missing_levels(self):
+        index = RegionIndex([row('country', 'IN', 10), row('district', 'IN-X', 4)])
+
+        assert index.parent('district', 'IN-X')['region_id'] == 'IN'
+
+
+class TestRollups:
+    """Tests for incremental subtree aggregates."""
+
+    def test_rollup_sums_leaves(self, rows):
+        index = RegionIndex(rows)
+
+        country = index.rollup('country', 'IN')
+        assert country['case_count'] == 400 + 150 + 300
+        assert country['population'] == 30000
+        assert country['case_density'] == pytest.approx(850 * 100.0 / 30000)
+        assert index.rollup('city', 'IN-MH-MUM')['case_count'] == 400
+
+    def test_update_propagates_delta(self, rows):
+        index = RegionIndex(rows)
+
+        assert index.update(row('city', 'IN-MH-MUM', 450, population=20000))
+
+        assert index.rollup('state', 'IN-MH')['case_count'] == 600
+        assert index.rollup('country', 'IN')['case_count'] == 900
+
+    def test_unchanged_row_is_noop(self, rows):
+        index = RegionIndex(rows)
+
+        assert not index.update(dict(rows[3]))
+
+    def test_first_child_replaces_leaf_counts(self, rows):
+        index = RegionIndex(rows)
+
+        index.update(row('city', 'IN-DL-NDL', 50))
+
+        assert index.rollup('state', 'IN-DL')['case_count'] == 50
+        assert index.rollup('country', 'IN')['case_count'] == 600
+
+    def test_remove_subtracts_subtree(self, rows):
+        index = RegionIndex(rows)
+
+        index.remove('state', 'IN-MH')
+
+        assert index.rollup('country', 'IN')['case_count'] == 300
+        assert index.parent('city', 'IN-MH-MUM') is None
+
+    def test_rollup_many_counts_nested_regions_once(self, rows):
+        index = RegionIndex(rows)
+
+        total = index.rollup_many([('state', 'IN-MH'), ('city', 'IN-MH-MUM'), ('state', 'IN-DL')])
+
+        assert total['case_count'] == 850
+
+    def test_matches_full_rebuild(self, rows):
+        index = RegionIndex(rows)
+        updated = [dict(r, case_count=r['case_count'] + 7) for r in rows[3:5]]
+        for r in updated:
+            index.update(r)
+        index.remove('state', 'IN-DL')
+
+        rebuilt = RegionIndex([r for r in rows[:3] if r['region_id'] != 'IN-DL'] + updated + rows[5:])
+
+        for key in [('country', 'IN'), ('state', 'IN-MH')]:
+            assert index.rollup(*key) == rebuilt.rollup(*key)
+
+
+class TestSharedIndex:
+    def test_syncs_from_database(self, rows):
+        fake = FakeSupabase({'regional_summary': rows})
+
+        with patch.object(database, 'get_supabase_client', return_value=fake), \
+                patch.object(Config, 'SHARED_CACHE_ENABLED', False), \
+                patch.object(region_index, '_index', None):
+            index = region_index.get_region_index()
+            queries = len(fake.queries)
+
+            assert [r['region_id'] for r in index.children('country', 'IN')] == ['IN-MH', 'IN-DL']
+            assert region_index.get_region_index() is index
+            assert len(fake.queries) == queries
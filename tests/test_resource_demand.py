@@ -0,0 +1,203 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models.predictions import ResourceDemandPredictor
+
+
+def reference_resource_needs(predictor, case_forecast, current_capacity):
+    """Original per-day loop implementation, kept as the behavioural reference."""
+    timeline = []
+    for day in case_forecast:
+        cases = day['predicted_cases']
+        icu = int(cases * predictor.ICU_BED_RATIO)
+        timeline.append({
+            'date': day['date'],
+            'predicted_cases': cases,
+            'severe_cases': int(cases * predictor.SEVERE_RATIO),
+            'icu_beds_needed': icu,
+            'ventilators_needed': int(cases * predictor.VENTILATOR_RATIO),
+            'oxygen_units_needed': int(cases * predictor.OXYGEN_PER_CASE),
+            'icu_bed_gap': max(0, icu - current_capacity.get('icu_beds', 0)),
+            'icu_capacity_utilization': round((icu / current_capacity.get('icu_beds', 1)) * 100, 1),
+        })
+    peak = max(timeline, key=lambda x: x['predicted_cases'])
+    return {
+        'success': True,
+        'timeline': timeline,
+        'summary': {
+            'peak_date': peak['date'],
+            'peak_cases': peak['predicted_cases'],
+            'peak_icu_beds_needed': peak['icu_beds_needed'],
+            'peak_ventilators_needed': peak['ventilators_needed'],
+            'total_icu_gap_days': sum(d['icu_bed_gap'] for d in timeline),
+            'max_icu_utilization': max(d['icu_capacity_utilization'] for d in timeline),
+        }
+    }
+
+
+def make_forecast(values):
+    return [{'date': f'2026-03-{i + 1:02d}', 'predicted_cases': v} for i, v in enumerate(values)]
+
+
+class TestPredictResourceNeeds:
+    """The dict output must match the original loop implementation."""
+
+    @pytest.mark.parametrize('values,capacity', [
+        ([500, 550, 600, 650, 700, 750, 800], {'icu_beds': 100}),
+        ([3, 7, 7, 1, 0, 13], {'icu_beds': 2}),
+        ([101, 99, 333, 333, 12], {}),
+        ([0, 0, 0], {'icu_beds': 5}),
+    ])
+    def test_matches_reference(self, values, capacity):
+        predictor = ResourceDemandPredictor(use_length_of_stay=False)
+        forecast = make_forecast(values)
+
+        assert predictor.predict_resource_needs(forecast, capacity) == \
+            reference_resource_needs(predictor, forecast, capacity)
+
+    def test_custom_ratios(self):
+        predictor = ResourceDemandPredictor({'icu_bed_ratio': 0.5, 'ventilator_ratio': 0.25},
+                                            use_length_of_stay=False)
+        forecast = make_forecast([10, 40, 20])
+
+        result = predictor.predict_resource_needs(forecast, {'icu_beds': 8})
+
+        assert result == reference_resource_needs(predictor, forecast, {'icu_beds': 8})
+        assert result['summary']['peak_ventilators_needed'] == 10
+
+    def test_empty_forecast(self):
+        result = ResourceDemandPredictor().predict_resource_needs([], {'icu_beds': 1})
+
+        assert result['success'] is False
+
+    def test_zero_capacity_does_not_divide_by_zero(self):
+        result = ResourceDemandPredictor(use_length_of_stay=False).predict_resource_needs(
+            make_forecast([10]), {'icu_beds': 0})
+
+        assert result['timeline'][0]['icu_capacity_utilization'] == 300.0
+
+    def test_output_is_plain_python(self):
+        result = ResourceDemandPredictor().predict_resource_needs(make_forecast([10, 20]), {'icu_beds': 5})
+
+        assert type(result['timeline'][0]['icu_beds_needed']) is int
+        assert type(result['summary']['total_icu_gap_days']) is int
+        assert type(result['summary']['max_icu_utilization']) is float
+
+
+class TestPredictResourceMatrix:
+    """Tests for the (regions x horizon) vectorized API."""
+
+    def test_shapes_and_per_region_capacity(self):
+        predictor = ResourceDemandPredictor(use_length_of_stay=False)
+        cases = np.array([[100, 200, 150], [10, 5, 30]])
+
+        matrix = predictor.predict_resource_matrix(cases, [50, 5])
+
+        assert matrix['icu_beds_needed'].shape == (2, 3)
+        assert matrix['icu_beds_needed'].tolist() == [[30, 60, 45], [3, 1, 9]]
+        assert matrix['icu_bed_gap'].tolist() == [[0, 10, 0], [0, 0, 4]]
+        assert matrix['peak_index'].tolist() == [1, 2]
+        assert matrix['total_icu_gap_days'].tolist() == [10, 4]
+        assert matrix['max_icu_utilization'].tolist() == pytest.approx([120.0, 180.0])
+
+    def test_rows_match_single_region_calls(self):
+        predictor = ResourceDemandPredictor(use_length_of_stay=False)
+        rng = np.random.default_rng(7)
+        cases = rng.integers(0, 5000, size=(25, 14))
+        capacity = rng.integers(0, 400, size=25)
+        dates = [f'2026-04-{d + 1:02d}' for d in range(14)]
+
+        matrix = predictor.predict_resource_matrix(cases, capacity)
+
+        for i in range(25):
+            forecast = [{'date': dates[d], 'predicted_cases': int(cases[i, d])} for d in range(14)]
+            capacity_i = {'icu_beds': int(capacity[i])} if capacity[i] else {}
+            assert predictor.resource_forecast_view(matrix, dates, i) == \
+                reference_resource_needs(predictor, forecast, capacity_i)
+
+    def test_predict_many(self):
+        predictor = ResourceDemandPredictor(use_length_of_stay=False)
+
+        results = predictor.predict_resource_needs_many(
+            {'US': make_forecast([100, 200]), 'IN': make_forecast([50, 10]), 'XX': []},
+            {'US': {'icu_beds': 10}, 'IN': {'icu_beds': 100}}
+        )
+
+        assert set(results) == {'US', 'IN'}
+        assert results['US']['summary']['peak_icu_beds_needed'] == 60
+        assert results['IN']['summary']['total_icu_gap_days'] == 0
+
+
+class TestLengthOfStay:
+    """Tests for the occupancy (census) projection."""
+
+    def test_survival_sums_to_mean_stay(self):
+        survival = ResourceDemandPredictor.length_of_stay_survival(mean_days=7)
+
+        assert survival[0] == 1.0
+        assert survival.sum() == pytest.approx(7, rel=1e-3)
+
+    def test_survival_from_distribution(self):
+        # Half stay 1 day, half stay 3 days
+        survival = ResourceDemandPredictor.length_of_stay_survival(pmf=[0.5, 0, 0.5])
+
+        assert survival.tolist() == [1.0, 0.5, 0.5]
+
+    def test_constant_admissions_reach_steady_state(self):
+        survival = ResourceDemandPredictor.length_of_stay_survival(mean_days=5)
+
+        census = ResourceDemandPredictor.project_census(np.full((1, 120), 10.0), survival)
+
+        assert census[0, 0] == pytest.approx(10.0)
+        assert census[0, -1] == pytest.approx(50.0, rel=1e-3)
+
+    def test_initial_census_is_discharged(self):
+        survival = ResourceDemandPredictor.length_of_stay_survival(pmf=[0, 0, 1.0])
+
+        census = ResourceDemandPredictor.project_census(np.zeros((1, 4)), survival, [30])
+
+        # Steady state with 3-day stays: a third leave each day
+        assert census[0].tolist() == pytest.approx([20.0, 10.0, 0.0, 0.0])
+
+    def test_census_carries_over_patients(self):
+        predictor = ResourceDemandPredictor({'icu_stay_days': 10})
+        forecast = make_forecast([100] * 14)
+
+        result = predictor.predict_resource_needs(forecast, {'icu_beds': 100, 'total_beds': 500})
+        icu = [day['icu_beds_needed'] for day in result['timeline']]
+
+        assert icu[0] == 30
+        assert icu == sorted(icu)
+        assert icu[-1] > 200
+        assert result['summary']['peak_icu_beds_needed'] == icu[-1]
+        assert result['summary']['peak_demand_date'] == forecast[-1]['date']
+        assert 'beds_needed' in result['timeline'][0]
+        assert result['summary']['max_bed_utilization'] > 0
+
+    def test_current_occupancy_adds_to_census(self):
+        predictor = ResourceDemandPredictor()
+        forecast = make_forecast([0, 0, 0])
+
+        result = predictor.predict_resource_needs(
+            forecast, {'icu_beds': 50}, {'icu_beds_occupied': 40, 'beds_occupied': 0}
+        )
+
+        icu = [day['icu_beds_needed'] for day in result['timeline']]
+        assert 0 < icu[-1] < icu[0] <= 40
+
+    def test_vectorized_many_regions_long_horizon(self):
+        predictor = ResourceDemandPredictor()
+        cases = np.random.default_rng(1).integers(0, 1000, size=(2000, 180))
+
+        matrix = predictor.predict_resource_matrix(cases, np.full(2000, 300), np.full(2000, 1000))
+
+        assert matrix['icu_beds_needed'].shape == (2000, 180)
+        assert matrix['beds_needed'].shape == (2000, 180)
+        assert (matrix['icu_beds_needed'] >= np.trunc(cases * predictor.ICU_BED_RATIO)).all()
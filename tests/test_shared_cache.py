@@ -0,0 +1,155 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.shared_cache import SharedCache, invalidate_tables, shared_cached
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'cache.sqlite3')
+
+
+@pytest.fixture
+def cache(cache_path):
+    return SharedCache(cache_path, default_ttl=60, stale_ttl=60, wait_seconds=0.2)
+
+
+class TestBasicOperations:
+    """Tests for get/set, TTLs and versions."""
+
+    def test_set_then_get(self, cache):
+        cache.set('timeseries', 'US', [{'date': '2026-01-01', 'case_count': 5}])
+
+        assert cache.get('timeseries', 'US') == [{'date': '2026-01-01', 'case_count': 5}]
+
+    def test_missing_key_returns_default(self, cache):
+        assert cache.get('timeseries', 'nope', default='x') == 'x'
+
+    def test_expired_entry_is_a_miss(self, cache):
+        cache.set('timeseries', 'US', 1, ttl=-1)
+
+        assert cache.get('timeseries', 'US') is None
+
+    def test_bump_version_invalidates_family(self, cache):
+        cache.set('timeseries', 'US', 1)
+        cache.set('forecast_report', 'US', 2)
+
+        new_version = cache.bump_version('timeseries')
+
+        assert new_version == 1
+        assert cache.get('timeseries', 'US') is None
+        assert cache.get('forecast_report', 'US') == 2
+
+    def test_entries_are_shared_between_workers(self, cache_path):
+        worker_a = SharedCache(cache_path)
+        worker_b = SharedCache(cache_path)
+
+        worker_a.set('regional_summary', 'country', [{'region_id': 'US'}])
+
+        assert worker_b.get('regional_summary', 'country') == [{'region_id': 'US'}]
+
+    def test_serializes_numpy_scalars(self, cache):
+        import numpy as np
+        cache.set('forecast_report', 'US', {'growth': np.float64(1.5), 'cases': np.int64(3)})
+
+        assert cache.get('forecast_report', 'US') == {'growth': 1.5, 'cases': 3}
+
+    def test_invalidate_tables_bumps_derived_families(self, cache):
+        cache.set('timeseries', 'US', [1, 2])
+
+        bumped = invalidate_tables(['case_summary', 'hospitals'], cache)
+
+        assert bumped == ['forecast_report', 'timeseries']
+        assert cache.get('timeseries', 'US') is None
+        assert cache.version('regional_summary')[0] == 0
+
+
+class TestGetOrCompute:
+    """Tests for read-through caching and stampede protection."""
+
+    def test_computes_once(self, cache):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'value': 42}
+
+        assert cache.get_or_compute('forecast_report', 'US', compute) == {'value': 42}
+        assert cache.get_or_compute('forecast_report', 'US', compute) == {'value': 42}
+        assert len(calls) == 1
+
+    def test_serves_stale_value_while_other_worker_recomputes(self, cache_path):
+        worker_a = SharedCache(cache_path, stale_ttl=60)
+        worker_b = SharedCache(cache_path, stale_ttl=60)
+        worker_a.set('timeseries', 'US', 'old', ttl=-1)
+
+        # Worker A holds the recompute lease
+        assert worker_a._acquire_lease(worker_a.make_key('timeseries', 'US'))
+
+        result = worker_b.get_or_compute('timeseries', 'US', lambda: 'new')
+
+        assert result == 'old'
+        assert worker_b.stats()['timeseries']['stale_hits'] == 1
+
+    def test_computes_when_lease_holder_never_finishes(self, cache_path):
+        worker_a = SharedCache(cache_path)
+        worker_b = SharedCache(cache_path, wait_seconds=0.1)
+        worker_a._acquire_lease(worker_a.make_key('timeseries', 'US'))
+
+        assert worker_b.get_or_compute('timeseries', 'US', lambda: 'new') == 'new'
+
+    def test_lease_released_after_compute(self, cache):
+        cache.get_or_compute('timeseries', 'US', lambda: 1, ttl=-1)
+
+        assert cache._acquire_lease(cache.make_key('timeseries', 'US'))
+
+    def test_stats_per_family(self, cache):
+        cache.get_or_compute('timeseries', 'US', lambda: 1)
+        cache.get_or_compute('timeseries', 'US', lambda: 1)
+        cache.get_or_compute('forecast_report', 'US', lambda: 1)
+
+        stats = cache.stats()
+
+        assert stats['timeseries']['hits'] == 1
+        assert stats['timeseries']['misses'] == 1
+        assert stats['forecast_report']['computes'] == 1
+
+
+class TestSharedCachedDecorator:
+    """Tests for the shared_cached decorator."""
+
+    def test_caches_by_arguments(self, cache):
+        calls = []
+
+        @shared_cached('timeseries')
+        def load(region_id, days=30):
+            calls.append(region_id)
+            return [region_id, days]
+
+        with patch('app.shared_cache.get_shared_cache', return_value=cache):
+            assert load('US') == ['US', 30]
+            assert load('US') == ['US', 30]
+            assert load('IN') == ['IN', 30]
+
+        assert calls == ['US', 'IN']
+
+    def test_calls_through_when_disabled(self):
+        calls = []
+
+        @shared_cached('timeseries')
+        def load(region_id):
+            calls.append(region_id)
+            return region_id
+
+        with patch('app.shared_cache.get_shared_cache', return_value=None):
+            load('US')
+            load('US')
+
+        assert calls == ['US', 'US']
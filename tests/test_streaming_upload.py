@@ -0,0 +1,210 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+import random
+from io import BytesIO
+from unittest.mock import patch
+from werkzeug.datastructures import FileStorage, MultiDict
+from werkzeug.formparser import parse_form_data
+from werkzeug.test import encode_multipart
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import streaming_upload
+from app.api_client import MultipartBody
+from app.config import Config
+from app.streaming_upload import parse_image_upload, UploadError
+from tests.fake_images import jpeg_bytes, png_bytes
+
+
+PNG = png_bytes()
+JPEG = jpeg_bytes()
+
+
+class TrickleStream(BytesIO):
+    """Request body that returns at most `step` bytes per read, like a slow client."""
+
+    def __init__(self, data, step=7):
+        super().__init__(data)
+        self.step = step
+
+    def read(self, size=-1):
+        return super().read(min(size, self.step) if size and size > 0 else self.step)
+
+
+def upload_body(*files, field='images', extra=None, boundary=None):
+    values = MultiDict([(field, FileStorage(BytesIO(data), filename=name)) for name, data in files])
+    for key, value in (extra or {}).items():
+        values.add(key, value)
+    boundary, body = encode_multipart(values, boundary=boundary)
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def parse(*files, stream_cls=BytesIO, **kwargs):
+    body, content_type = upload_body(*files, **kwargs)
+    return parse_image_upload(stream_cls(body), content_type)
+
+
+class TestParseImageUpload:
+    """Tests for the streaming multipart parser."""
+
+    def test_accepts_images_and_sniffs_type(self):
+        images = parse(('a.png', PNG), ('b.jpg', JPEG), extra={'note': 'ignored'})
+
+        assert [(i.filename, i.error, i.content_type) for i in images] == [
+            ('a.png', None, 'image/png'), ('b.jpg', None, 'image/jpeg')]
+        assert images[1].header == ('jpeg', 2, 2)
+        assert images[0].read() == PNG and images[1].read() == JPEG
+        assert images[0].size == len(PNG)
+
+    def test_rejections_keep_upload_order(self):
+        with patch.object(Config, 'MAX_FILE_SIZE_BYTES', 500):
+            images = parse(('doc.pdf', PNG), ('fake.png', b'GIF89a' + b'x' * 50),
+                           ('big.png', PNG + b'x' * 1000), ('ok.png', PNG), stream_cls=TrickleStream)
+
+        assert [i.filename for i in images] == ['doc.pdf', 'fake.png', 'big.png', 'ok.png']
+        assert 'not allowed' in images[0].error
+        assert 'not a JPG or PNG' in images[1].error
+        assert 'too large' in images[2].error
+        assert images[3].error is None and images[3].read() == PNG
+
+    def test_rejects_bad_headers_once_complete(self):
+        with patch.object(Config, 'MAX_IMAGE_PIXELS', 10000):
+            images = parse(('cut.png', PNG[:20]), ('huge.jpg', jpeg_bytes(20000, 20000)))
+
+        assert 'not a valid JPG or PNG' in images[0].error
+        assert images[1].error == 'Image is too large (20000x20000 pixels).'
+
+    def test_oversize_file_stops_being_stored(self):
+        writes = []
+        real_start = streaming_upload._PartReader._start
+
+        def tracking_start(reader, head):
+            real_start(reader, head)
+            spool_write = reader.image._file.write
+            reader.image._file.write = lambda data: writes.append(len(data)) or spool_write(data)
+
+        with patch.object(Config, 'MAX_FILE_SIZE_BYTES', 64), \
+                patch.object(streaming_upload._PartReader, '_start', tracking_start):
+            images = parse(('big.png', PNG + b'x' * 10000), stream_cls=TrickleStream)
+
+        assert images[0].error.startswith('File too large')
+        assert sum(writes) <= 64
+
+    def test_too_many_files(self):
+        with patch.object(Config, 'MAX_FILES_PER_UPLOAD', 2):
+            images = parse(*[(f'{i}.png', PNG) for i in range(3)])
+
+        assert [i.error is None for i in images] == [True, True, False]
+        assert 'at most 2' in images[2].error
+
+    def test_large_images_spool_to_disk(self):
+        with patch.object(Config, 'UPLOAD_SPOOL_KB', 1):
+            small, large = parse(('small.png', PNG), ('large.png', PNG + b'x' * 4096))
+
+        assert not small._file._rolled
+        assert large._file._rolled
+        large.seek(0)
+        assert large.read() == PNG + b'x' * 4096
+
+    def test_empty_selection_and_missing_field(self):
+        assert parse(('', b'')) == []
+        with pytest.raises(UploadError, match='No files uploaded'):
+            parse(('a.png', PNG), field='other')
+        with pytest.raises(UploadError, match='No files uploaded'):
+            parse_image_upload(BytesIO(b'images=a.png'), 'application/x-www-form-urlencoded')
+
+    def test_random_boundaries_with_short_reads(self):
+        rng = random.Random(7)
+        alphabet = 'abcXYZ0123456789-_'
+        for _ in range(200):
+            boundary = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 70)))
+            # Part data full of line breaks and dashes, the bytes a boundary is made of
+            images = [png_bytes(body=bytes(rng.choice(b'\r\n-px') for _ in range(rng.randint(0, 300))))
+                      for _ in range(rng.randint(1, 3))]
+            body, content_type = upload_body(*[(f'{i}.png', data) for i, data in enumerate(images)],
+                                             boundary=boundary)
+            step = rng.randint(1, 40)
+
+            with patch.object(streaming_upload, 'CHUNK_BYTES', rng.randint(1, 96)):
+                parsed = parse_image_upload(TrickleStream(body, step), content_type)
+
+            assert [image.read() for image in parsed] == images, (boundary, step)
+
+    def test_short_reads_are_filled_to_a_chunk(self):
+        body, content_type = upload_body(('a.png', PNG))
+        stream = TrickleStream(body, step=3)
+        chunks = []
+        real_receive = streaming_upload.MultipartDecoder.receive_data
+
+        def receive(decoder, data):
+            chunks.append(data)
+            real_receive(decoder, data)
+
+        with patch.object(streaming_upload.MultipartDecoder, 'receive_data', receive):
+            parse_image_upload(stream, content_type)
+
+        assert chunks[0] == body and chunks[-1] is None
+
+    def test_truncated_body(self):
+        body, content_type = upload_body(('a.png', PNG))
+
+        with pytest.raises(UploadError):
+            parse_image_upload(BytesIO(body[:len(body) // 2]), content_type)
+
+
+class TestMultipartBody:
+    """Tests for the streamed request body sent to the model API."""
+
+    def test_round_trips_through_a_form_parser(self):
+        first, second = BytesIO(PNG), BytesIO(JPEG)
+        first.filename, first.content_type = 'chest "AP".png', 'image/png'
+        second.filename, second.content_type = 'b.jpg', 'image/jpeg'
+        second.read(10)  # position is reset when the part is sent
+
+        body = MultipartBody([('images', first), ('images', second)])
+        chunks = iter(lambda: body.read(13), b'')
+        payload = b''.join(chunks)
+
+        assert len(payload) == len(body)
+        _, _, files = parse_form_data({
+            'wsgi.input': BytesIO(payload), 'REQUEST_METHOD': 'POST',
+            'CONTENT_TYPE': body.content_type, 'CONTENT_LENGTH': str(len(payload)),
+        })
+        sent = files.getlist('images')
+        assert [f.filename for f in sent] == ['chest "AP".png', 'b.jpg']
+        assert [f.read() for f in sent] == [PNG, JPEG]
+        assert sent[1].content_type == 'image/jpeg'
+
+
+class TestUploadView:
+    @pytest.fixture
+    def client(self):
+        from app.main import app
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['hospital_id'] = 'h1'
+        with patch.object(Config, 'MODEL_API_URL', ''), \
+                patch.object(Config, 'IMAGE_STORE_ENABLED', False), \
+                patch.object(Config, 'ALERT_SCHEDULER_ENABLED', False):
+            yield client
+
+    def test_upload_reports_each_file(self, client):
+        resp = client.post('/hospital/upload', content_type='multipart/form-data', data={
+            'images': [(BytesIO(PNG), 'scan.png'), (BytesIO(b'not an image'), 'scan2.png')]})
+
+        results = resp.get_json()['results']
+        assert resp.status_code == 200
+        assert results[0]['status'] == 'success'
+        assert results[1]['status'] == 'skipped' and 'not a JPG or PNG' in results[1]['error']
+
+    def test_missing_files(self, client):
+        no_field = client.post('/hospital/upload', data={'note': 'x'}, content_type='multipart/form-data')
+        empty = client.post('/hospital/upload', data={'images': [(BytesIO(b''), '')]},
+                            content_type='multipart/form-data')
+
+        assert no_field.status_code == 400 and no_field.get_json()['error'] == 'No files uploaded'
+        assert empty.status_code == 400 and empty.get_json()['error'] == 'No files selected'
@@ -0,0 +1,103 @@
+# AI Attribution: This file was developed with assistance from Claude (Anthropic).
+# https://claude.ai
+
+import pytest
+from unittest.mock import patch
+from collections import defaultdict
+from datetime import date
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import database, shared_cache
+from app.region_index import RegionIndex
+from app.shared_cache import SharedCache
+from app.synthetic_data import SyntheticOutbreak, TABLES, insert_supabase
+from tests.fake_supabase import FakeSupabase
+
+
+@pytest.fixture
+def outbreak():
+    return SyntheticOutbreak(countries=2, states=2, cities=2, districts=2, days=21,
+                             end_date=date(2026, 3, 1), analyses=True, seed=5)
+
+
+class TestSyntheticOutbreak:
+    """Tests for the synthetic data generator."""
+
+    def test_row_counts_match_estimate(self, outbreak):
+        tables = outbreak.tables()
+
+        for table, expected in outbreak.estimate_rows().items():
+            assert len(tables[table]) == expected
+        assert outbreak.region_count() == 2 + 4 + 8 + 16
+
+    def test_levels_roll_up(self, outbreak):
+        rows = outbreak.tables()['regional_summary']
+        totals = defaultdict(int)
+        for row in rows:
+            totals[(row['region_type'], row['date'])] += row['case_count']
+
+        for day in outbreak.dates:
+            assert totals[('country', day)] == totals[('state', day)] == \
+                totals[('city', day)] == totals[('district', day)]
+
+    def test_hospital_tables_match_regions(self, outbreak):
+        tables = outbreak.tables()
+        day = outbreak.dates[-1]
+
+        city_cases = sum(r['case_count'] for r in tables['regional_summary']
+                         if r['region_type'] == 'city' and r['date'] == day)
+        hospital_cases = sum(r['case_count'] for r in tables['case_summary'] if r['date'] == day)
+        analyses = sum(1 for r in tables['analyses'] if r['created_at'].startswith(day))
+
+        assert city_cases == hospital_cases == analyses
+        for row in tables['case_summary']:
+            assert row['case_count'] == row['normal_count'] + row['pneumonia_count'] + row['severe_count']
+
+    def test_same_seed_same_rows(self, outbreak):
+        again = SyntheticOutbreak(countries=2, states=2, cities=2, districts=2, days=21,
+                                  end_date=date(2026, 3, 1), analyses=True, seed=5)
+
+        assert again.tables() == outbreak.tables()
+
+    def test_stream_chunks_respect_size_and_foreign_keys(self, outbreak):
+        seen = defaultdict(set)
+
+        for table, rows in outbreak.stream(chunk_size=50):
+            assert 0 < len(rows) <= 50
+            for row in rows:
+                if table in ('case_summary', 'resources', 'users'):
+                    assert row['hospital_id'] in seen['hospitals']
+                if table == 'analyses':
+                    assert row['upload_id'] in seen['uploads']
+                if 'id' in row:
+                    seen[table].add(row['id'])
+
+        assert set(seen) <= set(TABLES)
+
+    def test_hierarchy_links_into_region_index(self, outbreak):
+        latest = [r for r in outbreak.tables()['regional_summary'] if r['date'] == outbreak.dates[-1]]
+
+        index = RegionIndex(latest)
+
+        assert [r['region_id'] for r in index.ancestors('district', 'C001-01-02-01')] == \
+            ['C001-01-02', 'C001-01', 'C001']
+        assert index.rollup('country', 'C001')['case_count'] == index.get('country', 'C001')['case_count']
+
+    def test_requires_a_country(self):
+        with pytest.raises(ValueError):
+            SyntheticOutbreak(countries=0)
+
+    def test_insert_supabase_invalidates_cached_reads(self, outbreak, tmp_path):
+        fake = FakeSupabase({table: [] for table in TABLES})
+        cache = SharedCache(str(tmp_path / 'cache.sqlite3'))
+
+        with patch.object(database, 'get_supabase_client', return_value=fake), \
+                patch.object(shared_cache, 'get_shared_cache', return_value=cache):
+            written = insert_supabase(outbreak, chunk_size=500)
+
+        assert written['regional_summary'] == len(fake.tables['regional_summary'])
+        assert all(cache.version(family)[0] == 1
+                   for family in ('regional_summary', 'timeseries', 'forecast_report'))
@@ -9,7 +9,12 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from app.utils import allowed_file, validate_file_size, generate_unique_filename, get_file_extension
+from app.config import Config
+from app.utils import (
+    allowed_file, validate_file_size, generate_unique_filename, get_file_extension,
+    read_image_header, summarize_capacity, validate_image
+)
+from tests.fake_images import jpeg_bytes, png_bytes
 
 
 class TestAllowedFile:
@@ -73,6 +78,50 @@ class TestValidateFileSize:
         assert fake_file.tell() == 0
 
 
+class TestReadImageHeader:
+    """Tests for decode-free format and dimension sniffing."""
+
+    def test_png_dimensions(self):
+        assert read_image_header(BytesIO(png_bytes(640, 480))) == ('png', 640, 480)
+
+    def test_jpeg_dimensions_past_exif(self):
+        image = BytesIO(jpeg_bytes(3000, 2000, exif_bytes=60000))
+
+        assert read_image_header(image) == ('jpeg', 3000, 2000)
+        assert image.tell() == 0
+
+    def test_progressive_jpeg_and_fill_bytes(self):
+        data = jpeg_bytes(800, 600, sof_marker=0xC2)
+        padded = data[:2] + b'\xff\xff' + data[2:]
+
+        assert read_image_header(BytesIO(padded)) == ('jpeg', 800, 600)
+
+    def test_rejects_non_images_and_broken_headers(self):
+        png = bytearray(png_bytes(64, 64))
+        png[20] ^= 0xff  # corrupt IHDR so the CRC no longer matches
+
+        assert read_image_header(BytesIO(b'GIF89a' + b'\x00' * 40)) is None
+        assert read_image_header(BytesIO(bytes(png))) is None
+        assert read_image_header(BytesIO(png_bytes()[:20])) is None
+        assert read_image_header(BytesIO(jpeg_bytes()[:30])) is None
+        assert read_image_header(BytesIO(b'')) is None
+
+
+class TestValidateImage:
+    """Tests for header-based image validation."""
+
+    def test_accepts_valid_image(self):
+        assert validate_image(BytesIO(png_bytes(512, 512))) == (('png', 512, 512), None)
+
+    def test_rejects_empty_and_oversized_images(self):
+        _, empty = validate_image(BytesIO(png_bytes(0, 512)))
+        with patch.object(Config, 'MAX_IMAGE_PIXELS', 1000):
+            _, huge = validate_image(BytesIO(jpeg_bytes(100, 100)))
+
+        assert empty == 'Image has no pixels.'
+        assert huge == 'Image is too large (100x100 pixels).'
+
+
 class TestGenerateUniqueFilename:
     """Tests for filename generation."""
     
@@ -110,3 +159,19 @@ class TestGetFileExtension:
     
     def test_handles_multiple_dots(self):
         assert get_file_extension('my.image.file.png') == 'png'
+
+
+class TestSummarizeCapacity:
+    """Tests for hospital capacity aggregation."""
+
+    def test_occupancy_has_every_predictor_field(self):
+        hospitals = [
+            {'total_beds': 100, 'icu_beds': 20,
+             'latest_resources': {'icu_beds_available': 5, 'ventilators_available': 8}},
+            {'total_beds': 50, 'icu_beds': 10, 'latest_resources': None},
+        ]
+
+        capacity, occupancy = summarize_capacity(hospitals)
+
+        assert capacity == {'total_beds': 150, 'icu_beds': 30, 'ventilators_available': 8}
+        assert occupancy == {'beds_occupied': 0, 'icu_beds_occupied': 15, 'ventilators_in_use': 0}